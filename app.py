@@ -1,17 +1,41 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import altair as alt
 import math 
+from datetime import datetime, time
+from pathlib import Path
+from time import perf_counter
 
 # Importar la función desde el archivo funciones.py
-from src.funciones import indice_de_sudoracion, tgbh, indice_sobrecarga_calorica, format_time, indice_de_calor
-
-#Importar csv con datos de metabolismo, cavs y clo
-lista_cavs = pd.read_csv("data/CAVS.csv")
-lista_metabolismo = pd.read_csv("data/Metabolismo.csv")
-lista_clo = pd.read_csv("data/Aislamiento.csv")
+# (altair, matplotlib, pyarrow y los módulos de lotes se importan donde se usan:
+# la primera ejecución solo paga por lo que se muestra)
+from src.funciones import EFECTOS_CALOR, NIVELES_CALOR, format_time, medidas_por_nivel
+from src.cache import indice_de_calor_cache, tgbh_cache, indice_de_sudoracion_cache, indice_sobrecarga_calorica_cache
+from src.resultados import ClasificacionISC, EstadoSudoracion, EstadoTGBH
+from src.inquilinos import MODO_MULTIINQUILINO, huella, resultados, tablas_inquilino
+from src.instrumentacion import medir, registrar, servir
+
+#Instrumentación opcional (INSTRUMENTACION=1): tiempo de cada ejecución del script y de cada gráfico,
+#publicado en localhost:9464/metricas; desactivada, servir y registrar no hacen nada
+inicio_ejecucion = perf_counter()
+servir()
+
+#Huella del contenido de cada archivo cargado (se calcula una vez por sesión y archivo)
+def huella_archivo(archivo):
+    huellas = st.session_state.setdefault("huellas_archivo", {})
+    file_id = getattr(archivo, "file_id", archivo.name)
+    if file_id not in huellas:
+        huellas[file_id] = huella(archivo)
+    return huellas[file_id]
+
+#El resumen del archivo se calcula una vez por contenido e inquilino, compartido entre sesiones
+def resumen_archivo(archivo):
+    from src.lotes import resumen_columnas
+
+    def leer():
+        with st.spinner("Leyendo archivo..."):
+            return resumen_columnas(archivo)
+
+    return resultados.obtener_o_calcular(inquilino, ("resumen", huella_archivo(archivo)), leer)
 
 # Configuración inicial de la página
 st.set_page_config(
@@ -20,6 +44,17 @@ st.set_page_config(
     layout="centered"
 )
 
+#Inquilino de la sesión (?inquilino=nombre en la URL, solo con la variable INQUILINOS definida)
+inquilino = st.query_params.get("inquilino", "") if MODO_MULTIINQUILINO else ""
+
+#Tablas de metabolismo, cavs y clo: las de data/ se leen una vez por proceso y se comparten
+#entre sesiones; las propias del inquilino se fusionan encima una vez por inquilino
+try:
+    lista_cavs, lista_metabolismo, lista_clo = tablas_inquilino(inquilino)
+except ValueError as error:
+    st.error(f"❌ {error}")
+    st.stop()
+
 # Título principal
 st.title("🔥 Sistema HEMS - Evaluación de Estrés Térmico")
 st.markdown("---")
@@ -105,22 +140,27 @@ velocidad_aire, humedad_relativa = 0.016, 50.00
 
 # Procesar archivo si existe
 if archivo is not None:
+    # Módulos del cálculo por lotes (NumPy, pyarrow): solo cuando hay un archivo
+    import numpy as np
+    from src.lotes import COLUMNAS_AMBIENTALES, COLUMNAS_SERIE, evaluar_archivo
+    from src.almacen import RAIZ_POR_DEFECTO, AlmacenResultados
+    from src.barrido import barrer_bloques, opciones_referencia
+    from src.graficos import SerieReducida
+    from src.ingesta import DERIVABLES, ingerir
+    from src.psicrometria import humedad_relativa as derivar_humedad, temperatura_bulbo_humedo
+
     try:
-        df = pd.read_csv(archivo)
+        # Lectura por bloques: solo se guardan la vista previa y los promedios
+        with medir("app.lectura_archivo"):
+            vista_previa, promedios = resumen_archivo(archivo)
         st.success("✅ Archivo cargado correctamente")
         
         # Vista previa
         st.write("**Vista previa (primeras 5 filas):**")
-        st.dataframe(df.head())
+        st.dataframe(vista_previa)
         
         # Diccionario para mapear columnas con valores por defecto
-        columnas_map = {
-            "Temperatura seca (°C)": ("temp_aire", 32.00),
-            "Temperatura de globo (°C)": ("temp_globo", 36.00), 
-            "Temperatura de bulbo humedo (°C)": ("temp_bulbo", 28.00),
-            "Velocidad del aire (m/s)": ("velocidad_aire", 0.016),
-            "Humedad relativa (%)": ("humedad_relativa", 50.00)
-        }
+        columnas_map = COLUMNAS_AMBIENTALES
         
         # Procesar cada columna de forma SEGURA
         columnas_encontradas = []
@@ -128,28 +168,36 @@ if archivo is not None:
         columnas_vacias = []
         
         for columna_df, (variable, valor_default) in columnas_map.items():
-            if columna_df in df.columns:
-                # Verificar si la columna tiene datos NO vacíos
-                if not df[columna_df].isna().all() and len(df[columna_df].dropna()) > 0:
-                    # Calcular promedio excluyendo NaN
-                    valor_promedio = df[columna_df].mean()
-                    
-                    # Verificar si el resultado es NaN (por si acaso)
-                    if pd.isna(valor_promedio):
-                        globals()[variable] = valor_default
-                        columnas_vacias.append(columna_df)
-                    else:
-                        globals()[variable] = valor_promedio
-                        columnas_encontradas.append(columna_df)
-                else:
-                    # Columna existe pero está vacía
+            if columna_df in promedios:
+                valor_promedio = promedios[columna_df]
+                
+                # Columna vacía o sin valores numéricos
+                if pd.isna(valor_promedio):
                     globals()[variable] = valor_default
                     columnas_vacias.append(columna_df)
+                else:
+                    globals()[variable] = valor_promedio
+                    columnas_encontradas.append(columna_df)
             else:
                 # Columna no existe en el CSV
                 globals()[variable] = valor_default
                 columnas_faltantes.append(columna_df)
         
+        # Sin bulbo húmedo o sin humedad relativa: se deriva de la otra en lugar del valor por defecto
+        columnas_variable = {variable: columna for columna, (variable, _) in columnas_map.items()}
+        columnas_derivadas = []
+        for variable, otra in DERIVABLES.items():
+            columna_df = columnas_variable[variable]
+            if columna_df not in columnas_encontradas and columnas_variable[otra] in columnas_encontradas:
+                if variable == "temp_bulbo":
+                    temp_bulbo = float(temperatura_bulbo_humedo(temp_aire, humedad_relativa))
+                else:
+                    humedad_relativa = float(derivar_humedad(temp_aire, temp_bulbo))
+                columnas_derivadas.append(columna_df)
+                for lista in (columnas_faltantes, columnas_vacias):
+                    if columna_df in lista:
+                        lista.remove(columna_df)
+        
         # MOSTRAR RESUMEN DETALLADO
         st.write("### 📋 Resumen de Datos Cargados")
         
@@ -160,6 +208,12 @@ if archivo is not None:
                 valor = globals()[variable]
                 st.write(f"• {columna}: **{valor:.2f}**")
         
+        if columnas_derivadas:
+            st.info("**🔁 Columnas derivadas (relación psicrométrica con la temperatura seca):**")
+            for columna in columnas_derivadas:
+                variable = columnas_map[columna][0]
+                st.write(f"• {columna}: **{globals()[variable]:.2f}**")
+        
         if columnas_vacias:
             st.warning("**⚠️ Columnas vacías (usando valores por defecto):**")
             for columna in columnas_vacias:
@@ -177,6 +231,7 @@ if archivo is not None:
             - Las columnas **vacías o faltantes** usan valores por defecto
             - Puede **corregir manualmente** cualquier valor en la siguiente sección
             """)
+        st.info("Los valores de la siguiente sección son promedios del archivo. La evaluación fila por fila está al final de la página, en **Evaluación por lotes del archivo**.")
         
     except Exception as e:
         st.error(f"❌ Error al procesar el archivo: {str(e)}")
@@ -243,7 +298,10 @@ st.write("## 📊 Resultados de Evaluación")
 #Llamar a la función indice de calor
 st.write("### 📈 Resultados Índice de Calor")
 
-heat_index,nivel,efecto,medidas_de_salud,nivel_para_medidas=indice_de_calor(temp_aire,humedad_relativa,radiacion_solar)
+heat_index,codigo_nivel,codigo_nivel_para_medidas=indice_de_calor_cache(temp_aire,humedad_relativa,radiacion_solar)
+nivel=NIVELES_CALOR[codigo_nivel]
+efecto=EFECTOS_CALOR[codigo_nivel]
+nivel_para_medidas=NIVELES_CALOR[codigo_nivel_para_medidas]
 
 #Graficar el indice de calor 
 
@@ -252,6 +310,9 @@ heat_index,nivel,efecto,medidas_de_salud,nivel_para_medidas=indice_de_calor(temp
 # ---------------------------
 # 2) PREPARAR DATOS PARA UNA SOLA BARRA
 # ---------------------------
+inicio_grafico = perf_counter()
+import altair as alt
+
 max_ref = max(140, math.ceil(heat_index) + 10)
 
 # Crear DataFrame con UNA sola fila - la del nivel actual
@@ -311,6 +372,7 @@ rule = (
 
 # Mostrar gráfico
 st.altair_chart(bar + text + rule, use_container_width=True)
+registrar("app.grafico_indice_calor", perf_counter() - inicio_grafico)
 
 # ---------------------------
 # 4) MÉTRICAS Y EFECTOS (sin cambios - como lo tenías bien)
@@ -333,8 +395,8 @@ if radiacion_solar == "Si":
 with st.expander(f"📋 Ver medidas de prevención para {nivel_para_medidas}", expanded=False):
     st.write(f"**Medidas específicas para {nivel_para_medidas}:**")
     
-    # Listar todas las medidas de la lista medidas_de_salud
-    for i, medida in enumerate(medidas_de_salud, 1):
+    # Listar las medidas del nivel (se resuelven a partir del código solo al mostrarlas)
+    for i, medida in enumerate(medidas_por_nivel(codigo_nivel_para_medidas), 1):
         st.write(f"• {medida}")
 
 
@@ -356,45 +418,24 @@ with st.expander("📊 Información sobre los niveles"):
 st.write("### 🌡️ Resultados TGBH")
 st.write("El TGBH es un índice que considera la temperatura del aire, la humedad, la radiación solar y la velocidad del aire para evaluar el estrés térmico en ambientes calurosos.")
 st.write("Esta diseñado para evaluar jornadas de máximo 8 horas y con mediciones de al menos una hora.")
-wbgt,tgbh_efectivo,tgbh_ref,estado=tgbh(radiacion_solar,temp_aire,temp_globo,temp_bulbo,cavs,carga_metabolica,aclimatacion)
+wbgt,tgbh_efectivo,tgbh_ref,estado=tgbh_cache(radiacion_solar,temp_aire,temp_globo,temp_bulbo,cavs,carga_metabolica,aclimatacion)
 # Mostrar los valores asignados después de que el usuario presione el botón
 
 st.write(f"TGBH: {round(wbgt,2)}")
 st.write(f"TGBH efectivo: {round(tgbh_efectivo,2)}")
 st.write(f"TGBH referencia: {round(tgbh_ref,2)}")
-st.write(f"Usted se encuentra en: {estado}")
-# Definir las funciones para las dos curvas
-def curva_aclimatada(x):
-    return 56.7 - 11.5 * np.log10(x)
-
-def curva_no_aclimatada(x):
-    return 59.9 - 14.1 * np.log10(x)
-x_values = np.linspace(100, 600, 500)
-y_aclimatada = curva_aclimatada(x_values)
-y_no_aclimatada = curva_no_aclimatada(x_values)
-# Crear el gráfico
-fig_1, ax = plt.subplots(figsize=(8, 6))
-# Graficar las curvas
-ax.plot(x_values, y_aclimatada, label="Personas Aclimatadas", color="blue", linewidth=2)
-ax.plot(x_values, y_no_aclimatada, label="Personas No Aclimatadas", color="red", linestyle='--', linewidth=2)
-# Graficar el punto
-ax.scatter(carga_metabolica, tgbh_efectivo, color="green", zorder=5, label=f'Punto ({carga_metabolica},{round(tgbh_efectivo),2})')
-# Etiquetas y título
-ax.set_xlabel('Carga Metabólica')
-ax.set_ylabel('TGBH Efectivo')
-ax.set_title('Curvas de Aclimatación y No Aclimatación')
-ax.legend()
-# Ajustar límites de los ejes
-ax.set_xlim(100, 600)
-ax.set_ylim(15, 45)
+st.write(f"Usted se encuentra en: {estado.texto}")
+# Curvas de aclimatación: se dibujan solo si se piden y la imagen se memoriza por punto
+if st.toggle("📈 Mostrar curvas de aclimatación", key="curvas_tgbh"):
+    from src.graficos import png_curvas_tgbh
 
-# Mostrar gráfico
-st.pyplot(fig_1)
+    with medir("app.grafico_curvas_tgbh"):
+        st.image(png_curvas_tgbh(float(carga_metabolica), float(tgbh_efectivo)))
 
 #Compuerta lógica para mostrar métodos de evaluación
-#Si se encuentra en estrés térmico, mostrará el método de evaluación SWreq e ISC, de lo contrario, mostrará Fanger. Fanger aun no se ha agregado.
+#Si se encuentra en estrés térmico, mostrará el método de evaluación SWreq e ISC, de lo contrario, mostrará Fanger.
 
-if estado == "Estrés Térmico":
+if estado == EstadoTGBH.ESTRES_TERMICO:
     st.write("### Método de evaluación: SWreq e ISC")
     st.write("Ya que el trabajador se encuentra en estrés térmico, se recomienda utilizar el método de evaluación SWreq e ISC")
     #Selección de la vestimenta para el factor clo
@@ -408,6 +449,39 @@ if estado == "Estrés Térmico":
          altura=st.number_input("Altura promedio de los trabajadores (cm)", min_value=0.00, max_value=300.00, value=170.00)
     with col6:
         peso=st.number_input("Peso promedio de los trabajadores (kg)", min_value=50.00, max_value=150.00, value=70.00)
+
+    with st.expander("Incertidumbre de la medición (Monte Carlo)"):
+        st.write("Intervalos de confianza de TGBH, ISC y SWreq considerando la exactitud de los sensores y la variabilidad de altura, peso y aclimatación de los trabajadores")
+        col_mc1, col_mc2, col_mc3 = st.columns(3)
+        with col_mc1:
+            muestras_mc = st.selectbox("Número de muestras", [10_000, 20_000, 50_000, 100_000], index=1, key="muestras_mc")
+            exactitud_mc = st.number_input("Exactitud de los termómetros (± °C)", min_value=0.0, max_value=3.0, value=0.5, step=0.1, key="exactitud_mc")
+        with col_mc2:
+            desviacion_altura_mc = st.number_input("Desviación estándar de la altura (cm)", min_value=0.0, max_value=30.0, value=7.0, key="desviacion_altura_mc")
+            desviacion_peso_mc = st.number_input("Desviación estándar del peso (kg)", min_value=0.0, max_value=40.0, value=12.0, key="desviacion_peso_mc")
+        with col_mc3:
+            proporcion_mc = st.slider("Proporción de trabajadores aclimatados", 0.0, 1.0, 1.0 if aclimatacion == "Si" else 0.0, 0.05, key="proporcion_mc")
+            semilla_mc = st.number_input("Semilla (resultados reproducibles)", min_value=0, value=0, step=1, key="semilla_mc")
+        if st.button("Calcular intervalos de confianza", key="calcular_mc"):
+            from src.incertidumbre import EXACTITUD_SENSORES, METRICAS, evaluar_incertidumbre
+            exactitud = {**EXACTITUD_SENSORES, "temp_aire": exactitud_mc, "temp_globo": exactitud_mc, "temp_bulbo": exactitud_mc}
+            incertidumbre = evaluar_incertidumbre(
+                {"temp_aire": temp_aire, "temp_globo": temp_globo, "temp_bulbo": temp_bulbo, "velocidad_aire": velocidad_aire},
+                {"radiacion_solar": radiacion_solar, "cavs": cavs, "carga_metabolica": carga_metabolica, "aclimatacion": aclimatacion,
+                 "iclo": iclo, "postura": postura, "conveccion": conveccion, "altura": altura, "peso": peso},
+                muestras=muestras_mc, semilla=int(semilla_mc), exactitud=exactitud, desviacion_altura=desviacion_altura_mc,
+                desviacion_peso=desviacion_peso_mc, proporcion_aclimatados=proporcion_mc)
+            intervalos = incertidumbre.intervalos().rename(index={metrica: etiqueta for metrica, _, etiqueta in METRICAS})
+            intervalos.columns = ["Estimación", "Límite inferior (95%)", "Mediana", "Límite superior (95%)"]
+            st.dataframe(intervalos.style.format("{:.1f}"), use_container_width=True)
+            probabilidades = incertidumbre.probabilidades()
+            col_p1, col_p2, col_p3 = st.columns(3)
+            with col_p1:
+                st.metric("Probabilidad de estrés térmico", f"{probabilidades['estres_termico']:.0%}")
+            with col_p2:
+                st.metric("Probabilidad de ISC > 100%", f"{probabilidades['isc_sobre_100']:.0%}")
+            with col_p3:
+                st.metric("SWreq no aplicable (Emax < 0)", f"{probabilidades['swreq_no_aplicable']:.0%}")
     
     #Nuevas visualizaciones ISC y Swreq    
     
@@ -418,9 +492,11 @@ if estado == "Estrés Térmico":
     if mostrar_swreq:
         
         # Llamar a la función indice de sudoración
-        dle_alarma_q, dle_peligro_q, dle_alarma_d, dle_peligro_d = indice_de_sudoracion(temp_aire, temp_globo, temp_bulbo, iclo, carga_metabolica, velocidad_aire, postura, aclimatacion, conveccion)
-        if dle_alarma_q == 0 and dle_peligro_q == 0 and dle_alarma_d == 0 and dle_peligro_d == 0:
+        dle_alarma_q, dle_peligro_q, dle_alarma_d, dle_peligro_d, estado_swreq = indice_de_sudoracion_cache(temp_aire, temp_globo, temp_bulbo, iclo, carga_metabolica, velocidad_aire, postura, aclimatacion, conveccion)
+        if estado_swreq == EstadoSudoracion.EMAX_NEGATIVO:
             st.error("❌ Error en el cálculo de SWreq. Cuando emax < 0 este metodo no puede ser utilizado. Por favor, revise los datos ingresados.")
+        elif estado_swreq == EstadoSudoracion.SIN_DATO:
+            st.error("❌ El SWreq no se puede calcular con estos datos (por ejemplo, temperatura de globo menor que la del aire con velocidad del aire ≤ 0.15 m/s). Por favor, revise los datos ingresados.")
         else:
             st.success("✅ Cálculo de SWreq completado exitosamente.")
             # VISUALIZACIÓN MEJORADA - DIRECTAMENTE EN EL FLUJO
@@ -476,144 +552,148 @@ if estado == "Estrés Térmico":
         mostrar_isc = st.button("Calcular Índice de Sobrecarga de Calor")
         if mostrar_isc:
             # Llamar a la función
-            isc, clasificacion_isc, tiempo_exp_per, emax, ereq = indice_sobrecarga_calorica(
+            isc, codigo_clasificacion_isc, tiempo_exp_per, emax, ereq = indice_sobrecarga_calorica_cache(
                 carga_metabolica, velocidad_aire, temp_globo, temp_aire, temp_bulbo, iclo, altura, peso
             )  
-            # ---------------------------
-            # 1) DETERMINAR NIVEL Y COLOR ACTUAL
-            # ---------------------------
-            # Determinar nivel y color actual
-            if isc <= 10:
-                nivel_actual = "Confort"
-                color_actual = "green"
-            elif isc <= 30:
-                nivel_actual = "Suave"
-                color_actual = "yellow"
-            elif isc <= 40:
-                nivel_actual = "Alarma" 
-                color_actual = "orange"
-            elif isc <= 79:
-                nivel_actual = "Severa"
-                color_actual = "orange"
-            elif isc <= 100:
-                nivel_actual = "Muy Severa"
-                color_actual = "red"
+            clasificacion_isc = codigo_clasificacion_isc.texto
+            if codigo_clasificacion_isc == ClasificacionISC.SIN_DATO:
+                st.error("❌ El ISC no se puede calcular con estos datos (por ejemplo, temperatura de globo menor que la del aire con velocidad del aire ≤ 0.15 m/s). Por favor, revise los datos ingresados.")
             else:
-                nivel_actual = "Crítica"
-                color_actual = "red"
+                # ---------------------------
+                # 1) DETERMINAR NIVEL Y COLOR ACTUAL
+                # ---------------------------
+                # Determinar nivel y color actual
+                if isc <= 10:
+                    nivel_actual = "Confort"
+                    color_actual = "green"
+                elif isc <= 30:
+                    nivel_actual = "Suave"
+                    color_actual = "yellow"
+                elif isc <= 40:
+                    nivel_actual = "Alarma" 
+                    color_actual = "orange"
+                elif isc <= 79:
+                    nivel_actual = "Severa"
+                    color_actual = "orange"
+                elif isc <= 100:
+                    nivel_actual = "Muy Severa"
+                    color_actual = "red"
+                else:
+                    nivel_actual = "Crítica"
+                    color_actual = "red"
 
-            # ---------------------------
-            # VERSIÓN CORREGIDA
-            # ---------------------------
+                # ---------------------------
+                # VERSIÓN CORREGIDA
+                # ---------------------------
 
-            st.title("🔥 Índice de Sobrecarga Calórica (ISC)")
+                st.title("🔥 Índice de Sobrecarga Calórica (ISC)")
 
-            # Tarjeta principal con el valor del ISC - SIN DELTA
-            col1, col2 = st.columns([1, 2])
+                # Tarjeta principal con el valor del ISC - SIN DELTA
+                col1, col2 = st.columns([1, 2])
 
-            with col1:
-                # Mostrar el valor sin delta (para eliminar la flecha verde)
-                st.metric(
-                    label="**ISC ACTUAL**",
-                    value=f"{isc:.1f}%"
-                )
+                with col1:
+                    # Mostrar el valor sin delta (para eliminar la flecha verde)
+                    st.metric(
+                        label="**ISC ACTUAL**",
+                        value=f"{isc:.1f}%"
+                    )
                 
-                # Mostrar el nivel con color personalizado
-                st.markdown(f"**Nivel:** <span style='color:{color_actual}; font-weight:bold;'>{nivel_actual}</span>", 
-                            unsafe_allow_html=True)
+                    # Mostrar el nivel con color personalizado
+                    st.markdown(f"**Nivel:** <span style='color:{color_actual}; font-weight:bold;'>{nivel_actual}</span>", 
+                                unsafe_allow_html=True)
 
-            with col2:
-                # Indicador visual mejorado - SIN BARRA DE PROGRESO AZUL
-                st.write(f"**Progreso hacia el límite crítico (100%):**")
+                with col2:
+                    # Indicador visual mejorado - SIN BARRA DE PROGRESO AZUL
+                    st.write(f"**Progreso hacia el límite crítico (100%):**")
                 
-                if isc <= 100:
-                    # Para valores normales, usar un texto simple
-                    st.info(f"🟢 **{isc:.1f}% / 100%** - Dentro del límite seguro")
-                else:
-                    # Para valores críticos, mostrar claramente el exceso
-                    st.error(f"🔴 **100% + {isc-100:.1f}% EXCEDIDO** - CONDICIÓN CRÍTICA")
+                    if isc <= 100:
+                        # Para valores normales, usar un texto simple
+                        st.info(f"🟢 **{isc:.1f}% / 100%** - Dentro del límite seguro")
+                    else:
+                        # Para valores críticos, mostrar claramente el exceso
+                        st.error(f"🔴 **100% + {isc-100:.1f}% EXCEDIDO** - CONDICIÓN CRÍTICA")
                     
 
-            # Línea separadora
-            st.markdown("---")
+                # Línea separadora
+                st.markdown("---")
 
-            # CLASIFICACIÓN Y ALERTA PRINCIPAL
-            st.subheader("📊 Clasificación y Estado")
+                # CLASIFICACIÓN Y ALERTA PRINCIPAL
+                st.subheader("📊 Clasificación y Estado")
 
-            if nivel_actual == "Confort":
-                st.success(f"## ✅ {clasificacion_isc}")
-                st.info("**Estado:** Confort térmico - Condiciones normales de trabajo")
+                if nivel_actual == "Confort":
+                    st.success(f"## ✅ {clasificacion_isc}")
+                    st.info("**Estado:** Confort térmico - Condiciones normales de trabajo")
                 
-            elif nivel_actual == "Suave":
-                st.info(f"## ℹ️ {clasificacion_isc}")
-                st.info("**Recomendación:** Monitoreo preventivo recomendado")
+                elif nivel_actual == "Suave":
+                    st.info(f"## ℹ️ {clasificacion_isc}")
+                    st.info("**Recomendación:** Monitoreo preventivo recomendado")
                 
-            elif nivel_actual == "Alarma":
-                st.warning(f"## ⚠️ {clasificacion_isc}")
-                st.warning("**Alerta:** Inicio de zona de alarma - Implementar controles básicos")
+                elif nivel_actual == "Alarma":
+                    st.warning(f"## ⚠️ {clasificacion_isc}")
+                    st.warning("**Alerta:** Inicio de zona de alarma - Implementar controles básicos")
                 
-            elif nivel_actual == "Severa":
-                st.warning(f"## 🚨 {clasificacion_isc}")
-                st.warning("**Alerta:** Controles activos requeridos - Monitoreo continuo")
+                elif nivel_actual == "Severa":
+                    st.warning(f"## 🚨 {clasificacion_isc}")
+                    st.warning("**Alerta:** Controles activos requeridos - Monitoreo continuo")
                 
-            elif nivel_actual == "Muy Severa":
-                st.error(f"## 🔴 {clasificacion_isc}")
-                st.error("**Alerta:** Límite máximo permisible - Precaución extrema")
+                elif nivel_actual == "Muy Severa":
+                    st.error(f"## 🔴 {clasificacion_isc}")
+                    st.error("**Alerta:** Límite máximo permisible - Precaución extrema")
                 
-            else:  # Crítica
-                st.error(f"## 🚨 {clasificacion_isc}")
-                st.error("**ALERTA CRÍTICA:** Condiciones peligrosas - Intervención inmediata")
+                else:  # Crítica
+                    st.error(f"## 🚨 {clasificacion_isc}")
+                    st.error("**ALERTA CRÍTICA:** Condiciones peligrosas - Intervención inmediata")
 
-            # INFORMACIÓN DE TIEMPO DE EXPOSICIÓN
-            st.markdown("---")
-            st.subheader("⏱️ Tiempo de Exposición")
+                # INFORMACIÓN DE TIEMPO DE EXPOSICIÓN
+                st.markdown("---")
+                st.subheader("⏱️ Tiempo de Exposición")
 
-            if isc <= 100:
-                st.success("""
-                ### ✅ No se requiere limitar el tiempo de exposición
+                if isc <= 100:
+                    st.success("""
+                    ### ✅ No se requiere limitar el tiempo de exposición
                 
-                **Explicación:** El cuerpo puede disipar el calor acumulado manteniéndose 
-                dentro de los límites fisiológicos seguros (ISC ≤ 100%).
-                """)
-            else:
-                if tiempo_exp_per != float('inf') and tiempo_exp_per > 0:
-                    horas = int(tiempo_exp_per // 60)
-                    minutos = int(tiempo_exp_per % 60)
+                    **Explicación:** El cuerpo puede disipar el calor acumulado manteniéndose 
+                    dentro de los límites fisiológicos seguros (ISC ≤ 100%).
+                    """)
+                else:
+                    if tiempo_exp_per != float('inf') and tiempo_exp_per > 0:
+                        horas = int(tiempo_exp_per // 60)
+                        minutos = int(tiempo_exp_per % 60)
                     
-                    if horas > 0:
-                        tiempo_formateado = f"{horas}h {minutos}min"
-                    else:
-                        tiempo_formateado = f"{minutos} min"
+                        if horas > 0:
+                            tiempo_formateado = f"{horas}h {minutos}min"
+                        else:
+                            tiempo_formateado = f"{minutos} min"
                     
-                    st.error(f"""
-                    ### 🚨 TIEMPO LÍMITE DE EXPOSICIÓN: {tiempo_formateado}
+                        st.error(f"""
+                        ### 🚨 TIEMPO LÍMITE DE EXPOSICIÓN: {tiempo_formateado}
                     
-                    **Advertencia Crítica:** ISC del {isc:.1f}% supera el límite seguro del 100%.
-                    El cuerpo está acumulando calor activamente.
+                        **Advertencia Crítica:** ISC del {isc:.1f}% supera el límite seguro del 100%.
+                        El cuerpo está acumulando calor activamente.
                     
-                    **Acciones inmediatas requeridas:**
-                    - Limitar exposición continua a **{tiempo_formateado}**
-                    - Programar pausas de recuperación obligatorias
-                    - Monitorear signos de estrés térmico continuamente
-                    - Considerar rotación de personal
-                    """)
+                        **Acciones inmediatas requeridas:**
+                        - Limitar exposición continua a **{tiempo_formateado}**
+                        - Programar pausas de recuperación obligatorias
+                        - Monitorear signos de estrés térmico continuamente
+                        - Considerar rotación de personal
+                        """)
                     
-                    # Métricas rápidas
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric("Índice de Sobrecarga", f"{isc:.1f}%")
-                    with col2:
-                        st.metric("Tiempo Límite", tiempo_formateado)
+                        # Métricas rápidas
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.metric("Índice de Sobrecarga", f"{isc:.1f}%")
+                        with col2:
+                            st.metric("Tiempo Límite", tiempo_formateado)
                         
-                else:
-                    st.error("""
-                    ### ⚠️ CONDICIÓN EXTREMADAMENTE PELIGROSA
+                    else:
+                        st.error("""
+                        ### ⚠️ CONDICIÓN EXTREMADAMENTE PELIGROSA
                     
-                    **Advertencia:** El cálculo indica condiciones críticas donde no se puede 
-                    determinar un tiempo seguro de exposición.
+                        **Advertencia:** El cálculo indica condiciones críticas donde no se puede 
+                        determinar un tiempo seguro de exposición.
                     
-                    **Acción inmediata:** Suspender actividades y evacuar el área.
-                    """)
+                        **Acción inmediata:** Suspender actividades y evacuar el área.
+                        """)
 
             # LEYENDA DE NIVELES (opcional)
             with st.expander("📋 Ver escala de niveles ISC"):
@@ -628,18 +708,150 @@ if estado == "Estrés Térmico":
                 - 💀 **Crítica (>100%):** Intervención inmediata
                 """)
     
-if estado== "Discomfort":
+if estado == EstadoTGBH.DISCOMFORT:
     if radiacion_solar== "No":
         st.write("### Método de evaluación: Fanger")
         st.write("Ya que el trabajador no se encuentra en estrés térmico, se recomienda utilizar el método de evaluación Fanger")
+        conjuntos_clo_fanger = lista_clo.iloc[:,0].tolist()
+        seleccion_clo_fanger = st.selectbox("Seleccione el conjunto que utilizan los trabajadores:", conjuntos_clo_fanger, key="clo_fanger")
+        iclo_fanger = lista_clo[lista_clo["Ropa de trabajo"]==seleccion_clo_fanger]["m²·K/W"].iloc[0]
         #Llamar a la función Fanger
-        st.write("Aun no se ha implementado el método de evaluación Fanger, porfavor vuelva más tarde para poder utilizarlo")    
+        from src.fanger import pmv_ppd_globo, sensacion
+        from src.resultados import CategoriaFanger, EstadoFanger
+        resultado_fanger = pmv_ppd_globo(temp_aire, temp_globo, velocidad_aire, humedad_relativa, carga_metabolica, iclo_fanger).item()
+        pmv, ppd, temp_ropa, codigo_categoria, codigo_estado_fanger = resultado_fanger
+        if codigo_estado_fanger == EstadoFanger.SIN_CONVERGENCIA:
+            st.error("❌ No fue posible calcular el PMV con los datos ingresados (la temperatura de la ropa no converge).")
+        else:
+            col_pmv, col_ppd, col_categoria = st.columns(3)
+            with col_pmv:
+                st.metric("PMV", f"{pmv:.2f}", help="Voto medio estimado, de -3 (frío) a +3 (muy caluroso)")
+            with col_ppd:
+                st.metric("PPD", f"{ppd:.1f} %", help="Porcentaje estimado de insatisfechos")
+            with col_categoria:
+                st.metric("Categoría ISO 7730", CategoriaFanger(codigo_categoria).texto)
+            st.write(f"**Sensación térmica:** {sensacion(pmv)} · **Temperatura de la ropa:** {temp_ropa:.1f} °C")
+            if codigo_estado_fanger == EstadoFanger.FUERA_DE_RANGO:
+                st.warning("⚠️ Alguna de las condiciones está fuera del rango de aplicación de la ISO 7730; el resultado es solo orientativo.")
     else: 
         st.write("No se cuenta con una metodologia para evaluar discomfort en exteriores")
         
 
 
+#Evaluación por lotes: cada fila (o ventana de filas) del archivo con los cuatro índices
+if archivo is not None:
+    st.markdown("---")
+    st.write("## 📂 Evaluación por lotes del archivo")
+    st.write("Evalúa cada fila del archivo con los cuatro índices usando las características de la tarea indicadas arriba, en lugar de usar el promedio de cada columna.")
+    conjuntos_clo_lote = lista_clo.iloc[:,0].tolist()
+    seleccion_clo_lote = st.selectbox("Conjunto de ropa para SWreq e ISC:", conjuntos_clo_lote, key="clo_lote")
+    iclo_lote = lista_clo[lista_clo["Ropa de trabajo"]==seleccion_clo_lote]["m²·K/W"].iloc[0]
+    col7, col8 = st.columns(2)
+    with col7:
+        intervalo_s = st.number_input("Intervalo entre mediciones (s)", min_value=1, max_value=3600, value=60, key="intervalo_lote")
+    with col8:
+        ventana = st.number_input("Filas por ventana de promedio (1 = cada fila)", min_value=1, max_value=100000, value=1, key="ventana_lote",
+                                  help="Por ejemplo, 60 filas de 1 minuto = promedio horario como indica la ISO 7243")
+    guardar_lote = st.checkbox("Guardar los resultados en el almacén histórico", key="guardar_lote",
+                               help=f"Se agregan como Parquet en la carpeta '{RAIZ_POR_DEFECTO}' (variable ALMACEN_RESULTADOS)")
+    if guardar_lote:
+        col9, col10, col11 = st.columns(3)
+        with col9:
+            sitio_lote = st.text_input("Sitio", value=Path(archivo.name).stem, key="sitio_lote")
+        with col10:
+            fecha_lote = st.date_input("Fecha de la primera medición", key="fecha_lote")
+        with col11:
+            hora_lote = st.time_input("Hora de la primera medición", value=time(0, 0), key="hora_lote")
+    if st.button("Evaluar archivo completo"):
+        parametros_lote = {
+            "radiacion_solar": radiacion_solar,
+            "cavs": cavs,
+            "carga_metabolica": carga_metabolica,
+            "aclimatacion": aclimatacion,
+            "iclo": iclo_lote,
+            "postura": postura,
+            "conveccion": conveccion,
+        }
 
-
-
-
+        def evaluar_lote():
+            serie_lote = SerieReducida(COLUMNAS_SERIE)
+            almacen_lote = AlmacenResultados() if guardar_lote else None
+            resumen_lote, muestra_lote = evaluar_archivo(archivo, parametros_lote, ventana=int(ventana), intervalo_s=float(intervalo_s),
+                                                         almacen=almacen_lote, sitio=sitio_lote if guardar_lote else None,
+                                                         fecha_inicio=datetime.combine(fecha_lote, hora_lote) if guardar_lote else None,
+                                                         serie=serie_lote)
+            return resumen_lote, muestra_lote, serie_lote.datos()
+
+        with st.spinner("Evaluando el archivo por bloques..."), medir("app.evaluacion_lote"):
+            # Sin guardar en el almacén, el resultado se comparte entre las sesiones del inquilino con el mismo archivo
+            if guardar_lote:
+                resumen_lote, muestra_lote, datos_serie_lote = evaluar_lote()
+            else:
+                clave_lote = ("lote", huella_archivo(archivo), tuple(sorted(parametros_lote.items())), int(ventana), float(intervalo_s))
+                resumen_lote, muestra_lote, datos_serie_lote = resultados.obtener_o_calcular(inquilino, clave_lote, evaluar_lote)
+        # Los resultados quedan en la sesión para que mostrar u ocultar los gráficos no obligue a evaluar de nuevo
+        st.session_state["lote"] = {
+            "archivo": getattr(archivo, "file_id", archivo.name),
+            "resumen": resumen_lote,
+            "muestra": muestra_lote,
+            "serie": datos_serie_lote,
+            "sitio": sitio_lote if guardar_lote else None,
+        }
+    lote = st.session_state.get("lote")
+    if lote is not None and lote["archivo"] == getattr(archivo, "file_id", archivo.name):
+        resumen_lote, muestra_lote = lote["resumen"], lote["muestra"]
+        ingesta = resumen_lote.ingesta
+        st.success(f"✅ {resumen_lote.filas} filas evaluadas ({ingesta.filas_por_segundo:,.0f} filas/s de lectura)")
+        if lote["sitio"] is not None:
+            st.success(f"💾 Resultados guardados en el almacén como sitio '{lote['sitio']}'")
+        if ingesta.filas_descartadas:
+            st.warning(f"⚠️ {ingesta.filas_descartadas} filas vacías o fuera de rango fueron descartadas")
+        if ingesta.columnas_faltantes:
+            st.warning("**⚠️ Columnas faltantes (usando valores por defecto):** " + ", ".join(ingesta.columnas_faltantes))
+        if ingesta.columnas_derivadas:
+            st.info("**🔁 Columnas derivadas fila por fila (relación psicrométrica):** " + ", ".join(ingesta.columnas_derivadas))
+        st.write("### 📊 Estadísticas por índice")
+        st.dataframe(resumen_lote.estadisticas())
+        st.write("### ⏱️ Tiempo por nivel")
+        st.dataframe(resumen_lote.tiempo_sobre_umbral())
+        #Serie de tiempo reducida a un presupuesto fijo de puntos (se dibuja solo si se pide)
+        if st.toggle("📈 Mostrar series de tiempo", key="series_lote"):
+            metrica_serie = st.selectbox("Índice:", COLUMNAS_SERIE, key="metrica_serie")
+            datos_serie = lote["serie"][["x", metrica_serie]].replace([np.inf, -np.inf], np.nan)
+            st.caption(f"{len(datos_serie):,} de {resumen_lote.filas:,} puntos (se conservan el mínimo y el máximo de cada tramo)")
+            with medir("app.grafico_serie"):
+                st.altair_chart(
+                    alt.Chart(datos_serie).mark_line().encode(
+                        x=alt.X("x:Q", title="Horas desde la primera medición"),
+                        y=alt.Y(f"{metrica_serie}:Q", title=metrica_serie),
+                    ),
+                    use_container_width=True,
+                )
+        st.write(f"### 📋 Resultados por fila (primeras {len(muestra_lote)} filas)")
+        st.dataframe(muestra_lote)
+
+    #Barrido de configuraciones: todas las combinaciones de ropa, CAV, metabolismo y aclimatación
+    st.write("### 🔎 Configuraciones seguras para estas mediciones")
+    st.write("Evalúa todas las combinaciones de ropa, conjunto (CAV), clase metabólica y aclimatación de las tablas de referencia contra cada fila del archivo, y ordena las que se mantienen dentro de los límites de SWreq e ISC.")
+    jornada_barrido = st.number_input("Duración de la jornada (min)", min_value=30, max_value=720, value=480, step=30, key="jornada_barrido")
+    if st.button("Buscar configuraciones seguras"):
+        def barrer_archivo():
+            #Ropas, conjuntos y clases metabólicas del inquilino
+            ropas_barrido, conjuntos_barrido, metabolismos_barrido = opciones_referencia((lista_cavs, lista_metabolismo, lista_clo))
+            if capucha == "Si":
+                conjuntos_barrido = {conjunto: cav + 1 for conjunto, cav in conjuntos_barrido.items()}
+            #El archivo se recorre por bloques: cada uno se reduce y se descarta
+            return barrer_bloques(ingerir(archivo), ropas=ropas_barrido, conjuntos_cavs=conjuntos_barrido, metabolismos=metabolismos_barrido,
+                                  radiacion_solar=radiacion_solar, postura=postura, conveccion=conveccion, intervalo_s=float(intervalo_s),
+                                  duracion_jornada=float(jornada_barrido))
+
+        with st.spinner("Evaluando todas las combinaciones..."), medir("app.barrido"):
+            clave_barrido = ("barrido", huella_archivo(archivo), capucha, radiacion_solar, postura, conveccion,
+                             float(intervalo_s), float(jornada_barrido))
+            tabla_barrido = resultados.obtener_o_calcular(inquilino, clave_barrido, barrer_archivo)
+        seguras = tabla_barrido[tabla_barrido["segura"]]
+        st.success(f"✅ {len(seguras)} de {len(tabla_barrido)} combinaciones se mantienen dentro de los límites de SWreq e ISC")
+        st.dataframe(seguras if len(seguras) else tabla_barrido.head(50))
+
+#Fin de la ejecución del script (solo se registra con la instrumentación activa)
+registrar("app.ejecucion", perf_counter() - inicio_ejecucion)
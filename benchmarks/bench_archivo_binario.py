@@ -0,0 +1,68 @@
+"""Reevaluación desde CSV contra el archivo binario mapeado de src.archivo_binario
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_archivo_binario [--filas 525600] [--repeticiones 3]
+
+Genera un registro sintético (por defecto un año a 1 minuto), lo convierte una
+vez a binario y mide, para ambos formatos, la carga de las cinco variables y la
+evaluación completa con src.lotes (CSV) o ArchivoBinario.evaluar (binario) con
+dos conjuntos de ropa distintos. Verifica que los resultados coincidan.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.datos import SEMILLA, archivo_csv
+from src.archivo_binario import ArchivoBinario, a_float64, convertir
+from src.ingesta import VARIABLES, ingerir
+from src.lotes import evaluar_archivo
+from src.paralelo import PARAMETROS_POR_DEFECTO
+
+
+def _mejor(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=525_600)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        csv = Path(carpeta) / "registro.csv"
+        binario = Path(carpeta) / "registro.tgbh"
+        csv.write_bytes(archivo_csv(args.filas, SEMILLA).getvalue())
+        segundos_conversion, _ = _mejor(lambda: convertir(csv, binario, "2024-01-01", 60.0), 1)
+        print(f"{args.filas:,} filas: CSV {csv.stat().st_size / 1e6:.1f} MB, binario {binario.stat().st_size / 1e6:.1f} MB "
+              f"(conversión única {segundos_conversion:.2f} s)")
+
+        def cargar_binario():
+            archivo = ArchivoBinario(binario)
+            return {v: a_float64(archivo.columnas[v], archivo.decimales[v]) for v in VARIABLES}
+
+        carga_csv, _ = _mejor(lambda: [bloque[list(VARIABLES)].to_numpy() for bloque in ingerir(str(csv))], args.repeticiones)
+        carga_binario, _ = _mejor(cargar_binario, args.repeticiones)
+        print(f"{'':>22} {'CSV':>8} {'binario':>8} {'aceleración':>12}")
+        print(f"{'carga de variables':>22} {carga_csv:>7.3f}s {carga_binario:>7.3f}s {carga_csv / carga_binario:>11.1f}x")
+
+        for iclo in (0.11, 0.155):
+            parametros = {**PARAMETROS_POR_DEFECTO, "iclo": iclo}
+            total_csv, (resumen_csv, _) = _mejor(lambda: evaluar_archivo(str(csv), parametros, intervalo_s=60.0),
+                                                 args.repeticiones)
+            total_binario, (resumen_binario, _) = _mejor(lambda: ArchivoBinario(binario).evaluar(parametros),
+                                                         args.repeticiones)
+            assert resumen_csv.tiempo_sobre_umbral().equals(resumen_binario.tiempo_sobre_umbral())
+            print(f"{f'evaluación iclo={iclo}':>22} {total_csv:>7.3f}s {total_binario:>7.3f}s "
+                  f"{total_csv / total_binario:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
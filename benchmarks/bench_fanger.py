@@ -0,0 +1,64 @@
+"""Tiempo de src.fanger para un día de datos por minuto de muchas zonas
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_fanger [--zonas 100] [--repeticiones 5]
+
+Genera --zonas zonas interiores con un ciclo diario de temperatura (1440
+minutos cada una), ropa y actividad distintas, y mide pmv_ppd_vec sobre todas
+las zonas a la vez. Compara con pmv_ppd (una condición por llamada) en una
+muestra y verifica que ambos den el mismo PMV.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.datos import SEMILLA
+from src.fanger import MET, SUPERFICIE_CORPORAL, pmv_ppd, pmv_ppd_vec
+
+
+def zonas_aleatorias(zonas, minutos=1440, semilla=SEMILLA):
+    rng = np.random.default_rng(semilla)
+    ciclo = np.sin((np.arange(minutos) / 60 - 9) / 24 * 2 * np.pi)
+    temp_aire = rng.uniform(19, 25, (zonas, 1)) + 2.5 * ciclo
+    return {
+        "temp_aire": temp_aire,
+        "temp_radiante_media": temp_aire + rng.uniform(-1, 3, (zonas, 1)),
+        "velocidad_aire": rng.uniform(0.05, 0.4, (zonas, 1)),
+        "humedad_relativa": rng.uniform(30, 70, (zonas, 1)) - 10 * ciclo,
+        "carga_metabolica": rng.uniform(1, 2, (zonas, 1)) * MET * SUPERFICIE_CORPORAL,
+        "iclo": rng.uniform(0.5, 1.2, (zonas, 1)) * 0.155,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--zonas", type=int, default=100)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--muestra", type=int, default=2000)
+    args = parser.parse_args()
+
+    entradas = zonas_aleatorias(args.zonas)
+    tiempos = []
+    for _ in range(args.repeticiones):
+        inicio = time.perf_counter()
+        resultado = pmv_ppd_vec(**entradas)
+        tiempos.append(time.perf_counter() - inicio)
+
+    planas = {nombre: np.broadcast_to(valor, resultado.shape).ravel() for nombre, valor in entradas.items()}
+    indices = np.random.default_rng(SEMILLA).choice(resultado.size, min(args.muestra, resultado.size), replace=False)
+    inicio = time.perf_counter()
+    escalares = [pmv_ppd(**{nombre: valor[i] for nombre, valor in planas.items()}).pmv for i in indices]
+    por_condicion = (time.perf_counter() - inicio) / len(indices)
+    np.testing.assert_allclose(escalares, resultado["pmv"].ravel()[indices], atol=1e-6)
+
+    mejor = min(tiempos)
+    print(f"{args.zonas:,} zonas x {resultado.shape[1]} minutos ({resultado.size:,} condiciones): "
+          f"mejor {mejor * 1e3:.1f} ms, mediana {sorted(tiempos)[len(tiempos) // 2] * 1e3:.1f} ms")
+    print(f"pmv_ppd escalar: {por_condicion * 1e6:.1f} µs por condición, "
+          f"{por_condicion * resultado.size:.1f} s estimados para todas ({por_condicion * resultado.size / mejor:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Microbenchmark del tiempo por llamada de las funciones escalares de src/funciones.py
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_funciones [--llamadas 200000] [--repeticiones 5]
+        [--referencia ruta/a/funciones.py]
+
+Mide cada índice con timeit (el mejor de las repeticiones) y reporta
+microsegundos por llamada. Con --referencia se mide además otra versión del
+módulo, por ejemplo la de un commit anterior:
+    git show HEAD~1:src/funciones.py > /tmp/funciones_antes.py
+    python -m benchmarks.bench_funciones --referencia /tmp/funciones_antes.py
+"""
+
+import argparse
+import importlib.util
+import timeit
+
+import src.funciones
+
+# (nombre, argumentos) de cada caso; las entradas cubren las ramas más frecuentes de la aplicación
+CASOS = (
+    ("indice_de_calor", (32.0, 60.0, "Si")),
+    ("indice_de_calor", (40.0, 60.0, "No")),
+    ("indice_de_sudoracion", (32.0, 40.0, 28.0, 0.11, 300.0, 0.5, "De pie", "Si", "Natural")),
+    ("indice_de_sudoracion", (45.0, 55.0, 35.0, 0.2, 415.0, 1.5, "Sentado", "No", "Forzada")),
+    ("tgbh", ("Si", 32.0, 40.0, 28.0, 0.0, 300.0, "Si")),
+    ("indice_sobrecarga_calorica", (300.0, 0.5, 40.0, 32.0, 28.0, 0.11, 170, 70)),
+)
+
+
+def cargar_modulo(ruta):
+    especificacion = importlib.util.spec_from_file_location("funciones_referencia", ruta)
+    modulo = importlib.util.module_from_spec(especificacion)
+    especificacion.loader.exec_module(modulo)
+    return modulo
+
+
+def microsegundos_por_llamada(funcion, argumentos, llamadas, repeticiones):
+    tiempos = timeit.repeat(lambda: funcion(*argumentos), number=llamadas, repeat=repeticiones)
+    return min(tiempos) / llamadas * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llamadas", type=int, default=200_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--referencia", help="otra versión de funciones.py para comparar")
+    args = parser.parse_args()
+
+    modulos = [("actual", src.funciones)]
+    if args.referencia:
+        modulos.insert(0, ("referencia", cargar_modulo(args.referencia)))
+
+    print(f"{'caso':<40}" + "".join(f"{nombre:>14}" for nombre, _ in modulos) + ("     cambio" if args.referencia else ""))
+    for nombre, argumentos in CASOS:
+        tiempos = [microsegundos_por_llamada(getattr(modulo, nombre), argumentos, args.llamadas, args.repeticiones)
+                   for _, modulo in modulos]
+        caso = f"{nombre}({argumentos[0]}, ...)"
+        fila = f"{caso:<40}" + "".join(f"{t:11.3f} us" for t in tiempos)
+        if args.referencia:
+            fila += f"{(tiempos[1] / tiempos[0] - 1) * 100:+10.1f}%"
+        print(fila)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Tiempo de src.incertidumbre por lectura según el número de muestras
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_incertidumbre [--muestras 10000 100000] [--repeticiones 5]
+
+Evalúa TGBH, SWreq e ISC de una lectura calurosa con error de los sensores,
+altura y peso variables y mitad de trabajadores aclimatados, y mide la
+evaluación y el cálculo de los intervalos por separado.
+"""
+
+import argparse
+import time
+
+from benchmarks.datos import SEMILLA
+from src.incertidumbre import evaluar_incertidumbre
+
+VARIABLES = {"temp_aire": 32.0, "temp_globo": 40.0, "temp_bulbo": 26.0, "velocidad_aire": 0.3}
+PARAMETROS = {"radiacion_solar": "Si", "cavs": 0.0, "carga_metabolica": 300.0, "aclimatacion": "Si", "iclo": 0.11,
+              "postura": "De pie", "conveccion": "Natural", "altura": 170.0, "peso": 70.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--muestras", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    for muestras in args.muestras:
+        evaluacion, intervalos = [], []
+        for _ in range(args.repeticiones):
+            inicio = time.perf_counter()
+            resultado = evaluar_incertidumbre(VARIABLES, PARAMETROS, muestras=muestras, semilla=SEMILLA,
+                                              proporcion_aclimatados=0.5)
+            evaluacion.append(time.perf_counter() - inicio)
+            inicio = time.perf_counter()
+            tabla = resultado.intervalos()
+            intervalos.append(time.perf_counter() - inicio)
+        print(f"{muestras:,} muestras: evaluación {min(evaluacion) * 1e3:.1f} ms, intervalos {min(intervalos) * 1e3:.1f} ms")
+    print(tabla.round(1))
+
+
+if __name__ == "__main__":
+    main()
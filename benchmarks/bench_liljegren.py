@@ -0,0 +1,70 @@
+"""Tiempo de src.liljegren para un año de datos horarios de muchas estaciones
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_liljegren [--estaciones 300] [--repeticiones 3]
+
+Genera --estaciones estaciones en latitudes tropicales y subtropicales con un
+ciclo diario de temperatura, humedad y radiación (8784 horas de 2024, viento a
+10 m) y mide estimar_vec sobre todas a la vez. Compara con llamadas de un
+elemento en una muestra y verifica que ambos den lo mismo.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.datos import SEMILLA
+from src.liljegren import coseno_cenital, estimar_vec
+
+
+def estaciones_aleatorias(estaciones, semilla=SEMILLA):
+    rng = np.random.default_rng(semilla)
+    horas = np.arange(np.datetime64("2024-01-01T00:30"), np.datetime64("2025-01-01T00:30"), np.timedelta64(1, "h"))
+    latitud = rng.uniform(-30, 30, (estaciones, 1))
+    longitud = rng.uniform(-120, 120, (estaciones, 1))
+    cza, distancia = coseno_cenital(horas, latitud, longitud)
+    dia = np.clip(cza, 0, None)
+    return {
+        "temp_aire": rng.uniform(18, 30, (estaciones, 1)) + 8 * dia,
+        "humedad_relativa": np.clip(rng.uniform(40, 90, (estaciones, 1)) - 30 * dia, 5, 100),
+        "velocidad_viento": rng.uniform(0.5, 6, cza.shape),
+        "radiacion_solar": 1000 * dia * rng.uniform(0.4, 0.95, cza.shape),
+        "cza": cza,
+        "distancia": distancia,
+        "altura_viento": 10.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--estaciones", type=int, default=300)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--muestra", type=int, default=500)
+    args = parser.parse_args()
+
+    entradas = estaciones_aleatorias(args.estaciones)
+    tiempos = []
+    for _ in range(args.repeticiones):
+        inicio = time.perf_counter()
+        resultado = estimar_vec(**entradas)
+        tiempos.append(time.perf_counter() - inicio)
+
+    planas = {nombre: np.broadcast_to(valor, resultado.shape).ravel() for nombre, valor in entradas.items()}
+    indices = np.random.default_rng(SEMILLA).choice(resultado.size, min(args.muestra, resultado.size), replace=False)
+    inicio = time.perf_counter()
+    uno_a_uno = [estimar_vec(**{nombre: valor[i] for nombre, valor in planas.items()}) for i in indices]
+    por_elemento = (time.perf_counter() - inicio) / len(indices)
+    for campo in ("temp_globo", "temp_bulbo"):
+        np.testing.assert_allclose([r[campo] for r in uno_a_uno], resultado[campo].ravel()[indices], atol=1e-9)
+
+    mejor = min(tiempos)
+    sin_convergencia = int(np.count_nonzero(np.isnan(resultado["temp_globo"]) | np.isnan(resultado["temp_bulbo"])))
+    print(f"{args.estaciones:,} estaciones x {resultado.shape[1]} horas ({resultado.size:,} elementos): "
+          f"mejor {mejor:.2f} s, mediana {sorted(tiempos)[len(tiempos) // 2]:.2f} s, {sin_convergencia} sin convergencia")
+    print(f"un elemento por llamada: {por_elemento * 1e6:.0f} µs, "
+          f"{por_elemento * resultado.size:.0f} s estimados para todos ({por_elemento * resultado.size / mejor:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
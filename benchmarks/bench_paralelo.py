@@ -0,0 +1,58 @@
+"""Escalamiento de src.paralelo con 1, 2, 4 y 8 procesos
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_paralelo [--archivos 16] [--filas 200000] [--procesos 1 2 4 8]
+
+Genera --archivos CSV sintéticos de --filas filas en una carpeta temporal, los
+evalúa con cada número de procesos y reporta el tiempo, la aceleración contra un
+proceso y la eficiencia (aceleración / procesos). Medir N procesos requiere al
+menos N núcleos libres: con menos, los procesos se turnan en los mismos núcleos y
+la aceleración queda cerca de 1x (en una máquina de un núcleo se midió 1.00x con
+2 procesos y 0.92x con 4). Los números de procesos que superan os.cpu_count() se
+marcan en la tabla.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.datos import SEMILLA, archivo_csv
+from src.paralelo import evaluar_sitios
+
+
+def generar_archivos(carpeta, archivos, filas):
+    rutas = []
+    for i in range(archivos):
+        ruta = Path(carpeta) / f"sitio_{i:03d}.csv"
+        ruta.write_bytes(archivo_csv(filas, SEMILLA + i).getvalue())
+        rutas.append(ruta)
+    return rutas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--archivos", type=int, default=16)
+    parser.add_argument("--filas", type=int, default=200_000)
+    parser.add_argument("--procesos", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"{args.archivos} archivos x {args.filas:,} filas, os.cpu_count() = {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as carpeta:
+        rutas = generar_archivos(carpeta, args.archivos, args.filas)
+        base = None
+        print(f"{'procesos':>8} {'segundos':>10} {'filas/s':>12} {'aceleración':>12} {'eficiencia':>11}")
+        for procesos in args.procesos:
+            inicio = time.perf_counter()
+            resumen = evaluar_sitios(rutas, Path(carpeta) / f"salida_{procesos}", procesos=procesos)
+            segundos = time.perf_counter() - inicio
+            assert resumen["error"].isna().all(), resumen["error"].dropna().iloc[0]
+            base = base or segundos
+            print(f"{procesos:>8} {segundos:>10.2f} {resumen['filas'].sum() / segundos:>12,.0f} "
+                  f"{base / segundos:>11.2f}x {base / segundos / procesos:>10.0%}"
+                  + ("  (más procesos que núcleos)" if procesos > (os.cpu_count() or 1) else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Tiempo de src.phs para un turno de 8 h de muchos trabajadores
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_phs [--trabajadores 10000] [--minutos 480] [--repeticiones 3]
+
+Genera un turno con un ciclo de temperatura, sol y viento por minuto y
+--trabajadores trabajadores con ropa, aclimatación, peso y tasa metabólica
+distintos (con 10 min de pausa por hora), y mide la simulación PHS minuto a
+minuto de todos a la vez. Compara con simularlos de a uno en una muestra.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.datos import SEMILLA
+from src.phs import simular_globo
+
+
+def turno(minutos):
+    ciclo = np.sin(np.arange(minutos) / minutos * np.pi)
+    temp_aire = 24 + 8 * ciclo
+    return {
+        "temp_aire": temp_aire,
+        "temp_globo": temp_aire + 6 * ciclo,
+        "temp_bulbo": temp_aire - 8,
+        "velocidad_aire": 0.3 + 0.2 * np.cos(np.arange(minutos) / 17),
+    }
+
+
+def trabajadores_aleatorios(cantidad, minutos, semilla=SEMILLA):
+    rng = np.random.default_rng(semilla)
+    pausas = np.arange(minutos) % 60 >= 50
+    carga = rng.uniform(150, 450, (cantidad, 1))
+    return {
+        "carga_metabolica": np.where(pausas, 115.0, carga),
+        "iclo": rng.uniform(0.08, 0.2, (cantidad, 1)),
+        "aclimatacion": rng.choice(["Si", "No"], (cantidad, 1)),
+        "peso": rng.uniform(55, 95, (cantidad, 1)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trabajadores", type=int, default=10_000)
+    parser.add_argument("--minutos", type=int, default=480)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--muestra", type=int, default=20)
+    args = parser.parse_args()
+
+    condiciones = turno(args.minutos)
+    trabajadores = trabajadores_aleatorios(args.trabajadores, args.minutos)
+    tiempos = []
+    for _ in range(args.repeticiones):
+        inicio = time.perf_counter()
+        simulacion = simular_globo(**condiciones, **trabajadores)
+        tiempos.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    for i in range(args.muestra):
+        solo = simular_globo(**condiciones, **{nombre: valor[i:i + 1] for nombre, valor in trabajadores.items()})
+        np.testing.assert_allclose(solo.temp_rectal[0], simulacion.temp_rectal[i])
+    por_trabajador = (time.perf_counter() - inicio) / args.muestra
+
+    mejor = min(tiempos)
+    resumen = simulacion.resumen()
+    print(f"{args.trabajadores:,} trabajadores x {args.minutos} minutos: mejor {mejor:.2f} s, "
+          f"mediana {sorted(tiempos)[len(tiempos) // 2]:.2f} s")
+    print(f"de a uno: {por_trabajador * 1e3:.1f} ms por trabajador, "
+          f"{por_trabajador * args.trabajadores:.0f} s estimados para todos ({por_trabajador * args.trabajadores / mejor:.0f}x)")
+    print(f"{(resumen['limite_rectal_min'] < np.inf).sum():,} trabajadores llegan a 38 °C de temperatura rectal; "
+          f"pérdida de agua media {resumen['perdida_agua_g'].mean():.0f} g")
+
+
+if __name__ == "__main__":
+    main()
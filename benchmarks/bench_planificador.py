@@ -0,0 +1,70 @@
+"""Tiempo de src.planificador para un turno de 12 h en intervalos de 5 min
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_planificador [--cuadrillas 300] [--repeticiones 3]
+
+Genera un pronóstico horario de un día caluroso (ciclo diario de temperatura y
+sol de 7 a 17 h) y --cuadrillas cuadrillas con ropa, tasa metabólica y
+aclimatación distintas (todas diferentes, sin configuraciones repetidas), y
+mide el plan completo. Verifica que los planes factibles no superen los límites
+de almacenamiento y deshidratación.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datos import SEMILLA
+from src.planificador import planificar
+
+
+def pronostico_dia(horas=24):
+    hora = np.arange(horas)
+    ciclo = np.sin((hora - 9) / 24 * 2 * np.pi)
+    temp_aire = 26 + 8 * ciclo.clip(0) + 2 * ciclo
+    sol = (hora % 24 > 6) & (hora % 24 < 18)
+    return pd.DataFrame({
+        "temp_aire": temp_aire,
+        "temp_globo": temp_aire + np.where(sol, 12, 0),
+        "temp_bulbo": temp_aire - 6,
+        "velocidad_aire": np.full(horas, 0.5),
+    })
+
+
+def cuadrillas_aleatorias(cantidad, semilla=SEMILLA):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        "nombre": [f"cuadrilla_{i}" for i in range(cantidad)],
+        "iclo": rng.uniform(0.08, 0.2, cantidad),
+        "carga_metabolica": rng.uniform(150, 520, cantidad),
+        "aclimatacion": rng.choice(["Si", "No"], cantidad),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cuadrillas", type=int, default=300)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    pronostico = pronostico_dia()
+    cuadrillas = cuadrillas_aleatorias(args.cuadrillas)
+    tiempos = []
+    for _ in range(args.repeticiones):
+        inicio = time.perf_counter()
+        plan = planificar(pronostico, cuadrillas, inicio_h=6, duracion_min=720, paso_min=5)
+        tiempos.append(time.perf_counter() - inicio)
+
+    resumen = plan.resumen()
+    factibles = resumen[resumen["factible"]]
+    assert (factibles["almacenamiento_max"] <= 1).all() and (factibles["deshidratacion_final"] <= 1).all()
+    print(f"{args.cuadrillas:,} cuadrillas x {plan.trabajo.shape[1]} intervalos: mejor {min(tiempos):.3f} s, "
+          f"mediana {sorted(tiempos)[len(tiempos) // 2]:.3f} s")
+    print(f"{len(factibles):,} factibles; trabajo por cuadrilla factible: "
+          f"media {factibles['minutos_trabajo'].mean():.0f} min, mínimo {factibles['minutos_trabajo'].min():.0f} min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Tiempo de src.psicrometria y de la ingesta de un archivo con una sola columna de humedad
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_psicrometria [--filas 1000000] [--repeticiones 5]
+
+Mide temperatura_bulbo_humedo (aproximación de Stull y resolución exacta) y
+humedad_relativa sobre --filas condiciones, y la ingesta de un CSV sin la
+columna de bulbo húmedo contra el mismo CSV con las cinco columnas.
+"""
+
+import argparse
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datos import SEMILLA
+from src.ingesta import EstadisticasIngesta, ingerir
+from src.psicrometria import humedad_relativa, temperatura_bulbo_humedo
+
+
+def _mejor(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def _ingesta(datos):
+    contenido = datos.to_csv(index=False).encode()
+    estadisticas = EstadisticasIngesta()
+    for _ in ingerir(io.BytesIO(contenido), estadisticas=estadisticas):
+        pass
+    return estadisticas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(SEMILLA)
+    ta = rng.uniform(15, 50, args.filas)
+    hr = rng.uniform(5, 100, args.filas)
+    tbh = temperatura_bulbo_humedo(ta, hr)
+
+    for nombre, funcion in (
+        ("bulbo húmedo (Stull)", lambda: temperatura_bulbo_humedo(ta, hr, exacta=False)),
+        ("bulbo húmedo (exacta)", lambda: temperatura_bulbo_humedo(ta, hr)),
+        ("humedad relativa", lambda: humedad_relativa(ta, tbh)),
+    ):
+        mejor = _mejor(funcion, args.repeticiones)
+        print(f"{nombre}: {mejor * 1e3:.1f} ms, {args.filas / mejor / 1e6:.1f} M filas/s")
+
+    completo = pd.DataFrame({
+        "Temperatura seca (°C)": ta, "Temperatura de globo (°C)": ta + 5, "Temperatura de bulbo humedo (°C)": tbh,
+        "Velocidad del aire (m/s)": 0.5, "Humedad relativa (%)": hr,
+    })
+    for nombre, datos in (("cinco columnas", completo), ("sin bulbo húmedo", completo.drop(columns="Temperatura de bulbo humedo (°C)"))):
+        estadisticas = _ingesta(datos)
+        print(f"ingesta {nombre}: {estadisticas.filas_por_segundo:,.0f} filas/s "
+              f"(derivadas: {', '.join(estadisticas.columnas_derivadas) or 'ninguna'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Comparación del sanitizador vectorizado contra el original celda por celda
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_sanitizar [--filas 1000000] [--columnas 20] [--object]
+
+Genera un DataFrame con la mitad de columnas numéricas y la mitad de texto (con
+~5 % de celdas que empiezan con '=', '@', '+' o '-'), mide ambas versiones y
+verifica que el resultado sea idéntico. Con --object las columnas de texto usan
+dtype object (el comportamiento por defecto de pandas < 3).
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.funciones import sanitizar_dataframe
+
+
+def sanitizar_celda_por_celda(df):
+    # Versión original: una llamada de Python por celda (applymap se llama map en pandas >= 2.1)
+    aplicar = df.map if hasattr(df, "map") else df.applymap
+    return aplicar(lambda x: f"'{x}" if isinstance(x, str) and x.startswith(('=', '@', '+', '-')) else x)
+
+
+def generar_datos(filas, columnas, semilla=0):
+    rng = np.random.default_rng(semilla)
+    textos = np.array(["sensor", "zona norte", "=SUMA(A1:A9)", "@usuario", "+506", "-3.2", "ok"], dtype=object)
+    probabilidades = [0.4, 0.35, 0.0125, 0.0125, 0.0125, 0.0125, 0.2]
+    datos = {}
+    for i in range(columnas):
+        if i % 2:
+            datos[f"texto_{i}"] = rng.choice(textos, size=filas, p=probabilidades)
+        else:
+            datos[f"numero_{i}"] = rng.normal(30, 5, size=filas)
+    return pd.DataFrame(datos)
+
+
+def medir(funcion, df):
+    inicio = time.perf_counter()
+    resultado = funcion(df)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--columnas", type=int, default=20)
+    parser.add_argument("--object", action="store_true", help="columnas de texto con dtype object")
+    args = parser.parse_args()
+
+    df = generar_datos(args.filas, args.columnas)
+    if args.object:
+        df = df.astype({c: object for c in df.columns if c.startswith("texto_")})
+    print(f"DataFrame de {args.filas:,} filas x {args.columnas} columnas (pandas {pd.__version__})")
+    t_original, original = medir(sanitizar_celda_por_celda, df)
+    t_vectorizado, vectorizado = medir(sanitizar_dataframe, df)
+    assert original.astype(str).equals(vectorizado.astype(str)), "Los resultados no coinciden"
+    print(f"Celda por celda: {t_original:8.3f} s")
+    print(f"Vectorizado:     {t_vectorizado:8.3f} s")
+    print(f"Aceleración:     {t_original / t_vectorizado:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Rendimiento de src.tiempo_real con muchos sensores a 1 Hz
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_tiempo_real [--sensores 20000] [--segundos 300]
+
+Simula --sensores flujos que envían una muestra por segundo durante --segundos
+(en tiempo simulado) y reporta la memoria del evaluador, las muestras por
+segundo y el tiempo de cada tick (una muestra de todos los sensores, con el
+TGBH de las tres ventanas).
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.datos import SEMILLA
+from src.tiempo_real import EvaluadorTGBHEnVivo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sensores", type=int, default=20_000)
+    parser.add_argument("--segundos", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(SEMILLA)
+    evaluador = EvaluadorTGBHEnVivo(args.sensores, "Si", 0.0, 300.0, "Si")
+    sensores = np.arange(args.sensores)
+    temp_aire = rng.uniform(20, 40, args.sensores)
+    tiempos = []
+    for segundo in range(args.segundos):
+        ruido = rng.normal(0, 0.2, args.sensores)
+        inicio = time.perf_counter()
+        evaluador.agregar(sensores, 1.7e9 + segundo, temp_aire + ruido, temp_aire + 5 + ruido, temp_aire - 4 + ruido)
+        tiempos.append(time.perf_counter() - inicio)
+
+    tiempos = np.array(tiempos) * 1000
+    print(f"{args.sensores:,} sensores x {args.segundos} s, ventanas {list(evaluador.ventanas)} s")
+    print(f"  memoria:      {evaluador.nbytes / 1e6:.1f} MB ({evaluador.nbytes / args.sensores:,.0f} B por sensor)")
+    print(f"  muestras/s:   {args.sensores * args.segundos / tiempos.sum() * 1000:,.0f}")
+    print(f"  ms por tick:  p50 {np.percentile(tiempos, 50):.1f}   p99 {np.percentile(tiempos, 99):.1f}   "
+          f"máx {tiempos.max():.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Prueba de carga del servicio HTTP de src/servicio.py en localhost
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.carga_servicio [--conexiones 32] [--segundos 10]
+        [--endpoint /sudoracion] [--lote 0] [--procesos N] [--url http://127.0.0.1:8000]
+
+Sin --url levanta el servicio (python -m src.servicio) en un puerto libre, espera
+a que responda /salud y lo detiene al terminar. Cada conexión es un cliente
+HTTP/1.1 con keep-alive que envía solicitudes una tras otra durante --segundos;
+se informan las solicitudes por segundo y la latencia p50/p90/p99. Con --lote N
+cada solicitud lleva N lecturas.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from benchmarks.datos import argumentos, variables_ambientales
+from src.servicio import ENDPOINTS
+
+# Endpoint -> nombre de la función en benchmarks.datos.argumentos
+FUNCIONES = {
+    "/indice-calor": "indice_de_calor",
+    "/tgbh": "tgbh",
+    "/sudoracion": "indice_de_sudoracion",
+    "/isc": "indice_sobrecarga_calorica",
+}
+LECTURAS_DISTINTAS = 1_000
+
+
+def cuerpos(endpoint, lote):
+    """Cuerpos JSON ya codificados, con lecturas realistas distintas entre sí."""
+    campos = ENDPOINTS[endpoint][0]
+    variables = variables_ambientales(LECTURAS_DISTINTAS)
+    lecturas = [dict(zip(campos, argumentos(variables, i)[FUNCIONES[endpoint]])) for i in range(LECTURAS_DISTINTAS)]
+    if not lote:
+        return [json.dumps(l).encode() for l in lecturas]
+    return [json.dumps({"lecturas": [lecturas[(i + j) % LECTURAS_DISTINTAS] for j in range(lote)]}).encode()
+            for i in range(0, LECTURAS_DISTINTAS, 10)]
+
+
+async def cliente(host, puerto, ruta, cuerpos_cliente, fin, latencias, errores):
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    i = 0
+    try:
+        while time.perf_counter() < fin:
+            cuerpo = cuerpos_cliente[i % len(cuerpos_cliente)]
+            i += 1
+            inicio = time.perf_counter()
+            escritor.write(f"POST {ruta} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                           f"Content-Length: {len(cuerpo)}\r\n\r\n".encode() + cuerpo)
+            await escritor.drain()
+            encabezado = await lector.readuntil(b"\r\n\r\n")
+            longitud = 0
+            for linea in encabezado.split(b"\r\n"):
+                if linea.lower().startswith(b"content-length:"):
+                    longitud = int(linea.split(b":", 1)[1])
+            await lector.readexactly(longitud)
+            latencias.append(time.perf_counter() - inicio)
+            if not encabezado.startswith(b"HTTP/1.1 200"):
+                errores.append(encabezado.split(b"\r\n", 1)[0].decode())
+    finally:
+        escritor.close()
+
+
+async def cargar(host, puerto, ruta, todos, conexiones, segundos):
+    latencias, errores = [], []
+    inicio = time.perf_counter()
+    fin = inicio + segundos
+    await asyncio.gather(*(cliente(host, puerto, ruta, todos[c::conexiones] or todos, fin, latencias, errores)
+                           for c in range(conexiones)))
+    return latencias, errores, time.perf_counter() - inicio
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _esperar(url, segundos=30):
+    limite = time.time() + segundos
+    while time.time() < limite:
+        try:
+            with urllib.request.urlopen(url + "/salud", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"El servicio no respondió en {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conexiones", type=int, default=32)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--endpoint", choices=list(ENDPOINTS), default="/sudoracion")
+    parser.add_argument("--lote", type=int, default=0, help="lecturas por solicitud (0 = una lectura sin lote)")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--url", help="servicio ya en ejecución (por defecto se levanta uno local)")
+    args = parser.parse_args()
+
+    servidor = None
+    url = args.url
+    if url is None:
+        puerto = _puerto_libre()
+        url = f"http://127.0.0.1:{puerto}"
+        servidor = subprocess.Popen([sys.executable, "-m", "src.servicio", "--puerto", str(puerto),
+                                     "--procesos", str(args.procesos)])
+    try:
+        _esperar(url)
+        partes = urlsplit(url)
+        todos = cuerpos(args.endpoint, args.lote)
+        latencias, errores, duracion = asyncio.run(
+            cargar(partes.hostname, partes.port, args.endpoint, todos, args.conexiones, args.segundos))
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+    latencias = np.array(latencias) * 1000
+    p50, p90, p99 = np.percentile(latencias, [50, 90, 99])
+    lecturas = len(latencias) * max(args.lote, 1)
+    print(f"{args.endpoint} con {args.conexiones} conexiones keep-alive, {args.procesos} procesos, "
+          f"lote={args.lote or 'no'}")
+    print(f"  solicitudes:  {len(latencias):,} en {duracion:.1f} s ({len(errores)} con error)")
+    print(f"  solicitudes/s: {len(latencias) / duracion:,.0f}   lecturas/s: {lecturas / duracion:,.0f}")
+    print(f"  latencia ms:   p50 {p50:.2f}   p90 {p90:.2f}   p99 {p99:.2f}   máx {latencias.max():.2f}")
+    if errores:
+        print(f"  primer error: {errores[0]}")
+
+
+if __name__ == "__main__":
+    main()
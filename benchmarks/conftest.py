@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from benchmarks.datos import (
+    FILAS_ARCHIVO,
+    FILAS_LOTE,
+    LLAMADAS_ESCALARES,
+    SEMILLA,
+    archivo_csv,
+    argumentos,
+    minutos,
+    variables_ambientales,
+)
+from benchmarks.generar_referencia import RUTA_REFERENCIA
+
+
+def pytest_addoption(parser):
+    parser.addoption("--presupuestos-tiempo", action="store_true",
+                     help="corre también las pruebas marcadas presupuesto_tiempo")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--presupuestos-tiempo"):
+        return
+    omitir = pytest.mark.skip(reason="presupuesto de tiempo de reloj: usar --presupuestos-tiempo")
+    for item in items:
+        if "presupuesto_tiempo" in item.keywords:
+            item.add_marker(omitir)
+
+
+@pytest.fixture(scope="session")
+def referencia():
+    return json.loads(RUTA_REFERENCIA.read_text(encoding="utf-8"))
+
+
+@pytest.fixture(scope="session")
+def variables_referencia(referencia):
+    return variables_ambientales(referencia["filas"], referencia["semilla"])
+
+
+@pytest.fixture(scope="session")
+def argumentos_escalares():
+    variables = variables_ambientales(LLAMADAS_ESCALARES, SEMILLA + 1)
+    return [argumentos(variables, i) for i in range(LLAMADAS_ESCALARES)]
+
+
+@pytest.fixture(scope="session")
+def variables_lote():
+    return variables_ambientales(FILAS_LOTE, SEMILLA + 2)
+
+
+@pytest.fixture(scope="session")
+def minutos_lote():
+    return minutos(LLAMADAS_ESCALARES, SEMILLA + 3)
+
+
+@pytest.fixture(scope="session")
+def archivo_lote():
+    return archivo_csv(FILAS_ARCHIVO, SEMILLA + 4)
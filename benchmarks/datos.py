@@ -0,0 +1,87 @@
+"""Entradas realistas y reproducibles para los benchmarks y los valores de referencia
+
+Las distribuciones imitan mediciones de campo en Costa Rica: aire de 20 a 45 °C,
+globo por encima del aire según la radiación, bulbo húmedo por debajo del aire,
+viento mayormente bajo y tasas metabólicas de la tabla de data/Metabolismo.csv.
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+from src.funciones import POSTURAS
+
+SEMILLA = 2024
+
+# Tamaños de las entradas de la suite: llamadas escalares por ronda y filas de los lotes
+LLAMADAS_ESCALARES = 1_000
+FILAS_LOTE = 100_000
+FILAS_ARCHIVO = 50_000
+
+
+def variables_ambientales(filas, semilla=SEMILLA):
+    """Diccionario de arreglos con las variables ambientales y de la tarea."""
+    rng = np.random.default_rng(semilla)
+    temp_aire = np.clip(rng.normal(31, 5, filas), 18, 48)
+    sol = rng.random(filas) < 0.6
+    temp_globo = temp_aire + np.where(sol, rng.gamma(4, 2.5, filas), rng.gamma(2, 0.8, filas))
+    temp_bulbo = temp_aire - rng.uniform(1, 12, filas)
+    humedad_relativa = np.clip(rng.normal(70, 15, filas), 15, 100)
+    velocidad_aire = np.round(rng.lognormal(-0.7, 0.9, filas), 3)
+    return {
+        "temp_aire": np.round(temp_aire, 1),
+        "temp_globo": np.round(temp_globo, 1),
+        "temp_bulbo": np.round(temp_bulbo, 1),
+        "humedad_relativa": np.round(humedad_relativa, 0),
+        "velocidad_aire": velocidad_aire,
+        "radiacion_solar": np.where(sol, "Si", "No"),
+        "carga_metabolica": rng.choice([180.0, 300.0, 415.0, 520.0], filas, p=[0.2, 0.4, 0.3, 0.1]),
+        "iclo": rng.choice([0.0, 0.11, 0.155, 0.2, 0.31], filas),
+        "cavs": rng.choice([0.0, 0.0, 2.0, 3.0, 11.0], filas),
+        "postura": rng.choice(list(POSTURAS), filas, p=[0.6, 0.3, 0.1]),
+        "aclimatacion": rng.choice(["Si", "No"], filas, p=[0.7, 0.3]),
+        "conveccion": rng.choice(["Natural", "Forzada"], filas, p=[0.7, 0.3]),
+    }
+
+
+def argumentos(variables, i):
+    """Argumentos de cada índice escalar para la fila i, en el orden de src.funciones."""
+    v = {clave: valores[i].item() for clave, valores in variables.items()}
+    return {
+        "indice_de_calor": (v["temp_aire"], v["humedad_relativa"], v["radiacion_solar"]),
+        "tgbh": (v["radiacion_solar"], v["temp_aire"], v["temp_globo"], v["temp_bulbo"], v["cavs"],
+                 v["carga_metabolica"], v["aclimatacion"]),
+        "indice_de_sudoracion": (v["temp_aire"], v["temp_globo"], v["temp_bulbo"], v["iclo"], v["carga_metabolica"],
+                                 v["velocidad_aire"], v["postura"], v["aclimatacion"], v["conveccion"]),
+        "indice_sobrecarga_calorica": (v["carga_metabolica"], v["velocidad_aire"], v["temp_globo"], v["temp_aire"],
+                                       v["temp_bulbo"], v["iclo"], 170, 70),
+    }
+
+
+def minutos(filas, semilla=SEMILLA):
+    """Tiempos límite en minutos como los que recibe format_time, con algunos infinitos."""
+    rng = np.random.default_rng(semilla)
+    valores = rng.exponential(180, filas)
+    valores[rng.random(filas) < 0.1] = float("inf")
+    return valores.tolist()
+
+
+def archivo_csv(filas, semilla=SEMILLA):
+    """CSV en memoria con el formato de los registradores, con ~1 % de celdas tipo fórmula."""
+    variables = variables_ambientales(filas, semilla)
+    rng = np.random.default_rng(semilla)
+    notas = rng.choice(["", "ok", "revisar", "=SUMA(A1:A9)", "+506 8888", "@sensor"], filas,
+                       p=[0.6, 0.25, 0.14, 0.004, 0.003, 0.003])
+    df = pd.DataFrame({
+        "Fecha": pd.date_range("2024-03-01 06:00", periods=filas, freq="s").strftime("%Y-%m-%d %H:%M:%S"),
+        "Temperatura seca (°C)": variables["temp_aire"],
+        "Temperatura de globo (°C)": variables["temp_globo"],
+        "Temperatura de bulbo humedo (°C)": variables["temp_bulbo"],
+        "Velocidad del aire (m/s)": variables["velocidad_aire"],
+        "Humedad relativa (%)": variables["humedad_relativa"],
+        "Notas": notas,
+    })
+    archivo = io.BytesIO(df.to_csv(index=False).encode("utf-8"))
+    archivo.name = "registro.csv"
+    return archivo
@@ -0,0 +1,80 @@
+"""Genera los valores de referencia (golden) que verifica la suite de benchmarks
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.generar_referencia
+
+Evalúa las funciones escalares de src/funciones.py sobre FILAS_REFERENCIA filas
+reproducibles de benchmarks.datos y guarda entradas y resultados en
+benchmarks/referencia.json. Solo debe regenerarse cuando un cambio de resultados
+es intencional (por ejemplo, la corrección de una fórmula), y el diff del JSON
+debe revisarse junto con ese cambio.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.datos import SEMILLA, archivo_csv, argumentos, minutos, variables_ambientales
+from src.funciones import (
+    format_time,
+    indice_de_calor,
+    indice_de_sudoracion,
+    indice_sobrecarga_calorica,
+    sanitize_file,
+    tgbh,
+)
+
+RUTA_REFERENCIA = Path(__file__).resolve().parent / "referencia.json"
+FILAS_REFERENCIA = 300
+INDICES = {
+    "indice_de_calor": indice_de_calor,
+    "tgbh": tgbh,
+    "indice_de_sudoracion": indice_de_sudoracion,
+    "indice_sobrecarga_calorica": indice_sobrecarga_calorica,
+}
+
+
+def _nativo(valor):
+    # Los resultados pueden traer escalares de NumPy; JSON solo acepta tipos de Python
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def generar():
+    variables = variables_ambientales(FILAS_REFERENCIA, SEMILLA)
+    filas = [argumentos(variables, i) for i in range(FILAS_REFERENCIA)]
+    referencia = {"semilla": SEMILLA, "filas": FILAS_REFERENCIA}
+    for nombre, funcion in INDICES.items():
+        referencia[nombre] = [[_nativo(v) for v in funcion(*fila[nombre])] for fila in filas]
+
+    tiempos = minutos(FILAS_REFERENCIA, SEMILLA)
+    referencia["format_time"] = {"minutos": tiempos, "textos": [format_time(m) for m in tiempos]}
+
+    sanitizado = sanitize_file(archivo_csv(FILAS_REFERENCIA, SEMILLA))
+    referencia["sanitize_file"] = {columna: [_nativo(v) for v in sanitizado[columna].tolist()]
+                                   for columna in sanitizado.columns}
+    return referencia
+
+
+def _a_json(referencia):
+    # Una fila de resultados por línea para que los diffs del archivo sean legibles
+    partes = []
+    for clave, valor in referencia.items():
+        if isinstance(valor, list):
+            texto = "[\n" + ",\n".join(f"  {json.dumps(fila, ensure_ascii=False)}" for fila in valor) + "\n ]"
+        elif isinstance(valor, dict):
+            texto = "{\n" + ",\n".join(f"  {json.dumps(k, ensure_ascii=False)}: {json.dumps(v, ensure_ascii=False)}"
+                                        for k, v in valor.items()) + "\n }"
+        else:
+            texto = json.dumps(valor)
+        partes.append(f" {json.dumps(clave)}: {texto}")
+    return "{\n" + ",\n".join(partes) + "\n}\n"
+
+
+def main():
+    RUTA_REFERENCIA.write_text(_a_json(generar()), encoding="utf-8")
+    print(f"Valores de referencia guardados en {RUTA_REFERENCIA}")
+
+
+if __name__ == "__main__":
+    main()
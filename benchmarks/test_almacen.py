@@ -0,0 +1,77 @@
+"""Almacén Parquet de resultados (src.almacen): escritura, consulta y compactación
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_almacen.py
+
+Lo que se agrega se lee igual: valores, NaN, etiquetas de los códigos y fechas,
+también para sitios cuyo nombre necesita codificarse en la ruta de la partición
+(espacios, '/', '%', '=', tildes). Las consultas por fechas cruzan meses y
+compactar no pierde ni repite filas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.datos import SEMILLA, variables_ambientales
+from src.almacen import ETIQUETAS, RESULTADOS, AlmacenResultados, marcas_de_tiempo
+from src.ingesta import VARIABLES
+from src.lotes import etiquetar, evaluar_variables
+
+PARAMETROS = {"radiacion_solar": "Si", "cavs": 0.0, "carga_metabolica": 415.0, "aclimatacion": "No", "iclo": 0.2,
+              "postura": "De pie", "conveccion": "Natural"}
+SITIOS = ("planta norte", "línea/2", "100% café", "a=b&c", "x%2Fy")
+
+
+def _resultados(filas, semilla):
+    variables = variables_ambientales(filas, semilla)
+    return evaluar_variables({v: variables[v] for v in VARIABLES}, PARAMETROS)
+
+
+def test_ida_y_vuelta(tmp_path):
+    almacen = AlmacenResultados(tmp_path / "almacen")
+    assert almacen.sitios() == [] and len(almacen.consultar()) == 0
+    escritos = {}
+    for i, sitio in enumerate(SITIOS):
+        resultados = _resultados(300, SEMILLA + i)
+        # Una fila cada 10 min desde el 31 de enero: cruza a febrero
+        fechas = marcas_de_tiempo("2024-01-31 12:00", len(resultados), 600)
+        assert almacen.agregar(sitio, resultados, fechas, PARAMETROS) == len(resultados)
+        escritos[sitio] = (etiquetar(resultados), fechas)
+    assert almacen.sitios() == sorted(SITIOS)
+
+    for sitio, (esperado, fechas) in escritos.items():
+        leido = almacen.consultar(sitio)
+        assert len(leido) == len(esperado)
+        np.testing.assert_array_equal(leido["fecha_hora"].to_numpy(dtype="datetime64[s]"), fechas)
+        assert (leido["sitio"] == sitio).all()
+        assert set(leido["mes"]) == {202401, 202402}
+        for columna in VARIABLES + RESULTADOS:
+            # Los NaN (DLE donde SWreq no es aplicable) se conservan
+            np.testing.assert_array_equal(leido[columna].to_numpy(), esperado[columna].to_numpy(dtype=np.float64))
+        for columna in ETIQUETAS:
+            assert leido[columna].astype(str).tolist() == esperado[columna].tolist()
+        assert (leido["aclimatacion"].astype(str) == "No").all() and (leido["iclo"] == 0.2).all()
+
+
+def test_consulta_por_fechas_y_compactar(tmp_path):
+    almacen = AlmacenResultados(tmp_path)
+    sitio = "línea/2"
+    # Tres agregados del mismo sitio: los dos últimos llegan desordenados
+    for primera in (0, 200, 100):
+        resultados = _resultados(100, SEMILLA + primera)
+        almacen.agregar(sitio, resultados, marcas_de_tiempo("2024-02-29 20:00", 100, 60, primera=primera), PARAMETROS)
+    almacen.agregar("otro", _resultados(50, SEMILLA), marcas_de_tiempo("2024-03-01", 50, 60), PARAMETROS)
+
+    todo = almacen.consultar(sitio)
+    assert len(todo) == 300 and todo["fecha_hora"].is_monotonic_increasing
+    # [desde, hasta) cruzando el cambio de mes: 22:00 a 01:00 son 180 filas
+    rango = almacen.consultar(sitio, desde="2024-02-29 22:00", hasta="2024-03-01 01:00", columnas=["wbgt"])
+    assert len(rango) == 180 and list(rango.columns) == ["fecha_hora", "wbgt"]
+    assert rango["fecha_hora"].min() == pd.Timestamp("2024-02-29 22:00")
+    assert rango["fecha_hora"].max() == pd.Timestamp("2024-03-01 00:59")
+    assert len(almacen.consultar(desde="2024-03-01", hasta="2024-03-02")) == 60 + 50
+
+    assert almacen.compactar() > 0
+    compactado = almacen.consultar(sitio)
+    pd.testing.assert_frame_equal(compactado, todo)
+    assert almacen.compactar() == 0
@@ -0,0 +1,103 @@
+"""Archivo binario mapeado (src.archivo_binario): conversión, reapertura y anexado
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_archivo_binario.py
+
+Reabrir el archivo debe dar las mismas variables que la ingesta del CSV y los
+mismos índices que src.lotes. Anexar un registro nuevo deja un archivo que, al
+reabrirlo, equivale a haber convertido los dos registros uno tras otro; los
+ArchivoBinario abiertos antes siguen viendo solo las filas anteriores.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.datos import SEMILLA, archivo_csv
+from src.archivo_binario import ArchivoBinario, a_float64, anexar, convertir
+from src.ingesta import VARIABLES, ingerir
+from src.lotes import evaluar_archivo
+from src.paralelo import PARAMETROS_POR_DEFECTO
+
+
+def _variables_csv(ruta):
+    bloques = list(ingerir(str(ruta)))
+    return {v: np.concatenate([b[v].to_numpy() for b in bloques]) for v in VARIABLES}
+
+
+def _variables_binario(archivo):
+    return {v: a_float64(archivo.columnas[v], archivo.decimales[v]) for v in VARIABLES}
+
+
+@pytest.fixture
+def registros(tmp_path):
+    rutas = []
+    for i, filas in enumerate((700, 450)):
+        ruta = tmp_path / f"registro_{i}.csv"
+        ruta.write_bytes(archivo_csv(filas, SEMILLA + i).getvalue())
+        rutas.append(ruta)
+    return rutas
+
+
+def test_convertir_y_reabrir(tmp_path, registros):
+    binario = tmp_path / "registro.tgbh"
+    estadisticas = convertir(registros[0], binario, "2024-01-31 23:00", 60.0, tamano_bloque=256)
+    archivo = ArchivoBinario(binario)
+    assert len(archivo) == estadisticas.filas_validas == 700 - estadisticas.filas_descartadas
+    assert archivo.encabezado["origen"] == "registro_0.csv" and archivo.intervalo_s == 60.0
+    for variable, valores in _variables_csv(registros[0]).items():
+        np.testing.assert_array_equal(_variables_binario(archivo)[variable], valores)
+        assert not archivo.columnas[variable].flags.writeable
+    assert archivo.fecha_hora[0] == np.datetime64("2024-01-31T23:00")
+
+    parametros = {**PARAMETROS_POR_DEFECTO, "iclo": 0.155}
+    resumen_binario, muestra_binario = archivo.evaluar(parametros, tamano_bloque=100)
+    resumen_csv, muestra_csv = evaluar_archivo(str(registros[0]), parametros, intervalo_s=60.0)
+    pd.testing.assert_frame_equal(resumen_binario.estadisticas(), resumen_csv.estadisticas())
+    pd.testing.assert_frame_equal(muestra_binario.drop(columns="fecha_hora"), muestra_csv.drop(columns="fila"))
+
+    # Filas de febrero: el rango usa las fechas ordenadas
+    febrero = archivo.rango("2024-02-01")
+    assert febrero.start == 60 and febrero.stop == len(archivo)
+    with open(tmp_path / "otro.tgbh", "wb") as otro:
+        otro.write(b"no es un archivo binario")
+    with pytest.raises(ValueError, match="no es un archivo binario"):
+        ArchivoBinario(tmp_path / "otro.tgbh")
+
+
+def test_anexar(tmp_path, registros):
+    binario = tmp_path / "registro.tgbh"
+    convertir(registros[0], binario, "2024-01-01", 60.0)
+    anterior = ArchivoBinario(binario)
+    filas_anteriores = len(anterior)
+    estadisticas = anexar(registros[1], binario, tamano_bloque=128)
+
+    archivo = ArchivoBinario(binario)
+    assert len(archivo) == filas_anteriores + estadisticas.filas_validas
+    assert archivo.encabezado["ordenado"] and archivo.intervalo_s == 60.0
+    # Las fechas siguen a la última fila del archivo
+    assert archivo.fecha_hora[filas_anteriores] == anterior.fecha_hora[-1] + np.timedelta64(60, "s")
+    esperado = [_variables_csv(ruta) for ruta in registros]
+    for variable in VARIABLES:
+        np.testing.assert_array_equal(_variables_binario(archivo)[variable],
+                                      np.concatenate([e[variable] for e in esperado]))
+    # El ArchivoBinario abierto antes de anexar sigue viendo las filas que tenía
+    assert len(anterior) == filas_anteriores
+    np.testing.assert_array_equal(_variables_binario(anterior)["temp_aire"], esperado[0]["temp_aire"])
+
+    # Igual que convertir los dos registros en uno
+    unido = tmp_path / "unido.csv"
+    unido.write_text(registros[0].read_text() + registros[1].read_text().split("\n", 1)[1])
+    convertir(unido, tmp_path / "unido.tgbh", "2024-01-01", 60.0)
+    parametros = {**PARAMETROS_POR_DEFECTO, "carga_metabolica": 415.0}
+    resumen_anexado, _ = archivo.evaluar(parametros)
+    resumen_unido, _ = ArchivoBinario(tmp_path / "unido.tgbh").evaluar(parametros)
+    pd.testing.assert_frame_equal(resumen_anexado.estadisticas(), resumen_unido.estadisticas())
+
+    # Con fecha de inicio explícita anterior a la última fila el archivo queda desordenado
+    anexar(registros[1], binario, fecha_inicio="2023-12-01")
+    desordenado = ArchivoBinario(binario)
+    assert len(desordenado) == len(archivo) + estadisticas.filas_validas
+    assert not desordenado.encabezado["ordenado"]
+    with pytest.raises(ValueError, match="no están ordenadas"):
+        desordenado.rango("2024-01-01")
@@ -0,0 +1,119 @@
+"""Barrido de configuraciones (src.barrido) contra la evaluación de cada combinación por separado
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_barrido.py
+
+Los minutos sobre los límites y los extremos de cada combinación deben ser los
+de evaluar esa combinación sola sobre la serie, con las filas en que SWreq no es
+aplicable (Emax < 0) o sin dato fuera de los minutos sobre el límite y del DLE
+mínimo, y las de ISC sin dato fuera de los minutos sobre el límite y del máximo. Por
+bloques debe dar lo mismo que con la serie completa, y las tablas de data/ solo
+se leen si falta alguna opción.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.datos import SEMILLA, variables_ambientales
+from src import barrido
+from src.barrido import barrer, barrer_bloques
+from src.ingesta import VARIABLES
+from src.resultados import ClasificacionISC, EstadoSudoracion
+from src.vectorizado import indice_de_sudoracion_vec, indice_sobrecarga_calorica_vec, tgbh_vec
+
+ROPAS = {"Ligera": 0.0, "Overol": 0.11, "Doble capa": 0.31}
+CONJUNTOS = {"Sin CAV": 0.0, "Delantal": 2.0, "Traje": 11.0}
+METABOLISMOS = {"Reposo": 115.0, "Moderado": 300.0, "Alto": 415.0}
+INTERVALO_S = 120.0
+JORNADA = 240.0
+
+
+def _serie():
+    variables = variables_ambientales(400, SEMILLA + 5)
+    serie = {v: variables[v].copy() for v in VARIABLES}
+    # Algunas filas casi saturadas y con mucho calor radiante: Emax < 0
+    saturadas = slice(0, 400, 37)
+    serie["temp_aire"][saturadas], serie["temp_globo"][saturadas] = 45.0, 60.0
+    serie["temp_bulbo"][saturadas], serie["velocidad_aire"][saturadas] = 44.9, 0.1
+    # Y otras con el globo más frío que el aire y convección natural: ISC y SWreq sin dato
+    sin_dato = slice(5, 400, 41)
+    serie["temp_globo"][sin_dato] = serie["temp_aire"][sin_dato] - 2
+    serie["velocidad_aire"][sin_dato] = 0.1
+    return serie
+
+
+def _combinacion(serie, iclo, cavs, carga, aclimatacion):
+    """Reducciones de una combinación evaluada sola, fila por fila."""
+    ta, tg, tw, va = serie["temp_aire"], serie["temp_globo"], serie["temp_bulbo"], serie["velocidad_aire"]
+    minutos = INTERVALO_S / 60
+    sudoracion = indice_de_sudoracion_vec(ta, tg, tw, iclo, carga, va, "De pie", aclimatacion, "Natural")
+    aplicable = sudoracion["estado"] == EstadoSudoracion.CALCULADO
+    dle = np.minimum(sudoracion["dle_alarma_q"], sudoracion["dle_alarma_d"])[aplicable]
+    dle[dle < 0] = np.inf
+    isc = indice_sobrecarga_calorica_vec(carga, va, tg, ta, tw, iclo, 170, 70)
+    con_isc = isc["clasificacion"] != ClasificacionISC.SIN_DATO
+    isc = isc["isc"][con_isc]
+    estado = tgbh_vec("Si", ta, tg, tw, cavs, carga, aclimatacion)["estado"]
+    return {
+        "minutos_swreq": np.count_nonzero(dle < JORNADA) * minutos,
+        "dle_min": dle.min() if len(dle) else np.nan,
+        "minutos_swreq_no_aplicable": np.count_nonzero(~aplicable) * minutos,
+        "minutos_isc": np.count_nonzero(isc > 100) * minutos,
+        "isc_max": isc.max() if len(isc) else np.nan,
+        "minutos_isc_sin_dato": np.count_nonzero(~con_isc) * minutos,
+        "minutos_tgbh": np.count_nonzero(estado) * minutos,
+    }
+
+
+def _barrer(bloques):
+    return barrer_bloques(bloques, ROPAS, CONJUNTOS, METABOLISMOS, intervalo_s=INTERVALO_S, duracion_jornada=JORNADA,
+                          minutos_tolerados=10.0)
+
+
+def test_conteos_por_combinacion():
+    serie = _serie()
+    tabla = barrer(serie, ROPAS, CONJUNTOS, METABOLISMOS, intervalo_s=INTERVALO_S, duracion_jornada=JORNADA,
+                   minutos_tolerados=10.0)
+    assert len(tabla) == len(ROPAS) * len(CONJUNTOS) * len(METABOLISMOS) * 2
+    assert (tabla["minutos_swreq_no_aplicable"] > 0).any() and (tabla["minutos_isc_sin_dato"] > 0).all()
+    assert tabla["isc_max"].notna().all()
+    for fila in tabla.itertuples():
+        esperado = _combinacion(serie, fila.iclo, fila.cavs, fila.carga_metabolica, fila.aclimatacion)
+        for columna, valor in esperado.items():
+            assert getattr(fila, columna) == pytest.approx(valor, rel=1e-12, nan_ok=True), (fila.Index, columna)
+        assert fila.segura == (fila.minutos_swreq <= 10 and fila.minutos_isc <= 10)
+    # Primero las seguras; dentro de cada grupo, menos minutos sobre el límite
+    assert not tabla["segura"].iloc[tabla["segura"].sum():].any()
+    for _, grupo in tabla.groupby("segura"):
+        assert grupo["minutos_sobre_limite"].is_monotonic_increasing
+
+
+def test_sin_filas_aplicables():
+    # Todas las filas con Emax < 0: sin minutos sobre el límite de SWreq y sin DLE mínimo
+    serie = {"temp_aire": np.full(5, 45.0), "temp_globo": np.full(5, 60.0), "temp_bulbo": np.full(5, 44.9),
+             "velocidad_aire": np.full(5, 0.1), "humedad_relativa": np.full(5, 99.0)}
+    tabla = barrer(serie, {"Doble capa": 0.31}, {"Sin CAV": 0.0}, {"Reposo": 115.0}, intervalo_s=60.0)
+    assert (tabla["minutos_swreq"] == 0).all() and tabla["dle_min"].isna().all()
+    assert (tabla["minutos_swreq_no_aplicable"] == 5).all()
+
+
+def test_por_bloques():
+    serie = _serie()
+    completa = _barrer([serie])
+    cortes = [0, 1, 37, 38, 200, 399, 400]
+    bloques = (pd.DataFrame({v: valores[a:b] for v, valores in serie.items()}) for a, b in zip(cortes, cortes[1:]))
+    pd.testing.assert_frame_equal(_barrer(bloques), completa)
+    # Un bloque vacío no cambia nada
+    vacio = {v: valores[:0] for v, valores in serie.items()}
+    pd.testing.assert_frame_equal(_barrer([vacio, serie, vacio]), completa)
+
+
+def test_tablas_de_referencia_perezosas(monkeypatch):
+    def sin_tablas():
+        raise AssertionError("no debería leer las tablas de data/")
+
+    monkeypatch.setattr(barrido, "cargar_tablas_referencia", sin_tablas)
+    assert len(_barrer([_serie()])) == 54
+    with pytest.raises(AssertionError, match="tablas"):
+        barrer(_serie(), ROPAS, CONJUNTOS)
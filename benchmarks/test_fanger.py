@@ -0,0 +1,78 @@
+"""PMV y PPD de src.fanger contra la tabla D.1 de la ISO 7730
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_fanger.py
+
+Las filas de la norma vienen en met y clo; se pasan a las unidades del
+repositorio (W para 1.7 m² y m²·K/W). La versión vectorizada debe coincidir con
+la escalar y marcar con su estado las entradas fuera de rango o no numéricas.
+"""
+
+import numpy as np
+import pytest
+
+from src.fanger import MET, SUPERFICIE_CORPORAL, pmv_ppd, pmv_ppd_vec, sensacion
+from src.resultados import CategoriaFanger, EstadoFanger, ResultadoFanger
+
+# (temp_aire, temp_radiante_media, velocidad_aire, humedad_relativa, met, clo, pmv, ppd) de la tabla D.1
+TABLA_D1 = [
+    (22.0, 22.0, 0.10, 60, 1.2, 0.5, -0.75, 17),
+    (27.0, 27.0, 0.10, 60, 1.2, 0.5, 0.77, 17),
+    (27.0, 27.0, 0.30, 60, 1.2, 0.5, 0.44, 9),
+    (23.5, 25.5, 0.10, 60, 1.2, 0.5, -0.01, 5),
+    (23.5, 25.5, 0.30, 60, 1.2, 0.5, -0.55, 11),
+    (19.0, 19.0, 0.10, 40, 1.2, 1.0, -0.60, 13),
+    (23.5, 23.5, 0.30, 40, 1.2, 1.0, 0.12, 5),
+    (23.0, 21.0, 0.10, 40, 1.2, 1.0, 0.05, 5),
+    (23.0, 21.0, 0.30, 40, 1.2, 1.0, -0.16, 6),
+    (22.0, 22.0, 0.10, 60, 1.6, 0.5, 0.05, 5),
+    (27.0, 27.0, 0.10, 60, 1.6, 0.5, 1.17, 34),
+    (27.0, 27.0, 0.30, 60, 1.6, 0.5, 0.95, 24),
+]
+
+
+def _entradas(filas):
+    ta, tr, v, hr, met, clo = np.array([fila[:6] for fila in filas], dtype=float).T
+    return ta, tr, v, hr, met * MET * SUPERFICIE_CORPORAL, clo * 0.155
+
+
+def test_tabla_iso_7730():
+    resultado = pmv_ppd_vec(*_entradas(TABLA_D1))
+    np.testing.assert_allclose(resultado["pmv"], [fila[6] for fila in TABLA_D1], atol=0.015)
+    np.testing.assert_allclose(resultado["ppd"], [fila[7] for fila in TABLA_D1], atol=1)
+    assert (resultado["estado"] == EstadoFanger.CALCULADO).all()
+
+
+def test_vectorizado_igual_al_escalar():
+    rng = np.random.default_rng(0)
+    ta, tr = rng.uniform(16, 30, 200), rng.uniform(16, 34, 200)
+    v, hr = rng.uniform(0, 0.8, 200), rng.uniform(20, 80, 200)
+    m, iclo = rng.uniform(90, 300, 200), rng.uniform(0, 0.3, 200)
+    resultado = pmv_ppd_vec(ta, tr, v, hr, m, iclo)
+    for i in range(0, 200, 17):
+        escalar = pmv_ppd(ta[i], tr[i], v[i], hr[i], m[i], iclo[i])
+        assert type(escalar) is ResultadoFanger and isinstance(escalar.categoria, CategoriaFanger)
+        assert escalar.pmv == pytest.approx(resultado["pmv"][i])
+        assert escalar.categoria == resultado["categoria"][i] and escalar.estado == resultado["estado"][i]
+
+
+def test_broadcasting_y_categorias():
+    resultado = pmv_ppd_vec(np.linspace(18, 30, 13)[:, None], 24.0, [0.1, 0.3], 50, 1.2 * MET * SUPERFICIE_CORPORAL, 0.08)
+    assert resultado.shape == (13, 2)
+    pmv, ppd = resultado["pmv"], resultado["ppd"]
+    assert (np.diff(pmv, axis=0) > 0).all() and (ppd >= 5).all()
+    categoria_a = resultado["categoria"] == CategoriaFanger.A
+    assert categoria_a.any() and (np.abs(pmv[categoria_a]) < 0.2).all()
+    assert (resultado["categoria"][np.abs(pmv) >= 0.7] == CategoriaFanger.FUERA).all()
+
+
+def test_estados():
+    resultado = pmv_ppd_vec([22.0, 36.0, np.nan], 22.0, 0.1, 50, 1.2 * MET * SUPERFICIE_CORPORAL, 0.08)
+    assert list(resultado["estado"]) == [EstadoFanger.CALCULADO, EstadoFanger.FUERA_DE_RANGO,
+                                         EstadoFanger.SIN_CONVERGENCIA]
+    assert np.isfinite(resultado["pmv"][:2]).all() and np.isnan(resultado["pmv"][2])
+
+
+def test_sensacion():
+    assert sensacion(0.1) == "Neutro"
+    assert sensacion(-5) == "Frío" and sensacion(2.6) == "Muy caluroso"
@@ -0,0 +1,208 @@
+"""Suite de benchmarks de src/funciones.py con verificación de valores de referencia
+
+Uso (desde la raíz del repositorio, con requirements-dev.txt instalado):
+    python -m pytest benchmarks
+
+Las pruebas `test_referencia_*` comparan los resultados con benchmarks/referencia.json
+para que una implementación más rápida no cambie los resultados sin aviso. Las
+pruebas con el fixture `benchmark` miden cada función en llamadas escalares y en
+lotes; cada ejecución se guarda como JSON en benchmarks/.benchmarks (ver pytest.ini).
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from benchmarks.datos import FILAS_ARCHIVO, FILAS_LOTE, archivo_csv, argumentos
+from src import funciones
+from src.funciones import (
+    format_time,
+    indice_de_calor,
+    indice_de_sudoracion,
+    indice_sobrecarga_calorica,
+    sanitize_file,
+    tgbh,
+)
+from src.resultados import ClasificacionISC, EstadoSudoracion
+from src.vectorizado import (
+    CLASIFICACIONES_ISC,
+    ESTADOS_TGBH,
+    indice_de_calor_vec,
+    indice_de_sudoracion_vec,
+    indice_sobrecarga_calorica_vec,
+    tgbh_vec,
+)
+
+# Tolerancia relativa contra los valores de referencia (solo redondeo de punto flotante)
+TOLERANCIA = 1e-9
+
+INDICES = {
+    "indice_de_calor": indice_de_calor,
+    "tgbh": tgbh,
+    "indice_de_sudoracion": indice_de_sudoracion,
+    "indice_sobrecarga_calorica": indice_sobrecarga_calorica,
+}
+
+
+def _coincide(obtenido, esperado):
+    if isinstance(esperado, float) or isinstance(obtenido, float):
+        if math.isnan(esperado):
+            return math.isnan(obtenido)
+        return obtenido == esperado or math.isclose(obtenido, esperado, rel_tol=TOLERANCIA, abs_tol=1e-12)
+    return obtenido == esperado
+
+
+def _verificar_filas(obtenidas, esperadas):
+    assert len(obtenidas) == len(esperadas)
+    for i, (obtenida, esperada) in enumerate(zip(obtenidas, esperadas)):
+        assert len(obtenida) == len(esperada), f"fila {i}"
+        assert all(_coincide(o, e) for o, e in zip(obtenida, esperada)), f"fila {i}: {obtenida} != {esperada}"
+
+
+def _vectorizado(nombre, v):
+    if nombre == "indice_de_calor":
+        return indice_de_calor_vec(v["temp_aire"], v["humedad_relativa"], v["radiacion_solar"])
+    if nombre == "tgbh":
+        return tgbh_vec(v["radiacion_solar"], v["temp_aire"], v["temp_globo"], v["temp_bulbo"], v["cavs"],
+                        v["carga_metabolica"], v["aclimatacion"])
+    if nombre == "indice_de_sudoracion":
+        return indice_de_sudoracion_vec(v["temp_aire"], v["temp_globo"], v["temp_bulbo"], v["iclo"], v["carga_metabolica"],
+                                        v["velocidad_aire"], v["postura"], v["aclimatacion"], v["conveccion"])
+    return indice_sobrecarga_calorica_vec(v["carga_metabolica"], v["velocidad_aire"], v["temp_globo"], v["temp_aire"],
+                                          v["temp_bulbo"], v["iclo"], 170, 70)
+
+
+def _formato_referencia(nombre, filas):
+    # Filas con el formato de referencia.json: estados y clasificaciones como texto
+    # y sin el estado del SWreq, que se verifica aparte
+    if nombre == "tgbh":
+        return [(*fila[:3], ESTADOS_TGBH[fila[3]]) for fila in filas]
+    if nombre == "indice_sobrecarga_calorica":
+        return [(fila[0], CLASIFICACIONES_ISC[fila[1]], *fila[2:]) for fila in filas]
+    if nombre == "indice_de_sudoracion":
+        return [tuple(fila[:4]) for fila in filas]
+    return filas
+
+
+"""Valores de referencia"""
+
+@pytest.mark.parametrize("nombre", INDICES)
+def test_referencia_escalar(nombre, referencia, variables_referencia):
+    funcion = INDICES[nombre]
+    obtenidas = [funcion(*argumentos(variables_referencia, i)[nombre]) for i in range(referencia["filas"])]
+    _verificar_filas(_formato_referencia(nombre, obtenidas), referencia[nombre])
+
+
+@pytest.mark.parametrize("nombre", INDICES)
+def test_referencia_vectorizado(nombre, referencia, variables_referencia):
+    _verificar_filas(_formato_referencia(nombre, _vectorizado(nombre, variables_referencia).tolist()), referencia[nombre])
+
+
+def test_estado_sudoracion(referencia, variables_referencia):
+    # Emax < 0 se informa con un estado explícito; los DLE en cero se conservan
+    escalares = [indice_de_sudoracion(*argumentos(variables_referencia, i)["indice_de_sudoracion"])
+                 for i in range(referencia["filas"])]
+    vectorizado = _vectorizado("indice_de_sudoracion", variables_referencia)["estado"].tolist()
+    assert [r.estado for r in escalares] == vectorizado
+    for resultado, esperada in zip(escalares, referencia["indice_de_sudoracion"]):
+        assert (resultado.estado == EstadoSudoracion.EMAX_NEGATIVO) == (esperada == [0, 0, 0, 0])
+    assert indice_de_sudoracion(45, 60, 44.9, 0.2, 100, 0.1, "De pie", "Si", "Natural").estado == EstadoSudoracion.EMAX_NEGATIVO
+
+
+def _sudoracion_vec(*argumentos):
+    return tuple(indice_de_sudoracion_vec(*argumentos).item())
+
+
+def test_sudoracion_sin_limite(monkeypatch):
+    # Sin almacenamiento de calor (toda la evaporación requerida es posible) no hay límite por calor
+    sin_almacenamiento = (30.0, 30.0, 22.0, 0.11, 150.0, 0.5, "De pie", "Si", "Natural")
+    resultado = indice_de_sudoracion(*sin_almacenamiento)
+    assert resultado.dle_alarma_q == resultado.dle_peligro_q == math.inf
+    assert 0 < resultado.dle_alarma_d < math.inf
+    assert tuple(resultado) == pytest.approx(_sudoracion_vec(*sin_almacenamiento), rel=TOLERANCIA)
+    # Ereq < 0: el cuerpo pierde calor, no hay almacenamiento ni sudoración (sw_p < 0): sin límites
+    frio = (20.0, 20.0, 14.0, 0.11, 60.0, 0.5, "De pie", "Si", "Natural")
+    assert tuple(indice_de_sudoracion(*frio)[:4]) == _sudoracion_vec(*frio)[:4] == (math.inf,) * 4
+    # Con almacenamiento el límite es finito: 60 · Q_max / (Ereq - Ep)
+    caluroso = (40.0, 55.0, 32.0, 0.2, 415.0, 0.3, "De pie", "No", "Natural")
+    resultado = indice_de_sudoracion(*caluroso)
+    assert 0 < resultado.dle_alarma_q < resultado.dle_peligro_q < math.inf
+    assert tuple(resultado) == pytest.approx(_sudoracion_vec(*caluroso), rel=TOLERANCIA)
+    # Con sw_p == 0 tampoco hay límite por deshidratación; solo se alcanza con w_max = 0
+    limites = {**funciones.ACLIMATACION["Si"], "w_max": 0.0}
+    monkeypatch.setattr(funciones, "ACLIMATACION", {"Si": limites})
+    resultado = indice_de_sudoracion(*sin_almacenamiento)
+    assert resultado.dle_alarma_d == resultado.dle_peligro_d == math.inf
+    # Toda la evaporación requerida queda como almacenamiento
+    assert 0 < resultado.dle_alarma_q < math.inf
+
+
+def test_sin_dato():
+    # Globo más frío que el aire con convección natural: la temperatura radiante no está definida
+    argumentos_sudoracion = (30.0, 28.0, 24.0, 0.11, 300.0, 0.1, "De pie", "Si", "Natural")
+    resultado = indice_de_sudoracion(*argumentos_sudoracion)
+    assert resultado.estado == EstadoSudoracion.SIN_DATO and not resultado.aplicable
+    assert all(math.isnan(dle) for dle in resultado[:4])
+    vectorizado = _sudoracion_vec(*argumentos_sudoracion)
+    assert vectorizado[4] == EstadoSudoracion.SIN_DATO and all(math.isnan(dle) for dle in vectorizado[:4])
+    resultado = indice_sobrecarga_calorica(300.0, 0.1, 28.0, 30.0, 24.0, 0.11, 170, 70)
+    assert resultado.clasificacion == ClasificacionISC.SIN_DATO and resultado.clasificacion.texto == "Sin dato"
+    assert math.isnan(resultado.isc) and math.isnan(resultado.tiempo_exp_per)
+    vectorizado = indice_sobrecarga_calorica_vec(300.0, 0.1, 28.0, 30.0, 24.0, 0.11, 170, 70)
+    assert vectorizado["clasificacion"] == ClasificacionISC.SIN_DATO and np.isnan(vectorizado["tiempo_exp_per"])
+    # Sin movimiento de aire Emax = 0 y el ISC es infinito: tampoco es una clasificación
+    vectorizado = indice_sobrecarga_calorica_vec([300.0, 300.0], [0.0, 0.5], 40.0, 32.0, 28.0, 0.11, 170, 70)
+    assert vectorizado["isc"][0] == math.inf
+    assert vectorizado["clasificacion"].tolist() == [
+        ClasificacionISC.SIN_DATO, indice_sobrecarga_calorica(300.0, 0.5, 40.0, 32.0, 28.0, 0.11, 170, 70).clasificacion]
+
+
+def test_referencia_format_time(referencia):
+    esperado = referencia["format_time"]
+    assert [format_time(m) for m in esperado["minutos"]] == esperado["textos"]
+
+
+def test_referencia_sanitize_file(referencia):
+    sanitizado = sanitize_file(archivo_csv(referencia["filas"], referencia["semilla"]))
+    esperado = referencia["sanitize_file"]
+    assert list(sanitizado.columns) == list(esperado)
+    for columna, valores in esperado.items():
+        _verificar_filas([[v] for v in sanitizado[columna].tolist()], [[v] for v in valores])
+
+
+"""Benchmarks escalares: 1000 llamadas por ronda con entradas realistas"""
+
+@pytest.mark.parametrize("nombre", INDICES)
+def test_escalar(benchmark, nombre, argumentos_escalares):
+    benchmark.group = "escalar"
+    funcion = INDICES[nombre]
+    casos = [fila[nombre] for fila in argumentos_escalares]
+    resultados = benchmark(lambda: [funcion(*caso) for caso in casos])
+    assert len(resultados) == len(casos)
+
+
+def test_escalar_format_time(benchmark, minutos_lote):
+    benchmark.group = "escalar"
+    textos = benchmark(lambda: [format_time(m) for m in minutos_lote])
+    assert len(textos) == len(minutos_lote)
+
+
+"""Benchmarks por lote: 100 000 filas con las versiones vectorizadas"""
+
+@pytest.mark.parametrize("nombre", INDICES)
+def test_lote(benchmark, nombre, variables_lote):
+    benchmark.group = "lote"
+    resultado = benchmark(_vectorizado, nombre, variables_lote)
+    assert len(resultado) == FILAS_LOTE
+
+
+def test_lote_sanitize_file(benchmark, archivo_lote):
+    benchmark.group = "lote"
+
+    def sanitizar():
+        archivo_lote.seek(0)
+        return sanitize_file(archivo_lote)
+
+    sanitizado = benchmark(sanitizar)
+    assert len(sanitizado) == FILAS_ARCHIVO
@@ -0,0 +1,67 @@
+"""Tiempo de importación del núcleo de cálculo medido con python -X importtime
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_importacion.py
+    python -m pytest benchmarks/test_importacion.py --presupuestos-tiempo
+
+Cada arranque de la aplicación, del servicio o de un proceso de src.paralelo
+importa src.funciones. El núcleo solo debe cargar math: si alguien vuelve a
+importar pandas, NumPy o matplotlib al inicio del módulo, las pruebas de módulos
+cargados fallan. El presupuesto de tiempo depende de la máquina y solo corre con
+--presupuestos-tiempo; cada medición es un intérprete nuevo y se toma la mejor
+de varias para no depender del ruido del sistema.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Tiempo acumulado máximo de `import src.funciones` (microsegundos)
+PRESUPUESTO_US = 50_000
+REPETICIONES = 5
+MODULOS_PESADOS = ("pandas", "numpy", "matplotlib", "altair", "pyarrow")
+
+
+def _ejecutar(*argumentos):
+    return subprocess.run([sys.executable, *argumentos], cwd=RAIZ, capture_output=True, text=True, check=True)
+
+
+def tiempo_importacion(modulo):
+    """Tiempo acumulado (µs) de importar `modulo` en un intérprete nuevo, según -X importtime."""
+    salida = _ejecutar("-X", "importtime", "-c", f"import {modulo}").stderr
+    for linea in salida.splitlines():
+        # import time: self [us] | cumulative | imported package
+        _, acumulado, nombre = linea.rsplit("|", 2)
+        if nombre.strip() == modulo:
+            return int(acumulado)
+    raise ValueError(f"{modulo} no aparece en la salida de -X importtime")
+
+
+def modulos_cargados(modulo):
+    """Módulos pesados presentes en sys.modules después de importar `modulo`."""
+    codigo = f"import sys, {modulo}; print(' '.join(m for m in {MODULOS_PESADOS!r} if m in sys.modules))"
+    return _ejecutar("-c", codigo).stdout.split()
+
+
+def test_funciones_solo_importa_math():
+    assert modulos_cargados("src.funciones") == []
+
+
+def test_cache_no_importa_pandas():
+    # Las tablas de referencia cargan pandas recién al pedirlas
+    assert modulos_cargados("src.cache") == []
+
+
+def test_servicio_solo_importa_numpy():
+    assert modulos_cargados("src.servicio") == ["numpy"]
+
+
+@pytest.mark.presupuesto_tiempo
+@pytest.mark.parametrize("modulo", ["src.funciones", "src.cache"])
+def test_presupuesto_importacion(modulo):
+    mejor = min(tiempo_importacion(modulo) for _ in range(REPETICIONES))
+    assert mejor < PRESUPUESTO_US, f"import {modulo}: {mejor / 1000:.1f} ms (presupuesto {PRESUPUESTO_US / 1000:.0f} ms)"
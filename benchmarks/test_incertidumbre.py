@@ -0,0 +1,90 @@
+"""Intervalos de confianza por Monte Carlo de src.incertidumbre
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_incertidumbre.py
+
+La estimación puntual debe ser la de las funciones escalares, los intervalos
+deben contenerla y ensancharse con la exactitud de los sensores, y la misma
+semilla debe dar el mismo resultado. Las muestras sin dato (ISC o SWreq no
+calculables) no entran en los intervalos ni en las probabilidades.
+"""
+
+import numpy as np
+import pytest
+
+from src.funciones import indice_de_sudoracion, indice_sobrecarga_calorica, tgbh
+from src.incertidumbre import evaluar_incertidumbre
+from src.resultados import ClasificacionISC, EstadoSudoracion
+from src.vectorizado import indice_de_sudoracion_vec, superficie_dubois
+
+VARIABLES = {"temp_aire": 32.0, "temp_globo": 40.0, "temp_bulbo": 26.0, "velocidad_aire": 0.3}
+PARAMETROS = {"radiacion_solar": "Si", "cavs": 0.0, "carga_metabolica": 300.0, "aclimatacion": "Si", "iclo": 0.11,
+              "postura": "De pie", "conveccion": "Natural", "altura": 170.0, "peso": 70.0}
+
+
+def test_estimacion_puntual_y_cobertura():
+    resultado = evaluar_incertidumbre(VARIABLES, PARAMETROS, muestras=20_000)
+    assert len(resultado) == 20_000
+    intervalos = resultado.intervalos()
+    ta, tg, tw, va = VARIABLES.values()
+    assert intervalos.loc["wbgt", "estimacion"] == pytest.approx(tgbh("Si", ta, tg, tw, 0, 300, "Si").wbgt)
+    assert intervalos.loc["dle_alarma_q", "estimacion"] == pytest.approx(
+        indice_de_sudoracion(ta, tg, tw, 0.11, 300, va, "De pie", "Si", "Natural").dle_alarma_q)
+    assert intervalos.loc["isc", "estimacion"] == pytest.approx(indice_sobrecarga_calorica(300, va, tg, ta, tw, 0.11, 170, 70).isc)
+    assert (intervalos["inferior"] <= intervalos["estimacion"]).all()
+    assert (intervalos["estimacion"] <= intervalos["superior"]).all()
+    # El TGBH solo depende de los sensores: ±0.5 °C en cada término acota el intervalo
+    assert intervalos.loc["wbgt", "superior"] - intervalos.loc["wbgt", "inferior"] < 1.0
+    assert set(resultado.probabilidades()) == {"estres_termico", "isc_sobre_100", "swreq_no_aplicable", "isc_sin_dato",
+                                               "swreq_sin_dato"}
+
+
+def test_semilla_reproducible():
+    a = evaluar_incertidumbre(VARIABLES, PARAMETROS, muestras=5_000, semilla=7).intervalos()
+    b = evaluar_incertidumbre(VARIABLES, PARAMETROS, muestras=5_000, semilla=7).intervalos()
+    c = evaluar_incertidumbre(VARIABLES, PARAMETROS, muestras=5_000, semilla=8).intervalos()
+    assert a.equals(b) and not a.equals(c)
+
+
+def test_exactitud_y_mezcla_de_aclimatacion():
+    exacto = evaluar_incertidumbre(VARIABLES, PARAMETROS, muestras=5_000,
+                                   exactitud={"temp_aire": 0, "temp_globo": 0, "temp_bulbo": 0, "velocidad_aire": 0},
+                                   desviacion_altura=0, desviacion_peso=0)
+    intervalos = exacto.intervalos()
+    np.testing.assert_allclose(intervalos["inferior"], intervalos["estimacion"])
+    np.testing.assert_allclose(intervalos["superior"], intervalos["estimacion"])
+    # Con no aclimatados el límite por deshidratación baja (D_max menor)
+    mezcla = evaluar_incertidumbre(VARIABLES, PARAMETROS, muestras=5_000, proporcion_aclimatados=0.5).intervalos()
+    assert mezcla.loc["dle_alarma_d", "inferior"] < intervalos.loc["dle_alarma_d", "inferior"]
+
+
+def test_superficie_corporal():
+    assert superficie_dubois(70, 170) == pytest.approx(1.81, abs=0.01)
+    normal = indice_de_sudoracion_vec(32, 40, 26, 0.11, 300, 0.3, "De pie", "Si", "Natural")
+    grande = indice_de_sudoracion_vec(32, 40, 26, 0.11, 300, 0.3, "De pie", "Si", "Natural", superficie_corporal=2.0)
+    # Con más superficie la misma tasa metabólica en W es menos calor por m²
+    assert grande["dle_alarma_q"] > normal["dle_alarma_q"]
+
+
+def test_lectura_incompleta():
+    with pytest.raises(ValueError):
+        evaluar_incertidumbre({"temp_aire": 30.0}, PARAMETROS)
+
+
+def test_muestras_sin_dato():
+    # Globo casi igual al aire con convección natural: con el error de los sensores parte de las
+    # muestras tiene el globo más frío que el aire y ni el ISC ni el SWreq se pueden calcular
+    lectura = {**VARIABLES, "temp_globo": 32.2, "velocidad_aire": 0.05}
+    resultado = evaluar_incertidumbre(lectura, PARAMETROS, muestras=10_000, exactitud={"temp_aire": 0.5, "temp_globo": 0.5})
+    isc, estado_swreq = resultado.muestras["isc"], resultado.muestras["swreq"]["estado"]
+    sin_isc = isc["clasificacion"] == ClasificacionISC.SIN_DATO
+    sin_swreq = estado_swreq == EstadoSudoracion.SIN_DATO
+    assert 0.1 < sin_isc.mean() < 0.9 and np.isnan(isc["isc"][sin_isc]).all()
+    probabilidades = resultado.probabilidades()
+    assert probabilidades["isc_sin_dato"] == pytest.approx(sin_isc.mean())
+    assert probabilidades["swreq_sin_dato"] == pytest.approx(sin_swreq.mean())
+    assert probabilidades["isc_sobre_100"] == pytest.approx(np.mean(isc["isc"][~sin_isc] > 100))
+    assert probabilidades["swreq_no_aplicable"] == pytest.approx(
+        np.mean(estado_swreq[~sin_swreq] == EstadoSudoracion.EMAX_NEGATIVO))
+    intervalos = resultado.intervalos()
+    assert np.isfinite(intervalos.loc[["isc", "dle_alarma_d"], ["inferior", "mediana", "superior"]].to_numpy()).all()
@@ -0,0 +1,111 @@
+"""Tablas por inquilino y caché de resultados de src.inquilinos
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_inquilinos.py
+
+Las tablas de data/ deben ser los mismos objetos para todas las sesiones y de
+solo lectura; las de un inquilino, las de data/ con sus filas encima. La caché
+de resultados no debe mezclar inquilinos ni pasar su límite de memoria.
+"""
+
+import io
+import threading
+
+import numpy as np
+import pytest
+
+from src import inquilinos
+from src.cache import cargar_tablas_referencia
+
+
+@pytest.fixture
+def raiz(tmp_path, monkeypatch):
+    (tmp_path / "minera").mkdir()
+    (tmp_path / "minera" / "Aislamiento.csv").write_text(
+        'Ropa de trabajo,clo,m²·K/W\n'
+        '"Ropa interior, overol, calcetines, zapatos",0.9,0.14\n'
+        'Traje aluminizado de la empresa,1.2,0.19\n', encoding="utf-8")
+    (tmp_path / "agricola").mkdir()
+    monkeypatch.setattr(inquilinos, "RAIZ_INQUILINOS", tmp_path)
+    monkeypatch.setattr(inquilinos, "_tablas", {})
+    return tmp_path
+
+
+def test_tablas_base_compartidas_y_de_solo_lectura():
+    base = inquilinos.tablas_inquilino("")
+    assert base is cargar_tablas_referencia()
+    lista_cavs = base[0]
+    with pytest.raises(ValueError):
+        lista_cavs.loc[0, "CAV"] = 99
+
+
+def test_tablas_fusionadas_por_inquilino(raiz):
+    base_cavs, base_metabolismo, base_clo = cargar_tablas_referencia()
+    lista_cavs, lista_metabolismo, lista_clo = inquilinos.tablas_inquilino("minera")
+    # Sin archivos propios se usan los mismos objetos de data/
+    assert lista_cavs is base_cavs and lista_metabolismo is base_metabolismo
+    assert all(a is b for a, b in zip(inquilinos.tablas_inquilino("agricola"), cargar_tablas_referencia()))
+    ropas = dict(zip(lista_clo["Ropa de trabajo"], lista_clo["m²·K/W"]))
+    assert len(lista_clo) == len(base_clo) + 1
+    assert ropas["Ropa interior, overol, calcetines, zapatos"] == 0.14
+    assert ropas["Traje aluminizado de la empresa"] == 0.19
+    # La segunda llamada reutiliza la fusión
+    assert inquilinos.tablas_inquilino("minera")[2] is lista_clo
+
+
+@pytest.mark.parametrize("nombre", ["../data", "desconocido", "a b"])
+def test_inquilino_no_valido(raiz, nombre):
+    with pytest.raises(ValueError):
+        inquilinos.tablas_inquilino(nombre)
+
+
+def test_huella_no_mueve_el_archivo():
+    archivo = io.BytesIO(b"a,b\n1,2\n")
+    assert inquilinos.huella(archivo) == inquilinos.huella(io.BytesIO(b"a,b\n1,2\n"))
+    assert archivo.tell() == 0
+
+
+def test_cache_por_inquilino_acotada():
+    cache = inquilinos.CacheResultados(bytes_por_inquilino=3 * 8_000 + 500)
+    llamadas = []
+
+    def calcular(valor):
+        llamadas.append(valor)
+        return np.full(1_000, valor, dtype=np.float64)
+
+    for inquilino in ("a", "b"):
+        for clave in range(4):
+            cache.obtener_o_calcular(inquilino, clave, lambda: calcular(clave))
+    assert cache.obtener_o_calcular("a", 3, lambda: calcular(-1))[0] == 3
+    estado = cache.estado()
+    for inquilino in ("a", "b"):
+        assert estado[inquilino]["entradas"] == 3
+        assert estado[inquilino]["bytes"] <= cache.bytes_por_inquilino
+    assert estado["a"]["aciertos"] == 1 and estado["a"]["fallos"] == 4
+    # La clave 0 fue desplazada y se calcula de nuevo
+    cache.obtener_o_calcular("a", 0, lambda: calcular(0))
+    assert llamadas.count(0) == 3
+    cache.limpiar("a")
+    assert "a" not in cache.estado() and cache.estado()["b"]["entradas"] == 3
+
+
+def test_cache_calcula_una_vez_con_sesiones_concurrentes():
+    cache = inquilinos.CacheResultados()
+    inicio = threading.Event()
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        inicio.wait(5)
+        return "resultado"
+
+    obtenidos = []
+    hilos = [threading.Thread(target=lambda: obtenidos.append(cache.obtener_o_calcular("a", "clave", calcular)))
+             for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    inicio.set()
+    for hilo in hilos:
+        hilo.join()
+    assert obtenidos == ["resultado"] * 8
+    assert len(llamadas) == 1
@@ -0,0 +1,75 @@
+"""Instrumentación opcional de src.instrumentacion, activada y desactivada
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_instrumentacion.py
+
+La instrumentación se decide al importar (INSTRUMENTACION=1), así que el caso
+activado corre en un intérprete nuevo. Desactivada, los índices deben ser las
+funciones originales, sin envoltura, para no cambiar los benchmarks.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from src import funciones, instrumentacion
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+INDICES = ("indice_de_calor", "tgbh", "indice_de_sudoracion", "indice_sobrecarga_calorica")
+
+PROGRAMA_ACTIVADO = """
+import json, urllib.request
+from benchmarks.datos import archivo_csv
+from src import funciones, instrumentacion
+from src.ingesta import ingerir
+
+for _ in range(3):
+    funciones.indice_de_calor(32, 60, "Si")
+    funciones.tgbh("Si", 32, 36, 28, 0, 300, "Si")
+    funciones.indice_de_sudoracion(32, 36, 28, 0.11, 300, 0.5, "De pie", "Si", "Natural")
+    funciones.indice_sobrecarga_calorica(300, 0.5, 36, 32, 28, 0.11, 170, 70)
+with instrumentacion.medir("prueba.tramo"):
+    pass
+bloques = list(ingerir(archivo_csv(1000, 1), tamano_bloque=400))
+servidor = instrumentacion.servir(puerto=0)
+url = f"http://127.0.0.1:{servidor.server_address[1]}"
+print(json.dumps({
+    "metricas": instrumentacion.metricas(),
+    "bloques": len(bloques),
+    "prometheus": urllib.request.urlopen(url + "/metricas").read().decode(),
+    "json": json.loads(urllib.request.urlopen(url + "/metricas.json").read()),
+}))
+"""
+
+
+def test_desactivada_no_envuelve():
+    assert not instrumentacion.ACTIVA
+    for nombre in INDICES:
+        assert not hasattr(getattr(funciones, nombre), "__wrapped__")
+    assert instrumentacion.medir("a") is instrumentacion.medir("b")
+    instrumentacion.registrar("prueba", 0.001)
+    assert instrumentacion.metricas() == {}
+    assert instrumentacion.servir() is None
+
+
+def test_activada_mide_y_exporta():
+    entorno = {**os.environ, "INSTRUMENTACION": "1"}
+    salida = subprocess.run([sys.executable, "-c", PROGRAMA_ACTIVADO], cwd=RAIZ, env=entorno,
+                            capture_output=True, text=True, check=True).stdout
+    datos = json.loads(salida)
+    metricas = datos["metricas"]
+    for nombre in INDICES:
+        tramo = metricas[f"funciones.{nombre}"]
+        assert tramo["cuenta"] == 3
+        assert tramo["cubetas"]["+Inf"] == 3
+        assert 0 < tramo["media_s"] <= tramo["p99_s"]
+    assert metricas["prueba.tramo"]["cuenta"] == 1
+    assert metricas["ingesta.bloque"]["cuenta"] == datos["bloques"] == 3
+    assert datos["json"]["funciones.tgbh"]["cuenta"] == 3
+    prometheus = datos["prometheus"]
+    assert "# TYPE hems_tramo_segundos histogram" in prometheus
+    assert 'hems_tramo_segundos_bucket{tramo="funciones.tgbh",le="+Inf"} 3' in prometheus
+    assert 'hems_tramo_segundos_count{tramo="ingesta.bloque"} 3' in prometheus
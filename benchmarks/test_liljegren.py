@@ -0,0 +1,97 @@
+"""Globo y bulbo húmedo natural estimados con src.liljegren a partir de datos de estaciones
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_liljegren.py
+
+Sin sol el globo queda cerca de la temperatura del aire y el bulbo húmedo
+natural cerca del psicrométrico; con sol ambos suben, menos cuanto más viento.
+La versión vectorizada debe dar lo mismo elemento por elemento y su resultado
+debe pasar directo a src.lotes.evaluar_variables.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ingesta import VARIABLES
+from src.liljegren import coseno_cenital, estimar_estacion, estimar_vec, fraccion_directa, velocidad_a_2m
+from src.lotes import evaluar_variables
+from src.psicrometria import temperatura_bulbo_humedo
+
+PARAMETROS = {"radiacion_solar": "Si", "cavs": 0.0, "carga_metabolica": 300.0, "aclimatacion": "Si", "iclo": 0.1,
+              "postura": "De pie", "conveccion": "Forzada"}
+
+
+def test_posicion_del_sol():
+    # Equinoccio en el ecuador y el meridiano de Greenwich: sol casi en el cenit al mediodía UTC
+    fechas = np.array(["2024-03-20T12:00", "2024-03-20T00:00", "2024-06-21T12:00"], dtype="datetime64[s]")
+    cza, distancia = coseno_cenital(fechas, 0.0, 0.0)
+    assert cza[0] > 0.99 and cza[1] < -0.99
+    # En el solsticio de junio el sol está a 23.44° del cenit en el ecuador
+    assert abs(np.degrees(np.arccos(cza[2])) - 23.44) < 0.5
+    assert 0.96 < distancia.min() and distancia.max() < 1.04
+    # Broadcasting: latitudes (S, 1) y fechas (T,)
+    assert coseno_cenital(fechas, np.array([[0.0], [45.0]]), 0.0)[0].shape == (2, 3)
+
+
+def test_radiacion_y_viento():
+    radiacion, directa = fraccion_directa([800, 0, 300, 500], [0.9, 0.9, -0.2, 0.0])
+    assert 0 < directa[0] <= 0.9 and directa[1] == 0
+    np.testing.assert_array_equal(radiacion[2:], 0)
+    # La radiación no supera el 85 % de la del tope de la atmósfera
+    assert fraccion_directa(2000, 0.5)[0] <= 0.85 * 1367 * 0.5 + 1e-9
+    assert velocidad_a_2m(5.0, 10.0) < 5.0 and velocidad_a_2m(5.0) == 5.0
+
+
+def test_sin_sol():
+    ta = np.array([15.0, 25.0, 35.0])
+    resultado = estimar_vec(ta, 50, 2.0, 0, -0.5)
+    # El globo pierde algo de calor hacia el cielo de noche
+    assert np.all(resultado["temp_globo"] < ta) and np.all(resultado["temp_globo"] > ta - 3)
+    np.testing.assert_allclose(resultado["temp_bulbo"], temperatura_bulbo_humedo(ta, 50), atol=1.5)
+    saturado = estimar_vec(30, 100, 2.0, 0, -0.5)
+    assert abs(saturado["temp_bulbo"].item() - 30) < 0.5
+
+
+def test_con_sol():
+    viento = np.array([0.5, 1.0, 3.0, 6.0])
+    resultado = estimar_vec(30, 50, viento, 900, 0.9)
+    sombra = estimar_vec(30, 50, viento, 0, 0.9)
+    exceso = resultado["temp_globo"] - 30
+    assert np.all(exceso > 5) and np.all(np.diff(exceso) < 0)
+    assert np.all(resultado["temp_bulbo"] > sombra["temp_bulbo"])
+    assert np.all(resultado["temp_bulbo"] < resultado["temp_globo"])
+
+
+def test_vectorizado_por_elemento():
+    rng = np.random.default_rng(0)
+    n = 200
+    entradas = (rng.uniform(5, 45, n), rng.uniform(5, 100, n), rng.uniform(0, 8, n), rng.uniform(0, 1100, n),
+                rng.uniform(-0.3, 1, n))
+    resultado = estimar_vec(*entradas)
+    assert not np.isnan(resultado["temp_globo"]).any() and not np.isnan(resultado["temp_bulbo"]).any()
+    for i in range(0, n, 20):
+        uno = estimar_vec(*(e[i] for e in entradas))
+        assert uno.shape == ()
+        assert uno["temp_globo"] == pytest.approx(resultado["temp_globo"][i], abs=1e-9)
+        assert uno["temp_bulbo"] == pytest.approx(resultado["temp_bulbo"][i], abs=1e-9)
+    # Las entradas no numéricas quedan como NaN sin afectar al resto
+    con_nan = estimar_vec([30, np.nan], [50, 50], 1, 500, 0.8)
+    assert np.isfinite(con_nan["temp_globo"][0]) and np.isnan(con_nan["temp_globo"][1])
+
+
+def test_estacion_a_indices():
+    fechas = pd.date_range("2024-07-01 00:30", periods=48, freq="h")
+    hora = fechas.hour.to_numpy()
+    sol = np.clip(np.sin((hora - 6) / 12 * np.pi), 0, None)
+    datos = pd.DataFrame({"fecha_hora": fechas, "temp_aire": 24 + 8 * sol, "humedad_relativa": 80 - 30 * sol,
+                          "velocidad_viento": 2.5, "radiacion_solar": 900 * sol})
+    # Longitud 0: el mediodía solar coincide con el UTC
+    variables = estimar_estacion(datos, 10.0, 0.0, altura_viento=10)
+    assert list(variables.columns) == ["fecha_hora", *VARIABLES]
+    assert not variables.isna().any().any()
+    assert variables["temp_globo"].iloc[12] > variables["temp_aire"].iloc[12] + 5
+    resultados = evaluar_variables(variables[list(VARIABLES)], PARAMETROS)
+    assert len(resultados) == 48 and not resultados["wbgt"].isna().any()
+    with pytest.raises(ValueError, match="radiacion_solar"):
+        estimar_estacion(datos.drop(columns="radiacion_solar"), 10.0, 0.0)
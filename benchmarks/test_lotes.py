@@ -0,0 +1,158 @@
+"""Evaluación por lotes (src.lotes): estadísticas acumuladas por bloques
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_lotes.py
+
+Los DLE sin límite (+inf) no se pierden: cuentan en n y en los percentiles y
+se informan aparte; los NaN (SWreq no aplicable, ISC o SWreq sin dato) no se
+cuentan. Los percentiles
+fuera del rango del histograma dan el extremo observado, no ±inf. Leer el
+archivo por bloques de cualquier tamaño da lo mismo que leerlo en un solo
+bloque, también las filas descartadas y las ventanas de promedio. Las filas
+válidas se fechan (y se ubican en la serie reducida) por su posición en el
+archivo, no por cuántas válidas las preceden.
+"""
+
+import io
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.datos import SEMILLA, archivo_csv
+from src.almacen import AlmacenResultados
+from src.graficos import SerieReducida
+from src.ingesta import EstadisticasIngesta, ingerir
+from src.lotes import COLUMNAS_SERIE, METRICAS, ResumenLote, evaluar_archivo, evaluar_variables
+from src.paralelo import PARAMETROS_POR_DEFECTO
+from src.resultados import ClasificacionISC, EstadoSudoracion
+
+
+def _resultados(**columnas):
+    """DataFrame con todas las columnas que usa ResumenLote.agregar; las de `columnas` con esos valores."""
+    filas = len(next(iter(columnas.values())))
+    datos = {nombre: np.full(filas, 10.0) for nombre, *_ in METRICAS}
+    datos.update({"nivel_calor": np.zeros(filas, dtype=np.int8), "estado_tgbh": np.zeros(filas, dtype=np.int8),
+                  "estado_swreq": np.zeros(filas, dtype=np.int8), "clasificacion_isc": np.zeros(filas, dtype=np.int8)})
+    datos.update({nombre: np.asarray(valores, dtype=np.float64) for nombre, valores in columnas.items()})
+    return pd.DataFrame(datos)
+
+
+def test_dle_sin_limite():
+    resumen = ResumenLote()
+    # 60 DLE finitos, 40 sin límite y 10 no aplicables, en dos bloques
+    dle = np.concatenate([np.arange(1.0, 61.0), np.full(40, np.inf), np.full(10, np.nan)])
+    resumen.agregar(_resultados(dle_alarma_q=dle[:55]))
+    resumen.agregar(_resultados(dle_alarma_q=dle[55:]))
+    fila = resumen.estadisticas().loc["dle_alarma_q"]
+    assert fila["n"] == 100 and fila["Filas sin límite"] == 40
+    assert fila["Mínimo"] == 1.0 and fila["Máximo"] == math.inf
+    # El promedio es el de los finitos
+    assert fila["Promedio"] == 30.5
+    assert abs(fila["P50"] - 50) <= 1
+    assert fila["P90"] == math.inf and fila["P99"] == math.inf
+
+
+def test_solo_sin_limite():
+    resumen = ResumenLote()
+    resumen.agregar(_resultados(dle_alarma_d=np.full(5, np.inf)))
+    fila = resumen.estadisticas().loc["dle_alarma_d"]
+    assert fila["n"] == 5 and fila["Filas sin límite"] == 5
+    assert fila["P50"] == math.inf and math.isnan(fila["Promedio"])
+
+
+def test_sin_dato_fuera_de_las_estadisticas():
+    # Filas 0-4 con globo más frío que el aire y poco viento: ni ISC ni SWreq se pueden calcular
+    calor = {"temp_aire": 40.0, "temp_globo": 60.0, "temp_bulbo": 32.0, "velocidad_aire": 0.5, "humedad_relativa": 50.0}
+    frio = {"temp_aire": 30.0, "temp_globo": 28.0, "temp_bulbo": 24.0, "velocidad_aire": 0.1, "humedad_relativa": 60.0}
+    variables = {v: np.array([frio[v]] * 5 + [calor[v]] * 15) for v in calor}
+    resultados = evaluar_variables(variables, PARAMETROS_POR_DEFECTO)
+    assert (resultados["clasificacion_isc"][:5] == ClasificacionISC.SIN_DATO).all()
+    assert (resultados["estado_swreq"][:5] == EstadoSudoracion.SIN_DATO).all()
+    assert resultados.loc[:4, ["isc", "tiempo_exp_per", "dle_alarma_q", "dle_alarma_d"]].isna().all().all()
+    assert (resultados["clasificacion_isc"][5:] == ClasificacionISC.CRITICA).all()
+
+    resumen = ResumenLote(intervalo_s=60.0)
+    resumen.agregar(resultados)
+    estadisticas = resumen.estadisticas()
+    assert estadisticas.loc["isc", "n"] == 15 and estadisticas.loc["dle_alarma_q", "n"] == 15
+    tiempos = resumen.tiempo_sobre_umbral().set_index(["Indicador", "Categoría"])["Minutos"]
+    assert tiempos["ISC", "Condiciones críticas por sobrecarga calórica"] == 15
+    assert tiempos["ISC", "Sin dato"] == 5 and tiempos["SWreq", "Sin dato"] == 5
+
+
+def test_percentiles_fuera_de_rango():
+    resumen = ResumenLote()
+    # dle_alarma_q va de 0 a 1440 min: casi todo por encima del rango
+    resumen.agregar(_resultados(dle_alarma_q=[-30.0, 5.0, *np.linspace(2000, 3000, 98)]))
+    fila = resumen.estadisticas().loc["dle_alarma_q"]
+    assert fila["Filas sin límite"] == 0
+    assert fila["P50"] == fila["P99"] == fila["Máximo"] == 3000.0
+    assert np.isfinite(fila[["Mínimo", "P50", "P90", "P95", "P99", "Máximo"]].astype(float)).all()
+    resumen = ResumenLote()
+    resumen.agregar(_resultados(dle_alarma_q=[-50.0] * 60 + [100.0] * 40))
+    assert resumen.estadisticas().loc["dle_alarma_q", "P50"] == -50.0
+
+
+def _archivo_con_descartes():
+    """CSV de 2000 filas con celdas vacías y valores fuera de rango repartidos."""
+    datos = pd.read_csv(archivo_csv(2000, SEMILLA + 9))
+    rng = np.random.default_rng(SEMILLA)
+    datos.loc[rng.choice(2000, 30, replace=False), "Temperatura seca (°C)"] = np.nan
+    datos.loc[rng.choice(2000, 20, replace=False), "Velocidad del aire (m/s)"] = -1.0
+    datos.loc[rng.choice(2000, 10, replace=False), "Temperatura de globo (°C)"] = 150.0
+    # Humedad vacía en algunas filas: se deriva del bulbo húmedo en vez de descartar
+    datos.loc[rng.choice(2000, 40, replace=False), "Humedad relativa (%)"] = np.nan
+    return datos.to_csv(index=False).encode()
+
+
+def test_ingesta_por_bloques():
+    contenido = _archivo_con_descartes()
+    completo = EstadisticasIngesta()
+    esperado = pd.concat(list(ingerir(io.BytesIO(contenido), 10_000, estadisticas=completo)), ignore_index=True)
+    assert completo.bloques == 1 and 0 < completo.filas_descartadas <= 60
+    for tamano in (1, 7, 128, 1999):
+        estadisticas = EstadisticasIngesta()
+        bloques = list(ingerir(io.BytesIO(contenido), tamano, estadisticas=estadisticas))
+        pd.testing.assert_frame_equal(pd.concat(bloques, ignore_index=True), esperado)
+        assert estadisticas.bloques == math.ceil(2000 / tamano)
+        assert estadisticas.filas_leidas == completo.filas_leidas == 2000
+        assert estadisticas.filas_descartadas == completo.filas_descartadas
+
+
+@pytest.mark.parametrize("ventana", [1, 3, 60])
+def test_evaluacion_por_bloques(ventana):
+    contenido = _archivo_con_descartes()
+    resumen, muestra = evaluar_archivo(io.BytesIO(contenido), PARAMETROS_POR_DEFECTO, ventana, tamano_bloque=10_000,
+                                       filas_muestra=5000)
+    assert resumen.filas == math.ceil(resumen.ingesta.filas_validas / ventana)
+    for tamano in (1, 7, 100):
+        por_bloques, muestra_bloques = evaluar_archivo(io.BytesIO(contenido), PARAMETROS_POR_DEFECTO, ventana,
+                                                       tamano_bloque=tamano, filas_muestra=5000)
+        assert por_bloques.filas == resumen.filas
+        assert por_bloques.ingesta.filas_descartadas == resumen.ingesta.filas_descartadas
+        pd.testing.assert_frame_equal(muestra_bloques, muestra)
+        pd.testing.assert_frame_equal(por_bloques.estadisticas(), resumen.estadisticas())
+        pd.testing.assert_frame_equal(por_bloques.tiempo_sobre_umbral(), resumen.tiempo_sobre_umbral())
+
+
+@pytest.mark.parametrize("ventana, minutos", [(1, [0, 2, 3, 4]), (2, [0, 3])])
+def test_fechas_tras_filas_descartadas(tmp_path, ventana, minutos):
+    datos = pd.read_csv(archivo_csv(5, SEMILLA))
+    datos.loc[1, "Temperatura seca (°C)"] = np.nan
+    almacen = AlmacenResultados(tmp_path / "almacen")
+    for tamano in (1, 2, 100):
+        evaluar_archivo(io.BytesIO(datos.to_csv(index=False).encode()), PARAMETROS_POR_DEFECTO, ventana, 60.0,
+                        tamano, almacen=almacen, sitio=f"bloques de {tamano}", fecha_inicio="2024-05-01 00:00")
+        fechas = almacen.consultar(f"bloques de {tamano}")["fecha_hora"]
+        assert list(fechas) == [pd.Timestamp("2024-05-01") + pd.Timedelta(minutes=m) for m in minutos]
+
+
+def test_serie_tras_filas_descartadas():
+    datos = pd.read_csv(archivo_csv(5, SEMILLA))
+    datos.loc[1, "Temperatura seca (°C)"] = np.nan
+    serie = SerieReducida(COLUMNAS_SERIE)
+    evaluar_archivo(io.BytesIO(datos.to_csv(index=False).encode()), PARAMETROS_POR_DEFECTO, intervalo_s=60.0,
+                    tamano_bloque=2, serie=serie)
+    np.testing.assert_allclose(serie.datos()["x"], np.array([0, 2, 3, 4]) / 60)
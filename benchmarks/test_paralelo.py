@@ -0,0 +1,37 @@
+"""Nombres de sitio y salidas de src.paralelo
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_paralelo.py
+
+Dos archivos con el mismo nombre en carpetas distintas no deben escribir el
+mismo <sitio>.csv; la misma ruta dos veces se rechaza antes de evaluar.
+"""
+
+import pandas as pd
+import pytest
+
+from benchmarks.datos import SEMILLA, archivo_csv
+from src.paralelo import evaluar_sitios, nombres_sitios
+
+
+def test_nombres_sitios(tmp_path):
+    assert nombres_sitios([tmp_path / "norte.csv", tmp_path / "sur.xlsx"]) == ["norte", "sur"]
+    rutas = [tmp_path / "planta_a" / "lunes.csv", tmp_path / "planta_b" / "lunes.csv", tmp_path / "planta_b" / "martes.csv"]
+    assert nombres_sitios(rutas) == ["planta_a_lunes", "planta_b_lunes", "martes"]
+    with pytest.raises(ValueError, match="lunes"):
+        nombres_sitios([tmp_path / "lunes.csv", tmp_path / "lunes.csv"])
+
+
+def test_salidas_no_se_pisan(tmp_path):
+    rutas = []
+    for i, planta in enumerate(("planta_a", "planta_b")):
+        (tmp_path / planta).mkdir()
+        ruta = tmp_path / planta / "lunes.csv"
+        ruta.write_bytes(archivo_csv(200 + 100 * i, SEMILLA + i).getvalue())
+        rutas.append(ruta)
+    resumen = evaluar_sitios(rutas, tmp_path / "salida", procesos=1)
+    assert resumen["error"].isna().all()
+    assert list(resumen["sitio"]) == ["planta_a_lunes", "planta_b_lunes"]
+    for sitio, filas in zip(resumen["sitio"], resumen["filas"]):
+        assert len(pd.read_csv(tmp_path / "salida" / f"{sitio}.csv")) == filas
+    assert list(resumen["filas"]) == [200, 300]
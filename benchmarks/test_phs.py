@@ -0,0 +1,72 @@
+"""Simulación PHS (ISO 7933) de src.phs
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_phs.py
+
+El caso 1 del anexo F de la norma (40 °C, 2.5 kPa, 150 W/m², 0.5 clo, 480 min)
+debe dar la temperatura rectal, la pérdida de agua y los tiempos límite
+publicados. Simular varios trabajadores a la vez debe dar lo mismo que
+simularlos por separado.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.phs import SUPERFICIE_CORPORAL, simular, simular_globo, simular_turno
+
+
+def test_caso_iso_7933():
+    simulacion = simular(np.full(480, 40.0), 40, 2.5, 0.3, 150 * SUPERFICIE_CORPORAL, 0.5 * 0.155, peso=75, altura=180)
+    fila = simulacion.resumen().iloc[0]
+    assert fila["temp_rectal_final"] == pytest.approx(37.5, abs=0.05)
+    assert fila["perdida_agua_g"] == pytest.approx(6168, abs=20)
+    assert fila["limite_perdida_50_min"] == pytest.approx(439, abs=2)
+    assert fila["limite_perdida_95_min"] == pytest.approx(298, abs=2)
+    assert fila["limite_rectal_min"] == np.inf
+    assert simulacion.temp_rectal.shape == simulacion.perdida_agua.shape == (1, 480)
+    assert (np.diff(simulacion.perdida_agua[0]) > 0).all()
+
+
+def test_lote_igual_a_cada_trabajador():
+    minutos = np.arange(240)
+    temp_aire = 30 + 5 * np.sin(minutos / 240 * np.pi)
+    carga = np.array([[200.0], [350.0], [500.0]])
+    iclo = np.array([[0.08], [0.12], [0.2]])
+    aclimatacion = np.array([["Si"], ["No"], ["Si"]])
+    postura = np.array([["De pie"], ["Sentado"], ["Agachado"]])
+    lote = simular_globo(temp_aire, temp_aire + 8, temp_aire - 6, 0.4, carga, iclo, aclimatacion=aclimatacion,
+                         postura=postura, peso=[[60.0], [75.0], [90.0]], altura=170)
+    for i in range(3):
+        solo = simular_globo(temp_aire, temp_aire + 8, temp_aire - 6, 0.4, carga[i, 0], iclo[i, 0],
+                             aclimatacion=aclimatacion[i, 0], postura=postura[i, 0], peso=[60.0, 75.0, 90.0][i], altura=170)
+        np.testing.assert_allclose(lote.temp_rectal[i], solo.temp_rectal[0])
+        np.testing.assert_allclose(lote.perdida_agua[i], solo.perdida_agua[0])
+        assert lote.limite_rectal[i] == solo.limite_rectal[0]
+
+
+def test_tasa_metabolica_variable_y_turno():
+    minutos = 300
+    condiciones = pd.DataFrame({"temp_aire": np.full(minutos, 34.0), "temp_globo": 42.0, "temp_bulbo": 26.0,
+                                "velocidad_aire": 0.5})
+    trabajadores = pd.DataFrame({"nombre": ["a", "b"], "iclo": 0.1, "carga_metabolica": 400.0, "aclimatacion": "Si"})
+    continuo = simular_turno(condiciones, trabajadores)
+    # 45 min de trabajo y 15 de descanso
+    ciclos = np.where(np.arange(minutos) % 60 < 45, 400.0, 115.0)
+    con_pausas = simular_turno(condiciones, trabajadores, carga_metabolica=ciclos)
+    assert (con_pausas.temp_rectal[:, -1] < continuo.temp_rectal[:, -1]).all()
+    assert (con_pausas.perdida_agua[:, -1] < continuo.perdida_agua[:, -1]).all()
+    # La columna de condiciones da lo mismo que el argumento
+    por_columna = simular_turno(condiciones.assign(carga_metabolica=ciclos), trabajadores)
+    np.testing.assert_array_equal(por_columna.temp_rectal, con_pausas.temp_rectal)
+    finales = simular_turno(condiciones, trabajadores, carga_metabolica=ciclos, series=False)
+    np.testing.assert_array_equal(finales.temp_rectal, con_pausas.temp_rectal[:, -1])
+    resumen = con_pausas.resumen()
+    assert list(resumen["trabajador"]) == ["a", "b"]
+
+
+def test_parametro_de_trabajador_variable_en_el_tiempo():
+    with pytest.raises(ValueError):
+        simular(np.full(10, 30.0), 30, 2.0, 0.3, 300, np.full((2, 10), 0.1))
+    with pytest.raises(ValueError):
+        simular_turno({"temp_aire": [30.0]}, {"iclo": [0.1], "carga_metabolica": [300], "aclimatacion": ["Si"]})
@@ -0,0 +1,112 @@
+"""Planes de trabajo/descanso de src.planificador contra los límites recalculados
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_planificador.py
+
+Con los incrementos de cada intervalo recalculados aparte, el almacenamiento
+acumulado de un plan nunca supera 1 (Q_max o el límite del ISC) y la
+deshidratación final tampoco (D_max). Una cuadrilla es factible exactamente
+cuando descansar todo el turno cumple los límites; si no lo es, su plan es
+descanso completo. Descansar en sombra fresca no reduce la deshidratación acumulada.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.planificador import CARGA_DESCANSO, condiciones_turno, incrementos, planificar
+
+INICIO_H, DURACION_MIN, PASO_MIN = 6.0, 720, 5
+
+
+def _pronostico(aire=26.0, sol_aire=10.0, sol_globo=22.0, bulbo=23.0, sol_bulbo=4.0, viento=0.4):
+    hora = np.arange(24)
+    sol = np.clip(np.sin((hora - 6) / 12 * np.pi), 0, None)
+    return pd.DataFrame({"temp_aire": aire + sol_aire * sol, "temp_globo": aire + sol_globo * sol,
+                         "temp_bulbo": bulbo + sol_bulbo * sol, "velocidad_aire": viento})
+
+
+def _cuadrillas(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({"nombre": [f"cuadrilla_{i}" for i in range(n)],
+                         "iclo": rng.choice([0.0, 0.11, 0.155, 0.31], n),
+                         "carga_metabolica": rng.choice([180.0, 300.0, 415.0, 520.0], n),
+                         "aclimatacion": rng.choice(["Si", "No"], n)})
+
+
+def _acumulados(pronostico, cuadrillas, trabajo):
+    """Almacenamiento (sin bajar de 0) y deshidratación acumulados del plan `trabajo`, recalculados aparte."""
+    condiciones = condiciones_turno(pronostico, INICIO_H, DURACION_MIN, PASO_MIN)
+    sombra = {**condiciones, "temp_globo": condiciones["temp_aire"]}
+    parametros = {c: cuadrillas[c].to_numpy()[:, None] for c in ("iclo", "carga_metabolica", "aclimatacion")}
+    trabajo_q, trabajo_d = incrementos(condiciones, **parametros, paso_min=PASO_MIN)
+    descanso_q, descanso_d = incrementos(sombra, **{**parametros, "carga_metabolica": CARGA_DESCANSO}, paso_min=PASO_MIN)
+    almacenamiento = np.zeros(trabajo.shape)
+    actual = np.zeros(len(cuadrillas))
+    for t in range(trabajo.shape[1]):
+        actual = np.maximum(actual + np.where(trabajo[:, t], trabajo_q[:, t], descanso_q[:, t]), 0)
+        almacenamiento[:, t] = actual
+    deshidratacion = np.cumsum(np.where(trabajo, trabajo_d, descanso_d), axis=1)
+    return almacenamiento, deshidratacion
+
+
+def test_planes_dentro_de_los_limites():
+    pronostico, cuadrillas = _pronostico(), _cuadrillas(40)
+    plan = planificar(pronostico, cuadrillas, INICIO_H, DURACION_MIN, PASO_MIN)
+    assert plan.trabajo.shape == (40, DURACION_MIN // PASO_MIN)
+    almacenamiento, deshidratacion = _acumulados(pronostico, cuadrillas, plan.trabajo)
+    np.testing.assert_allclose(plan.almacenamiento, almacenamiento, rtol=1e-9, atol=1e-12)
+    factible = plan.factible
+    assert factible.any() and (~factible).any()
+    assert almacenamiento[factible].max() <= 1 and deshidratacion[factible, -1].max() <= 1
+    assert plan.trabajo[factible].any(axis=1).any()
+    # Cuadrillas no factibles: descanso completo
+    assert not plan.trabajo[~factible].any()
+
+    # Factible si y solo si descansar todo el turno cumple ambos límites
+    almacenamiento, deshidratacion = _acumulados(pronostico, cuadrillas, np.zeros_like(plan.trabajo))
+    descanso_cumple = (almacenamiento.max(axis=1) <= 1) & (deshidratacion[:, -1] <= 1)
+    np.testing.assert_array_equal(factible, descanso_cumple)
+
+    resumen = plan.resumen()
+    assert (resumen["minutos_trabajo"] + resumen["minutos_descanso"] == DURACION_MIN).all()
+    bloques = plan.bloques(resumen["cuadrilla"][np.argmax(resumen["minutos_trabajo"])])
+    assert bloques["inicio_h"].iloc[0] == INICIO_H and bloques["fin_h"].iloc[-1] == INICIO_H + DURACION_MIN / 60
+
+
+def test_limite_de_deshidratacion():
+    # Calor moderado sin almacenamiento relevante: el turno lo limita D_max
+    pronostico = _pronostico(aire=30.0, sol_aire=4.0, sol_globo=6.0, bulbo=20.0, sol_bulbo=1.0, viento=1.5)
+    cuadrillas = pd.DataFrame({"nombre": ["a", "b"], "iclo": [0.11, 0.11], "carga_metabolica": [520.0, 300.0],
+                               "aclimatacion": ["No", "Si"]})
+    plan = planificar(pronostico, cuadrillas, INICIO_H, DURACION_MIN, PASO_MIN)
+    almacenamiento, deshidratacion = _acumulados(pronostico, cuadrillas, plan.trabajo)
+    assert plan.factible.all()
+    assert almacenamiento.max() <= 1 and deshidratacion[:, -1].max() <= 1
+    # Trabajar todo el turno superaría D_max: el plan descansa algo y aprovecha casi todo el límite
+    _, todo_trabajo = _acumulados(pronostico, cuadrillas, np.ones_like(plan.trabajo))
+    assert todo_trabajo[0, -1] > 1 and 0 < plan.trabajo[0].sum() < plan.trabajo.shape[1]
+    assert deshidratacion[0, -1] > 0.9
+
+
+def test_sin_plan_posible():
+    # Aire casi saturado a 45 °C: Emax < 0 también en descanso, ninguna cuadrilla es factible
+    extremo = pd.DataFrame({"temp_aire": np.full(24, 45.0), "temp_globo": 60.0, "temp_bulbo": 44.5,
+                            "velocidad_aire": 0.1})
+    plan = planificar(extremo, _cuadrillas(3), INICIO_H, DURACION_MIN, PASO_MIN)
+    assert not plan.factible.any() and not plan.trabajo.any()
+    # Día fresco y trabajo liviano: todas trabajan todo el turno
+    fresco = _pronostico(aire=18.0, sol_aire=0.0, sol_globo=0.0, bulbo=14.0, sol_bulbo=0.0, viento=1.0)
+    plan = planificar(fresco, _cuadrillas(3).assign(carga_metabolica=180.0), INICIO_H, DURACION_MIN, PASO_MIN)
+    assert plan.factible.all() and plan.trabajo.all()
+
+
+def test_descanso_fresco_no_repone_deshidratacion():
+    # Reposo a 18 °C en sombra: el balance da sudoración negativa, que no debe restar deshidratación
+    fresco = _pronostico(aire=18.0, sol_aire=0.0, sol_globo=0.0, bulbo=12.0, sol_bulbo=0.0, viento=0.4)
+    condiciones = condiciones_turno(fresco, INICIO_H, DURACION_MIN, PASO_MIN)
+    sombra = {**condiciones, "temp_globo": condiciones["temp_aire"]}
+    _, descanso_d = incrementos(sombra, np.array([[0.11]]), np.array([[CARGA_DESCANSO]]), np.array([["Si"]]),
+                                paso_min=PASO_MIN)
+    assert (descanso_d == 0).all()
+    plan = planificar(fresco, _cuadrillas(8), INICIO_H, DURACION_MIN, PASO_MIN)
+    assert (np.diff(plan.deshidratacion, axis=1) >= 0).all()
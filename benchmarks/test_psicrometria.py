@@ -0,0 +1,100 @@
+"""Derivación del bulbo húmedo y la humedad relativa (src.psicrometria) y su uso en la ingesta
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_psicrometria.py
+
+Derivar una variable y volver debe dar la original, con la misma relación
+psicrométrica de src.vectorizado. Un archivo con solo una de las dos columnas se
+ingiere con la otra derivada fila por fila, no con el valor por defecto.
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+from src.ingesta import EstadisticasIngesta, ingerir
+from src.psicrometria import bulbo_humedo_stull, completar_humedad, humedad_relativa, temperatura_bulbo_humedo
+from src.vectorizado import presion_parcial_ambiente, presion_saturacion
+
+
+def _malla():
+    ta, hr = np.meshgrid(np.linspace(-20, 60, 81), np.linspace(0, 100, 51))
+    return ta, hr
+
+
+def test_ida_y_vuelta():
+    ta, hr = _malla()
+    tbh = temperatura_bulbo_humedo(ta, hr)
+    assert tbh.shape == ta.shape
+    np.testing.assert_allclose(humedad_relativa(ta, tbh), hr, atol=1e-6)
+    np.testing.assert_allclose(presion_parcial_ambiente(ta, tbh), hr / 100 * presion_saturacion(ta), atol=1e-8)
+    np.testing.assert_allclose(temperatura_bulbo_humedo(ta, humedad_relativa(ta, tbh)), tbh, atol=1e-4)
+    # Saturado: el bulbo húmedo es la temperatura del aire
+    np.testing.assert_allclose(temperatura_bulbo_humedo(ta[0], 100), ta[0], atol=1e-6)
+
+
+def test_stull():
+    # Ejemplo de Stull (2011): 20 °C y 50 % dan 13.7 °C
+    assert abs(bulbo_humedo_stull(20, 50) - 13.7) < 0.05
+    ta, hr = _malla()
+    exacta = temperatura_bulbo_humedo(ta, hr)
+    aproximada = temperatura_bulbo_humedo(ta, hr, exacta=False)
+    # Fuera del rango de Stull se resuelve igual que con exacta=True
+    fuera = (hr < 5) | (ta > 50)
+    np.testing.assert_allclose(aproximada[fuera], exacta[fuera], atol=1e-4)
+    dentro = (ta >= 15) & (ta <= 50) & (hr >= 5) & (hr <= 99)
+    assert np.abs(aproximada - exacta)[dentro].max() < 1.5
+
+
+def test_no_numericos_y_completar():
+    assert np.isnan(temperatura_bulbo_humedo([np.nan, 30], [50, np.nan])).all()
+    variables = {
+        "temp_aire": np.array([30.0, 30.0, 30.0, np.nan]),
+        "temp_bulbo": np.array([25.0, np.nan, np.nan, 20.0]),
+        "humedad_relativa": np.array([np.nan, 60.0, np.nan, np.nan]),
+    }
+    completar_humedad(variables)
+    assert abs(variables["humedad_relativa"][0] - humedad_relativa(30, 25)) < 1e-12
+    assert abs(variables["temp_bulbo"][1] - temperatura_bulbo_humedo(30, 60)) < 1e-12
+    # Sin la otra variable o sin temperatura seca no se deriva nada
+    assert np.isnan(variables["temp_bulbo"][2]) and np.isnan(variables["humedad_relativa"][2])
+    assert np.isnan(variables["humedad_relativa"][3])
+
+
+def _csv(datos):
+    return io.BytesIO(pd.DataFrame(datos).to_csv(index=False).encode())
+
+
+def _ingerir(datos):
+    estadisticas = EstadisticasIngesta()
+    preparado = pd.concat(list(ingerir(_csv(datos), tamano_bloque=4, estadisticas=estadisticas)), ignore_index=True)
+    return preparado, estadisticas
+
+
+def test_ingesta_con_una_sola_columna():
+    rng = np.random.default_rng(0)
+    ta = rng.uniform(20, 45, 10)
+    hr = rng.uniform(10, 95, 10)
+    tbh = temperatura_bulbo_humedo(ta, hr)
+    base = {"Temperatura seca (°C)": ta, "Temperatura de globo (°C)": ta + 5, "Velocidad del aire (m/s)": 0.5}
+
+    solo_humedad, estadisticas = _ingerir({**base, "Humedad relativa (%)": hr})
+    assert estadisticas.columnas_faltantes == []
+    assert estadisticas.columnas_derivadas == ["Temperatura de bulbo humedo (°C)"]
+    np.testing.assert_allclose(solo_humedad["temp_bulbo"], tbh, atol=1e-4)
+
+    solo_bulbo, estadisticas = _ingerir({**base, "Temperatura de bulbo humedo (°C)": tbh})
+    assert estadisticas.columnas_derivadas == ["Humedad relativa (%)"]
+    np.testing.assert_allclose(solo_bulbo["humedad_relativa"], hr, atol=1e-3)
+
+    # Las celdas vacías se derivan de la otra columna en vez de descartar la fila
+    hr_con_vacios = np.where(np.arange(10) % 3 == 0, np.nan, hr)
+    mixto, estadisticas = _ingerir({**base, "Temperatura de bulbo humedo (°C)": tbh, "Humedad relativa (%)": hr_con_vacios})
+    assert estadisticas.filas_descartadas == 0 and estadisticas.columnas_derivadas == []
+    np.testing.assert_allclose(mixto["humedad_relativa"], hr, atol=1e-3)
+
+    # Sin ninguna de las dos se usan los valores por defecto, como antes
+    ninguna, estadisticas = _ingerir(base)
+    assert len(estadisticas.columnas_faltantes) == 2 and estadisticas.columnas_derivadas == []
+    assert (ninguna["temp_bulbo"] == 28.0).all() and (ninguna["humedad_relativa"] == 50.0).all()
@@ -0,0 +1,69 @@
+"""Rejilla SWreq precalculada (src.rejilla_sudoracion) contra la función exacta
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_rejilla_sudoracion.py
+
+Dentro de la rejilla los DLE interpolados quedan cerca de los exactos; fuera de
+ella, y donde el SWreq no se puede calcular, el resultado es el exacto. Guardar
+y cargar la rejilla da los mismos resultados y el archivo se lee sin pickle.
+"""
+
+import numpy as np
+import pytest
+
+from src.rejilla_sudoracion import RejillaSudoracion
+from src.resultados import EstadoSudoracion
+from src.vectorizado import DTYPE_SUDORACION, indice_de_sudoracion_vec
+
+CONFIGURACION = {"iclo": 0.11, "carga_metabolica": 300.0, "postura": "De pie", "conveccion": "Natural"}
+
+
+@pytest.fixture(scope="module")
+def rejilla():
+    return RejillaSudoracion.construir(**CONFIGURACION, paso_aire=3.0, paso_radiante=5.0, paso_presion=1.0,
+                                       nodos_viento=12, muestras_validacion=5000)
+
+
+def _exacta(ta, tg, tw, va, aclimatacion):
+    c = CONFIGURACION
+    return indice_de_sudoracion_vec(ta, tg, tw, c["iclo"], c["carga_metabolica"], va, c["postura"], aclimatacion,
+                                    c["conveccion"])
+
+
+def _puntos(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    ta = rng.uniform(15, 60, n)
+    return ta, rng.uniform(ta, 80), rng.uniform(15, ta), rng.uniform(0.2, 3, n)
+
+
+@pytest.mark.parametrize("aclimatacion", ["Si", "No"])
+def test_error_dentro_de_la_rejilla(rejilla, aclimatacion):
+    assert rejilla.errores["fraccion_en_rejilla"] > 0.95 and rejilla.errores["dle_rel_p99"] < 0.1
+    puntos = _puntos(5000)
+    exacto, aproximado = _exacta(*puntos, aclimatacion), rejilla.evaluar(*puntos, aclimatacion)
+    np.testing.assert_array_equal(aproximado["estado"][exacto["estado"] == EstadoSudoracion.SIN_DATO],
+                                  EstadoSudoracion.SIN_DATO)
+    for campo in DTYPE_SUDORACION.names[:4]:
+        comparable = np.isfinite(exacto[campo]) & (exacto[campo] > 0) & (exacto[campo] <= 480)
+        relativo = np.abs(aproximado[campo][comparable] / exacto[campo][comparable] - 1)
+        assert comparable.sum() > 100 and np.percentile(relativo, 99) < 0.1
+
+
+def test_exacta_fuera_de_la_rejilla(rejilla):
+    # Aire sobre 60 °C y globo más frío que el aire sin convección forzada (SIN_DATO)
+    ta, tg, tw, va = np.array([65.0, 30.0]), np.array([70.0, 28.0]), np.array([40.0, 24.0]), np.array([1.0, 0.1])
+    aproximado, exacto = rejilla.evaluar(ta, tg, tw, va, "Si"), _exacta(ta, tg, tw, va, "Si")
+    for campo in DTYPE_SUDORACION.names:
+        np.testing.assert_array_equal(aproximado[campo], exacto[campo])
+    assert aproximado["estado"][1] == EstadoSudoracion.SIN_DATO
+
+
+def test_guardar_y_cargar(rejilla, tmp_path):
+    ruta = tmp_path / "rejilla.npz"
+    rejilla.guardar(ruta)
+    with np.load(ruta, allow_pickle=False) as datos:
+        assert all(datos[clave].dtype != object for clave in datos.files)
+    cargada = RejillaSudoracion.cargar(ruta)
+    assert cargada.configuracion == rejilla.configuracion and cargada.errores == rejilla.errores
+    puntos = _puntos(500, 1)
+    np.testing.assert_array_equal(cargada.evaluar(*puntos, "No"), rejilla.evaluar(*puntos, "No"))
@@ -0,0 +1,84 @@
+"""Tipos de resultado de src.resultados y lote por columnas
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_resultados.py
+
+Los resultados escalares deben seguir desempaquetándose como tuplas, ser
+inmutables y no tener __dict__. Un LoteResultados debe devolver los mismos
+resultados que las funciones escalares, aceptar los arreglos de src.vectorizado
+y ocupar solo los bytes de sus campos por fila.
+"""
+
+import numpy as np
+import pytest
+
+from benchmarks.datos import argumentos
+from src.funciones import indice_de_calor, indice_de_sudoracion, indice_sobrecarga_calorica, tgbh
+from src.resultados import (
+    ClasificacionISC,
+    EstadoTGBH,
+    LoteResultados,
+    NivelCalor,
+    ResultadoCalor,
+    ResultadoISC,
+    ResultadoSudoracion,
+    ResultadoTGBH,
+)
+from src.vectorizado import indice_de_sudoracion_vec, tgbh_vec
+
+TIPOS = {
+    "indice_de_calor": (indice_de_calor, ResultadoCalor),
+    "tgbh": (tgbh, ResultadoTGBH),
+    "indice_de_sudoracion": (indice_de_sudoracion, ResultadoSudoracion),
+    "indice_sobrecarga_calorica": (indice_sobrecarga_calorica, ResultadoISC),
+}
+
+
+def test_resultado_escalar_inmutable():
+    resultado = tgbh("Si", 32, 40, 28, 0, 300, "Si")
+    wbgt, wbgt_efectivo, wbgt_ref, estado = resultado
+    assert resultado.wbgt == wbgt and estado is resultado.estado is EstadoTGBH.ESTRES_TERMICO
+    assert estado.texto == "Estrés Térmico"
+    assert not hasattr(resultado, "__dict__")
+    with pytest.raises(AttributeError):
+        resultado.estado = EstadoTGBH.DISCOMFORT
+    assert indice_de_calor(32, 60, "Si").nivel is NivelCalor.NIVEL_II
+    assert isinstance(indice_sobrecarga_calorica(300, 0.5, 40, 32, 28, 0.11, 170, 70).clasificacion, ClasificacionISC)
+
+
+@pytest.mark.parametrize("nombre", TIPOS)
+def test_lote_conserva_resultados(nombre, variables_referencia):
+    funcion, tipo = TIPOS[nombre]
+    escalares = [funcion(*argumentos(variables_referencia, i)[nombre]) for i in range(50)]
+    lote = LoteResultados(tipo, capacidad=4)
+    for resultado in escalares:
+        lote.agregar(resultado)
+    assert len(lote) == 50 and lote.capacidad >= 50
+    assert list(lote) == escalares
+    assert lote[-1] == escalares[-1] and type(lote[0]) is tipo
+    for campo, codigo in tipo.CODIGOS.items():
+        assert isinstance(getattr(lote[0], campo), codigo)
+    with pytest.raises(IndexError):
+        lote[50]
+
+
+def test_lote_desde_vectorizado(variables_referencia):
+    v = variables_referencia
+    arreglo = indice_de_sudoracion_vec(v["temp_aire"], v["temp_globo"], v["temp_bulbo"], v["iclo"], v["carga_metabolica"],
+                                       v["velocidad_aire"], v["postura"], v["aclimatacion"], v["conveccion"])
+    lote = LoteResultados(ResultadoSudoracion, capacidad=0)
+    lote.extender(arreglo)
+    lote.extender(arreglo)
+    assert len(lote) == 2 * len(arreglo)
+    np.testing.assert_array_equal(lote.como_arreglo()[:len(arreglo)], arreglo)
+    np.testing.assert_array_equal(lote.columna("estado")[len(arreglo):], arreglo["estado"])
+    with pytest.raises(ValueError):
+        lote.columna("dle_alarma_q")[0] = 1.0
+
+
+def test_lote_bytes_por_resultado():
+    lote = LoteResultados(ResultadoTGBH, capacidad=0)
+    lote.extender(tgbh_vec("Si", np.full(100_000, 32.0), 40.0, 28.0, 0.0, 300.0, "Si"))
+    # 3 floats y un código de un byte por fila, más la capacidad libre
+    assert lote.nbytes <= 25 * lote.capacidad
+    assert lote.nbytes < 2 * 25 * len(lote)
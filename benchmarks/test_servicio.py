@@ -0,0 +1,100 @@
+"""Servicio HTTP de src.servicio llamado directamente como aplicación ASGI
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_servicio.py
+
+Una lectura sola y la misma lectura dentro de un lote dan el mismo resultado,
+también fuera del dominio de las fórmulas (/isc con velocidad_aire = 0, /tgbh con
+carga_metabolica = 0, globo más frío que el aire sin convección forzada), que
+responde 422 en los dos casos. Mientras se evalúa una solicitud, el bucle de
+eventos sigue atendiendo las demás.
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from benchmarks.datos import SEMILLA, argumentos, variables_ambientales
+from src import servicio
+from src.servicio import ENDPOINTS, app
+
+FUNCIONES = {"/indice-calor": "indice_de_calor", "/tgbh": "tgbh", "/sudoracion": "indice_de_sudoracion",
+             "/isc": "indice_sobrecarga_calorica"}
+
+
+async def _solicitud(ruta, cuerpo=None, metodo="POST"):
+    """(estado, JSON de la respuesta) de una solicitud a la aplicación."""
+    recibidos = [{"type": "http.request", "body": json.dumps(cuerpo).encode(), "more_body": False}]
+    enviados = []
+
+    async def receive():
+        return recibidos.pop(0) if recibidos else {"type": "http.disconnect"}
+
+    async def send(mensaje):
+        enviados.append(mensaje)
+
+    await app({"type": "http", "path": ruta, "method": metodo}, receive, send)
+    return enviados[0]["status"], json.loads(enviados[1]["body"])
+
+
+def _lecturas(ruta, n):
+    variables = variables_ambientales(n, SEMILLA + 6)
+    return [dict(zip(ENDPOINTS[ruta][0], argumentos(variables, i)[FUNCIONES[ruta]])) for i in range(n)]
+
+
+@pytest.mark.parametrize("ruta", list(ENDPOINTS))
+def test_lectura_y_lote(ruta):
+    lecturas = _lecturas(ruta, 20)
+    estado, lote = asyncio.run(_solicitud(ruta, {"lecturas": lecturas}))
+    assert estado == 200 and len(lote["resultados"]) == 20
+    for lectura, en_lote in zip(lecturas, lote["resultados"]):
+        estado, sola = asyncio.run(_solicitud(ruta, lectura))
+        assert estado == 200 and sola.keys() == en_lote.keys()
+        for campo, valor in sola.items():
+            assert en_lote[campo] == (valor if isinstance(valor, str) or valor is None else pytest.approx(valor))
+
+
+@pytest.mark.parametrize("velocidad", [0, 0.0, -0.5])
+def test_isc_sin_movimiento_de_aire(velocidad):
+    lecturas = _lecturas("/isc", 3)
+    lecturas[1]["velocidad_aire"] = velocidad
+    for cuerpo in (lecturas[1], {"lecturas": lecturas}):
+        estado, respuesta = asyncio.run(_solicitud("/isc", cuerpo))
+        assert estado == 422 and "velocidad_aire" in respuesta["error"]
+
+
+@pytest.mark.parametrize("ruta, cambios", [
+    ("/tgbh", {"carga_metabolica": 0}),
+    ("/tgbh", {"carga_metabolica": -5.0}),
+    ("/sudoracion", {"temp_globo": 30.0, "temp_aire": 35.0, "velocidad_aire": 0.1}),
+    ("/sudoracion", {"temp_globo": -40.0, "temp_aire": 60.0, "velocidad_aire": 0.2}),
+    ("/isc", {"temp_globo": 30.0, "temp_aire": 35.0, "velocidad_aire": 0.15}),
+])
+def test_fuera_del_dominio(ruta, cambios):
+    lecturas = _lecturas(ruta, 3)
+    lecturas[1].update(cambios)
+    sola = asyncio.run(_solicitud(ruta, lecturas[1]))
+    en_lote = asyncio.run(_solicitud(ruta, {"lecturas": lecturas}))
+    assert sola[0] == 422 and sola == en_lote
+
+
+def test_evaluacion_fuera_del_bucle(monkeypatch):
+    # La evaluación espera a que /salud responda: si corriera en el bucle de eventos, nunca terminaría
+    salud_respondida = threading.Event()
+
+    def evaluar_bloqueante(ruta, cuerpo):
+        assert salud_respondida.wait(5)
+        return {"ruta": ruta}
+
+    monkeypatch.setattr(servicio, "evaluar", evaluar_bloqueante)
+
+    async def concurrentes():
+        evaluacion = asyncio.create_task(_solicitud("/tgbh", {}))
+        await asyncio.sleep(0)
+        assert await _solicitud("/salud", metodo="GET") == (200, {"estado": "ok"})
+        salud_respondida.set()
+        return await evaluacion
+
+    assert asyncio.run(concurrentes()) == (200, {"ruta": "/tgbh"})
@@ -0,0 +1,71 @@
+"""Ventanas móviles de src.tiempo_real contra un recálculo desde cero
+
+Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/test_tiempo_real.py
+
+Después de cada muestra, el promedio de cada ventana debe ser el de todas las
+muestras guardadas cuya cubeta está entre la más reciente del sensor y las
+`cubetas` - 1 anteriores, con muestras fuera de orden, pausas más largas que la
+ventana, temperaturas faltantes y sensores que envían en distintos momentos.
+"""
+
+import numpy as np
+
+from src.tiempo_real import EvaluadorTGBHEnVivo, VentanaMovil
+from src.vectorizado import tgbh_vec
+
+
+def _promedio_bruto(muestras, segundos, cubetas):
+    """Promedio (3,) de las muestras [(tiempo_s, (ta, tg, tbh)), ...] de un sensor en su ventana actual."""
+    completas = [(t, v) for t, v in muestras if np.isfinite(v).all()]
+    if not completas:
+        return np.full(3, np.nan)
+    ancho = segundos / cubetas
+    cubetas_muestras = np.array([np.floor_divide(t, ancho) for t, _ in completas])
+    valores = np.array([v for _, v in completas])
+    dentro = cubetas_muestras > cubetas_muestras.max() - cubetas
+    return valores[dentro].mean(axis=0)
+
+
+def test_ventana_contra_recalculo():
+    rng = np.random.default_rng(0)
+    sensores, segundos, cubetas = 6, 120, 12
+    ventana = VentanaMovil(sensores, segundos, cubetas)
+    historial = {s: [] for s in range(sensores)}
+    tiempos = np.full(sensores, 1.7e9)
+    for paso in range(400):
+        enviando = np.flatnonzero(rng.random(sensores) < 0.7)
+        # Avances de 0 a 25 s, algunas pausas más largas que la ventana y algunas muestras atrasadas
+        avance = rng.choice([0.0, 1.0, 3.5, 10.0, 25.0, 400.0], len(enviando), p=[0.1, 0.4, 0.2, 0.15, 0.13, 0.02])
+        tiempos[enviando] += avance
+        tiempo = tiempos[enviando] - np.where(rng.random(len(enviando)) < 0.1, rng.uniform(0, 150, len(enviando)), 0)
+        valores = rng.normal([30.0, 35.0, 25.0], 2.0, (len(enviando), 3))
+        valores[rng.random(len(enviando)) < 0.05, 1] = np.nan
+        completas = np.isfinite(valores).all(axis=1)
+        ventana.agregar(enviando[completas], tiempo[completas], valores[completas])
+        for s, t, v in zip(enviando, tiempo, valores):
+            historial[s].append((t, v))
+        esperado = np.array([_promedio_bruto(historial[s], segundos, cubetas) for s in range(sensores)])
+        np.testing.assert_allclose(ventana.promedios(np.arange(sensores)), esperado, rtol=1e-5, atol=1e-4,
+                                   err_msg=f"paso {paso}")
+
+
+def test_evaluador_tgbh():
+    evaluador = EvaluadorTGBHEnVivo(3, "Si", 0.0, 300.0, np.array(["Si", "No", "Si"]), ventanas_s=(60, 3600))
+    rng = np.random.default_rng(1)
+    historial = {s: [] for s in range(3)}
+    for segundo in range(0, 7200, 7):
+        # El sensor 2 deja de enviar a la mitad
+        sensores = np.array([0, 1] if segundo >= 3600 else [0, 1, 2])
+        valores = rng.normal([30.0, 38.0, 26.0], 1.5, (len(sensores), 3))
+        resultado = evaluador.agregar(sensores, 1.7e9 + segundo, *valores.T)
+        for s, v in zip(sensores, valores):
+            historial[s].append((1.7e9 + segundo, v))
+    for segundos, tgbh in evaluador.evaluar().items():
+        promedios = np.array([_promedio_bruto(historial[s], segundos, 60) for s in range(3)])
+        np.testing.assert_allclose(evaluador.promedios(segundos), promedios, rtol=1e-5)
+        esperado = tgbh_vec("Si", *promedios.T, 0.0, 300.0, np.array(["Si", "No", "Si"]))
+        np.testing.assert_allclose(tgbh["wbgt"], esperado["wbgt"], rtol=1e-5)
+        np.testing.assert_array_equal(tgbh["estado"], esperado["estado"])
+    # agregar devuelve solo los sensores pedidos
+    assert resultado[60].shape == (2,)
@@ -0,0 +1,230 @@
+"""Almacén columnar (Parquet) de resultados de evaluaciones por sitio
+
+Los resultados de src.lotes.evaluar_variables (variables ambientales, los cuatro
+índices y las condiciones de la tarea) se agregan con su fecha y hora a un
+dataset Parquet particionado por sitio y mes:
+
+    <raiz>/sitio=<sitio>/mes=<AAAAMM>/parte-<uuid>-<n>.parquet
+
+Cada agregado escribe archivos nuevos (varios procesos pueden escribir a la vez
+sin pisarse) y `compactar` los une en un archivo por partición. Los niveles,
+estados, clasificaciones y textos de la tarea se guardan como columnas
+diccionario (un byte por fila y las etiquetas una sola vez por archivo).
+
+`consultar` filtra por sitio y fechas con una expresión de pyarrow.dataset: las
+particiones de otros sitios y meses no se abren, y dentro de cada archivo los
+grupos de filas (ordenados por fecha_hora) se descartan con sus estadísticas
+mínimo/máximo, así que un año de un sitio se lee sin recorrer los CSV originales.
+
+Uso:
+    python -m src.almacen almacen --sitio planta_norte --desde 2024-01-01 --hasta 2025-01-01
+    python -m src.almacen almacen --compactar
+"""
+
+import argparse
+import os
+import time
+import uuid
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.ingesta import VARIABLES
+from src.vectorizado import CLASIFICACIONES_ISC, ESTADOS_SUDORACION, ESTADOS_TGBH, NIVELES_CALOR
+
+RAIZ_POR_DEFECTO = os.environ.get("ALMACEN_RESULTADOS", "almacen")
+FILAS_POR_GRUPO = 65_536
+
+# Columnas de códigos -> etiquetas del diccionario
+ETIQUETAS = {
+    "nivel_calor": NIVELES_CALOR,
+    "estado_tgbh": ESTADOS_TGBH,
+    "estado_swreq": ESTADOS_SUDORACION,
+    "clasificacion_isc": CLASIFICACIONES_ISC,
+}
+RESULTADOS = (
+    "indice_calor", "wbgt", "wbgt_efectivo", "wbgt_ref", "dle_alarma_q", "dle_peligro_q", "dle_alarma_d",
+    "dle_peligro_d", "isc", "tiempo_exp_per",
+)
+# Condiciones de la tarea: numéricas y de texto
+PARAMETROS_NUMERICOS = ("cavs", "carga_metabolica", "iclo")
+PARAMETROS_TEXTO = ("radiacion_solar", "aclimatacion", "postura", "conveccion")
+
+_TEXTO = pa.dictionary(pa.int8(), pa.string())
+ESQUEMA = pa.schema(
+    [("fecha_hora", pa.timestamp("s"))]
+    + [(variable, pa.float64()) for variable in VARIABLES]
+    + [(columna, pa.float64()) for columna in RESULTADOS]
+    + [(columna, _TEXTO) for columna in ETIQUETAS]
+    + [(parametro, pa.float64()) for parametro in PARAMETROS_NUMERICOS]
+    + [(parametro, _TEXTO) for parametro in PARAMETROS_TEXTO]
+)
+PARTICIONES = ds.partitioning(pa.schema([("sitio", pa.string()), ("mes", pa.int32())]), flavor="hive")
+
+
+def marcas_de_tiempo(inicio, filas, intervalo_s, primera=0):
+    """Fechas (datetime64[s]) de las filas primera..primera+filas-1 medidas desde `inicio` cada `intervalo_s` s.
+
+    `filas` también puede ser un arreglo con las posiciones de las filas (por
+    ejemplo la columna src.ingesta.COLUMNA_FILA); entonces `primera` no se usa.
+    """
+    if inicio is None:
+        raise ValueError("Se necesita la fecha y hora de la primera medición para guardar en el almacén")
+    inicio = np.datetime64(pd.Timestamp(inicio).floor("s").to_datetime64(), "s")
+    posiciones = np.arange(primera, primera + filas) if np.ndim(filas) == 0 else np.asarray(filas)
+    return inicio + np.round(posiciones * intervalo_s).astype("timedelta64[s]")
+
+
+def _mes(fecha_hora):
+    # AAAAMM como entero: el orden numérico es el orden cronológico
+    return fecha_hora.year * 100 + fecha_hora.month
+
+
+def _ordenada(fechas):
+    # Los archivos se escriben ordenados y se leen por partición: tras compactar, una
+    # consulta de un sitio ya viene en orden y se evita ordenar (~20 % del tiempo)
+    fechas = fechas.combine_chunks()
+    return len(fechas) < 2 or pc.all(pc.less_equal(fechas[:-1], fechas[1:])).as_py()
+
+
+def tabla_resultados(resultados, fecha_hora, parametros):
+    """Tabla Arrow con el ESQUEMA del almacén (sin las columnas de partición).
+
+    `resultados` es un DataFrame de src.lotes.evaluar_variables (con códigos, sin
+    etiquetar), `fecha_hora` una fecha por fila y `parametros` las condiciones
+    de la tarea con que se evaluó.
+    """
+    filas = len(resultados)
+    columnas = {"fecha_hora": pa.array(np.asarray(fecha_hora, dtype="datetime64[s]"), pa.timestamp("s"))}
+    for columna in VARIABLES + RESULTADOS:
+        columnas[columna] = pa.array(resultados[columna].to_numpy(dtype=np.float64))
+    for columna, etiquetas in ETIQUETAS.items():
+        codigos = pa.array(resultados[columna].to_numpy(dtype=np.int8))
+        columnas[columna] = pa.DictionaryArray.from_arrays(codigos, pa.array(etiquetas))
+    for parametro in PARAMETROS_NUMERICOS:
+        columnas[parametro] = pa.array(np.full(filas, float(parametros[parametro])))
+    for parametro in PARAMETROS_TEXTO:
+        columnas[parametro] = pa.DictionaryArray.from_arrays(pa.array(np.zeros(filas, dtype=np.int8)),
+                                                             pa.array([str(parametros[parametro])]))
+    return pa.Table.from_pydict(columnas, schema=ESQUEMA)
+
+
+class AlmacenResultados:
+    """Dataset Parquet de resultados en la carpeta `raiz` (se crea al primer agregado)."""
+
+    def __init__(self, raiz=RAIZ_POR_DEFECTO):
+        self.raiz = str(raiz)
+
+    def _dataset(self):
+        return ds.dataset(self.raiz, format="parquet", partitioning=PARTICIONES,
+                          schema=ESQUEMA.append(pa.field("sitio", pa.string())).append(pa.field("mes", pa.int32())))
+
+    def agregar(self, sitio, resultados, fecha_hora, parametros):
+        """Agrega los resultados de `sitio` y devuelve el número de filas escritas."""
+        tabla = tabla_resultados(resultados, fecha_hora, parametros)
+        if not len(tabla):
+            return 0
+        tabla = tabla.sort_by("fecha_hora")
+        fechas = pd.DatetimeIndex(tabla["fecha_hora"].to_numpy())
+        meses = fechas.year * 100 + fechas.month
+        tabla = tabla.append_column("sitio", pa.array([str(sitio)] * len(tabla), pa.string()))
+        tabla = tabla.append_column("mes", pa.array(meses, pa.int32()))
+        ds.write_dataset(tabla, self.raiz, format="parquet", partitioning=PARTICIONES,
+                         basename_template=f"parte-{uuid.uuid4().hex}-{{i}}.parquet",
+                         existing_data_behavior="overwrite_or_ignore",
+                         min_rows_per_group=FILAS_POR_GRUPO, max_rows_per_group=FILAS_POR_GRUPO)
+        return len(tabla)
+
+    def filtro(self, sitio=None, desde=None, hasta=None):
+        """Expresión de pyarrow.dataset para `sitio` y fecha_hora en [desde, hasta)."""
+        condiciones = []
+        if sitio is not None:
+            condiciones.append(ds.field("sitio") == str(sitio))
+        if desde is not None:
+            desde = pd.Timestamp(desde)
+            # La condición sobre `mes` descarta particiones; la de fecha_hora, grupos de filas
+            condiciones += [ds.field("mes") >= _mes(desde),
+                            ds.field("fecha_hora") >= pa.scalar(np.datetime64(desde, "s"), pa.timestamp("s"))]
+        if hasta is not None:
+            hasta = pd.Timestamp(hasta)
+            condiciones += [ds.field("mes") <= _mes(hasta - timedelta(seconds=1)),
+                            ds.field("fecha_hora") < pa.scalar(np.datetime64(hasta, "s"), pa.timestamp("s"))]
+        expresion = None
+        for condicion in condiciones:
+            expresion = condicion if expresion is None else expresion & condicion
+        return expresion
+
+    def consultar(self, sitio=None, desde=None, hasta=None, columnas=None, como_tabla=False):
+        """Resultados de `sitio` (todos por defecto) con fecha_hora en [desde, hasta), ordenados por fecha.
+
+        `columnas` limita las columnas leídas. Devuelve un DataFrame (las columnas
+        diccionario como Categorical) o, con `como_tabla`, la tabla Arrow.
+        """
+        if not os.path.isdir(self.raiz):
+            tabla = ESQUEMA.empty_table()
+        else:
+            if columnas is not None and "fecha_hora" not in columnas:
+                columnas = ["fecha_hora", *columnas]
+            tabla = self._dataset().to_table(columns=columnas, filter=self.filtro(sitio, desde, hasta))
+            if sitio is None or not _ordenada(tabla["fecha_hora"]):
+                tabla = tabla.sort_by([("sitio", "ascending"), ("fecha_hora", "ascending")]) \
+                    if "sitio" in tabla.column_names else tabla.sort_by("fecha_hora")
+        return tabla if como_tabla else tabla.to_pandas()
+
+    def sitios(self):
+        """Nombres de los sitios con resultados."""
+        if not os.path.isdir(self.raiz):
+            return []
+        tabla = self._dataset().to_table(columns=["sitio"])
+        return sorted(pc.unique(tabla["sitio"]).to_pylist())
+
+    def compactar(self):
+        """Une los archivos de cada partición (sitio, mes) en uno. Devuelve el número de archivos eliminados."""
+        if not os.path.isdir(self.raiz):
+            return 0
+        particiones = {}
+        for fragmento in self._dataset().get_fragments():
+            particiones.setdefault(os.path.dirname(fragmento.path), []).append(fragmento.path)
+        eliminados = 0
+        for carpeta, archivos in particiones.items():
+            if len(archivos) < 2:
+                continue
+            tabla = pa.concat_tables(pq.read_table(archivo, schema=ESQUEMA) for archivo in archivos)
+            temporal = os.path.join(carpeta, f".compacto-{uuid.uuid4().hex}.tmp")
+            pq.write_table(tabla.sort_by("fecha_hora"), temporal, row_group_size=FILAS_POR_GRUPO)
+            # Primero el archivo nuevo y después se borran los anteriores: nunca falta una fila
+            os.replace(temporal, os.path.join(carpeta, f"parte-{uuid.uuid4().hex}-0.parquet"))
+            for archivo in archivos:
+                os.remove(archivo)
+            eliminados += len(archivos) - 1
+        return eliminados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consulta o compacta el almacén de resultados")
+    parser.add_argument("raiz", nargs="?", default=RAIZ_POR_DEFECTO)
+    parser.add_argument("--sitio")
+    parser.add_argument("--desde", help="fecha o fecha y hora ISO (incluida)")
+    parser.add_argument("--hasta", help="fecha o fecha y hora ISO (excluida)")
+    parser.add_argument("--compactar", action="store_true", help="une los archivos de cada partición")
+    args = parser.parse_args()
+
+    almacen = AlmacenResultados(args.raiz)
+    if args.compactar:
+        print(f"{almacen.compactar()} archivos unidos")
+        return
+    inicio = time.perf_counter()
+    resultados = almacen.consultar(args.sitio, args.desde, args.hasta)
+    segundos = time.perf_counter() - inicio
+    print(f"{len(resultados):,} filas en {segundos * 1000:.0f} ms")
+    if len(resultados):
+        print(resultados.head())
+
+
+if __name__ == "__main__":
+    main()
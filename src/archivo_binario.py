@@ -0,0 +1,329 @@
+"""Archivo binario de ancho fijo para registros ambientales, leído con mmap
+
+Para reevaluar el mismo registro con otra ropa o tasa metabólica no hace falta
+volver a leer el CSV: `convertir` lo pasa una vez (con la misma validación de
+src.ingesta) a un archivo por columnas:
+
+    TGBHBIN\\x01 | largo del encabezado (uint32) | encabezado JSON | columnas
+
+Las columnas van una tras otra, alineadas a 64 bytes: fecha_hora como
+datetime64[s] (int64) y las cinco variables ambientales como float32 (~28 bytes
+por fila, contra ~35 del CSV). `ArchivoBinario` mapea el archivo en memoria y
+entrega vistas de NumPy sin copia; el sistema operativo carga solo las páginas
+que se leen y las comparte entre procesos. Los índices vectorizados convierten
+cada bloque a float64 al evaluar, así que la memoria sigue acotada por el
+tamaño del bloque.
+
+float32 guarda sin pérdida los valores de hasta 6 cifras significativas, de sobra
+para la resolución de los sensores (0.1 °C, 0.01 m/s). Al convertir se anota en
+el encabezado cuántos decimales tiene cada columna y al evaluar se recupera el
+decimal original (ver a_float64), así que los índices coinciden exactamente con
+los calculados desde el CSV. Las columnas con más cifras quedan con la precisión
+de float32 (~7 cifras).
+
+`anexar` agrega al final de un archivo existente las filas de un registro nuevo
+(por ejemplo, el mes siguiente).
+
+Uso:
+    python -m src.archivo_binario registros.csv --salida registros.tgbh --inicio 2024-01-01T00:00 --intervalo 60
+    python -m src.archivo_binario registros.csv --salida registros.tgbh --columna-fecha Fecha
+    python -m src.archivo_binario febrero.csv --salida registros.tgbh --anexar
+"""
+
+import argparse
+import json
+import math
+import shutil
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.ingesta import TAMANO_BLOQUE, VARIABLES, EstadisticasIngesta, leer_bloques, preparar_bloque
+from src.lotes import ResumenLote, etiquetar, evaluar_variables, promediar_ventanas
+
+MAGICO = b"TGBHBIN\x01"
+ALINEACION = 64
+# Columnas del archivo y su tipo en disco
+COLUMNAS = {"fecha_hora": np.dtype("<M8[s]"), **{variable: np.dtype("<f4") for variable in VARIABLES}}
+
+
+def _alinear(posicion):
+    return -(-posicion // ALINEACION) * ALINEACION
+
+
+def decimales_exactos(valores):
+    """Menor número de decimales (0-6) con que `valores` se recuperan exactos tras pasar por float32, o None."""
+    reducidos = valores.astype(np.float32).astype(np.float64)
+    for decimales in range(7):
+        escala = 10.0 ** decimales
+        if np.array_equal(np.rint(reducidos * escala) / escala, valores):
+            return decimales
+    return None
+
+
+def a_float64(valores, decimales=None):
+    """float32 -> float64, redondeando a `decimales` para recuperar el decimal original.
+
+    Convertido directo, 36.1 guardado como float32 se lee 36.09999847; con
+    rint(x * 10^d) / 10^d se obtiene el mismo float64 que al leer el texto del
+    CSV, y los índices coinciden con los calculados desde el CSV incluso en los
+    casos mal condicionados (DLE con almacenamiento de calor casi nulo).
+    """
+    valores = valores.astype(np.float64)
+    if decimales is None:
+        return valores
+    escala = 10.0 ** decimales
+    return np.rint(valores * escala) / escala
+
+
+def _resumen_fechas(fechas, intervalo_s):
+    # (fechas ordenadas, mediana del intervalo en s) para el encabezado
+    diferencias = np.diff(fechas).astype(np.int64)
+    intervalo = float(np.median(diferencias)) if len(diferencias) else float(intervalo_s)
+    return bool((diferencias >= 0).all()), intervalo
+
+
+def _escribir(destino, partes, filas, decimales, origen, ordenado, intervalo_s):
+    """Escribe el archivo junto a `destino` (<destino>.tmp) y devuelve su ruta.
+
+    `partes` da, por columna, los trozos en orden: rutas de archivos con los
+    valores crudos o arreglos (vistas del mapa de otro archivo binario).
+    """
+    columnas, posicion = [], 0
+    for nombre, dtype in COLUMNAS.items():
+        columnas.append({"nombre": nombre, "dtype": dtype.str, "desplazamiento": posicion,
+                         "decimales": decimales.get(nombre)})
+        posicion = _alinear(posicion + filas * dtype.itemsize)
+    encabezado = {
+        "version": 1,
+        "filas": filas,
+        "origen": origen,
+        "ordenado": ordenado,
+        "intervalo_s": intervalo_s,
+        "columnas": columnas,
+    }
+    texto = json.dumps(encabezado, ensure_ascii=False).encode()
+    inicio_datos = _alinear(len(MAGICO) + 4 + len(texto))
+    texto = texto.ljust(inicio_datos - len(MAGICO) - 4)
+
+    temporal = destino.with_name(destino.name + ".tmp")
+    with open(temporal, "wb") as salida:
+        salida.write(MAGICO + struct.pack("<I", len(texto)) + texto)
+        for columna in columnas:
+            salida.seek(inicio_datos + columna["desplazamiento"])
+            for parte in partes[columna["nombre"]]:
+                if isinstance(parte, Path):
+                    with open(parte, "rb") as archivo:
+                        shutil.copyfileobj(archivo, salida)
+                else:
+                    salida.write(np.ascontiguousarray(parte).view(np.uint8).data)
+        salida.truncate(inicio_datos + posicion)
+    return temporal
+
+
+def convertir(fuente, destino, fecha_inicio=None, intervalo_s=60.0, columna_fecha=None,
+              tamano_bloque=TAMANO_BLOQUE, estadisticas=None):
+    """Convierte un CSV o XLSX de registrador a archivo binario y devuelve las EstadisticasIngesta.
+
+    Las fechas salen de `columna_fecha` o, sin ella, de `fecha_inicio` más
+    `intervalo_s` segundos por fila del archivo original (las filas descartadas
+    por la validación dejan su hueco). Las columnas se escriben por bloques en
+    archivos temporales y se unen al final, de modo que la memoria no depende del
+    tamaño del registro.
+    """
+    if columna_fecha is None and fecha_inicio is None:
+        raise ValueError("Se necesita columna_fecha o fecha_inicio para fechar las filas")
+    estadisticas = estadisticas if estadisticas is not None else EstadisticasIngesta()
+    destino = Path(destino)
+    extras = (columna_fecha,) if columna_fecha else ()
+    inicio = None if columna_fecha else np.datetime64(pd.Timestamp(fecha_inicio).floor("s").to_datetime64(), "s")
+    filas = 0
+    decimales = {variable: 0 for variable in VARIABLES}
+    with tempfile.TemporaryDirectory(dir=destino.parent) as carpeta:
+        partes = {nombre: open(Path(carpeta) / nombre, "wb") for nombre in COLUMNAS}
+        try:
+            bloques = leer_bloques(fuente, tamano_bloque, extras)
+            while True:
+                reloj = time.perf_counter()
+                bloque = next(bloques, None)
+                if bloque is None:
+                    break
+                if columna_fecha:
+                    fechas = pd.to_datetime(bloque[columna_fecha], errors="coerce").to_numpy(dtype="datetime64[s]")
+                else:
+                    posiciones = np.arange(estadisticas.filas_leidas, estadisticas.filas_leidas + len(bloque))
+                    fechas = inicio + np.round(posiciones * intervalo_s).astype("timedelta64[s]")
+                # La fecha viaja como columna extra para conservar solo la de las filas válidas
+                bloque = bloque.assign(fecha_hora=fechas)
+                preparado, descartadas, faltantes, derivadas = preparar_bloque(bloque, ("fecha_hora",))
+                preparado = preparado[~np.isnat(preparado["fecha_hora"].to_numpy())]
+                for nombre, dtype in COLUMNAS.items():
+                    valores = preparado[nombre].to_numpy()
+                    if nombre in decimales and len(valores) and decimales[nombre] is not None:
+                        exactos = decimales_exactos(valores)
+                        decimales[nombre] = None if exactos is None else max(decimales[nombre], exactos)
+                    partes[nombre].write(valores.astype(dtype).tobytes())
+                filas += len(preparado)
+                estadisticas.segundos += time.perf_counter() - reloj
+                estadisticas.bloques += 1
+                estadisticas.filas_leidas += len(bloque)
+                estadisticas.filas_descartadas += len(bloque) - len(preparado)
+                estadisticas.columnas_faltantes = faltantes
+                estadisticas.columnas_derivadas = derivadas
+        finally:
+            for parte in partes.values():
+                parte.close()
+
+        fechas = np.fromfile(Path(carpeta) / "fecha_hora", dtype=COLUMNAS["fecha_hora"])
+        ordenado, intervalo = _resumen_fechas(fechas, intervalo_s)
+        del fechas
+        temporal = _escribir(destino, {nombre: [Path(carpeta) / nombre] for nombre in COLUMNAS}, filas, decimales,
+                             Path(str(getattr(fuente, "name", fuente))).name, ordenado, intervalo)
+        temporal.replace(destino)
+    return estadisticas
+
+
+def anexar(fuente, destino, fecha_inicio=None, intervalo_s=None, columna_fecha=None, tamano_bloque=TAMANO_BLOQUE,
+           estadisticas=None):
+    """Agrega al final del archivo binario `destino` las filas de un CSV o XLSX y devuelve las EstadisticasIngesta.
+
+    Las fechas se asignan como en convertir; sin `columna_fecha` ni
+    `fecha_inicio` siguen a la última fila del archivo cada `intervalo_s`
+    segundos (por defecto, el intervalo del archivo). Como las columnas van una
+    tras otra, el archivo se reescribe en un temporal que reemplaza al original
+    al final: los ArchivoBinario ya abiertos siguen viendo las filas anteriores.
+    """
+    destino = Path(destino)
+    existente = ArchivoBinario(destino)
+    intervalo_s = existente.intervalo_s if intervalo_s is None else intervalo_s
+    if columna_fecha is None and fecha_inicio is None:
+        if not len(existente):
+            raise ValueError("El archivo está vacío: se necesita columna_fecha o fecha_inicio para fechar las filas")
+        fecha_inicio = pd.Timestamp(existente.fecha_hora[-1] + np.timedelta64(round(intervalo_s), "s"))
+    with tempfile.TemporaryDirectory(dir=destino.parent) as carpeta:
+        ruta_nuevo = Path(carpeta) / destino.name
+        estadisticas = convertir(fuente, ruta_nuevo, fecha_inicio, intervalo_s, columna_fecha, tamano_bloque, estadisticas)
+        nuevo = ArchivoBinario(ruta_nuevo)
+        archivos = (existente, nuevo)
+        decimales = {variable: None if any(a.decimales[variable] is None for a in archivos)
+                     else max(a.decimales[variable] for a in archivos)
+                     for variable in VARIABLES}
+        ordenado, intervalo = _resumen_fechas(np.concatenate([a.fecha_hora for a in archivos]), intervalo_s)
+        temporal = _escribir(destino, {nombre: [a.columnas[nombre] for a in archivos] for nombre in COLUMNAS},
+                             len(existente) + len(nuevo), decimales, existente.encabezado["origen"], ordenado, intervalo)
+        del existente, nuevo, archivos
+        temporal.replace(destino)
+    return estadisticas
+
+
+class ArchivoBinario:
+    """Archivo binario mapeado en memoria; las columnas son vistas de solo lectura."""
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        with open(self.ruta, "rb") as archivo:
+            if archivo.read(len(MAGICO)) != MAGICO:
+                raise ValueError(f"{self.ruta} no es un archivo binario de registros")
+            (largo,) = struct.unpack("<I", archivo.read(4))
+            self.encabezado = json.loads(archivo.read(largo))
+        inicio_datos = len(MAGICO) + 4 + largo
+        self.filas = self.encabezado["filas"]
+        self._mapa = np.memmap(self.ruta, dtype=np.uint8, mode="r")
+        self.columnas = {}
+        self.decimales = {}
+        for columna in self.encabezado["columnas"]:
+            self.decimales[columna["nombre"]] = columna.get("decimales")
+            dtype = np.dtype(columna["dtype"])
+            posicion = inicio_datos + columna["desplazamiento"]
+            self.columnas[columna["nombre"]] = self._mapa[posicion:posicion + self.filas * dtype.itemsize].view(dtype)
+
+    def __len__(self):
+        return self.filas
+
+    @property
+    def fecha_hora(self):
+        return self.columnas["fecha_hora"]
+
+    @property
+    def intervalo_s(self):
+        return self.encabezado["intervalo_s"]
+
+    def rango(self, desde=None, hasta=None):
+        """slice de las filas con fecha_hora en [desde, hasta) (requiere fechas ordenadas)."""
+        if desde is None and hasta is None:
+            return slice(0, self.filas)
+        if not self.encabezado["ordenado"]:
+            raise ValueError("Las fechas del archivo no están ordenadas; no se puede filtrar por rango")
+        inicio = 0 if desde is None else int(np.searchsorted(self.fecha_hora, np.datetime64(pd.Timestamp(desde), "s")))
+        fin = self.filas if hasta is None else int(np.searchsorted(self.fecha_hora, np.datetime64(pd.Timestamp(hasta), "s")))
+        return slice(inicio, fin)
+
+    def variables(self, desde=None, hasta=None):
+        """Vistas sin copia (float32) de las cinco variables y fecha_hora en el rango."""
+        filas = self.rango(desde, hasta)
+        return {nombre: valores[filas] for nombre, valores in self.columnas.items()}
+
+    def evaluar_bloques(self, parametros, ventana=1, tamano_bloque=TAMANO_BLOQUE, desde=None, hasta=None):
+        """Como src.lotes.evaluar_bloques, pero sobre el archivo mapeado y con columna fecha_hora.
+
+        Con `ventana` > 1 la fecha de cada ventana es la de su primera fila.
+        """
+        filas = self.rango(desde, hasta)
+        tamano_bloque = max(1, math.ceil(tamano_bloque / ventana)) * ventana
+        for inicio in range(filas.start, filas.stop, tamano_bloque):
+            bloque = slice(inicio, min(inicio + tamano_bloque, filas.stop))
+            variables = promediar_ventanas({v: a_float64(self.columnas[v][bloque], self.decimales[v]) for v in VARIABLES}, ventana)
+            resultados = evaluar_variables(variables, parametros)
+            resultados.insert(0, "fecha_hora", self.fecha_hora[bloque][::ventana])
+            yield resultados
+
+    def evaluar(self, parametros, ventana=1, tamano_bloque=TAMANO_BLOQUE, desde=None, hasta=None, filas_muestra=1000,
+                almacen=None, sitio=None):
+        """Como src.lotes.evaluar_archivo: devuelve el ResumenLote y las primeras `filas_muestra` filas.
+
+        Con `almacen` (src.almacen.AlmacenResultados) los resultados de `sitio`
+        también se guardan con sus fechas.
+        """
+        resumen = ResumenLote(intervalo_s=self.intervalo_s * ventana)
+        muestra = []
+        filas_en_muestra = 0
+        for resultados in self.evaluar_bloques(parametros, ventana, tamano_bloque, desde, hasta):
+            if almacen is not None:
+                almacen.agregar(sitio, resultados, resultados["fecha_hora"].to_numpy(), parametros)
+            resumen.agregar(resultados)
+            if filas_en_muestra < filas_muestra:
+                muestra.append(resultados.head(filas_muestra - filas_en_muestra))
+                filas_en_muestra += len(muestra[-1])
+        muestra = etiquetar(pd.concat(muestra, ignore_index=True)) if muestra else pd.DataFrame()
+        return resumen, muestra
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte un registro CSV o XLSX a archivo binario mapeable")
+    parser.add_argument("archivo")
+    parser.add_argument("--salida", required=True)
+    parser.add_argument("--columna-fecha", help="columna con la fecha y hora de cada fila")
+    parser.add_argument("--inicio", help="fecha y hora ISO de la primera fila (sin --columna-fecha)")
+    parser.add_argument("--intervalo", type=float, default=None,
+                        help="segundos entre filas (sin --columna-fecha); por defecto 60 o, con --anexar, el del archivo")
+    parser.add_argument("--anexar", action="store_true",
+                        help="agrega las filas al final de --salida; sin --columna-fecha ni --inicio siguen a su última fila")
+    args = parser.parse_args()
+    if args.anexar:
+        estadisticas = anexar(args.archivo, args.salida, args.inicio, args.intervalo, args.columna_fecha)
+    else:
+        if not args.columna_fecha and not args.inicio:
+            parser.error("se necesita --columna-fecha o --inicio")
+        intervalo = 60.0 if args.intervalo is None else args.intervalo
+        estadisticas = convertir(args.archivo, args.salida, args.inicio, intervalo, args.columna_fecha)
+    tamano = Path(args.salida).stat().st_size
+    print(f"{estadisticas.filas_validas:,} filas ({estadisticas.filas_descartadas:,} descartadas) "
+          f"en {estadisticas.segundos:.1f} s -> {args.salida} ({tamano / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
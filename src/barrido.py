@@ -0,0 +1,229 @@
+"""Barrido "qué pasa si" de ropa, CAV, tasa metabólica y aclimatación
+
+Para una serie de mediciones (por ejemplo un día de datos por minuto) evalúa
+todas las combinaciones de las tablas de referencia de data/ (ropa de
+Aislamiento.csv, conjuntos de CAVS.csv, clases de Metabolismo.csv) y de
+aclimatación, y devuelve una tabla ordenada con las configuraciones que se
+mantienen dentro de los límites de SWreq e ISC.
+
+Cada índice se evalúa una sola vez sobre los factores de los que depende, con
+broadcasting de NumPy: SWreq sobre ropa x metabolismo x aclimatación x tiempo,
+ISC sobre ropa x metabolismo x tiempo y TGBH sobre CAV x metabolismo x
+aclimatación x tiempo. El CAV no interviene en SWreq ni en ISC, así que
+multiplicar los conjuntos de CAV no multiplica el cálculo de sudoración. Los
+resultados de cada combinación se reducen a minutos sobre el límite y valores
+extremos antes de armar la tabla del producto cartesiano; barrer_bloques hace
+esas reducciones bloque a bloque, sin cargar la serie completa.
+
+Uso:
+    python -m src.barrido registro.csv [--intervalo 60] [--jornada 480] [--mostrar 20]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.cache import cargar_tablas_referencia
+from src.ingesta import EstadisticasIngesta, ingerir
+from src.resultados import ClasificacionISC, EstadoSudoracion
+from src.vectorizado import indice_de_sudoracion_vec, indice_sobrecarga_calorica_vec, tgbh_vec
+
+ACLIMATACIONES = ("Si", "No")
+# Puntos (combinaciones x filas) de SWreq evaluados a la vez; acota la memoria
+PUNTOS_POR_PASO = 4_000_000
+
+
+def opciones_referencia(tablas=None):
+    """Opciones de las tablas (por defecto, las de data/): (ropas, conjuntos_cavs, metabolismos) como {nombre: valor}.
+
+    `tablas` es (lista_cavs, lista_metabolismo, lista_clo), por ejemplo las de un
+    inquilino según src.inquilinos.tablas_inquilino.
+    """
+    lista_cavs, lista_metabolismo, lista_clo = tablas or cargar_tablas_referencia()
+    ropas = dict(zip(lista_clo["Ropa de trabajo"], lista_clo["m²·K/W"].astype(float)))
+    conjuntos_cavs = dict(zip(lista_cavs["Conjunto"], lista_cavs["CAV"].astype(float)))
+    metabolismos = dict(zip(lista_metabolismo["Clase"], lista_metabolismo["Tasa metabólica"].astype(float)))
+    return ropas, conjuntos_cavs, metabolismos
+
+
+def _minutos(mascara, intervalo_s):
+    return mascara.sum(axis=-1) * intervalo_s / 60
+
+
+def _reducir_bloque(variables, iclo, cavs, carga, aclimatacion, radiacion_solar, postura, conveccion, intervalo_s,
+                    duracion_jornada, limite_isc):
+    """Reducciones de un bloque de filas por combinación; se combinan entre bloques en barrer_bloques."""
+    ta, tg, tw, va = (np.asarray(variables[v], dtype=np.float64)
+                      for v in ("temp_aire", "temp_globo", "temp_bulbo", "velocidad_aire"))
+    n_ropa, n_carga, n_aclimatacion = len(iclo), len(carga), len(aclimatacion)
+
+    # SWreq: ropa x metabolismo x aclimatación x tiempo, por pasos de ropa
+    minutos_swreq = np.empty((n_ropa, n_carga, n_aclimatacion))
+    dle_min = np.empty((n_ropa, n_carga, n_aclimatacion))
+    minutos_no_aplicable = np.empty((n_ropa, n_carga, n_aclimatacion))
+    paso = max(1, PUNTOS_POR_PASO // max(1, n_carga * n_aclimatacion * len(ta)))
+    for inicio in range(0, n_ropa, paso):
+        ropa = slice(inicio, inicio + paso)
+        sudoracion = indice_de_sudoracion_vec(ta, tg, tw, iclo[ropa, None, None, None], carga[None, :, None, None], va,
+                                              postura, aclimatacion[None, None, :, None], conveccion)
+        dle = np.minimum(sudoracion["dle_alarma_q"], sudoracion["dle_alarma_d"])
+        # Emax < 0 da DLE 0 en indice_de_sudoracion_vec: no es un límite, SWreq no se aplica;
+        # tampoco hay límite donde el SWreq no se puede calcular (SIN_DATO)
+        no_aplicable = sudoracion["estado"] != EstadoSudoracion.CALCULADO
+        dle = np.where(no_aplicable, np.nan, dle)
+        minutos_swreq[ropa] = _minutos(dle < duracion_jornada, intervalo_s)
+        minutos_no_aplicable[ropa] = _minutos(no_aplicable, intervalo_s)
+        dle_min[ropa] = np.where(no_aplicable.all(axis=-1), np.nan, np.fmin.reduce(dle, axis=-1, initial=np.inf))
+
+    # ISC: ropa x metabolismo x tiempo; sin dato (NaN o infinito) no cuenta como sobre el límite ni en el máximo
+    isc = indice_sobrecarga_calorica_vec(carga[None, :, None], va, tg, ta, tw, iclo[:, None, None], 170, 70)
+    isc_sin_dato = isc["clasificacion"] == ClasificacionISC.SIN_DATO
+    isc = np.where(isc_sin_dato, np.nan, isc["isc"])
+
+    # TGBH: CAV x metabolismo x aclimatación x tiempo
+    estado = tgbh_vec(radiacion_solar, ta, tg, tw, cavs[:, None, None, None], carga[None, :, None, None],
+                      aclimatacion[None, None, :, None])["estado"]
+    return {
+        "minutos_swreq": minutos_swreq,
+        "dle_min": dle_min,
+        "minutos_swreq_no_aplicable": minutos_no_aplicable,
+        "minutos_isc": _minutos(isc > limite_isc, intervalo_s),
+        "isc_max": np.fmax.reduce(isc, axis=-1, initial=-np.inf),
+        "minutos_isc_sin_dato": _minutos(isc_sin_dato, intervalo_s),
+        "minutos_tgbh": _minutos(estado.astype(bool), intervalo_s),
+    }
+
+
+# Cómo se combinan las reducciones de dos bloques (fmin ignora el NaN de los bloques sin filas aplicables)
+_COMBINAR = {
+    "minutos_swreq": np.add,
+    "dle_min": np.fmin,
+    "minutos_swreq_no_aplicable": np.add,
+    "minutos_isc": np.add,
+    "isc_max": np.maximum,
+    "minutos_isc_sin_dato": np.add,
+    "minutos_tgbh": np.add,
+}
+
+
+def barrer_bloques(bloques, ropas=None, conjuntos_cavs=None, metabolismos=None, aclimataciones=ACLIMATACIONES,
+                   radiacion_solar="Si", postura="De pie", conveccion="Natural", intervalo_s=60.0,
+                   duracion_jornada=480.0, limite_isc=100.0, minutos_tolerados=0.0):
+    """Como barrer, pero sobre una serie que llega por bloques (por ejemplo, los de src.ingesta.ingerir).
+
+    Cada bloque se reduce a minutos y extremos por combinación y se descarta,
+    así que la memoria depende del tamaño del bloque y no del de la serie.
+    """
+    if ropas is None or conjuntos_cavs is None or metabolismos is None:
+        referencia = opciones_referencia()
+        ropas = referencia[0] if ropas is None else ropas
+        conjuntos_cavs = referencia[1] if conjuntos_cavs is None else conjuntos_cavs
+        metabolismos = referencia[2] if metabolismos is None else metabolismos
+    iclo = np.fromiter(ropas.values(), dtype=np.float64)
+    cavs = np.fromiter(conjuntos_cavs.values(), dtype=np.float64)
+    carga = np.fromiter(metabolismos.values(), dtype=np.float64)
+    aclimatacion = np.asarray(aclimataciones)
+    n_ropa, n_cavs, n_carga, n_aclimatacion = len(iclo), len(cavs), len(carga), len(aclimatacion)
+
+    forma_swreq = (n_ropa, n_carga, n_aclimatacion)
+    reducido = {
+        "minutos_swreq": np.zeros(forma_swreq),
+        "dle_min": np.full(forma_swreq, np.nan),
+        "minutos_swreq_no_aplicable": np.zeros(forma_swreq),
+        "minutos_isc": np.zeros((n_ropa, n_carga)),
+        "isc_max": np.full((n_ropa, n_carga), -np.inf),
+        "minutos_isc_sin_dato": np.zeros((n_ropa, n_carga)),
+        "minutos_tgbh": np.zeros((n_cavs, n_carga, n_aclimatacion)),
+    }
+    for bloque in bloques:
+        parcial = _reducir_bloque(bloque, iclo, cavs, carga, aclimatacion, radiacion_solar, postura, conveccion,
+                                  intervalo_s, duracion_jornada, limite_isc)
+        for nombre, combinar in _COMBINAR.items():
+            reducido[nombre] = combinar(reducido[nombre], parcial[nombre])
+
+    # Sin ninguna fila con ISC calculable no hay máximo
+    reducido["isc_max"] = np.where(reducido["isc_max"] == -np.inf, np.nan, reducido["isc_max"])
+
+    # Producto cartesiano ropa x CAV x metabolismo x aclimatación
+    r, k, m, a = (indice.ravel() for indice in np.indices((n_ropa, n_cavs, n_carga, n_aclimatacion)))
+    tabla = pd.DataFrame({
+        "ropa": np.asarray(list(ropas), dtype=object)[r],
+        "iclo": iclo[r],
+        "conjunto_cavs": np.asarray(list(conjuntos_cavs), dtype=object)[k],
+        "cavs": cavs[k],
+        "clase_metabolica": np.asarray(list(metabolismos), dtype=object)[m],
+        "carga_metabolica": carga[m],
+        "aclimatacion": aclimatacion[a],
+        "minutos_swreq": reducido["minutos_swreq"][r, m, a],
+        "dle_min": reducido["dle_min"][r, m, a],
+        "minutos_swreq_no_aplicable": reducido["minutos_swreq_no_aplicable"][r, m, a],
+        "minutos_isc": reducido["minutos_isc"][r, m],
+        "isc_max": reducido["isc_max"][r, m],
+        "minutos_isc_sin_dato": reducido["minutos_isc_sin_dato"][r, m],
+        "minutos_tgbh": reducido["minutos_tgbh"][k, m, a],
+    })
+    tabla["minutos_sobre_limite"] = tabla["minutos_swreq"] + tabla["minutos_isc"]
+    tabla["segura"] = (tabla["minutos_swreq"] <= minutos_tolerados) & (tabla["minutos_isc"] <= minutos_tolerados)
+    return tabla.sort_values(["segura", "minutos_sobre_limite", "dle_min", "minutos_tgbh"],
+                             ascending=[False, True, False, True], ignore_index=True, kind="stable")
+
+
+def barrer(variables, ropas=None, conjuntos_cavs=None, metabolismos=None, aclimataciones=ACLIMATACIONES,
+           radiacion_solar="Si", postura="De pie", conveccion="Natural", intervalo_s=60.0, duracion_jornada=480.0,
+           limite_isc=100.0, minutos_tolerados=0.0):
+    """Evalúa todas las combinaciones contra la serie `variables` y devuelve un DataFrame ordenado.
+
+    `variables` tiene las cinco variables ambientales (temp_aire, temp_globo,
+    temp_bulbo, velocidad_aire, humedad_relativa) con una fila cada `intervalo_s`
+    segundos. `ropas`, `conjuntos_cavs` y `metabolismos` son {nombre: iclo},
+    {nombre: CAV} y {nombre: tasa metabólica}; por defecto, las tablas de data/
+    (que solo se leen si falta alguna). Para series largas, ver barrer_bloques.
+
+    Por combinación se informan los minutos en que el DLE de alarma (el menor de
+    los de almacenamiento y deshidratación) es menor que `duracion_jornada`, el
+    DLE mínimo, los minutos con ISC sobre `limite_isc`, el ISC máximo y los
+    minutos de estrés térmico por TGBH. Las filas en que SWreq no es aplicable
+    (Emax < 0) o no se puede calcular no cuentan como DLE menor que la jornada
+    ni entran en el DLE mínimo; se informan aparte en minutos_swreq_no_aplicable
+    (NaN en dle_min si no hay ninguna fila aplicable). Las filas con ISC sin
+    dato (NaN o infinito) tampoco cuentan sobre el límite ni en isc_max y se
+    informan en minutos_isc_sin_dato. Una configuración es segura si los minutos
+    sobre los límites de SWreq e ISC no superan `minutos_tolerados`. Las seguras
+    van primero; dentro de cada grupo, menos minutos sobre el límite y mayor DLE
+    mínimo.
+    """
+    return barrer_bloques([variables], ropas, conjuntos_cavs, metabolismos, aclimataciones, radiacion_solar, postura,
+                          conveccion, intervalo_s, duracion_jornada, limite_isc, minutos_tolerados)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Configuraciones de ropa, CAV, metabolismo y aclimatación seguras para un registro")
+    parser.add_argument("archivo", help="CSV o XLSX con las mediciones del día")
+    parser.add_argument("--intervalo", type=float, default=60.0, help="segundos entre mediciones")
+    parser.add_argument("--jornada", type=float, default=480.0, help="duración de la jornada (min) para el DLE")
+    parser.add_argument("--limite-isc", type=float, default=100.0)
+    parser.add_argument("--radiacion-solar", choices=["Si", "No"], default="Si")
+    parser.add_argument("--postura", default="De pie")
+    parser.add_argument("--conveccion", choices=["Natural", "Forzada"], default="Natural")
+    parser.add_argument("--mostrar", type=int, default=20, help="filas de la tabla a mostrar")
+    parser.add_argument("--salida", help="CSV donde guardar la tabla completa")
+    args = parser.parse_args()
+
+    estadisticas = EstadisticasIngesta()
+    inicio = time.perf_counter()
+    tabla = barrer_bloques(ingerir(args.archivo, estadisticas=estadisticas), radiacion_solar=args.radiacion_solar,
+                           postura=args.postura, conveccion=args.conveccion, intervalo_s=args.intervalo,
+                           duracion_jornada=args.jornada, limite_isc=args.limite_isc)
+    segundos = time.perf_counter() - inicio
+    print(f"{len(tabla):,} combinaciones x {estadisticas.filas_validas:,} filas en {segundos:.2f} s; "
+          f"{tabla['segura'].sum():,} seguras")
+    with pd.option_context("display.max_colwidth", 40, "display.width", 200):
+        print(tabla.head(args.mostrar))
+    if args.salida:
+        tabla.to_csv(args.salida, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Caché compartida por el proceso para las tablas de referencia y los índices
+
+Streamlit vuelve a ejecutar app.py completo con cada cambio de un widget. Las
+tablas de data/ se leen una sola vez por proceso y los resultados de los índices
+se memorizan con un LRU acotado, con la tupla de entradas como clave, de modo
+que una nueva ejecución solo recalcula los índices cuyas entradas cambiaron.
+Como todas las sesiones de Streamlit corren en el mismo proceso, la caché es
+compartida entre usuarios concurrentes. Los valores devueltos se comparten entre
+llamadas y no deben modificarse: las columnas numéricas de las tablas quedan de
+solo lectura y una asignación sobre ellas falla con ValueError.
+"""
+
+import functools
+from pathlib import Path
+
+from src.funciones import indice_de_calor, indice_de_sudoracion, indice_sobrecarga_calorica, tgbh
+
+RUTA_DATOS = Path(__file__).resolve().parent.parent / "data"
+
+# Máximo de combinaciones de entradas memorizadas por índice
+TAMANO_CACHE = 4096
+
+
+def congelar(tabla):
+    """Copia de `tabla` con las columnas NumPy de solo lectura (las de texto de Arrow ya son inmutables)."""
+    import numpy as np
+    import pandas as pd
+
+    columnas = {}
+    for nombre, columna in tabla.items():
+        if isinstance(columna.dtype, np.dtype):
+            valores = columna.to_numpy(copy=True)
+            valores.flags.writeable = False
+        else:
+            valores = columna.array
+        columnas[nombre] = valores
+    # Sin copiar: cada columna queda como su propio arreglo de solo lectura
+    return pd.DataFrame(columnas, index=tabla.index, copy=False)
+
+
+@functools.lru_cache(maxsize=None)
+def cargar_tablas_referencia():
+    """Tablas (lista_cavs, lista_metabolismo, lista_clo) leídas una vez por proceso."""
+    # pandas se importa aquí: el servicio y los workers usan la caché de índices sin las tablas
+    import pandas as pd
+
+    lista_cavs = congelar(pd.read_csv(RUTA_DATOS / "CAVS.csv"))
+    lista_metabolismo = congelar(pd.read_csv(RUTA_DATOS / "Metabolismo.csv"))
+    lista_clo = congelar(pd.read_csv(RUTA_DATOS / "Aislamiento.csv"))
+    return lista_cavs, lista_metabolismo, lista_clo
+
+
+indice_de_calor_cache = functools.lru_cache(maxsize=TAMANO_CACHE)(indice_de_calor)
+tgbh_cache = functools.lru_cache(maxsize=TAMANO_CACHE)(tgbh)
+indice_de_sudoracion_cache = functools.lru_cache(maxsize=TAMANO_CACHE)(indice_de_sudoracion)
+indice_sobrecarga_calorica_cache = functools.lru_cache(maxsize=TAMANO_CACHE)(indice_sobrecarga_calorica)
+
+FUNCIONES_CACHE = (indice_de_calor_cache, tgbh_cache, indice_de_sudoracion_cache, indice_sobrecarga_calorica_cache)
+
+
+def estado_cache():
+    """Aciertos, fallos y tamaño de la caché de cada índice."""
+    return {funcion.__wrapped__.__name__: funcion.cache_info()._asdict() for funcion in FUNCIONES_CACHE}
+
+
+def limpiar_cache():
+    cargar_tablas_referencia.cache_clear()
+    for funcion in FUNCIONES_CACHE:
+        funcion.cache_clear()
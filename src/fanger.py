@@ -0,0 +1,178 @@
+"""Método de Fanger (ISO 7730): PMV y PPD vectorizados para ambientes sin estrés térmico
+
+Cuando el TGBH indica discomfort en interiores, el confort se evalúa con el voto
+medio estimado (PMV) y el porcentaje estimado de insatisfechos (PPD) de la
+ISO 7730. La temperatura superficial de la ropa se obtiene con la iteración de
+punto fijo del anexo D de la norma, pero sobre arreglos: en cada paso solo se
+actualizan los elementos que aún no convergen (máscara de convergencia por
+elemento), así que un día de datos por minuto de muchas zonas se evalúa en
+milisegundos sin un bucle escalar.
+
+Las unidades son las del resto del repositorio: `carga_metabolica` en W (la
+columna "Tasa metabólica" de data/Metabolismo.csv, que se divide por 1.7 m²
+como en SWreq e ISC) e `iclo` en m²·K/W (la columna "m²·K/W" de
+data/Aislamiento.csv). `velocidad_aire` es la velocidad relativa del aire; con
+actividad se puede estimar con `velocidad_relativa`.
+
+El resultado es un arreglo estructurado DTYPE_FANGER (campos de
+src.resultados.ResultadoFanger): pmv, ppd, temp_ropa (°C), categoria
+(CategoriaFanger, anexo A) y estado (EstadoFanger: fuera del rango de aplicación
+de la norma o sin convergencia).
+"""
+
+import numpy as np
+
+from src.resultados import CategoriaFanger, EstadoFanger, ResultadoFanger, desde_valores
+from src.vectorizado import _numerico, _resultado, temperatura_radiante_media
+
+DTYPE_FANGER = np.dtype(list(ResultadoFanger.FORMATOS))
+
+SUPERFICIE_CORPORAL = 1.7  # m², la misma de SWreq e ISC
+MET = 58.15  # W/m²
+
+# Iteración de la temperatura de la ropa (anexo D de la ISO 7730)
+TOLERANCIA = 0.00015
+ITERACIONES_MAXIMAS = 150
+
+# Rango de aplicación de la ISO 7730 (apartado 4.2): (mínimo, máximo) de cada entrada
+RANGOS = {
+    "carga_metabolica": (46, 232),  # W/m²
+    "iclo": (0, 0.310),  # m²·K/W
+    "temp_aire": (10, 30),  # °C
+    "temp_radiante_media": (10, 40),  # °C
+    "velocidad_aire": (0, 1),  # m/s
+    "presion_vapor": (0, 2700),  # Pa
+}
+
+# Límites de PPD y |PMV| de las categorías A, B y C (anexo A)
+LIMITES_CATEGORIA = ((6, 0.2), (10, 0.5), (15, 0.7))
+
+# Escala de sensación térmica de siete puntos, de -3 a +3
+SENSACIONES = ("Frío", "Fresco", "Ligeramente fresco", "Neutro", "Ligeramente caluroso", "Caluroso", "Muy caluroso")
+
+
+def velocidad_relativa(velocidad_aire, carga_metabolica):
+    """Velocidad relativa del aire (m/s): suma 0.3 m/s por cada met sobre 1 por el movimiento del cuerpo."""
+    met = _numerico(carga_metabolica) / SUPERFICIE_CORPORAL / MET
+    return _numerico(velocidad_aire) + 0.3 * np.clip(met - 1, 0, None)
+
+
+def sensacion(pmv):
+    """Texto de la escala de sensación térmica para el PMV redondeado (limitado a ±3)."""
+    return SENSACIONES[int(np.clip(np.rint(pmv), -3, 3)) + 3]
+
+
+def _temperatura_ropa(p2, p3, p4, p5, hcf, taa, xn):
+    """Iteración de punto fijo de la temperatura de la ropa (en K/100) con máscara de convergencia por elemento.
+
+    Se itera sobre copias de los elementos pendientes. Cada elemento guarda su
+    valor en el paso en que converge y deja de contar (máscara `vivos`); las
+    copias se compactan recién cuando quedan vivos la mitad o menos, porque
+    compactar cuesta más que un paso. Devuelve (xn, hc, convergio).
+    """
+    hc = hcf.copy()
+    convergio = np.zeros(xn.shape, dtype=bool)
+    # Las entradas no numéricas no se iteran y quedan sin convergencia
+    pendientes = np.flatnonzero(np.isfinite(xn) & np.isfinite(p5) & np.isfinite(hcf))
+    p2_t, p3_t, p4_t, p5_t, hcf_t, taa_t, xn_t = (a[pendientes] for a in (p2, p3, p4, p5, hcf, taa, xn))
+    xf_t = xn_t * 2
+    vivos = np.ones(pendientes.shape, dtype=bool)
+    for _ in range(ITERACIONES_MAXIMAS):
+        if not pendientes.size:
+            break
+        xf_t = (xf_t + xn_t) / 2
+        hc_t = np.maximum(hcf_t, 2.38 * np.sqrt(np.sqrt(np.abs(100 * xf_t - taa_t))))
+        cuarta = xf_t * xf_t
+        cuarta *= cuarta
+        xn_t = (p5_t + p4_t * hc_t - p2_t * cuarta) / (100 + p3_t * hc_t)
+        listos = np.abs(xn_t - xf_t) <= TOLERANCIA
+        listos &= vivos
+        if not listos.any():
+            continue
+        xn[pendientes[listos]] = xn_t[listos]
+        hc[pendientes[listos]] = hc_t[listos]
+        convergio[pendientes[listos]] = True
+        vivos &= ~listos
+        if np.count_nonzero(vivos) * 2 <= vivos.size:
+            pendientes = pendientes[vivos]
+            p2_t, p3_t, p4_t, p5_t, hcf_t, taa_t, xn_t, xf_t = (
+                a[vivos] for a in (p2_t, p3_t, p4_t, p5_t, hcf_t, taa_t, xn_t, xf_t))
+            vivos = np.ones(pendientes.shape, dtype=bool)
+    return xn, hc, convergio
+
+
+def pmv_ppd_vec(temp_aire, temp_radiante_media, velocidad_aire, humedad_relativa, carga_metabolica, iclo, trabajo_externo=0.0):
+    """PMV y PPD (DTYPE_FANGER) de cada elemento; las entradas se combinan con broadcasting."""
+    temp_aire, temp_radiante_media = _numerico(temp_aire), _numerico(temp_radiante_media)
+    velocidad_aire, humedad_relativa, iclo = _numerico(velocidad_aire), _numerico(humedad_relativa), _numerico(iclo)
+    # Pasar la tasa metabólica y el trabajo externo a W/m2
+    m = _numerico(carga_metabolica) / SUPERFICIE_CORPORAL
+    w = _numerico(trabajo_externo) / SUPERFICIE_CORPORAL
+    resultado = _resultado(DTYPE_FANGER, temp_aire, temp_radiante_media, velocidad_aire, humedad_relativa, m, w, iclo)
+    ta, tr, var, hr, m, w, iclo = (np.broadcast_to(x, resultado.shape).ravel()
+                                  for x in (temp_aire, temp_radiante_media, velocidad_aire, humedad_relativa, m, w, iclo))
+    mw = m - w
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        presion_vapor = hr * 10 * np.exp(16.6536 - 4030.183 / (ta + 235))  # Pa
+        fcl = np.where(iclo <= 0.078, 1 + 1.29 * iclo, 1.05 + 0.645 * iclo)
+        hcf = 12.1 * np.sqrt(var)
+        taa, tra = ta + 273, tr + 273
+        p1 = iclo * fcl
+        p2 = p1 * 3.96
+        p3 = p1 * 100
+        p4 = p1 * taa
+        p5 = 308.7 - 0.028 * mw + p2 * ((tra / 100) ** 2) ** 2
+        xn = (taa + (35.5 - ta) / (3.5 * iclo + 0.1)) / 100
+        xn, hc, convergio = _temperatura_ropa(p2, p3, p4, p5, hcf, taa, xn)
+        temp_ropa = 100 * xn - 273
+
+        # Pérdidas de calor: difusión por la piel, sudor, respiración latente y seca, radiación y convección
+        hl1 = 3.05e-3 * (5733 - 6.99 * mw - presion_vapor)
+        hl2 = np.where(mw > MET, 0.42 * (mw - MET), 0)
+        hl3 = 1.7e-5 * m * (5867 - presion_vapor)
+        hl4 = 0.0014 * m * (34 - ta)
+        hl5 = 3.96 * fcl * ((xn * xn) ** 2 - ((tra / 100) ** 2) ** 2)
+        hl6 = fcl * hc * (temp_ropa - ta)
+        ts = 0.303 * np.exp(-0.036 * m) + 0.028
+        pmv = ts * (mw - hl1 - hl2 - hl3 - hl4 - hl5 - hl6)
+        pmv2 = pmv * pmv
+        ppd = 100 - 95 * np.exp(-0.03353 * pmv2 * pmv2 - 0.2179 * pmv2)
+
+    categoria = np.full(pmv.shape, CategoriaFanger.FUERA, dtype=np.int8)
+    for codigo, (ppd_max, pmv_max) in reversed(list(enumerate(LIMITES_CATEGORIA))):
+        categoria[(ppd < ppd_max) & (np.abs(pmv) < pmv_max)] = codigo
+
+    valores = {"carga_metabolica": m, "iclo": iclo, "temp_aire": ta, "temp_radiante_media": tr,
+               "velocidad_aire": var, "presion_vapor": presion_vapor}
+    fuera = np.zeros(pmv.shape, dtype=bool)
+    for nombre, (minimo, maximo) in RANGOS.items():
+        fuera |= (valores[nombre] < minimo) | (valores[nombre] > maximo)
+    estado = np.where(fuera, EstadoFanger.FUERA_DE_RANGO, EstadoFanger.CALCULADO)
+    estado[~convergio] = EstadoFanger.SIN_CONVERGENCIA
+
+    plano = resultado.reshape(-1)
+    plano["pmv"] = np.where(convergio, pmv, np.nan)
+    plano["ppd"] = np.where(convergio, ppd, np.nan)
+    plano["temp_ropa"] = np.where(convergio, temp_ropa, np.nan)
+    plano["categoria"] = categoria
+    plano["estado"] = estado
+    return resultado
+
+
+def pmv_ppd_globo(temp_aire, temp_globo, velocidad_aire, humedad_relativa, carga_metabolica, iclo, trabajo_externo=0.0):
+    """pmv_ppd_vec con la temperatura radiante media estimada desde la de globo (como SWreq e ISC).
+
+    La corrección por el movimiento del cuerpo (`velocidad_relativa`) se aplica aquí.
+    """
+    temp_radiante_media = temperatura_radiante_media(temp_globo, temp_aire, velocidad_aire)
+    return pmv_ppd_vec(temp_aire, temp_radiante_media, velocidad_relativa(velocidad_aire, carga_metabolica),
+                       humedad_relativa, carga_metabolica, iclo, trabajo_externo)
+
+
+def pmv_ppd(temp_aire, temp_radiante_media, velocidad_aire, humedad_relativa, carga_metabolica, iclo, trabajo_externo=0.0):
+    """PMV y PPD de una sola condición como ResultadoFanger."""
+    resultado = pmv_ppd_vec(temp_aire, temp_radiante_media, velocidad_aire, humedad_relativa, carga_metabolica, iclo,
+                            trabajo_externo)
+    return desde_valores(ResultadoFanger, resultado.item())
+
@@ -1,57 +1,126 @@
 import math
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
+from types import MappingProxyType
+
+from src.instrumentacion import instrumentar
+from src.resultados import (
+    NIVELES_CALOR,
+    ClasificacionISC,
+    EstadoSudoracion,
+    EstadoTGBH,
+    NivelCalor,
+    ResultadoCalor,
+    ResultadoISC,
+    ResultadoSudoracion,
+    ResultadoTGBH,
+)
+
+# Solo math (y src.instrumentacion, de la biblioteca estándar) al importar: pandas y
+# NumPy se importan dentro de las funciones de sanitización, que son las únicas que
+# los usan (ver benchmarks/test_importacion.py)
+
+"""Tablas constantes de los índices (inmutables, se crean una sola vez al importar)"""
+
+# Códigos de nivel del índice de calor (NivelCalor): los resultados llevan el código y
+# el texto se resuelve con estas tablas (y NIVELES_CALOR) solo al mostrarlo
+EFECTOS_CALOR = (
+    "",
+    "Es posible que tenga fatiga con exposiciones prolongadas y actividad física.",
+    "Posible insolación, calambres y agotamiento por exposición prolongada y actividad física",
+    "Probable insolación, calambres y agotamiento por exposición prolongada y actividad física",
+    "Probabilidad alta de insolación, golpe de calor ",
+)
+
+MEDIDAS_CALOR = (
+    (),
+    # Nivel I
+    (
+        "Asegurar la disponibilidad de agua potable durante toda la jornada.",
+        "Proporcionar áreas de sombra (semi o permanentes) para descanso en campo abierto.",
+        "Proporcionar sombrero de ala ancha o gorra con cubre-cuello, mangas largas y usar protector solar cuando sea posible.",
+        "Capacitar a los trabajadores.",
+        "Cuando los trabajadores requieren el uso de prendas pesadas (CLO +1, +2), capas o uniformes no transpirables/impermeables, aplicar las medidas del nivel III.",
+        "Las personas que sean nuevas o que retornen al trabajo deben aclimatarse",
+        "Designar a una persona que esté capacitada sobre las manifestaciones clínicas relacionadas con la sobrecarga térmica y que sea capaz de informar a este respecto a la persona con la autoridad requerida y con la persona encargada de salud ocupacional para modificar las actividades laborales y el horario de trabajo/descanso como se requiera",
+    ),
+    # Nivel II
+    (
+        "Asegurar la disponibilidad de agua potable durante toda la jornada.",
+        "Proporcionar áreas de sombra (semi o permanentes) para descanso en campo abierto.",
+        "Proporcionar sombrero de ala ancha o gorra con cubre-cuello, mangas largas y usar protector solar cuando sea posible.",
+        "Capacitar a los trabajadores.",
+        "Cuando los trabajadores requieren el uso de prendas pesadas (CLO +1, +2), capas o uniformes no transpirables/impermeables, aplicar las medidas del nivel III.",
+        "Las personas que sean nuevas o que retornen al trabajo deben aclimatarse",
+        "Designar a una persona que esté capacitada sobre las manifestaciones clínicas relacionadas con la sobrecarga térmica y que sea capaz de informar a este respecto a la persona con la autoridad requerida y con la persona encargada de salud ocupacional para modificar las actividades laborales y el horario de trabajo/descanso como se requiera",
+    ),
+    # Nivel III
+    (
+        "Asegurar la disponibilidad de agua potable durante toda la jornada.",
+        "Proporcionar áreas de sombra (semi o permanentes) para descanso en campo abierto.",
+        "Proporcionar sombrero de ala ancha o gorra con cubre-cuello, mangas largas y usar protector solar cuando sea posible.",
+        "Capacitar a los trabajadores.",
+        "Las personas que sean nuevas o que retornen al trabajo deben aclimatarse",
+        "Designar a una persona que esté capacitada sobre las manifestaciones clínicas relacionadas con la sobrecarga térmica y que sea capaz de informar a este respecto a la persona con la autoridad requerida y con la persona encargada de salud ocupacional para modificar las actividades laborales y el horario de trabajo/descanso como se requiera",
+        "Establecer y cumplir horarios de trabajo/descanso.",
+        "Informar a las personas trabajadoras sobre el horario establecido.",
+        "Si el trabajo se realiza directamente bajo el sol, aplicar las medidas específicas del nivel IV descritas para esa condición.",
+    ),
+    # Nivel IV
+    (
+        "Asegurar la disponibilidad de agua potable durante toda la jornada.",
+        "Suministrar bebidas rehidratantes según normativa del Ministerio de Salud.",
+        "Proporcionar áreas de sombra (semi o permanentes) para descanso en campo abierto.",
+        "Proporcionar sombrero de ala ancha o gorra con cubre-cuello, mangas largas y usar protector solar cuando sea posible.",
+        "Capacitar a los trabajadores.",
+        "Las personas que sean nuevas o que retornen al trabajo deben aclimatarse",
+        "Designar a una persona que esté capacitada sobre las manifestaciones clínicas relacionadas con la sobrecarga térmica y que sea capaz de informar a este respecto a la persona con la autoridad requerida y con la persona encargada de salud ocupacional para modificar las actividades laborales y el horario de trabajo/descanso como se requiera",
+        "Establecer y cumplir horarios de trabajo/descanso.",
+        "Informar a las personas trabajadoras sobre el horario establecido.",
+    ),
+)
+
+# Ar/Adu según la postura de trabajo
+POSTURAS = MappingProxyType({
+    "De pie": 0.77,
+    "Sentado": 0.7,
+    "Agachado": 0.67,
+})
+
+# Máximo de humedad, tasa de sudoración y límites de almacenamiento y deshidratación según aclimatación
+ACLIMATACION = MappingProxyType({
+    "Si": MappingProxyType({
+        "w_max": 1.0,
+        "sw_max": 500,
+        "Q_max_peligro": 60,
+        "Q_max_alarma": 50,
+        "D_max_peligro": 2000,
+        "D_max_alarma": 1500,
+    }),
+    "No": MappingProxyType({
+        "w_max": 0.85,
+        "sw_max": 400,
+        "Q_max_peligro": 60,
+        "Q_max_alarma": 50,
+        "D_max_peligro": 1250,
+        "D_max_alarma": 1000,
+    }),
+})
+
+BOLTZMAN = 5.67 * (10**-8)  # W/((m²)(K**4))
+EMISIVIDAD_PIEL = 0.97
+
+
+def medidas_por_nivel(nivel):
+    """Medidas de prevención (tupla de textos) para un código de nivel del índice de calor."""
+    return MEDIDAS_CALOR[nivel]
 
 """Función para el cálculo del índice de calor"""
 
+# Devuelve ResultadoCalor(ih, nivel, nivel_para_medidas) con los niveles como códigos NivelCalor
+@instrumentar("funciones.indice_de_calor")
 def indice_de_calor(temp_aire, humedad_relativa,exposicion_solar):
     temp_aire= temp_aire * 9/5 + 32  # Convertir a Fahrenheit
     indice_preliminar= 0.5*(temp_aire+61.0+((temp_aire-68)*1.2)+(humedad_relativa*0.094))
     
-    medidas = {
-        "Nivel I": [
-            "Asegurar la disponibilidad de agua potable durante toda la jornada.",
-            "Proporcionar áreas de sombra (semi o permanentes) para descanso en campo abierto.",
-            "Proporcionar sombrero de ala ancha o gorra con cubre-cuello, mangas largas y usar protector solar cuando sea posible.",
-            "Capacitar a los trabajadores.",
-            "Cuando los trabajadores requieren el uso de prendas pesadas (CLO +1, +2), capas o uniformes no transpirables/impermeables, aplicar las medidas del nivel III.",
-            "Las personas que sean nuevas o que retornen al trabajo deben aclimatarse",
-            "Designar a una persona que esté capacitada sobre las manifestaciones clínicas relacionadas con la sobrecarga térmica y que sea capaz de informar a este respecto a la persona con la autoridad requerida y con la persona encargada de salud ocupacional para modificar las actividades laborales y el horario de trabajo/descanso como se requiera"
-        ],
-        "Nivel II": [
-            "Asegurar la disponibilidad de agua potable durante toda la jornada.",
-            "Proporcionar áreas de sombra (semi o permanentes) para descanso en campo abierto.",
-            "Proporcionar sombrero de ala ancha o gorra con cubre-cuello, mangas largas y usar protector solar cuando sea posible.",
-            "Capacitar a los trabajadores.",
-            "Cuando los trabajadores requieren el uso de prendas pesadas (CLO +1, +2), capas o uniformes no transpirables/impermeables, aplicar las medidas del nivel III.",
-            "Las personas que sean nuevas o que retornen al trabajo deben aclimatarse",
-            "Designar a una persona que esté capacitada sobre las manifestaciones clínicas relacionadas con la sobrecarga térmica y que sea capaz de informar a este respecto a la persona con la autoridad requerida y con la persona encargada de salud ocupacional para modificar las actividades laborales y el horario de trabajo/descanso como se requiera"
-        ],
-        "Nivel III": [
-            "Asegurar la disponibilidad de agua potable durante toda la jornada.",
-            "Proporcionar áreas de sombra (semi o permanentes) para descanso en campo abierto.",
-            "Proporcionar sombrero de ala ancha o gorra con cubre-cuello, mangas largas y usar protector solar cuando sea posible.",
-            "Capacitar a los trabajadores.",
-            "Las personas que sean nuevas o que retornen al trabajo deben aclimatarse",
-            "Designar a una persona que esté capacitada sobre las manifestaciones clínicas relacionadas con la sobrecarga térmica y que sea capaz de informar a este respecto a la persona con la autoridad requerida y con la persona encargada de salud ocupacional para modificar las actividades laborales y el horario de trabajo/descanso como se requiera",
-            "Establecer y cumplir horarios de trabajo/descanso.",
-            "Informar a las personas trabajadoras sobre el horario establecido.",
-            "Si el trabajo se realiza directamente bajo el sol, aplicar las medidas específicas del nivel IV descritas para esa condición."
-        ],
-        "Nivel IV": [
-            "Asegurar la disponibilidad de agua potable durante toda la jornada.",
-            "Suministrar bebidas rehidratantes según normativa del Ministerio de Salud.",
-            "Proporcionar áreas de sombra (semi o permanentes) para descanso en campo abierto.",
-            "Proporcionar sombrero de ala ancha o gorra con cubre-cuello, mangas largas y usar protector solar cuando sea posible.",
-            "Capacitar a los trabajadores.",
-            "Las personas que sean nuevas o que retornen al trabajo deben aclimatarse",
-            "Designar a una persona que esté capacitada sobre las manifestaciones clínicas relacionadas con la sobrecarga térmica y que sea capaz de informar a este respecto a la persona con la autoridad requerida y con la persona encargada de salud ocupacional para modificar las actividades laborales y el horario de trabajo/descanso como se requiera",
-            "Establecer y cumplir horarios de trabajo/descanso.",
-            "Informar a las personas trabajadoras sobre el horario establecido.",
-        ],
-    }
-    
     if indice_preliminar >= 80:
         ih =-42.379 + 2.04901523*temp_aire + 10.14333127*humedad_relativa - .22475541*temp_aire*humedad_relativa - .00683783*temp_aire*temp_aire - .05481717*humedad_relativa*humedad_relativa + .00122874*temp_aire*temp_aire*humedad_relativa + .00085282*temp_aire*humedad_relativa*humedad_relativa - .00000199*temp_aire*temp_aire*humedad_relativa*humedad_relativa
         #Ajuste 1. Si la humedad relativa es menor al 13% y la temperatura del aire está entre 80°F y 112°F se resta el ajuste
@@ -65,65 +134,37 @@ def indice_de_calor(temp_aire, humedad_relativa,exposicion_solar):
     else:
         ih=indice_preliminar
     if ih <91:
-        nivel="Nivel I"
-        efecto= "Es posible que tenga fatiga con exposiciones prolongadas y actividad física."
-        if exposicion_solar == "Si":
-            nivel_para_medidas="Nivel II"
-            medidas_por_nivel = medidas[nivel_para_medidas]
-        else:
-            nivel_para_medidas="Nivel I"
-            medidas_por_nivel = medidas[nivel]
-        return (ih, nivel, efecto, medidas_por_nivel,nivel_para_medidas)
+        nivel=NivelCalor.NIVEL_I
     elif 91<= ih <103:
-        nivel="Nivel II"
-        efecto="Posible insolación, calambres y agotamiento por exposición prolongada y actividad física"
-        if exposicion_solar == "Si":
-            nivel_para_medidas="Nivel III"
-            medidas_por_nivel = medidas[nivel_para_medidas]
-        else:
-            nivel_para_medidas="Nivel II"
-            medidas_por_nivel = medidas[nivel]
-        return (ih, nivel, efecto, medidas_por_nivel, nivel_para_medidas)
+        nivel=NivelCalor.NIVEL_II
     elif 103<= ih <125:
-        nivel="Nivel III"
-        efecto= "Probable insolación, calambres y agotamiento por exposición prolongada y actividad física"
-        if exposicion_solar == "Si":
-            nivel_para_medidas="Nivel IV"
-            medidas_por_nivel = medidas[nivel_para_medidas]
-        else:
-            nivel_para_medidas="Nivel III"
-            medidas_por_nivel = medidas[nivel]
-        return (ih, nivel, efecto, medidas_por_nivel,nivel_para_medidas)
-    elif ih >=125:        
-        nivel="Nivel IV"
-        efecto= "Probabilidad alta de insolación, golpe de calor "
-        medidas_por_nivel = medidas[nivel]
-        nivel_para_medidas = "Nivel IV"
-        return (ih, nivel, efecto, medidas_por_nivel, nivel_para_medidas)
-    
-        
+        nivel=NivelCalor.NIVEL_III
+    elif ih >=125:
+        nivel=NivelCalor.NIVEL_IV
+    else:
+        nivel=NivelCalor.SIN_DATO
+    # Con exposición solar las medidas corresponden al siguiente nivel, excepto en el Nivel IV
+    if exposicion_solar == "Si" and NivelCalor.SIN_DATO < nivel < NivelCalor.NIVEL_IV:
+        nivel_para_medidas=NivelCalor(nivel+1)
+    else:
+        nivel_para_medidas=nivel
+    return ResultadoCalor(ih, nivel, nivel_para_medidas)
 
 
 """Función para el cálculo del índice de sudoracion requerida (SWreq)"""
 
+@instrumentar("funciones.indice_de_sudoracion")
 def indice_de_sudoracion(temp_aire, temp_globo, temp_bulbo, iclo, carga_metabolica, velocidad_aire, postura, aclimatacion, conveccion):
-    #Definición de constantes
-    BOLTZMAN = 5.67 * (10**-8)  # W/((m²)(K**4))
-    EMISIVIDAD_PIEL = 0.97
-     # Diccionario de posturas y sus valores correspondientes
-    postura_trabajo_dict = {
-        "De pie": 0.77,
-        "Sentado": 0.7,
-        "Agachado": 0.67
-    }
-    
     # Definición del Ar/Adu
-    postura_trabajo = postura_trabajo_dict[postura]
+    postura_trabajo = POSTURAS[postura]
     #Pasar la tasa metabolica a W/m2
     carga_metabolica=carga_metabolica/1.7
     # Cálculo de la temperatura radiante media
     if velocidad_aire > 0.15:
         temp_radiante_media = (((temp_globo + 273)**4) + (2.5 * (10**8)) * (velocidad_aire**0.6) * (temp_globo - temp_aire))**0.25 - 273
+    elif temp_globo < temp_aire:
+        # Convección natural con el globo más frío que el aire: la fórmula no está definida (NaN, SIN_DATO)
+        temp_radiante_media = math.nan
     else:
         temp_radiante_media = (((temp_globo + 273)**4) + (0.42 * (10**8)) * ((temp_globo - temp_aire)**0.25) * (temp_globo - temp_aire))**0.25 - 273
     
@@ -151,45 +192,32 @@ def indice_de_sudoracion(temp_aire, temp_globo, temp_bulbo, iclo, carga_metaboli
 
     # Calcular Emax
     e_max = (presion_vapor_piel - presion_parcial_ambiente) / resistencia_total_vestido
+    if not math.isfinite(e_max):
+        return ResultadoSudoracion(math.nan, math.nan, math.nan, math.nan, EstadoSudoracion.SIN_DATO)
     if e_max < 0:
-        return (0,0,0,0)
+        # El método no se aplica: estado explícito y DLE en cero, como en la versión vectorizada
+        return ResultadoSudoracion(0.0, 0.0, 0.0, 0.0, EstadoSudoracion.EMAX_NEGATIVO)
     # Cálculos de balance térmico
     c_res = 0.0014 * carga_metabolica * (35 - temp_aire)
     e_res = 0.0173 * carga_metabolica * (5.624 - presion_parcial_ambiente)
     r = hr * f_mayus_clo * (temp_piel - temp_radiante_media)
     c = hc * f_mayus_clo * (temp_piel - temp_aire)
     e_req = carga_metabolica - c_res - e_res - c - r
+    if not math.isfinite(e_req):
+        return ResultadoSudoracion(math.nan, math.nan, math.nan, math.nan, EstadoSudoracion.SIN_DATO)
     
     # Análisis del puesto
     w_p = e_req / e_max
     
 
     # Definir máximo de humedad y tasa de sudoración según aclimatación
-    aclimatacion_dict = {
-        "Si": {
-            "w_max": 1.0,
-            "sw_max": 500,
-            "Q_max_peligro": 60,
-            "Q_max_alarma": 50,
-            "D_max_peligro": 2000,
-            "D_max_alarma": 1500
-        },
-        "No": {
-            "w_max": 0.85,
-            "sw_max": 400,
-            "Q_max_peligro": 60,
-            "Q_max_alarma": 50,
-            "D_max_peligro": 1250,
-            "D_max_alarma": 1000
-        }
-    }
-
-    w_max = aclimatacion_dict[aclimatacion]["w_max"]
-    sw_max = aclimatacion_dict[aclimatacion]["sw_max"]
-    q_max_peligro = aclimatacion_dict[aclimatacion]["Q_max_peligro"]
-    q_max_alarma = aclimatacion_dict[aclimatacion]["Q_max_alarma"]
-    d_max_peligro = aclimatacion_dict[aclimatacion]["D_max_peligro"]
-    d_max_alarma = aclimatacion_dict[aclimatacion]["D_max_alarma"]
+    limites = ACLIMATACION[aclimatacion]
+    w_max = limites["w_max"]
+    sw_max = limites["sw_max"]
+    q_max_peligro = limites["Q_max_peligro"]
+    q_max_alarma = limites["Q_max_alarma"]
+    d_max_peligro = limites["D_max_peligro"]
+    d_max_alarma = limites["D_max_alarma"]
     
     if w_p > w_max:
         w_p = w_max
@@ -205,14 +233,24 @@ def indice_de_sudoracion(temp_aire, temp_globo, temp_bulbo, iclo, carga_metaboli
         sw_p = sw_max
     
     # Tiempos límite de exposición
-    dle_alarma_q = 60 * q_max_alarma / (e_req - e_p)
-    dle_peligro_q = 60 * q_max_peligro / (e_req - e_p)
-    dle_alarma_d = 60 * d_max_alarma / sw_p
-    dle_peligro_d = 60 * d_max_peligro / sw_p
+    # Sin almacenamiento de calor (e_p == e_req) el residuo es solo redondeo: límite infinito
+    almacenamiento = e_req - e_p
+    if almacenamiento <= 1e-9 * abs(e_req):
+        dle_alarma_q = dle_peligro_q = float('inf')
+    else:
+        dle_alarma_q = 60 * q_max_alarma / almacenamiento
+        dle_peligro_q = 60 * q_max_peligro / almacenamiento
+    # Sin sudoración (sw_p <= 0, el cuerpo pierde calor) no hay límite de deshidratación
+    if sw_p <= 0:
+        dle_alarma_d = dle_peligro_d = float('inf')
+    else:
+        dle_alarma_d = 60 * d_max_alarma / sw_p
+        dle_peligro_d = 60 * d_max_peligro / sw_p
 
-    return dle_alarma_q, dle_peligro_q, dle_alarma_d, dle_peligro_d
+    return ResultadoSudoracion(dle_alarma_q, dle_peligro_q, dle_alarma_d, dle_peligro_d, EstadoSudoracion.CALCULADO)
 
 """Función para TGBH"""
+@instrumentar("funciones.tgbh")
 def tgbh(radiacion_solar,temp_aire,temp_globo,temp_bulbo,cavs,carga_metabolica,aclimatacion):
    
     #TGBH simple x
@@ -230,13 +268,14 @@ def tgbh(radiacion_solar,temp_aire,temp_globo,temp_bulbo,cavs,carga_metabolica,a
     
     #determinar si estrés o discomfort
     if wbgt_efectivo>wbgt_ref:
-        estado="Estrés Térmico"
+        estado=EstadoTGBH.ESTRES_TERMICO
     else:
-        estado="Discomfort"
-    return (wbgt,wbgt_efectivo,wbgt_ref,estado)
+        estado=EstadoTGBH.DISCOMFORT
+    return ResultadoTGBH(wbgt,wbgt_efectivo,wbgt_ref,estado)
 
 """Función para Índice de Sobrecarga Calorica (ISC)"""
 
+@instrumentar("funciones.indice_sobrecarga_calorica")
 def indice_sobrecarga_calorica(carga_metabolica,velocidad_aire, temp_globo, temp_aire,temp_bulbo,iclo,altura,peso):
   
     carga_metabolica=carga_metabolica/1.7
@@ -249,6 +288,9 @@ def indice_sobrecarga_calorica(carga_metabolica,velocidad_aire, temp_globo, temp
     
     if velocidad_aire > 0.15:
             temp_radiante_media = ((((temp_globo + 273)**4) + (2.5 * (10**8)) * (velocidad_aire**0.6) * (temp_globo - temp_aire))**0.25) - 273
+    elif temp_globo < temp_aire:
+            # Convección natural con el globo más frío que el aire: la fórmula no está definida (NaN, SIN_DATO)
+            temp_radiante_media = math.nan
     else:
             temp_radiante_media = ((((temp_globo + 273)**4) + (0.42 * (10**8))*((temp_globo - temp_aire)**0.25)*(temp_globo - temp_aire))**0.25)- 273
     # Cálculo de los términos
@@ -264,23 +306,27 @@ def indice_sobrecarga_calorica(carga_metabolica,velocidad_aire, temp_globo, temp
     indice_sobrecarga_calorica = (evaporacion_req /evaporacion_max) * 100
 
         # Clasificación según la nueva escala
-    if indice_sobrecarga_calorica <= 10:
-        clasificacion_isc = "Confort térmico"
+    if not math.isfinite(indice_sobrecarga_calorica):
+        clasificacion_isc = ClasificacionISC.SIN_DATO
+    elif indice_sobrecarga_calorica <= 10:
+        clasificacion_isc = ClasificacionISC.CONFORT
     elif indice_sobrecarga_calorica <= 30:
-        clasificacion_isc = "Carga suave"
+        clasificacion_isc = ClasificacionISC.SUAVE
     elif indice_sobrecarga_calorica <= 40:
-        clasificacion_isc = "Carga moderada (Zona de alarma)"
+        clasificacion_isc = ClasificacionISC.MODERADA
     elif indice_sobrecarga_calorica <= 80:
-        clasificacion_isc = "Carga severa"
+        clasificacion_isc = ClasificacionISC.SEVERA
     elif indice_sobrecarga_calorica < 100:
-        clasificacion_isc = "Carga muy severa"
+        clasificacion_isc = ClasificacionISC.MUY_SEVERA
     elif indice_sobrecarga_calorica == 100:
-        clasificacion_isc = "Carga máxima permisible"
+        clasificacion_isc = ClasificacionISC.MAXIMA_PERMISIBLE
     else:
-        clasificacion_isc = "Condiciones críticas por sobrecarga calórica"
+        clasificacion_isc = ClasificacionISC.CRITICA
 
     # Cálculo del tiempo de exposición permitido
-    if indice_sobrecarga_calorica > 100:
+    if clasificacion_isc == ClasificacionISC.SIN_DATO:
+        tiempo_exp_per = math.nan
+    elif indice_sobrecarga_calorica > 100:
         tiempo_exp_per = 2440 / (evaporacion_req - evaporacion_max)
     else:
         tiempo_exp_per = float('inf')
@@ -289,7 +335,7 @@ def indice_sobrecarga_calorica(carga_metabolica,velocidad_aire, temp_globo, temp
     #superficie_corporal=(peso**0.425)*(altura**0.725)*0.007184
     #tiempo_de_recuperacion= (58+peso*1)/((evaporacion_max-evaporacion_req)*superficie_corporal) #minutos
     
-    return (indice_sobrecarga_calorica, clasificacion_isc, tiempo_exp_per, evaporacion_max, evaporacion_req)
+    return ResultadoISC(indice_sobrecarga_calorica, clasificacion_isc, tiempo_exp_per, evaporacion_max, evaporacion_req)
 
 """Función para calcular el tiempo en horas y minutos"""
 #Función para mostrar el tiempo en formato horas y minutos
@@ -302,6 +348,8 @@ def format_time(minutes):
 
 #Limpiar el pd dataframe
 def sanitize_file(uploaded_file):
+    import pandas as pd
+
     # Determinar el tipo de archivo y cargarlo
     if uploaded_file.name.endswith('.csv'):
         df = pd.read_csv(uploaded_file)
@@ -310,8 +358,55 @@ def sanitize_file(uploaded_file):
     else:
         raise ValueError("Formato de archivo no soportado")
     
-    # Sanitizar el DataFrame
-    sanitized_df = df.applymap(lambda x: f"'{x}" if isinstance(x, str) and x.startswith(('=', '@', '+', '-')) else x)
+    return sanitizar_dataframe(df)
+
+#Escapar celdas de texto que Excel interpretaría como fórmulas
+PREFIJOS_FORMULA = ('=', '@', '+', '-')
+
+def sanitizar_dataframe(df):
+    import pandas as pd
+
+    # Solo las columnas de texto pueden contener fórmulas; las numéricas se dejan tal cual.
+    # Las operaciones .str son vectorizadas (kernels de Arrow en columnas string[pyarrow])
+    sanitized_df = df.copy(deep=False)
+    for columna in df.select_dtypes(include=["object", "string", "category"]).columns:
+        serie = df[columna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            categorias = serie.cat.categories.to_series()
+            escapadas = _escapar_formulas(categorias)
+            if escapadas is not categorias:
+                # Si al escapar dos categorías coinciden, se sanitizan los valores como texto
+                escapadas = escapadas.tolist()
+                sanitized_df[columna] = (serie.cat.rename_categories(escapadas) if len(set(escapadas)) == len(escapadas)
+                                         else _escapar_formulas(serie.astype(object)))
+            continue
+        sanitized_df[columna] = _escapar_formulas(serie)
 
     return sanitized_df
 
+def _escapar_formulas(serie):
+    import numpy as np
+    import pandas as pd
+
+    try:
+        if serie.dtype == object:
+            # En columnas object se revisan solo los valores únicos (factorize usa hash en C)
+            codigos, unicos = pd.factorize(serie)
+            peligrosos = pd.Series(unicos, dtype=object).str.startswith(PREFIJOS_FORMULA, na=False).to_numpy(dtype=bool)
+            peligrosa = np.append(peligrosos, False)[codigos]  # código -1 (vacío) -> False
+        else:
+            peligrosa = serie.str.startswith(PREFIJOS_FORMULA, na=False).to_numpy(dtype=bool)
+    except AttributeError:
+        # Columna object sin ningún texto
+        return serie
+    if not peligrosa.any():
+        return serie
+    if serie.dtype == object:
+        valores = serie.to_numpy(dtype=object, copy=True)
+        valores[peligrosa] = "'" + valores[peligrosa]
+        return pd.Series(valores, index=serie.index, name=serie.name, dtype=object)
+    # Columnas string: se reemplazan solo las posiciones afectadas, sin pasar por objetos
+    escapada = serie.copy()
+    posiciones = np.flatnonzero(peligrosa)
+    escapada.iloc[posiciones] = ("'" + serie.iloc[posiciones]).to_numpy()
+    return escapada
@@ -0,0 +1,172 @@
+"""Gráficos bajo demanda y reducción de series largas para la aplicación
+
+Las curvas de referencia del TGBH (aclimatados y no aclimatados) no dependen de
+las entradas: se calculan una vez por proceso, y la figura con el punto de la
+evaluación se guarda como PNG por (tasa metabólica, TGBH efectivo), así que solo
+se dibuja cuando el usuario la pide y una sola vez por combinación.
+
+Las series del cálculo por lotes pueden tener cientos de miles de puntos; antes
+de pasarlas a Vega-Lite se reducen a un presupuesto fijo de puntos conservando
+los picos:
+
+- `reducir_minmax` divide la serie en cubetas iguales y conserva el mínimo y el
+  máximo de cada una (totalmente vectorizado; los extremos de cada cubeta, y por
+  lo tanto los picos, sobreviven siempre).
+- `reducir_lttb` aplica Largest-Triangle-Three-Buckets, que conserva mejor la
+  forma visual con el mismo número de puntos.
+
+`SerieReducida` acumula una serie bloque a bloque con min/max sin guardar la
+serie completa: reducir dos veces con min/max conserva los mismos extremos.
+"""
+
+import functools
+import io
+
+import numpy as np
+import pandas as pd
+
+PUNTOS_MAXIMOS = 2_000
+CARGA_MINIMA, CARGA_MAXIMA = 100, 600
+
+
+def _cubetas(n, cubetas):
+    return np.linspace(0, n, cubetas + 1).astype(np.intp)
+
+
+def reducir_minmax(x, y, puntos=PUNTOS_MAXIMOS):
+    """Índices (ordenados) de a lo sumo `puntos` filas: mínimo y máximo de y en cada cubeta.
+
+    Los NaN se ignoran; una cubeta sin valores finitos no aporta puntos.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= puntos:
+        return np.arange(n)
+    bordes = _cubetas(n, max(1, puntos // 2))
+    inicios = bordes[:-1]
+    finitos = np.isfinite(y)
+    # reduceat sobre copias con ±inf en los NaN para que no ganen el mínimo ni el máximo
+    minimos = np.minimum.reduceat(np.where(finitos, y, np.inf), inicios)
+    maximos = np.maximum.reduceat(np.where(finitos, y, -np.inf), inicios)
+    cubeta = np.repeat(np.arange(len(inicios)), np.diff(bordes))
+    es_min = finitos & (y == minimos[cubeta])
+    es_max = finitos & (y == maximos[cubeta])
+    # Primera aparición del mínimo y del máximo de cada cubeta
+    indices = np.arange(n)
+    primero_min = np.full(len(inicios), n)
+    primero_max = np.full(len(inicios), n)
+    np.minimum.at(primero_min, cubeta[es_min], indices[es_min])
+    np.minimum.at(primero_max, cubeta[es_max], indices[es_max])
+    elegidos = np.concatenate([primero_min, primero_max])
+    return np.unique(elegidos[elegidos < n])
+
+
+def reducir_lttb(x, y, puntos=PUNTOS_MAXIMOS):
+    """Índices (ordenados) de `puntos` filas elegidas con Largest-Triangle-Three-Buckets.
+
+    `x` debe ser numérico y creciente (por ejemplo fechas como datetime64 o
+    segundos). Se conservan la primera y la última fila; de cada cubeta
+    intermedia se elige el punto que forma el triángulo de mayor área con el
+    punto elegido en la cubeta anterior y el promedio de la siguiente. El ciclo
+    recorre cubetas (no filas) y cada cubeta se evalúa vectorizada.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= puntos or puntos < 3:
+        return np.arange(n) if n <= puntos else np.array([0, n - 1])
+    x = np.asarray(x)
+    x = (x - x[0]).astype("timedelta64[ns]").astype(np.float64) if x.dtype.kind == "M" else x.astype(np.float64)
+    # Cubetas intermedias sobre las filas 1..n-2 y una última cubeta con la fila final
+    bordes = np.append(1 + _cubetas(n - 2, puntos - 2), n)
+    # Promedios de cada cubeta (la última cubeta es la fila final)
+    sumas_x = np.add.reduceat(x, bordes[:-1])
+    sumas_y = np.add.reduceat(y, bordes[:-1])
+    largos = np.diff(bordes)
+    medio_x, medio_y = sumas_x / largos, sumas_y / largos
+    elegidos = np.empty(puntos, dtype=np.intp)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    anterior = 0
+    for cubeta in range(puntos - 2):
+        inicio, fin = bordes[cubeta], bordes[cubeta + 1]
+        ax, ay = x[anterior], y[anterior]
+        area = np.abs((ax - medio_x[cubeta + 1]) * (y[inicio:fin] - ay) - (ax - x[inicio:fin]) * (medio_y[cubeta + 1] - ay))
+        anterior = inicio + int(np.nanargmax(area)) if np.isfinite(area).any() else inicio
+        elegidos[cubeta + 1] = anterior
+    return elegidos
+
+
+def reducir(datos, x, columnas, puntos=PUNTOS_MAXIMOS, metodo="minmax"):
+    """DataFrame `datos` reducido a ~`puntos` filas que conservan los picos de `columnas`.
+
+    Con varias columnas el presupuesto se reparte entre ellas y se unen las
+    filas elegidas para cada una.
+    """
+    if len(datos) <= puntos:
+        return datos
+    funcion = reducir_lttb if metodo == "lttb" else reducir_minmax
+    por_columna = max(4, puntos // len(columnas))
+    indices = np.unique(np.concatenate([funcion(datos[x].to_numpy(), datos[c].to_numpy(), por_columna)
+                                        for c in columnas]))
+    return datos.iloc[indices].reset_index(drop=True)
+
+
+class SerieReducida:
+    """Serie (x, columnas) acumulada bloque a bloque con a lo sumo ~`puntos` filas por columna."""
+
+    def __init__(self, columnas, puntos=PUNTOS_MAXIMOS):
+        self.columnas = tuple(columnas)
+        self.puntos = puntos
+        self.filas = 0
+        self._partes = []
+        self._pendientes = 0
+
+    def agregar(self, x, datos):
+        """Agrega un bloque: `x` (posiciones o fechas) y un DataFrame con las columnas."""
+        bloque = pd.DataFrame({"x": np.asarray(x), **{c: datos[c].to_numpy() for c in self.columnas}})
+        self.filas += len(bloque)
+        self._partes.append(reducir(bloque, "x", self.columnas, self.puntos))
+        self._pendientes += len(self._partes[-1])
+        # Se vuelve a reducir lo acumulado al pasar de 4 presupuestos: la memoria queda acotada
+        if self._pendientes > 4 * self.puntos:
+            self._partes = [self.datos()]
+            self._pendientes = len(self._partes[0])
+
+    def datos(self):
+        """DataFrame con x y las columnas, reducido al presupuesto."""
+        if not self._partes:
+            return pd.DataFrame(columns=["x", *self.columnas])
+        return reducir(pd.concat(self._partes, ignore_index=True), "x", self.columnas, self.puntos)
+
+
+@functools.lru_cache(maxsize=None)
+def curvas_referencia_tgbh(puntos=500):
+    """TGBH de referencia para aclimatados y no aclimatados en 100-600 W (calculado una vez)."""
+    carga = np.linspace(CARGA_MINIMA, CARGA_MAXIMA, puntos)
+    return carga, 56.7 - 11.5 * np.log10(carga), 59.9 - 14.1 * np.log10(carga)
+
+
+@functools.lru_cache(maxsize=256)
+def png_curvas_tgbh(carga_metabolica, tgbh_efectivo):
+    """PNG de las curvas de referencia del TGBH con el punto de la evaluación.
+
+    Usa matplotlib.figure.Figure (sin el estado global de pyplot, seguro entre
+    sesiones concurrentes) y devuelve bytes, que se memorizan por punto.
+    """
+    from matplotlib.figure import Figure
+
+    carga, aclimatada, no_aclimatada = curvas_referencia_tgbh()
+    figura = Figure(figsize=(8, 6))
+    ax = figura.subplots()
+    ax.plot(carga, aclimatada, label="Personas Aclimatadas", color="blue", linewidth=2)
+    ax.plot(carga, no_aclimatada, label="Personas No Aclimatadas", color="red", linestyle='--', linewidth=2)
+    ax.scatter(carga_metabolica, tgbh_efectivo, color="green", zorder=5,
+               label=f'Punto ({carga_metabolica},{round(tgbh_efectivo, 2)})')
+    ax.set_xlabel('Carga Metabólica')
+    ax.set_ylabel('TGBH Efectivo')
+    ax.set_title('Curvas de Aclimatación y No Aclimatación')
+    ax.legend()
+    ax.set_xlim(CARGA_MINIMA, CARGA_MAXIMA)
+    ax.set_ylim(15, 45)
+    salida = io.BytesIO()
+    figura.savefig(salida, format="png", bbox_inches="tight")
+    return salida.getvalue()
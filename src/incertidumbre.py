@@ -0,0 +1,174 @@
+"""Incertidumbre por Monte Carlo: error de los sensores y variabilidad de los trabajadores
+
+Los índices dan una sola estimación para una lectura, pero los sensores tienen
+una exactitud de ±0.5 °C y los trabajadores no son todos iguales. Para una
+lectura, `evaluar_incertidumbre` genera `muestras` variantes (10.000 a 100.000):
+
+- Error de cada sensor, uniforme en ±EXACTITUD_SENSORES (la exactitud del
+  fabricante como cota); la velocidad del aire no baja de 0.
+- Altura y peso de cada trabajador con distribución normal alrededor de los
+  valores ingresados (acotados a RANGO_ALTURA y RANGO_PESO). La tasa metabólica
+  de las tablas (W) es la de la tarea; cada muestra la pasa a W/m² con su
+  superficie de Du Bois relativa a la del trabajador promedio, de modo que el
+  trabajador promedio usa los 1.7 m² de siempre.
+- Aclimatación: la de los parámetros o, con `proporcion_aclimatados`, una
+  mezcla de aclimatados y no aclimatados.
+
+Todas las muestras se evalúan a la vez con las funciones de src.vectorizado y
+el resultado da intervalos de confianza del TGBH, el ISC y los tiempos límite
+de SWreq, y la probabilidad de estrés térmico. Las muestras en que el ISC o el
+SWreq no se pueden calcular (código SIN_DATO) quedan fuera de sus intervalos y
+probabilidades. Con la misma `semilla` el resultado es reproducible.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.resultados import ClasificacionISC, EstadoSudoracion, EstadoTGBH
+from src.vectorizado import (
+    SUPERFICIE_CORPORAL,
+    indice_de_sudoracion_vec,
+    indice_sobrecarga_calorica_vec,
+    superficie_dubois,
+    tgbh_vec,
+)
+
+# Exactitud (±) de cada sensor: °C y m/s
+EXACTITUD_SENSORES = {"temp_aire": 0.5, "temp_globo": 0.5, "temp_bulbo": 0.5, "velocidad_aire": 0.05}
+# Desviación estándar de la altura (cm) y el peso (kg) entre trabajadores
+DESVIACION_ALTURA = 7.0
+DESVIACION_PESO = 12.0
+RANGO_ALTURA = (140.0, 210.0)
+RANGO_PESO = (40.0, 150.0)
+
+MUESTRAS = 20_000
+SEMILLA = 0
+NIVEL = 0.95
+
+# Métricas con intervalo de confianza: (campo, índice de origen, etiqueta)
+METRICAS = (
+    ("wbgt", "tgbh", "TGBH (°C)"),
+    ("wbgt_efectivo", "tgbh", "TGBH efectivo (°C)"),
+    ("isc", "isc", "ISC (%)"),
+    ("tiempo_exp_per", "isc", "Tiempo de exposición permitido ISC (min)"),
+    ("dle_alarma_q", "swreq", "DLE alarma por calor almacenado (min)"),
+    ("dle_peligro_q", "swreq", "DLE peligro por calor almacenado (min)"),
+    ("dle_alarma_d", "swreq", "DLE alarma por deshidratación (min)"),
+    ("dle_peligro_d", "swreq", "DLE peligro por deshidratación (min)"),
+)
+
+
+class Incertidumbre:
+    """Índices de todas las muestras de una lectura y su estimación puntual."""
+
+    def __init__(self, estimacion, muestras):
+        self.estimacion = estimacion  # {"tgbh", "swreq", "isc"}: arreglo estructurado de un elemento
+        self.muestras = muestras  # {"tgbh", "swreq", "isc"}: arreglos estructurados (muestras,)
+
+    def __len__(self):
+        return len(self.muestras["tgbh"])
+
+    def _valores(self, metrica, origen):
+        valores = self.muestras[origen][metrica]
+        if origen == "swreq":
+            # Con Emax < 0 el SWreq no se aplica: esas muestras no tienen tiempos límite
+            return np.where(self.muestras["swreq"]["estado"] == EstadoSudoracion.CALCULADO, valores, np.nan)
+        if origen == "isc":
+            return np.where(self.muestras["isc"]["clasificacion"] == ClasificacionISC.SIN_DATO, np.nan, valores)
+        return valores
+
+    def intervalos(self, nivel=NIVEL):
+        """Una fila por métrica: estimación puntual, límite inferior, mediana y límite superior del intervalo.
+
+        Los cuantiles son valores de las muestras (sin interpolar), así que los
+        tiempos límite infinitos (sin almacenamiento de calor) quedan como inf.
+        """
+        cola = (1 - nivel) / 2
+        filas = {}
+        for metrica, origen, _ in METRICAS:
+            valores = self._valores(metrica, origen)
+            if np.isnan(valores).all():
+                inferior = mediana = superior = np.nan
+            else:
+                inferior, mediana, superior = np.nanquantile(valores, [cola, 0.5, 1 - cola], method="inverted_cdf")
+            filas[metrica] = {"estimacion": self.estimacion[origen][metrica].item(), "inferior": inferior,
+                              "mediana": mediana, "superior": superior}
+        return pd.DataFrame.from_dict(filas, orient="index")
+
+    def probabilidades(self):
+        """Fracción de las muestras con estrés térmico, con ISC > 100 y en que el SWreq no se aplica.
+
+        ISC > 100 y SWreq no aplicable se calculan sobre las muestras con dato;
+        isc_sin_dato y swreq_sin_dato son la fracción de todas las muestras sin él
+        (NaN si ninguna muestra tiene dato).
+        """
+        isc, estado_swreq = self.muestras["isc"], self.muestras["swreq"]["estado"]
+        con_isc = isc["clasificacion"] != ClasificacionISC.SIN_DATO
+        con_swreq = estado_swreq != EstadoSudoracion.SIN_DATO
+        return {
+            "estres_termico": float(np.mean(self.muestras["tgbh"]["estado"] == EstadoTGBH.ESTRES_TERMICO)),
+            "isc_sobre_100": _fraccion(isc["isc"][con_isc] > 100),
+            "swreq_no_aplicable": _fraccion(estado_swreq[con_swreq] == EstadoSudoracion.EMAX_NEGATIVO),
+            "isc_sin_dato": float(np.mean(~con_isc)),
+            "swreq_sin_dato": float(np.mean(~con_swreq)),
+        }
+
+
+def _fraccion(mascara):
+    return float(np.mean(mascara)) if len(mascara) else np.nan
+
+
+def _evaluar(variables, parametros, aclimatacion, superficie):
+    ta, tg, tw, va = (variables[v] for v in ("temp_aire", "temp_globo", "temp_bulbo", "velocidad_aire"))
+    p = parametros
+    return {
+        "tgbh": tgbh_vec(p["radiacion_solar"], ta, tg, tw, p["cavs"], p["carga_metabolica"], aclimatacion),
+        "swreq": indice_de_sudoracion_vec(ta, tg, tw, p["iclo"], p["carga_metabolica"], va, p["postura"], aclimatacion,
+                                          p["conveccion"], superficie_corporal=superficie),
+        "isc": indice_sobrecarga_calorica_vec(p["carga_metabolica"], va, tg, ta, tw, p["iclo"], p.get("altura", 170),
+                                              p.get("peso", 70), superficie_corporal=superficie),
+    }
+
+
+def muestrear(variables, parametros, muestras=MUESTRAS, semilla=SEMILLA, exactitud=EXACTITUD_SENSORES,
+              desviacion_altura=DESVIACION_ALTURA, desviacion_peso=DESVIACION_PESO, proporcion_aclimatados=None):
+    """Variables, aclimatación y superficie corporal (arreglos de largo `muestras`) de una lectura."""
+    rng = np.random.default_rng(semilla)
+    muestreadas = {}
+    for variable, valor in variables.items():
+        error = exactitud.get(variable, 0.0)
+        muestreadas[variable] = float(valor) + rng.uniform(-error, error, muestras)
+    muestreadas["velocidad_aire"] = np.maximum(muestreadas["velocidad_aire"], 0)
+
+    altura, peso = float(parametros.get("altura", 170)), float(parametros.get("peso", 70))
+    alturas = np.clip(rng.normal(altura, desviacion_altura, muestras), *RANGO_ALTURA)
+    pesos = np.clip(rng.normal(peso, desviacion_peso, muestras), *RANGO_PESO)
+    superficie = SUPERFICIE_CORPORAL * superficie_dubois(pesos, alturas) / superficie_dubois(peso, altura)
+
+    if proporcion_aclimatados is None:
+        aclimatacion = parametros["aclimatacion"]
+    else:
+        aclimatacion = np.where(rng.random(muestras) < proporcion_aclimatados, "Si", "No")
+    return muestreadas, aclimatacion, superficie
+
+
+def evaluar_incertidumbre(variables, parametros, muestras=MUESTRAS, semilla=SEMILLA, **opciones):
+    """TGBH, SWreq e ISC de `muestras` variantes de una lectura (Incertidumbre).
+
+    `variables` tiene la lectura: temp_aire, temp_globo, temp_bulbo y
+    velocidad_aire. `parametros` tiene las condiciones de la tarea como en
+    src.lotes.evaluar_variables (radiacion_solar, cavs, carga_metabolica,
+    aclimatacion, iclo, postura, conveccion) más altura y peso promedio. Las
+    `opciones` son las de `muestrear` (exactitud, desviaciones y proporción de
+    aclimatados).
+    """
+    faltantes = [v for v in EXACTITUD_SENSORES if v not in variables]
+    if faltantes:
+        raise ValueError(f"Faltan variables de la lectura: {', '.join(faltantes)}")
+    variables = {v: variables[v] for v in EXACTITUD_SENSORES}
+    muestreadas, aclimatacion, superficie = muestrear(variables, parametros, muestras, semilla, **opciones)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        estimacion = _evaluar({v: np.array([valor], dtype=np.float64) for v, valor in variables.items()}, parametros,
+                              parametros["aclimatacion"], SUPERFICIE_CORPORAL)
+        resultados = _evaluar(muestreadas, parametros, aclimatacion, superficie)
+    return Incertidumbre(estimacion, resultados)
@@ -0,0 +1,199 @@
+"""Ingesta por bloques de archivos de registradores ambientales
+
+`ingerir` es un generador que lee el archivo en bloques de tamaño fijo, con tipos
+explícitos para las cinco columnas ambientales, valida y sanitiza cada bloque y
+lo entrega listo para los índices vectorizados. Solo se mantiene un bloque en
+memoria a la vez, sin importar el tamaño del archivo, y las estadísticas de la
+ingesta (filas leídas, descartadas y filas por segundo) se acumulan en un
+objeto EstadisticasIngesta. Cada fila válida conserva en la columna `fila` su
+posición en el archivo (desde 0), para fecharla aunque antes haya filas descartadas.
+
+Si el archivo trae solo una de las columnas de bulbo húmedo y humedad relativa,
+la otra se deriva fila por fila con src.psicrometria en lugar de tomar el valor
+por defecto; lo mismo con las celdas vacías de una de las dos.
+"""
+
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.funciones import sanitizar_dataframe
+from src.instrumentacion import registrar
+from src.psicrometria import completar_humedad
+
+# Columnas del archivo -> (variable, valor por defecto)
+COLUMNAS_AMBIENTALES = {
+    "Temperatura seca (°C)": ("temp_aire", 32.00),
+    "Temperatura de globo (°C)": ("temp_globo", 36.00),
+    "Temperatura de bulbo humedo (°C)": ("temp_bulbo", 28.00),
+    "Velocidad del aire (m/s)": ("velocidad_aire", 0.016),
+    "Humedad relativa (%)": ("humedad_relativa", 50.00),
+}
+VARIABLES = tuple(variable for variable, _ in COLUMNAS_AMBIENTALES.values())
+DTYPES_AMBIENTALES = {columna: np.float64 for columna in COLUMNAS_AMBIENTALES}
+# Variables que, si faltan, se derivan de la otra (src.psicrometria)
+DERIVABLES = {"temp_bulbo": "humedad_relativa", "humedad_relativa": "temp_bulbo"}
+
+# Rangos físicamente posibles; las filas fuera de rango o vacías se descartan
+RANGOS_VALIDOS = {
+    "temp_aire": (-40.0, 70.0),
+    "temp_globo": (-40.0, 120.0),
+    "temp_bulbo": (-40.0, 70.0),
+    "velocidad_aire": (0.0, 50.0),
+    "humedad_relativa": (0.0, 100.0),
+}
+
+TAMANO_BLOQUE = 100_000
+# Posición original (desde 0) de cada fila válida en el archivo
+COLUMNA_FILA = "fila"
+
+
+class EstadisticasIngesta:
+    """Contadores de una ingesta, actualizados bloque a bloque."""
+
+    def __init__(self):
+        self.bloques = 0
+        self.filas_leidas = 0
+        self.filas_descartadas = 0
+        self.columnas_faltantes = []
+        self.columnas_derivadas = []
+        self.segundos = 0.0
+
+    @property
+    def filas_validas(self):
+        return self.filas_leidas - self.filas_descartadas
+
+    @property
+    def filas_por_segundo(self):
+        return self.filas_leidas / self.segundos if self.segundos else math.nan
+
+    def __repr__(self):
+        return (f"EstadisticasIngesta(bloques={self.bloques}, filas_leidas={self.filas_leidas}, "
+                f"filas_descartadas={self.filas_descartadas}, filas_por_segundo={self.filas_por_segundo:.0f})")
+
+
+def _nombre(fuente):
+    return str(getattr(fuente, "name", fuente))
+
+
+def _rebobinar(fuente):
+    if hasattr(fuente, "seek"):
+        fuente.seek(0)
+
+
+def _bloques_csv(fuente, tamano_bloque, columnas_extra):
+    _rebobinar(fuente)
+    encabezado = pd.read_csv(fuente, nrows=0).columns
+    _rebobinar(fuente)
+    columnas = [c for c in encabezado if c in COLUMNAS_AMBIENTALES or c in columnas_extra]
+    dtypes = {c: DTYPES_AMBIENTALES.get(c, str) for c in columnas}
+    try:
+        yield from pd.read_csv(fuente, usecols=columnas, dtype=dtypes, chunksize=tamano_bloque)
+    except ValueError as error:
+        raise ValueError(f"Valores no numéricos en las columnas ambientales de {_nombre(fuente)}: {error}") from error
+
+
+def _bloques_excel(fuente, tamano_bloque, columnas_extra):
+    # openpyxl en modo de solo lectura recorre las filas sin cargar la hoja completa
+    from openpyxl import load_workbook
+
+    _rebobinar(fuente)
+    libro = load_workbook(fuente, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezado = [str(c) for c in next(filas, ())]
+        indices = [i for i, c in enumerate(encabezado) if c in COLUMNAS_AMBIENTALES or c in columnas_extra]
+        columnas = [encabezado[i] for i in indices]
+        pendientes = []
+        for fila in filas:
+            pendientes.append([fila[i] if i < len(fila) else None for i in indices])
+            if len(pendientes) == tamano_bloque:
+                yield pd.DataFrame(pendientes, columns=columnas)
+                pendientes = []
+        if pendientes:
+            yield pd.DataFrame(pendientes, columns=columnas)
+    finally:
+        libro.close()
+
+
+def leer_bloques(fuente, tamano_bloque=TAMANO_BLOQUE, columnas_extra=()):
+    """Bloques crudos (DataFrames) de un CSV o XLSX con solo las columnas necesarias."""
+    nombre = _nombre(fuente).lower()
+    if nombre.endswith(".xlsx"):
+        return _bloques_excel(fuente, tamano_bloque, columnas_extra)
+    # Un archivo abierto sin nombre (por ejemplo BytesIO) se trata como CSV
+    if nombre.endswith(".csv") or not isinstance(fuente, str) and not hasattr(fuente, "name"):
+        return _bloques_csv(fuente, tamano_bloque, columnas_extra)
+    raise ValueError("Formato de archivo no soportado")
+
+
+def preparar_bloque(bloque, columnas_extra=()):
+    """Valida y sanitiza un bloque crudo.
+
+    Devuelve un DataFrame con las cinco variables ambientales como float64
+    (renombradas a sus nombres de variable), las columnas extra sanitizadas y
+    solo las filas válidas, junto con el número de filas descartadas, la lista
+    de columnas ausentes que toman el valor por defecto y la de columnas
+    ausentes derivadas de otra (DERIVABLES).
+    """
+    presentes = {variable for columna, (variable, _) in COLUMNAS_AMBIENTALES.items() if columna in bloque.columns}
+    preparado = {}
+    faltantes = []
+    derivadas = []
+    for columna, (variable, valor_default) in COLUMNAS_AMBIENTALES.items():
+        if columna in bloque.columns:
+            preparado[variable] = pd.to_numeric(bloque[columna], errors="coerce").to_numpy(dtype=np.float64)
+        elif DERIVABLES.get(variable) in presentes:
+            preparado[variable] = np.full(len(bloque), np.nan)
+            derivadas.append(columna)
+        else:
+            preparado[variable] = np.full(len(bloque), valor_default)
+            faltantes.append(columna)
+    # Las celdas vacías de bulbo húmedo o humedad relativa (y la columna derivada) se completan con la otra
+    completar_humedad(preparado)
+    validas = np.ones(len(bloque), dtype=bool)
+    for variable, (minimo, maximo) in RANGOS_VALIDOS.items():
+        valores = preparado[variable]
+        validas &= (valores >= minimo) & (valores <= maximo)
+    preparado = pd.DataFrame(preparado, index=bloque.index)
+    extras = [c for c in columnas_extra if c in bloque.columns]
+    if extras:
+        preparado = preparado.join(sanitizar_dataframe(bloque[extras]))
+    descartadas = int(len(bloque) - validas.sum())
+    if descartadas:
+        preparado = preparado[validas]
+    return preparado.reset_index(drop=True), descartadas, faltantes, derivadas
+
+
+def ingerir(fuente, tamano_bloque=TAMANO_BLOQUE, columnas_extra=(), estadisticas=None):
+    """Generador de bloques validados listos para los índices vectorizados.
+
+    `fuente` es una ruta o un archivo abierto (CSV o XLSX). `columnas_extra` son
+    columnas de texto a conservar (por ejemplo fecha u hora), que se sanitizan.
+    Cada bloque trae además la columna COLUMNA_FILA con la posición de sus filas
+    en el archivo.
+    Si se pasa `estadisticas` (EstadisticasIngesta) se actualiza con cada bloque;
+    el tiempo medido incluye solo la lectura y la preparación, no el consumo.
+    """
+    estadisticas = estadisticas if estadisticas is not None else EstadisticasIngesta()
+    bloques = leer_bloques(fuente, tamano_bloque, columnas_extra)
+    while True:
+        inicio = time.perf_counter()
+        bloque = next(bloques, None)
+        if bloque is None:
+            break
+        # La posición viaja como columna extra para conservar solo la de las filas válidas
+        posiciones = np.arange(estadisticas.filas_leidas, estadisticas.filas_leidas + len(bloque))
+        bloque = bloque.assign(**{COLUMNA_FILA: posiciones})
+        preparado, descartadas, faltantes, derivadas = preparar_bloque(bloque, (*columnas_extra, COLUMNA_FILA))
+        segundos = time.perf_counter() - inicio
+        registrar("ingesta.bloque", segundos)
+        estadisticas.segundos += segundos
+        estadisticas.bloques += 1
+        estadisticas.filas_leidas += len(bloque)
+        estadisticas.filas_descartadas += descartadas
+        estadisticas.columnas_faltantes = faltantes
+        estadisticas.columnas_derivadas = derivadas
+        yield preparado
@@ -0,0 +1,227 @@
+"""Modo multiinquilino: tablas de referencia compartidas y caché de resultados por inquilino
+
+Un mismo proceso de Streamlit atiende a varias empresas (inquilinos). Las tablas
+de data/ se leen una sola vez por proceso (src.cache) y quedan de solo lectura;
+todas las sesiones usan los mismos objetos. Cada inquilino puede tener su propia
+carpeta con versiones de CAVS.csv, Metabolismo.csv y Aislamiento.csv, con las
+mismas columnas que las de data/: sus filas reemplazan a las de igual nombre
+(Conjunto, Clase o Ropa de trabajo) y las nuevas se agregan al final. Las tablas
+fusionadas se calculan una vez por inquilino (y de nuevo solo si cambia alguno
+de sus archivos); un inquilino sin tablas propias usa directamente las de data/.
+
+El modo se activa con la variable INQUILINOS, la carpeta que contiene una
+subcarpeta por inquilino; la aplicación elige el inquilino con ?inquilino=nombre
+en la URL:
+
+    inquilinos/
+        minera_norte/Aislamiento.csv
+        agricola_sur/Metabolismo.csv
+
+    INQUILINOS=inquilinos streamlit run app.py
+
+`resultados` es una caché LRU por inquilino, acotada en bytes
+(INQUILINOS_MEMORIA_MB por inquilino), para resultados caros (resumen de un
+archivo, evaluación por lotes, barrido). La clave incluye una huella del
+contenido del archivo, así que las sesiones de un mismo inquilino que cargan el
+mismo archivo comparten un solo resultado, y si varias lo piden a la vez se
+calcula una vez. Los valores se comparten entre sesiones y no deben modificarse.
+"""
+
+import hashlib
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from src.cache import cargar_tablas_referencia, congelar
+
+RAIZ_INQUILINOS = Path(os.environ["INQUILINOS"]) if os.environ.get("INQUILINOS") else None
+MODO_MULTIINQUILINO = RAIZ_INQUILINOS is not None
+
+# Memoria máxima de resultados memorizados por inquilino (bytes)
+MEMORIA_POR_INQUILINO = int(os.environ.get("INQUILINOS_MEMORIA_MB", 64)) * 2**20
+
+# (archivo, columna con el nombre, columna con el valor) en el orden de cargar_tablas_referencia
+TABLAS = (
+    ("CAVS.csv", "Conjunto", "CAV"),
+    ("Metabolismo.csv", "Clase", "Tasa metabólica"),
+    ("Aislamiento.csv", "Ropa de trabajo", "m²·K/W"),
+)
+
+# Nombres de inquilino admitidos (también son nombres de carpeta)
+PATRON_NOMBRE = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+_candado = threading.Lock()
+# inquilino -> (fechas de modificación de sus archivos, tablas fusionadas)
+_tablas = {}
+
+
+def carpeta_inquilino(nombre):
+    """Carpeta del inquilino `nombre`; ValueError si el nombre no es válido o no existe."""
+    if RAIZ_INQUILINOS is None:
+        raise ValueError("El modo multiinquilino no está activo (variable de entorno INQUILINOS)")
+    if not PATRON_NOMBRE.fullmatch(nombre):
+        raise ValueError(f"Nombre de inquilino no válido: '{nombre}' (solo letras, números, '_' y '-')")
+    carpeta = RAIZ_INQUILINOS / nombre
+    if not carpeta.is_dir():
+        raise ValueError(f"Inquilino desconocido: '{nombre}'")
+    return carpeta
+
+
+def _fecha_modificacion(ruta):
+    try:
+        return ruta.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _fusionar(base, ruta, columna_nombre, columna_valor):
+    """`base` con las filas del CSV `ruta` encima (reemplazan por nombre o se agregan)."""
+    import pandas as pd
+
+    propia = pd.read_csv(ruta, encoding="utf-8-sig")
+    faltantes = [c for c in (columna_nombre, columna_valor) if c not in propia.columns]
+    if faltantes:
+        raise ValueError(f"{ruta}: faltan las columnas {', '.join(faltantes)}")
+    try:
+        propia[columna_valor] = pd.to_numeric(propia[columna_valor])
+    except (TypeError, ValueError):
+        raise ValueError(f"{ruta}: la columna '{columna_valor}' debe ser numérica") from None
+    fusion = pd.concat([base, propia[[c for c in propia.columns if c in base.columns]]], ignore_index=True)
+    fusion = fusion.drop_duplicates(columna_nombre, keep="last").reset_index(drop=True)
+    return congelar(fusion)
+
+
+def tablas_inquilino(nombre=""):
+    """(lista_cavs, lista_metabolismo, lista_clo) del inquilino `nombre` ("" = tablas de data/).
+
+    Las tablas se comparten entre todas las sesiones del inquilino y son de
+    solo lectura. Si cambia algún archivo del inquilino se vuelven a fusionar y
+    se descartan sus resultados memorizados.
+    """
+    base = cargar_tablas_referencia()
+    if not nombre:
+        return base
+    carpeta = carpeta_inquilino(nombre)
+    fechas = tuple(_fecha_modificacion(carpeta / archivo) for archivo, _, _ in TABLAS)
+    with _candado:
+        guardadas = _tablas.get(nombre)
+    if guardadas is not None and guardadas[0] == fechas:
+        return guardadas[1]
+    tablas = tuple(
+        tabla if fecha is None else _fusionar(tabla, carpeta / archivo, columna_nombre, columna_valor)
+        for tabla, fecha, (archivo, columna_nombre, columna_valor) in zip(base, fechas, TABLAS)
+    )
+    with _candado:
+        _tablas[nombre] = (fechas, tablas)
+    if guardadas is not None:
+        resultados.limpiar(nombre)
+    return tablas
+
+
+def huella(archivo):
+    """Huella del contenido de un archivo cargado (BytesIO o UploadedFile), sin moverlo."""
+    return hashlib.blake2b(archivo.getbuffer(), digest_size=16).hexdigest()
+
+
+def tamano_aproximado(valor):
+    """Bytes aproximados de `valor`: DataFrames y arreglos por sus datos, contenedores y objetos recorridos."""
+    if hasattr(valor, "nbytes") and not hasattr(valor, "memory_usage"):
+        return int(valor.nbytes)
+    if hasattr(valor, "memory_usage"):
+        uso = valor.memory_usage(deep=True)
+        return int(uso.sum()) if hasattr(uso, "sum") else int(uso)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamano_aproximado(k) + tamano_aproximado(v) for k, v in valor.items())
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return sys.getsizeof(valor) + sum(tamano_aproximado(v) for v in valor)
+    if hasattr(valor, "__dict__"):
+        return sys.getsizeof(valor) + tamano_aproximado(vars(valor))
+    return sys.getsizeof(valor)
+
+
+class CacheResultados:
+    """LRU por inquilino, acotada en bytes, compartida por todas las sesiones del proceso.
+
+    Cada inquilino tiene su propia partición: los resultados de uno nunca se
+    devuelven a otro ni desplazan los de otro. Los valores más grandes que la
+    partición completa no se guardan.
+    """
+
+    def __init__(self, bytes_por_inquilino=MEMORIA_POR_INQUILINO):
+        self.bytes_por_inquilino = bytes_por_inquilino
+        self._particiones = {}
+        self._ocupados = {}
+        self._aciertos = {}
+        self._fallos = {}
+        self._en_curso = {}
+        self._candado = threading.Lock()
+
+    def obtener_o_calcular(self, inquilino, clave, calcular):
+        """Resultado memorizado de `clave` para `inquilino`, o `calcular()` guardado.
+
+        Si otra sesión ya está calculando la misma clave, espera su resultado en
+        lugar de repetir el cálculo.
+        """
+        while True:
+            with self._candado:
+                particion = self._particiones.setdefault(inquilino, OrderedDict())
+                if clave in particion:
+                    particion.move_to_end(clave)
+                    self._aciertos[inquilino] = self._aciertos.get(inquilino, 0) + 1
+                    return particion[clave][0]
+                evento = self._en_curso.get((inquilino, clave))
+                if evento is None:
+                    evento = self._en_curso[(inquilino, clave)] = threading.Event()
+                    self._fallos[inquilino] = self._fallos.get(inquilino, 0) + 1
+                    break
+            # Si el cálculo ajeno falla o no se guarda, se intenta de nuevo
+            evento.wait()
+        try:
+            valor = calcular()
+            self.guardar(inquilino, clave, valor)
+            return valor
+        finally:
+            with self._candado:
+                del self._en_curso[(inquilino, clave)]
+            evento.set()
+
+    def guardar(self, inquilino, clave, valor):
+        tamano = tamano_aproximado(valor)
+        if tamano > self.bytes_por_inquilino:
+            return
+        with self._candado:
+            particion = self._particiones.setdefault(inquilino, OrderedDict())
+            if clave in particion:
+                self._ocupados[inquilino] -= particion.pop(clave)[1]
+            ocupado = self._ocupados.get(inquilino, 0) + tamano
+            while ocupado > self.bytes_por_inquilino:
+                _, (_, liberado) = particion.popitem(last=False)
+                ocupado -= liberado
+            particion[clave] = (valor, tamano)
+            self._ocupados[inquilino] = ocupado
+
+    def limpiar(self, inquilino=None):
+        """Descarta los resultados de `inquilino` (o de todos)."""
+        with self._candado:
+            for nombre in list(self._particiones) if inquilino is None else [inquilino]:
+                self._particiones.pop(nombre, None)
+                self._ocupados.pop(nombre, None)
+
+    def estado(self):
+        """{inquilino: {entradas, bytes, aciertos, fallos}}."""
+        with self._candado:
+            return {
+                nombre: {
+                    "entradas": len(particion),
+                    "bytes": self._ocupados.get(nombre, 0),
+                    "aciertos": self._aciertos.get(nombre, 0),
+                    "fallos": self._fallos.get(nombre, 0),
+                }
+                for nombre, particion in self._particiones.items()
+            }
+
+
+resultados = CacheResultados()
@@ -0,0 +1,253 @@
+"""Instrumentación opcional: tramos con tiempo, conteos e histogramas de latencia
+
+Se activa con la variable de entorno INSTRUMENTACION=1 al iniciar el proceso
+(la aplicación, el servicio o un script). Desactivada no cuesta nada en los
+índices: `instrumentar` devuelve la misma función sin envolver, `medir` devuelve
+un contexto vacío compartido y `registrar` retorna de inmediato.
+
+Activada, cada tramo (ingesta de un bloque, cada índice escalar de
+src.funciones, cada gráfico y cada ejecución de app.py) acumula cuenta, suma e
+histograma de duraciones en cubetas fijas de 1 µs a 10 s. Los datos se exportan
+en formato de texto de Prometheus (`como_prometheus`) o como JSON
+(`como_json`), y `servir` los publica en un servidor HTTP local:
+
+    INSTRUMENTACION=1 streamlit run app.py
+    curl localhost:9464/metricas          # Prometheus
+    curl localhost:9464/metricas.json
+
+El servicio HTTP (src.servicio) publica lo mismo en GET /metricas de cada
+proceso. Las métricas son por proceso.
+"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+
+ACTIVA = os.environ.get("INSTRUMENTACION", "") not in ("", "0")
+PUERTO_POR_DEFECTO = int(os.environ.get("INSTRUMENTACION_PUERTO", 9464))
+
+# Límites superiores (s) de las cubetas del histograma: 1, 2.5 y 5 por década, de 1 µs a 10 s
+LIMITES = tuple(float(f"{m}e{e}") for e in range(-6, 1) for m in (1, 2.5, 5)) + (10.0,)
+PERCENTILES = (0.5, 0.95, 0.99)
+
+# Cada hilo acumula en sus propios histogramas (sin candado en `registrar`); al
+# exportar se suman, y los de hilos terminados se consolidan en _terminados
+_local = threading.local()
+_por_hilo = []
+_terminados = {}
+_candado = threading.Lock()
+_servidor = None
+
+
+class Histograma:
+    """Cuenta, suma y conteo por cubeta (no acumulado) de las duraciones de un tramo."""
+
+    __slots__ = ("cuenta", "suma", "cubetas")
+
+    def __init__(self):
+        self.cuenta = 0
+        self.suma = 0.0
+        # Una cubeta más para las duraciones sobre el último límite (+Inf)
+        self.cubetas = [0] * (len(LIMITES) + 1)
+
+    def sumar(self, otro):
+        self.cuenta += otro.cuenta
+        self.suma += otro.suma
+        self.cubetas = [a + b for a, b in zip(self.cubetas, otro.cubetas)]
+
+    def percentil(self, q):
+        """Límite superior de la cubeta que contiene el percentil `q` (inf si cae sobre 10 s)."""
+        objetivo = q * self.cuenta
+        acumulado = 0
+        for limite, cuenta in zip(LIMITES + (float("inf"),), self.cubetas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return limite
+        return float("inf")
+
+
+def registrar(nombre, segundos):
+    """Agrega una duración al tramo `nombre` (no hace nada si la instrumentación está desactivada)."""
+    if not ACTIVA:
+        return
+    try:
+        propios = _local.histogramas
+    except AttributeError:
+        propios = _local.histogramas = {}
+        with _candado:
+            _por_hilo.append((threading.current_thread(), propios))
+    histograma = propios.get(nombre)
+    if histograma is None:
+        histograma = propios[nombre] = Histograma()
+    histograma.cuenta += 1
+    histograma.suma += segundos
+    histograma.cubetas[bisect.bisect_left(LIMITES, segundos)] += 1
+
+
+class Tramo:
+    """Contexto que mide su bloque con perf_counter y lo registra al salir."""
+
+    __slots__ = ("nombre", "inicio")
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        registrar(self.nombre, time.perf_counter() - self.inicio)
+
+
+class _TramoVacio:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return None
+
+
+_TRAMO_VACIO = _TramoVacio()
+
+
+def medir(nombre):
+    """Contexto `with medir("app.grafico_calor"): ...`; vacío si la instrumentación está desactivada."""
+    return Tramo(nombre) if ACTIVA else _TRAMO_VACIO
+
+
+def instrumentar(nombre):
+    """Decorador que mide cada llamada de la función como el tramo `nombre`.
+
+    Se decide al importar: desactivada, la función se devuelve sin envolver.
+    """
+    def decorador(funcion):
+        if not ACTIVA:
+            return funcion
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                registrar(nombre, time.perf_counter() - inicio)
+
+        return envoltura
+
+    return decorador
+
+
+def reiniciar():
+    """Descarta todas las métricas acumuladas."""
+    with _candado:
+        _terminados.clear()
+        for _, propios in _por_hilo:
+            propios.clear()
+
+
+def _copia():
+    """Suma de los histogramas de todos los hilos (los de hilos terminados se consolidan)."""
+    with _candado:
+        vivos = []
+        for hilo, propios in _por_hilo:
+            if hilo.is_alive():
+                vivos.append((hilo, propios))
+                continue
+            for nombre, histograma in propios.items():
+                _terminados.setdefault(nombre, Histograma()).sumar(histograma)
+        _por_hilo[:] = vivos
+        copia = {}
+        for propios in [_terminados, *(propios for _, propios in vivos)]:
+            for nombre, histograma in list(propios.items()):
+                copia.setdefault(nombre, Histograma()).sumar(histograma)
+        return copia
+
+
+def metricas():
+    """{tramo: {cuenta, suma_s, media_s, p50_s, p95_s, p99_s, cubetas}} con cubetas acumuladas por límite."""
+    resultado = {}
+    for nombre, histograma in sorted(_copia().items()):
+        acumuladas = []
+        acumulado = 0
+        for cuenta in histograma.cubetas:
+            acumulado += cuenta
+            acumuladas.append(acumulado)
+        resultado[nombre] = {
+            "cuenta": histograma.cuenta,
+            "suma_s": histograma.suma,
+            "media_s": histograma.suma / histograma.cuenta,
+            **{f"p{round(q * 100)}_s": histograma.percentil(q) for q in PERCENTILES},
+            "cubetas": {**{repr(limite): n for limite, n in zip(LIMITES, acumuladas)}, "+Inf": acumuladas[-1]},
+        }
+    return resultado
+
+
+def como_json():
+    """Métricas como texto JSON (los percentiles sobre el último límite se informan como null)."""
+    import json
+
+    datos = metricas()
+    for tramo in datos.values():
+        for q in PERCENTILES:
+            clave = f"p{round(q * 100)}_s"
+            if tramo[clave] == float("inf"):
+                tramo[clave] = None
+    return json.dumps(datos, ensure_ascii=False, indent=2)
+
+
+def como_prometheus():
+    """Métricas en el formato de texto de Prometheus (un histograma con la etiqueta `tramo`)."""
+    lineas = [
+        "# HELP hems_tramo_segundos Duración de los tramos instrumentados",
+        "# TYPE hems_tramo_segundos histogram",
+    ]
+    for nombre, tramo in metricas().items():
+        etiqueta = nombre.replace("\\", "\\\\").replace('"', '\\"')
+        for limite, cuenta in tramo["cubetas"].items():
+            lineas.append(f'hems_tramo_segundos_bucket{{tramo="{etiqueta}",le="{limite}"}} {cuenta}')
+        lineas.append(f'hems_tramo_segundos_sum{{tramo="{etiqueta}"}} {tramo["suma_s"]!r}')
+        lineas.append(f'hems_tramo_segundos_count{{tramo="{etiqueta}"}} {tramo["cuenta"]}')
+    return "\n".join(lineas) + "\n"
+
+
+def servir(puerto=PUERTO_POR_DEFECTO, host="127.0.0.1"):
+    """Publica /metricas (Prometheus) y /metricas.json en un hilo; una sola vez por proceso.
+
+    Devuelve el servidor, o None si la instrumentación está desactivada.
+    """
+    global _servidor
+    if not ACTIVA:
+        return None
+    with _candado:
+        if _servidor is not None:
+            return _servidor
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                ruta = self.path.split("?")[0].rstrip("/")
+                if ruta == "/metricas":
+                    cuerpo, tipo = como_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+                elif ruta == "/metricas.json":
+                    cuerpo, tipo = como_json(), "application/json; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                cuerpo = cuerpo.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", tipo)
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        _servidor = ThreadingHTTPServer((host, puerto), Manejador)
+        threading.Thread(target=_servidor.serve_forever, name="instrumentacion", daemon=True).start()
+        return _servidor
@@ -0,0 +1,346 @@
+"""Temperatura de globo y de bulbo húmedo natural a partir de datos de estaciones meteorológicas
+
+Las estaciones meteorológicas miden la temperatura del aire, la humedad
+relativa, el viento y la irradiancia solar global, pero no tienen globo ni bulbo
+húmedo natural, así que el TGBH, el SWreq y el ISC no se pueden calcular con sus
+datos. Este módulo estima ambas temperaturas con el modelo de Liljegren et al.
+(2008, J. Occup. Environ. Hyg. 5:645-655): balances de energía del globo negro
+de 50.8 mm y de la mecha húmeda (7 mm x 25.4 mm), con convección, radiación de
+onda larga del cielo y del suelo, radiación solar directa y difusa y, en la
+mecha, evaporación.
+
+Cada balance es un punto fijo en la temperatura del sensor con el criterio de
+convergencia del modelo original, resuelto sobre arreglos con pasos de secante:
+en cada paso solo se actualizan los elementos que aún no convergen (máscara de
+convergencia por elemento, como en src.fanger), así que un año de datos
+horarios de cientos de estaciones se estima en segundos. Los elementos que no
+convergen en ITERACIONES_MAXIMAS quedan como NaN.
+
+La fracción directa de la radiación solar se estima con la irradiancia
+normalizada por la del tope de la atmósfera (`coseno_cenital` da la posición
+del sol a partir de la fecha y hora en UTC). El viento se lleva a los 2 m del
+modelo con una ley de potencia; el modelo original elige el exponente según la
+clase de estabilidad, aquí es un parámetro (EXPONENTE_VIENTO, clase D neutra).
+
+El resultado tiene las variables del repositorio (temp_aire, temp_globo,
+temp_bulbo, velocidad_aire, humedad_relativa), con temp_bulbo como bulbo húmedo
+natural, igual que el de los medidores de TGBH, así que pasa directo a
+src.lotes.evaluar_variables o a tgbh_vec y las demás funciones de
+src.vectorizado.
+
+Uso:
+    python -m src.liljegren estacion.csv --latitud 9.93 --longitud -84.08 [--altura-viento 10] [--salida variables.csv]
+
+estacion.csv tiene una fila por hora con fecha_hora (UTC, a la mitad del
+intervalo de promedio), temp_aire (°C), humedad_relativa (%), velocidad_viento
+(m/s), radiacion_solar (W/m², global horizontal) y opcionalmente presion (hPa).
+--salida escribe las variables con los nombres de columna de los registradores
+(src.ingesta.COLUMNAS_AMBIENTALES), así que el archivo se carga como cualquier
+otro en la aplicación o en src.paralelo.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.ingesta import COLUMNAS_AMBIENTALES, VARIABLES
+from src.vectorizado import _numerico
+
+COLUMNAS_ESTACION = ("fecha_hora", "temp_aire", "humedad_relativa", "velocidad_viento", "radiacion_solar")
+
+# Constantes físicas
+STEFAN_BOLTZMANN = 5.6696e-8  # W/(m²·K⁴)
+CALOR_ESPECIFICO = 1003.5  # J/(kg·K), aire seco
+MASA_MOLAR_AIRE = 28.97
+MASA_MOLAR_AGUA = 18.015
+CONSTANTE_GASES = 8314.34  # J/(kmol·K)
+CONSTANTE_AIRE = CONSTANTE_GASES / MASA_MOLAR_AIRE
+PRANDTL = CALOR_ESPECIFICO / (CALOR_ESPECIFICO + 1.25 * CONSTANTE_AIRE)
+RELACION_CALOR = CALOR_ESPECIFICO * MASA_MOLAR_AIRE / MASA_MOLAR_AGUA
+CONSTANTE_SOLAR = 1367.0  # W/m²
+PRESION = 1013.25  # hPa
+
+# Globo, mecha y suelo del modelo
+DIAMETRO_GLOBO = 0.0508  # m
+EMISIVIDAD_GLOBO = 0.95
+ALBEDO_GLOBO = 0.05
+DIAMETRO_MECHA = 0.007  # m
+LARGO_MECHA = 0.0254  # m
+EMISIVIDAD_MECHA = 0.95
+ALBEDO_MECHA = 0.4
+EMISIVIDAD_SUELO = 0.999
+ALBEDO_SUELO = 0.45
+
+VELOCIDAD_MINIMA = 0.13  # m/s, convección natural
+ALTURA_VIENTO = 2.0  # m, altura del viento del modelo
+EXPONENTE_VIENTO = 0.15  # ley de potencia del perfil de viento (clase D)
+COSENO_CENITAL_MINIMO = 0.00873  # cos(89.5°): sol bajo el horizonte
+RADIACION_NORMALIZADA_MAXIMA = 0.85
+
+# Punto fijo t = f(t) hasta |f(t) - t| < TOLERANCIA; RELAJACION es la del modelo original (t <- t + 0.1·(f(t) - t))
+TOLERANCIA = 0.02  # K
+RELAJACION = 0.1
+ITERACIONES_MAXIMAS = 50
+
+DTYPE_ESTIMACION = np.dtype([("temp_globo", "f8"), ("temp_bulbo", "f8"), ("velocidad_aire", "f8"),
+                             ("radiacion_solar", "f8"), ("fraccion_directa", "f8")])
+
+
+"""Posición del sol y radiación"""
+
+def coseno_cenital(fechas, latitud, longitud):
+    """Coseno del ángulo cenital del sol y (r0/r)² de la distancia Tierra-Sol (ecuaciones de NOAA).
+
+    `fechas` son datetime64 en UTC; latitud y longitud en grados (este y norte
+    positivos). Las entradas se combinan con broadcasting: fechas (T,) y
+    latitudes (S, 1) dan (S, T).
+    """
+    fechas = np.asarray(fechas, dtype="datetime64[s]")
+    anio = fechas.astype("datetime64[Y]")
+    dias_anio = ((anio + 1).astype("datetime64[D]") - anio.astype("datetime64[D]")).astype(np.float64)
+    dia = (fechas - anio.astype("datetime64[s]")).astype(np.float64) / 86400
+    gamma = 2 * np.pi / dias_anio * (dia - 0.5)
+    coseno, seno = np.cos(gamma), np.sin(gamma)
+    coseno2, seno2 = np.cos(2 * gamma), np.sin(2 * gamma)
+    declinacion = (0.006918 - 0.399912 * coseno + 0.070257 * seno - 0.006758 * coseno2 + 0.000907 * seno2
+                   - 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma))
+    ecuacion_tiempo = 229.18 * (0.000075 + 0.001868 * coseno - 0.032077 * seno - 0.014615 * coseno2 - 0.040849 * seno2)
+    minutos = (fechas - fechas.astype("datetime64[D]")).astype(np.float64) / 60
+    angulo_horario = np.radians((minutos + ecuacion_tiempo + 4 * _numerico(longitud)) / 4 - 180)
+    latitud = np.radians(_numerico(latitud))
+    cza = np.sin(latitud) * np.sin(declinacion) + np.cos(latitud) * np.cos(declinacion) * np.cos(angulo_horario)
+    distancia = 1.000110 + 0.034221 * coseno + 0.001280 * seno + 0.000719 * coseno2 + 0.000077 * seno2
+    return cza, np.broadcast_to(distancia, cza.shape)
+
+
+def fraccion_directa(radiacion_solar, cza, distancia=1.0):
+    """Radiación solar acotada por la del tope de la atmósfera y su fracción directa.
+
+    Con el sol bajo el horizonte la radiación y la fracción directa son 0.
+    """
+    radiacion_solar, cza = _numerico(radiacion_solar), _numerico(cza)
+    tope = np.where(cza > COSENO_CENITAL_MINIMO, CONSTANTE_SOLAR * cza * _numerico(distancia), 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normalizada = np.clip(radiacion_solar / tope, 0, RADIACION_NORMALIZADA_MAXIMA)
+        directa = np.clip(np.exp(3 - 1.34 * normalizada - 1.65 / normalizada), 0, 0.9)
+    sol = tope > 0
+    return np.where(sol, normalizada * tope, 0.0), np.where(sol & (normalizada > 0), directa, 0.0)
+
+
+def velocidad_a_2m(velocidad, altura=ALTURA_VIENTO, exponente=EXPONENTE_VIENTO):
+    """Velocidad del viento (m/s) a 2 m a partir de la medida a `altura` m (ley de potencia)."""
+    return _numerico(velocidad) * (ALTURA_VIENTO / _numerico(altura)) ** exponente
+
+
+"""Propiedades del aire (en K y hPa)"""
+
+def presion_saturacion(temp):
+    """Presión de vapor de saturación sobre agua (hPa) de Buck (1981) con factor de realce, temperatura en K."""
+    return 1.004 * 6.1121 * np.exp(17.502 * (temp - 273.15) / (temp - 32.18))
+
+
+def punto_de_rocio(presion_vapor):
+    """Temperatura de rocío (K) para una presión de vapor (hPa); inversa de presion_saturacion."""
+    z = np.log(presion_vapor / (6.1121 * 1.004))
+    return 273.15 + 240.97 * z / (17.502 - z)
+
+
+def emisividad_atmosfera(temp, humedad):
+    """Emisividad de la atmósfera con la humedad como fracción."""
+    return 0.575 * (humedad * presion_saturacion(temp)) ** 0.143
+
+
+def viscosidad(temp):
+    """Viscosidad del aire (kg/(m·s))."""
+    omega = (temp / 97.0 - 2.9) / 0.4 * -0.034 + 1.048
+    return 2.6693e-6 * np.sqrt(MASA_MOLAR_AIRE * temp) / (3.617 * 3.617 * omega)
+
+
+def difusividad(temp, presion):
+    """Difusividad del vapor de agua en aire (m²/s)."""
+    constante = (3.640e-4 * (36.4 * 218.0) ** (1 / 3) * (132.0 * 647.3) ** (5 / 12)
+                 * np.sqrt(1 / MASA_MOLAR_AIRE + 1 / MASA_MOLAR_AGUA) * 1e-4)
+    return constante * (temp / np.sqrt(132.0 * 647.3)) ** 2.334 * 1013.25 / presion
+
+
+def calor_evaporacion(temp):
+    """Calor latente de evaporación del agua (J/kg)."""
+    return (313.15 - temp) / 30.0 * -71100.0 + 2.4073e6
+
+
+"""Balances del globo y de la mecha"""
+
+def _punto_fijo(actualizar, inicial, *datos):
+    """Punto fijo t = actualizar(t, *datos) con máscara de convergencia por elemento.
+
+    El criterio es el del modelo original (|f(t) - t| < TOLERANCIA, y el
+    resultado es f(t)), pero el paso es el de la secante sobre f(t) - t en
+    lugar de la relajación t <- 0.9·t + 0.1·f(t), que solo se usa en el primer
+    paso y donde la secante no da un número: converge en 5 a 7 evaluaciones en
+    lugar de 25 a 35, al mismo punto fijo. `datos` son arreglos planos del
+    largo de `inicial`. Cada elemento guarda su valor en el paso en que
+    converge y deja de contar; las copias de los pendientes se compactan cuando
+    quedan vivos la mitad o menos. Los que no convergen (o dan un valor no
+    numérico) quedan como NaN.
+    """
+    valor = np.full(inicial.shape, np.nan)
+    pendientes = np.flatnonzero(np.isfinite(inicial))
+    t = inicial[pendientes]
+    datos = [d[pendientes] for d in datos]
+    vivos = np.ones(pendientes.shape, dtype=bool)
+    anterior = residuo_anterior = None
+    for _ in range(ITERACIONES_MAXIMAS):
+        if not pendientes.size:
+            break
+        nuevo = actualizar(t, *datos)
+        residuo = nuevo - t
+        listos = (np.abs(residuo) < TOLERANCIA) & vivos
+        valor[pendientes[listos]] = nuevo[listos]
+        vivos &= ~listos & np.isfinite(nuevo)
+        paso = RELAJACION * residuo
+        if anterior is not None:
+            secante = residuo * (t - anterior) / (residuo_anterior - residuo)
+            paso = np.where(np.isfinite(secante), secante, paso)
+        anterior, residuo_anterior = t, residuo
+        t = t + paso
+        if np.count_nonzero(vivos) * 2 <= vivos.size:
+            pendientes, t, anterior, residuo_anterior = (a[vivos] for a in (pendientes, t, anterior, residuo_anterior))
+            datos = [d[vivos] for d in datos]
+            vivos = np.ones(pendientes.shape, dtype=bool)
+    return valor
+
+
+def _conveccion_globo(t, ta, viento, presion):
+    # Coeficiente de convección de una esfera (W/(m²·K)) con las propiedades a la temperatura media
+    tref = 0.5 * (t + ta)
+    mu = viscosidad(tref)
+    reynolds = viento * presion * 100 / (CONSTANTE_AIRE * tref) * DIAMETRO_GLOBO / mu
+    nusselt = 2.0 + 0.6 * np.sqrt(reynolds) * PRANDTL ** (1 / 3)
+    return nusselt * (CALOR_ESPECIFICO + 1.25 * CONSTANTE_AIRE) * mu / DIAMETRO_GLOBO
+
+
+def _globo(t, ta, viento, presion, radiacion):
+    # `radiacion` es el flujo de onda larga y solar absorbido, ya dividido por σ·ε
+    conveccion = _conveccion_globo(t, ta, viento, presion)
+    return np.sqrt(np.sqrt(radiacion - conveccion / (STEFAN_BOLTZMANN * EMISIVIDAD_GLOBO) * (t - ta)))
+
+
+def _bulbo_natural(t, ta, viento, presion, radiacion, presion_vapor):
+    # `radiacion` es el flujo de onda larga (sin la emisión de la mecha) y solar absorbido (W/m²)
+    tref = 0.5 * (t + ta)
+    mu = viscosidad(tref)
+    densidad = presion * 100 / (CONSTANTE_AIRE * tref)
+    reynolds = viento * densidad * DIAMETRO_MECHA / mu
+    conveccion = (0.281 * reynolds ** 0.6 * PRANDTL ** 0.44 * (CALOR_ESPECIFICO + 1.25 * CONSTANTE_AIRE) * mu
+                  / DIAMETRO_MECHA)
+    t2 = t * t
+    flujo = radiacion - STEFAN_BOLTZMANN * EMISIVIDAD_MECHA * t2 * t2
+    schmidt = mu / (densidad * difusividad(tref, presion))
+    presion_mecha = presion_saturacion(t)
+    return (ta - calor_evaporacion(tref) / RELACION_CALOR * (presion_mecha - presion_vapor) / (presion - presion_mecha)
+            * (PRANDTL / schmidt) ** 0.56 + flujo / conveccion)
+
+
+def estimar_vec(temp_aire, humedad_relativa, velocidad_viento, radiacion_solar, cza, distancia=1.0, presion=PRESION,
+                altura_viento=ALTURA_VIENTO, exponente_viento=EXPONENTE_VIENTO):
+    """Temperatura de globo y de bulbo húmedo natural (DTYPE_ESTIMACION) de cada elemento.
+
+    Temperaturas en °C, humedad relativa en %, viento en m/s medido a
+    `altura_viento` m, radiación solar global horizontal en W/m², presión en
+    hPa; `cza` y `distancia` son los de `coseno_cenital`. Las entradas se
+    combinan con broadcasting. El resultado trae también el viento a 2 m
+    (velocidad_aire, la del repositorio), la radiación acotada y su fracción
+    directa.
+    """
+    entradas = (temp_aire, humedad_relativa, velocidad_viento, radiacion_solar, cza, distancia, presion, altura_viento)
+    entradas = np.broadcast_arrays(*(_numerico(e) for e in entradas))
+    forma = entradas[0].shape
+    ta, hr, viento, radiacion, cza, distancia, presion, altura = (e.ravel() for e in entradas)
+    resultado = np.empty(forma, dtype=DTYPE_ESTIMACION)
+    plano = resultado.reshape(-1)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        velocidad_aire = velocidad_a_2m(viento, altura, exponente_viento)
+        viento = np.maximum(velocidad_aire, VELOCIDAD_MINIMA)
+        radiacion, directa = fraccion_directa(radiacion, cza, distancia)
+        ta = ta + 273.15
+        humedad = hr / 100
+        ta2 = ta * ta
+        onda_larga = 0.5 * (emisividad_atmosfera(ta, humedad) + EMISIVIDAD_SUELO) * ta2 * ta2
+        sol = directa > 0
+        cza_sol = np.where(sol, cza, 1.0)
+
+        # Globo: radiación absorbida dividida por σ·ε, punto de partida en la temperatura del aire
+        solar_globo = np.where(sol, directa * (1 / (2 * cza_sol) - 1), 0.0) + 1 + ALBEDO_SUELO
+        radiacion_globo = onda_larga + radiacion / (2 * STEFAN_BOLTZMANN * EMISIVIDAD_GLOBO) * (1 - ALBEDO_GLOBO) * solar_globo
+        temp_globo = _punto_fijo(_globo, ta.copy(), ta, viento, presion, radiacion_globo)
+
+        # Mecha: radiación absorbida, punto de partida en el punto de rocío
+        presion_vapor = humedad * presion_saturacion(ta)
+        proporcion = 0.25 * DIAMETRO_MECHA / LARGO_MECHA
+        tangente = np.sqrt(1 - cza_sol * cza_sol) / cza_sol
+        solar_mecha = (1 - directa) * (1 + proporcion) + directa * (tangente / np.pi + proporcion) + ALBEDO_SUELO
+        radiacion_mecha = STEFAN_BOLTZMANN * EMISIVIDAD_MECHA * onda_larga + (1 - ALBEDO_MECHA) * radiacion * solar_mecha
+        rocio = punto_de_rocio(presion_vapor)
+        inicial = np.where(np.isfinite(rocio), np.minimum(rocio, ta), ta)
+        inicial[~np.isfinite(radiacion_mecha)] = np.nan
+        temp_bulbo = _punto_fijo(_bulbo_natural, inicial, ta, viento, presion, radiacion_mecha, presion_vapor)
+
+    plano["temp_globo"] = temp_globo - 273.15
+    plano["temp_bulbo"] = temp_bulbo - 273.15
+    plano["velocidad_aire"] = velocidad_aire
+    plano["radiacion_solar"] = radiacion
+    plano["fraccion_directa"] = directa
+    return resultado
+
+
+def estimar_estacion(datos, latitud, longitud, altura_viento=ALTURA_VIENTO, exponente_viento=EXPONENTE_VIENTO):
+    """Variables del repositorio (DataFrame) a partir de los datos de una estación.
+
+    `datos` es un DataFrame (o dict de columnas) con COLUMNAS_ESTACION y
+    opcionalmente presion (hPa). El resultado tiene fecha_hora y las variables
+    de src.ingesta.VARIABLES, listo para src.lotes.evaluar_variables.
+    """
+    datos = pd.DataFrame(datos)
+    faltantes = [c for c in COLUMNAS_ESTACION if c not in datos]
+    if faltantes:
+        raise ValueError(f"Faltan columnas: {', '.join(faltantes)}")
+    fechas = pd.to_datetime(datos["fecha_hora"]).to_numpy(dtype="datetime64[s]")
+    cza, distancia = coseno_cenital(fechas, latitud, longitud)
+    presion = datos["presion"].to_numpy(dtype=np.float64) if "presion" in datos else PRESION
+    temp_aire = datos["temp_aire"].to_numpy(dtype=np.float64)
+    humedad_relativa = datos["humedad_relativa"].to_numpy(dtype=np.float64)
+    estimacion = estimar_vec(temp_aire, humedad_relativa, datos["velocidad_viento"].to_numpy(dtype=np.float64),
+                             datos["radiacion_solar"].to_numpy(dtype=np.float64), cza, distancia, presion,
+                             altura_viento, exponente_viento)
+    variables = {"temp_aire": temp_aire, "temp_globo": estimacion["temp_globo"], "temp_bulbo": estimacion["temp_bulbo"],
+                 "velocidad_aire": estimacion["velocidad_aire"], "humedad_relativa": humedad_relativa}
+    return pd.DataFrame({"fecha_hora": fechas, **{v: variables[v] for v in VARIABLES}})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temperatura de globo y bulbo húmedo natural a partir de datos de una estación")
+    parser.add_argument("estacion", help="CSV con fecha_hora (UTC), temp_aire, humedad_relativa, velocidad_viento, radiacion_solar")
+    parser.add_argument("--latitud", type=float, required=True)
+    parser.add_argument("--longitud", type=float, required=True)
+    parser.add_argument("--altura-viento", type=float, default=ALTURA_VIENTO, help="altura (m) del anemómetro")
+    parser.add_argument("--salida", help="CSV de salida con las columnas de los registradores (para la aplicación o src.paralelo)")
+    args = parser.parse_args()
+
+    datos = pd.read_csv(args.estacion)
+    inicio = time.perf_counter()
+    variables = estimar_estacion(datos, args.latitud, args.longitud, args.altura_viento)
+    segundos = time.perf_counter() - inicio
+    sin_convergencia = int(variables[["temp_globo", "temp_bulbo"]].isna().any(axis=1).sum())
+    print(f"{len(variables):,} filas en {segundos:.2f} s ({sin_convergencia} sin convergencia)")
+    with pd.option_context("display.width", 200):
+        print(variables.describe().T[["mean", "min", "max"]])
+    if args.salida:
+        columnas = {variable: columna for columna, (variable, _) in COLUMNAS_AMBIENTALES.items()}
+        variables.rename(columns=columnas).to_csv(args.salida, index=False)
+
+
+if __name__ == "__main__":
+    main()
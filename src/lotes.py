@@ -0,0 +1,304 @@
+"""Evaluación por lotes de archivos de registradores ambientales
+
+El archivo se lee por bloques con src.ingesta y cada fila (o cada ventana de
+filas promediadas) se evalúa con los cuatro índices vectorizados. Las estadísticas se
+acumulan bloque a bloque con histogramas de ancho fijo, de modo que la memoria
+no depende del tamaño del archivo.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from src.almacen import marcas_de_tiempo
+from src.resultados import ClasificacionISC, EstadoSudoracion
+from src.ingesta import (
+    COLUMNA_FILA, COLUMNAS_AMBIENTALES, TAMANO_BLOQUE, VARIABLES, EstadisticasIngesta, ingerir, leer_bloques,
+)
+from src.vectorizado import (
+    CLASIFICACIONES_ISC,
+    ESTADOS_SUDORACION,
+    ESTADOS_TGBH,
+    NIVELES_CALOR,
+    indice_de_calor_vec,
+    indice_de_sudoracion_vec,
+    indice_sobrecarga_calorica_vec,
+    tgbh_vec,
+)
+
+# Métricas con estadísticas: (columna, mínimo, máximo, ancho de clase del histograma)
+METRICAS = (
+    ("indice_calor", 0.0, 250.0, 0.1),
+    ("wbgt", 0.0, 80.0, 0.05),
+    ("wbgt_efectivo", 0.0, 100.0, 0.05),
+    ("isc", -500.0, 2000.0, 0.5),
+    ("dle_alarma_q", 0.0, 1440.0, 1.0),
+    ("dle_peligro_q", 0.0, 1440.0, 1.0),
+    ("dle_alarma_d", 0.0, 1440.0, 1.0),
+    ("dle_peligro_d", 0.0, 1440.0, 1.0),
+)
+PERCENTILES = (50, 90, 95, 99)
+# Índices disponibles como serie de tiempo en la aplicación
+COLUMNAS_SERIE = ("wbgt_efectivo", "indice_calor", "isc", "dle_alarma_q", "dle_alarma_d")
+
+
+def resumen_columnas(archivo, filas_vista_previa=5, tamano_bloque=TAMANO_BLOQUE):
+    """Vista previa y promedio de cada columna ambiental presente, leyendo por bloques.
+
+    Las columnas que no están en el archivo no aparecen en el diccionario de
+    promedios; las que están vacías tienen promedio NaN.
+    """
+    vista_previa = None
+    sumas, conteos = {}, {}
+    for bloque in leer_bloques(archivo, tamano_bloque):
+        if vista_previa is None:
+            vista_previa = bloque.head(filas_vista_previa)
+        for columna in COLUMNAS_AMBIENTALES:
+            if columna in bloque.columns:
+                valores = pd.to_numeric(bloque[columna], errors="coerce")
+                sumas[columna] = sumas.get(columna, 0.0) + float(valores.sum())
+                conteos[columna] = conteos.get(columna, 0) + int(valores.count())
+    promedios = {columna: sumas[columna] / conteos[columna] if conteos[columna] else math.nan for columna in sumas}
+    return vista_previa, promedios
+
+
+def promediar_ventanas(variables, ventana):
+    """Promedia las variables en ventanas consecutivas de `ventana` filas."""
+    if ventana <= 1:
+        return variables
+    promedios = {}
+    for variable, valores in variables.items():
+        n = len(valores)
+        inicios = np.arange(0, n, ventana)
+        sumas = np.add.reduceat(valores, inicios) if n else valores
+        conteos = np.diff(np.append(inicios, n))
+        promedios[variable] = sumas / conteos
+    return promedios
+
+
+def evaluar_variables(variables, parametros):
+    """Evalúa los cuatro índices para cada fila de `variables`.
+
+    `parametros` contiene las condiciones de la tarea: radiacion_solar, cavs,
+    carga_metabolica, aclimatacion, iclo, postura y conveccion. Donde SWreq no
+    es aplicable o no se puede calcular (estado_swreq EMAX_NEGATIVO o SIN_DATO)
+    los cuatro DLE quedan como NaN para que no entren en las estadísticas como
+    límites de 0 minutos; lo mismo el ISC y su tiempo de exposición con
+    clasificación SIN_DATO (ISC infinito, por ejemplo).
+    """
+    ta, tg, tw = variables["temp_aire"], variables["temp_globo"], variables["temp_bulbo"]
+    va, hr = variables["velocidad_aire"], variables["humedad_relativa"]
+    p = parametros
+
+    calor = indice_de_calor_vec(ta, hr, p["radiacion_solar"])
+    wbgt = tgbh_vec(p["radiacion_solar"], ta, tg, tw, p["cavs"], p["carga_metabolica"], p["aclimatacion"])
+    swreq = indice_de_sudoracion_vec(ta, tg, tw, p["iclo"], p["carga_metabolica"], va,
+                                     p["postura"], p["aclimatacion"], p["conveccion"])
+    isc = indice_sobrecarga_calorica_vec(p["carga_metabolica"], va, tg, ta, tw, p["iclo"],
+                                         p.get("altura", 170), p.get("peso", 70))
+    no_aplicable = swreq["estado"] != EstadoSudoracion.CALCULADO
+    dle = {campo: np.where(no_aplicable, np.nan, swreq[campo])
+           for campo in ("dle_alarma_q", "dle_peligro_q", "dle_alarma_d", "dle_peligro_d")}
+    isc_sin_dato = isc["clasificacion"] == ClasificacionISC.SIN_DATO
+    return pd.DataFrame({
+        **variables,
+        "indice_calor": calor["ih"],
+        "nivel_calor": calor["nivel"],
+        "wbgt": wbgt["wbgt"],
+        "wbgt_efectivo": wbgt["wbgt_efectivo"],
+        "wbgt_ref": wbgt["wbgt_ref"],
+        "estado_tgbh": wbgt["estado"],
+        **dle,
+        "estado_swreq": swreq["estado"],
+        "isc": np.where(isc_sin_dato, np.nan, isc["isc"]),
+        "clasificacion_isc": isc["clasificacion"],
+        "tiempo_exp_per": np.where(isc_sin_dato, np.nan, isc["tiempo_exp_per"]),
+    })
+
+
+def etiquetar(resultados):
+    """Reemplaza los códigos de nivel, estado y clasificación por sus textos."""
+    etiquetado = resultados.copy()
+    etiquetado["nivel_calor"] = np.asarray(NIVELES_CALOR, dtype=object)[resultados["nivel_calor"]]
+    etiquetado["estado_tgbh"] = np.asarray(ESTADOS_TGBH, dtype=object)[resultados["estado_tgbh"]]
+    etiquetado["estado_swreq"] = np.asarray(ESTADOS_SUDORACION, dtype=object)[resultados["estado_swreq"]]
+    etiquetado["clasificacion_isc"] = np.asarray(CLASIFICACIONES_ISC, dtype=object)[resultados["clasificacion_isc"]]
+    return etiquetado
+
+
+class ResumenLote:
+    """Acumula estadísticas de los resultados bloque a bloque.
+
+    Los percentiles se obtienen de histogramas de ancho fijo (ver METRICAS), por
+    lo que su resolución es el ancho de clase de cada métrica; los que caen
+    fuera del rango del histograma se informan como el mínimo o el máximo
+    observado. Los valores +inf (DLE sin límite) cuentan en una clase aparte por
+    encima de todas: entran en n y en los percentiles y se informan en "Filas
+    sin límite", pero no en el promedio. Los NaN (por ejemplo, DLE donde SWreq no
+    es aplicable) no se cuentan. Los mínimos, máximos finitos y promedios son
+    exactos.
+    """
+
+    def __init__(self, intervalo_s=1.0):
+        self.intervalo_s = intervalo_s
+        self.filas = 0
+        self.ingesta = EstadisticasIngesta()
+        self.conteo_nivel_calor = np.zeros(len(NIVELES_CALOR), dtype=np.int64)
+        self.conteo_estado_tgbh = np.zeros(len(ESTADOS_TGBH), dtype=np.int64)
+        self.conteo_estado_swreq = np.zeros(len(ESTADOS_SUDORACION), dtype=np.int64)
+        self.conteo_clasificacion_isc = np.zeros(len(CLASIFICACIONES_ISC), dtype=np.int64)
+        self._estadisticas = {}
+        for nombre, minimo, maximo, ancho in METRICAS:
+            clases = int(math.ceil((maximo - minimo) / ancho))
+            self._estadisticas[nombre] = {
+                "n": 0, "sin_limite": 0, "suma": 0.0, "min": math.inf, "max": -math.inf,
+                # Clases extra para valores por debajo y por encima del rango
+                "histograma": np.zeros(clases + 2, dtype=np.int64),
+            }
+
+    def agregar(self, resultados):
+        self.filas += len(resultados)
+        self.conteo_nivel_calor += np.bincount(resultados["nivel_calor"], minlength=len(NIVELES_CALOR))
+        self.conteo_estado_tgbh += np.bincount(resultados["estado_tgbh"], minlength=len(ESTADOS_TGBH))
+        self.conteo_estado_swreq += np.bincount(resultados["estado_swreq"], minlength=len(ESTADOS_SUDORACION))
+        self.conteo_clasificacion_isc += np.bincount(resultados["clasificacion_isc"], minlength=len(CLASIFICACIONES_ISC))
+        for nombre, minimo, maximo, ancho in METRICAS:
+            valores = resultados[nombre].to_numpy()
+            estadistica = self._estadisticas[nombre]
+            sin_limite = int(np.count_nonzero(valores == np.inf))
+            estadistica["sin_limite"] += sin_limite
+            estadistica["n"] += sin_limite
+            valores = valores[np.isfinite(valores)]
+            if not len(valores):
+                continue
+            estadistica["n"] += len(valores)
+            estadistica["suma"] += float(valores.sum())
+            estadistica["min"] = min(estadistica["min"], float(valores.min()))
+            estadistica["max"] = max(estadistica["max"], float(valores.max()))
+            histograma = estadistica["histograma"]
+            clases = np.floor((valores - minimo) / ancho).astype(np.int64) + 1
+            np.clip(clases, 0, len(histograma) - 1, out=clases)
+            histograma += np.bincount(clases, minlength=len(histograma))
+
+    def _percentil(self, nombre, q):
+        _, minimo, _, ancho = next(m for m in METRICAS if m[0] == nombre)
+        estadistica = self._estadisticas[nombre]
+        # Clases: por debajo del rango, las del histograma, por encima del rango y sin límite (+inf)
+        acumulado = np.cumsum(np.append(estadistica["histograma"], estadistica["sin_limite"]))
+        clase = int(np.searchsorted(acumulado, q / 100 * estadistica["n"]))
+        if clase == len(acumulado) - 1:
+            return math.inf
+        # Fuera del rango del histograma solo se conoce el extremo observado
+        if clase == 0:
+            return estadistica["min"]
+        if clase == len(acumulado) - 2:
+            return estadistica["max"]
+        # Centro de la clase, acotado por el mínimo y el máximo observados
+        valor = minimo + (clase - 1 + 0.5) * ancho
+        return min(max(valor, estadistica["min"]), estadistica["max"])
+
+    def estadisticas(self):
+        """DataFrame con n, filas sin límite, mínimo, promedio, percentiles y máximo por métrica.
+
+        El mínimo y el máximo son los de los valores finitos; el máximo es inf si
+        hay filas sin límite.
+        """
+        filas = []
+        for nombre, *_ in METRICAS:
+            estadistica = self._estadisticas[nombre]
+            fila = {"Métrica": nombre, "n": estadistica["n"], "Filas sin límite": estadistica["sin_limite"]}
+            if estadistica["n"]:
+                finitos = estadistica["n"] - estadistica["sin_limite"]
+                fila["Mínimo"] = estadistica["min"] if finitos else math.inf
+                fila["Promedio"] = estadistica["suma"] / finitos if finitos else math.nan
+                for q in PERCENTILES:
+                    fila[f"P{q}"] = self._percentil(nombre, q)
+                fila["Máximo"] = math.inf if estadistica["sin_limite"] else estadistica["max"]
+            filas.append(fila)
+        return pd.DataFrame(filas).set_index("Métrica")
+
+    def tiempo_sobre_umbral(self):
+        """Tiempo (minutos) en cada nivel de índice de calor, estado TGBH, estado SWreq y clasificación ISC."""
+        minutos = self.intervalo_s / 60
+        filas = []
+        for indicador, etiquetas, conteos in (
+            ("Índice de calor", NIVELES_CALOR, self.conteo_nivel_calor),
+            ("TGBH", ESTADOS_TGBH, self.conteo_estado_tgbh),
+            ("SWreq", ESTADOS_SUDORACION, self.conteo_estado_swreq),
+            ("ISC", CLASIFICACIONES_ISC, self.conteo_clasificacion_isc),
+        ):
+            for etiqueta, conteo in zip(etiquetas, conteos):
+                if conteo:
+                    filas.append({
+                        "Indicador": indicador,
+                        "Categoría": etiqueta,
+                        "Filas": int(conteo),
+                        "Minutos": conteo * minutos,
+                        "% del tiempo": 100 * conteo / self.filas,
+                    })
+        return pd.DataFrame(filas)
+
+
+def evaluar_bloques(archivo, parametros, ventana=1, tamano_bloque=TAMANO_BLOQUE, estadisticas=None):
+    """Generador de resultados por bloque: ingesta -> (ventanas) -> cuatro índices.
+
+    Con `ventana` > 1 se promedian las variables ambientales en ventanas de ese
+    número de filas válidas antes de evaluar (por ejemplo 3600 filas de 1 s = 1
+    hora); las ventanas no dependen de `tamano_bloque`. La primera columna,
+    COLUMNA_FILA, es la posición en el archivo de la fila (o de la primera fila
+    de la ventana) de cada resultado.
+    """
+    # Bloques múltiplos de la ventana: sin filas descartadas ninguna ventana queda partida
+    tamano_bloque = max(1, math.ceil(tamano_bloque / ventana)) * ventana
+    columnas = (*VARIABLES, COLUMNA_FILA)
+    pendiente = None
+    for bloque in ingerir(archivo, tamano_bloque, estadisticas=estadisticas):
+        variables = {c: bloque[c].to_numpy() for c in columnas}
+        if ventana > 1:
+            # Con filas descartadas la última ventana del bloque queda incompleta: pasa al siguiente
+            if pendiente is not None:
+                variables = {c: np.concatenate([pendiente[c], variables[c]]) for c in columnas}
+            completas = len(variables[COLUMNA_FILA]) // ventana * ventana
+            pendiente = {c: valores[completas:] for c, valores in variables.items()}
+            variables = {c: valores[:completas] for c, valores in variables.items()}
+        yield _evaluar_ventanas(variables, ventana, parametros)
+    if pendiente is not None and len(pendiente[COLUMNA_FILA]):
+        yield _evaluar_ventanas(pendiente, ventana, parametros)
+
+
+def _evaluar_ventanas(variables, ventana, parametros):
+    # Cada ventana queda en la posición de su primera fila
+    filas = variables.pop(COLUMNA_FILA)[::ventana]
+    resultados = evaluar_variables(promediar_ventanas(variables, ventana), parametros)
+    resultados.insert(0, COLUMNA_FILA, filas)
+    return resultados
+
+
+def evaluar_archivo(archivo, parametros, ventana=1, intervalo_s=1.0, tamano_bloque=TAMANO_BLOQUE, filas_muestra=1000,
+                    almacen=None, sitio=None, fecha_inicio=None, serie=None):
+    """Evalúa todas las filas de `archivo` sin cargarlo completo en memoria.
+
+    Devuelve el ResumenLote (con las EstadisticasIngesta en `resumen.ingesta`) y
+    un DataFrame con las primeras `filas_muestra` filas de resultados. Con
+    `almacen` (src.almacen.AlmacenResultados) los resultados de `sitio` también se
+    guardan, fechados desde `fecha_inicio` según la posición de su fila en el
+    archivo, cada `intervalo_s` segundos. Con `serie` (src.graficos.SerieReducida)
+    se acumula la serie reducida de sus columnas contra las horas desde la
+    primera fila del archivo, también según esa posición.
+    """
+    resumen = ResumenLote(intervalo_s=intervalo_s * ventana)
+    muestra = []
+    filas_en_muestra = 0
+    for resultados in evaluar_bloques(archivo, parametros, ventana, tamano_bloque, resumen.ingesta):
+        if almacen is not None:
+            fechas = marcas_de_tiempo(fecha_inicio, resultados[COLUMNA_FILA].to_numpy(), intervalo_s)
+            almacen.agregar(sitio, resultados, fechas, parametros)
+        if serie is not None:
+            serie.agregar(resultados[COLUMNA_FILA].to_numpy() * intervalo_s / 3600, resultados)
+        resumen.agregar(resultados)
+        if filas_en_muestra < filas_muestra:
+            muestra.append(resultados.head(filas_muestra - filas_en_muestra))
+            filas_en_muestra += len(muestra[-1])
+    muestra = etiquetar(pd.concat(muestra, ignore_index=True)) if muestra else pd.DataFrame()
+    return resumen, muestra
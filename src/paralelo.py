@@ -0,0 +1,186 @@
+"""Evaluación en paralelo de muchos archivos de sitios, un proceso por núcleo
+
+Cada archivo (un sitio-día, por ejemplo) se evalúa completo en un proceso del
+ProcessPoolExecutor con la misma cadena por bloques de src.lotes, y sus
+resultados fila a fila se escriben por bloques en <salida>/<sitio>.csv (ver
+nombres_sitios para archivos con el mismo nombre en carpetas distintas). Cada
+proceso mantiene en memoria un solo bloque a la vez y al proceso principal solo
+vuelve un resumen pequeño por sitio, así que la memoria no depende del tamaño ni
+del número de archivos. Los sitios se reparten dinámicamente: cada proceso toma
+el siguiente archivo al terminar el anterior. Con N procesos la aceleración
+necesita al menos N núcleos libres: en una máquina de un núcleo los tiempos no
+bajan (ver benchmarks/bench_paralelo.py).
+
+Uso:
+    python -m src.paralelo datos/*.csv --salida resultados [--procesos N]
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+from src.almacen import AlmacenResultados, marcas_de_tiempo
+from src.ingesta import COLUMNA_FILA, TAMANO_BLOQUE
+from src.lotes import ResumenLote, etiquetar, evaluar_bloques
+
+# Condiciones de la tarea por defecto (los mismos valores iniciales de la aplicación)
+PARAMETROS_POR_DEFECTO = {
+    "radiacion_solar": "Si",
+    "cavs": 0.0,
+    "carga_metabolica": 300.0,
+    "aclimatacion": "Si",
+    "iclo": 0.11,
+    "postura": "De pie",
+    "conveccion": "Natural",
+}
+
+
+def resumen_sitio(sitio, resumen):
+    """Fila de resumen de un sitio a partir de su ResumenLote."""
+    estadisticas = resumen.estadisticas()
+    tiempos = resumen.tiempo_sobre_umbral()
+
+    def minutos(indicador, categoria):
+        fila = tiempos[(tiempos["Indicador"] == indicador) & (tiempos["Categoría"] == categoria)] if len(tiempos) else tiempos
+        return float(fila["Minutos"].sum()) if len(fila) else 0.0
+
+    def estadistica(metrica, columna):
+        return float(estadisticas.loc[metrica, columna]) if columna in estadisticas and estadisticas.loc[metrica, "n"] else None
+
+    return {
+        "sitio": sitio,
+        "filas": resumen.filas,
+        "filas_descartadas": resumen.ingesta.filas_descartadas,
+        "indice_calor_max": estadistica("indice_calor", "Máximo"),
+        "wbgt_efectivo_max": estadistica("wbgt_efectivo", "Máximo"),
+        "isc_max": estadistica("isc", "Máximo"),
+        "dle_alarma_q_min": estadistica("dle_alarma_q", "Mínimo"),
+        "dle_alarma_q_filas_sin_limite": int(estadisticas.loc["dle_alarma_q", "Filas sin límite"]),
+        "minutos_estres_tgbh": minutos("TGBH", "Estrés Térmico"),
+        "minutos_nivel_iv": minutos("Índice de calor", "Nivel IV"),
+        "minutos_swreq_no_aplicable": minutos("SWreq", "No aplicable (Emax < 0)"),
+        "minutos_swreq_sin_dato": minutos("SWreq", "Sin dato"),
+        "minutos_isc_sin_dato": minutos("ISC", "Sin dato"),
+    }
+
+
+def nombres_sitios(rutas):
+    """Nombre de sitio (y de su <sitio>.csv) para cada ruta, sin repetidos.
+
+    Es el nombre del archivo sin extensión; los archivos con el mismo nombre en
+    carpetas distintas (planta_a/lunes.csv, planta_b/lunes.csv) se nombran con
+    su ruta relativa a la carpeta común (planta_a_lunes, planta_b_lunes). Si aun
+    así se repite un nombre (por ejemplo, la misma ruta dos veces) es ValueError.
+    """
+    rutas = [Path(ruta).resolve() for ruta in rutas]
+    tallos = [ruta.stem for ruta in rutas]
+    repetidos = {tallo for tallo in tallos if tallos.count(tallo) > 1}
+    if repetidos:
+        comun = Path(os.path.commonpath([ruta.parent for ruta in rutas]))
+        tallos = ["_".join(ruta.relative_to(comun).with_suffix("").parts) if tallo in repetidos else tallo
+                  for ruta, tallo in zip(rutas, tallos)]
+    repetidos = sorted({tallo for tallo in tallos if tallos.count(tallo) > 1})
+    if repetidos:
+        raise ValueError(f"Varios archivos darían el mismo sitio: {', '.join(repetidos)}")
+    return tallos
+
+
+def evaluar_sitio(ruta, carpeta_salida, parametros, ventana=1, intervalo_s=60.0, tamano_bloque=TAMANO_BLOQUE,
+                  almacen=None, fecha_inicio=None, sitio=None):
+    """Evalúa un archivo por bloques, escribe <carpeta_salida>/<sitio>.csv y devuelve el resumen del sitio.
+
+    `sitio` es por defecto el nombre del archivo sin extensión. Con `almacen`
+    (carpeta de src.almacen) los resultados también se agregan al almacén
+    Parquet, fechados desde `fecha_inicio` según la posición de su fila en el
+    archivo (columna COLUMNA_FILA), cada `intervalo_s` segundos.
+    """
+    inicio = time.perf_counter()
+    sitio = Path(ruta).stem if sitio is None else sitio
+    destino = Path(carpeta_salida) / f"{sitio}.csv"
+    if destino.resolve() == Path(ruta).resolve():
+        raise ValueError(f"La salida {destino} sobrescribiría el archivo de entrada")
+    resumen = ResumenLote(intervalo_s=intervalo_s * ventana)
+    almacen = AlmacenResultados(almacen) if almacen is not None else None
+    # El escritor CSV de Arrow formatea los números en C; DataFrame.to_csv tomaba ~90 % del tiempo por sitio
+    escritor = None
+    try:
+        for resultados in evaluar_bloques(str(ruta), parametros, ventana, tamano_bloque, resumen.ingesta):
+            if almacen is not None:
+                fechas = marcas_de_tiempo(fecha_inicio, resultados[COLUMNA_FILA].to_numpy(), intervalo_s)
+                almacen.agregar(sitio, resultados, fechas, parametros)
+            resumen.agregar(resultados)
+            tabla = pa.Table.from_pandas(etiquetar(resultados), preserve_index=False)
+            if escritor is None:
+                escritor = pa_csv.CSVWriter(str(destino), tabla.schema)
+            escritor.write_table(tabla)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return {**resumen_sitio(sitio, resumen), "segundos": time.perf_counter() - inicio, "error": None}
+
+
+def evaluar_sitios(rutas, carpeta_salida, parametros=None, procesos=None, ventana=1, intervalo_s=60.0,
+                   tamano_bloque=TAMANO_BLOQUE, almacen=None, fecha_inicio=None):
+    """Evalúa todos los archivos de `rutas` en paralelo y devuelve un DataFrame con un resumen por sitio.
+
+    El resumen también se escribe en <carpeta_salida>/resumen.csv. Un archivo que
+    falla (por ejemplo, con valores no numéricos) queda en el resumen con su error
+    y no detiene a los demás. Con `almacen` los resultados de todos los sitios se
+    agregan al almacén Parquet (ver evaluar_sitio). Los nombres de los sitios
+    salen de nombres_sitios, antes de evaluar ningún archivo.
+    """
+    parametros = {**PARAMETROS_POR_DEFECTO, **(parametros or {})}
+    sitios = nombres_sitios(rutas)
+    procesos = procesos or os.cpu_count() or 1
+    carpeta_salida = Path(carpeta_salida)
+    carpeta_salida.mkdir(parents=True, exist_ok=True)
+
+    filas = []
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        tareas = {ejecutor.submit(evaluar_sitio, ruta, carpeta_salida, parametros, ventana, intervalo_s, tamano_bloque,
+                                  almacen, fecha_inicio, sitio): sitio
+                  for ruta, sitio in zip(rutas, sitios)}
+        for tarea in as_completed(tareas):
+            try:
+                filas.append(tarea.result())
+            except Exception as error:
+                filas.append({"sitio": tareas[tarea], "error": f"{type(error).__name__}: {error}"})
+
+    resumen = pd.DataFrame(filas).sort_values("sitio", ignore_index=True)
+    resumen.to_csv(carpeta_salida / "resumen.csv", index=False)
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evalúa en paralelo archivos de registradores de varios sitios")
+    parser.add_argument("archivos", nargs="+", help="archivos CSV o XLSX, uno por sitio")
+    parser.add_argument("--salida", required=True, help="carpeta para <sitio>.csv y resumen.csv")
+    parser.add_argument("--procesos", type=int, default=None, help="por defecto, uno por núcleo")
+    parser.add_argument("--ventana", type=int, default=1)
+    parser.add_argument("--intervalo", type=float, default=60.0, help="segundos entre mediciones")
+    parser.add_argument("--almacen", help="carpeta del almacén Parquet donde agregar los resultados")
+    parser.add_argument("--inicio", help="fecha y hora ISO de la primera medición (con --almacen)")
+    for clave, valor in PARAMETROS_POR_DEFECTO.items():
+        parser.add_argument(f"--{clave.replace('_', '-')}", type=type(valor), default=valor)
+    args = parser.parse_args()
+
+    parametros = {clave: getattr(args, clave) for clave in PARAMETROS_POR_DEFECTO}
+    inicio = time.perf_counter()
+    if args.almacen and not args.inicio:
+        parser.error("--almacen requiere --inicio")
+    resumen = evaluar_sitios(args.archivos, args.salida, parametros, args.procesos, args.ventana, args.intervalo,
+                             almacen=args.almacen, fecha_inicio=args.inicio)
+    segundos = time.perf_counter() - inicio
+    errores = resumen["error"].notna().sum()
+    print(f"{len(resumen)} sitios ({errores} con error), {resumen['filas'].sum():,.0f} filas en {segundos:.1f} s")
+    print(f"Resumen en {Path(args.salida) / 'resumen.csv'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""Simulación minuto a minuto de la sobrecarga térmica estimada (PHS, ISO 7933)
+
+El SWreq de src.funciones da cuatro DLE para condiciones constantes. Este módulo
+simula el modelo PHS de la ISO 7933 (anexo E) minuto a minuto con series de
+condiciones y de tasa metabólica: temperatura de la piel, central y rectal,
+sudoración estimada y pérdida de agua acumulada. Todos los trabajadores (o
+cuadrillas) avanzan a la vez: el estado es un arreglo de NumPy por variable y
+cada minuto es un paso vectorizado, con las dos iteraciones de punto fijo de la
+norma (temperatura de la ropa y temperatura central) resueltas con máscaras de
+convergencia por elemento.
+
+Las series tienen forma (N, T) (N trabajadores, T minutos), o (T,) si son
+iguales para todos, o (N, 1) si son constantes en el tiempo; los parámetros de
+cada trabajador (ropa, aclimatación, postura, peso, altura, si bebe) tienen
+forma (N, 1) o son escalares. Las unidades son las del resto del repositorio:
+`carga_metabolica` en W (dividida por 1.7 m² como en SWreq e ISC), `iclo` en
+m²·K/W, `altura` en cm. La temperatura radiante media y las presiones de vapor
+usan las fórmulas de src.vectorizado (las mismas de src.funciones).
+
+Uso:
+    python -m src.phs condiciones.csv trabajadores.csv [--mostrar nombre]
+
+condiciones.csv tiene una fila por minuto con temp_aire, temp_globo, temp_bulbo
+y velocidad_aire (y opcionalmente carga_metabolica, que reemplaza la de todos
+los trabajadores); trabajadores.csv tiene nombre, iclo, carga_metabolica y
+aclimatacion (postura, peso, altura y bebe son opcionales).
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.funciones import BOLTZMAN, EMISIVIDAD_PIEL
+from src.vectorizado import (
+    _categoria,
+    _codigos,
+    _numerico,
+    factor_postura,
+    limites_aclimatacion,
+    presion_parcial_ambiente,
+    presion_saturacion,
+    superficie_dubois,
+    temperatura_radiante_media,
+)
+
+VARIABLES_CONDICIONES = ("temp_aire", "temp_globo", "temp_bulbo", "velocidad_aire")
+# Columnas de la tabla de trabajadores y valores por defecto de las opcionales
+COLUMNAS_TRABAJADOR = {"iclo": None, "carga_metabolica": None, "aclimatacion": None, "postura": "De pie",
+                       "peso": 70.0, "altura": 170.0, "bebe": True}
+
+SUPERFICIE_CORPORAL = 1.7  # m², la de la tasa metabólica en SWreq e ISC
+CLO = 0.155  # m²·K/W
+AISLAMIENTO_AIRE = 0.111  # m²·K/W, capa límite estática
+PERMEABILIDAD = 0.38  # índice de permeabilidad estático de la ropa (valor por defecto de la norma)
+
+# Estado inicial (°C) y límite de temperatura rectal
+TEMP_RECTAL_INICIAL = 36.8
+TEMP_PIEL_INICIAL = 34.1
+TEMP_RECTAL_LIMITE = 38.0
+
+# Constantes del promedio exponencial por minuto de la norma
+CONSTANTE_CENTRAL = np.exp(-1 / 10)
+CONSTANTE_PIEL = np.exp(-1 / 3)
+CONSTANTE_SUDORACION = np.exp(-1 / 10)
+
+TOLERANCIA = 0.001  # °C, en las dos iteraciones de punto fijo
+ITERACIONES_MAXIMAS = 100
+
+
+class SimulacionPHS:
+    """Resultado de una simulación PHS de varios trabajadores."""
+
+    def __init__(self, trabajadores, temp_rectal, perdida_agua, limite_rectal, limite_perdida_50, limite_perdida_95):
+        self.trabajadores = list(trabajadores)
+        self.temp_rectal = temp_rectal  # (N, T) °C al final de cada minuto (o (N,) final sin series)
+        self.perdida_agua = perdida_agua  # (N, T) g acumulados (o (N,) final sin series)
+        # (N,) minuto en que se alcanza cada límite; inf si no se alcanza en la simulación
+        self.limite_rectal = limite_rectal
+        self.limite_perdida_50 = limite_perdida_50
+        self.limite_perdida_95 = limite_perdida_95
+
+    def resumen(self):
+        """Una fila por trabajador: temperatura rectal final y máxima, pérdida de agua y minutos límite."""
+        temp_rectal = np.atleast_2d(self.temp_rectal.T).T
+        perdida_agua = np.atleast_2d(self.perdida_agua.T).T
+        return pd.DataFrame({
+            "trabajador": self.trabajadores,
+            "temp_rectal_final": temp_rectal[:, -1],
+            "temp_rectal_max": temp_rectal.max(axis=1),
+            "perdida_agua_g": perdida_agua[:, -1],
+            "limite_rectal_min": self.limite_rectal,
+            "limite_perdida_50_min": self.limite_perdida_50,
+            "limite_perdida_95_min": self.limite_perdida_95,
+        })
+
+
+def _serie(valor):
+    """Valores por minuto de una serie: (T, N) o (T, 1) si cambia en el tiempo, (N,) o (1,) si no.
+
+    Una serie igual para todos los trabajadores se deja como columna (T, 1) en
+    lugar de repetirla N veces.
+    """
+    valor = np.atleast_2d(_numerico(valor))
+    if valor.shape[1] == 1:
+        return valor[:, 0], False
+    return np.ascontiguousarray(valor.T), True
+
+
+def _ropa_dinamica(m, va, clo, fcl, aislamiento_total, permeabilidad):
+    """Conductancia de la ropa (W/m²·K) y resistencia evaporativa total corregidas por viento y caminata."""
+    caminata = np.clip(0.0052 * (m - 58), 0, 0.7)
+    viento = np.minimum(va, 3)
+    correccion_ropa = np.minimum(1.044 * np.exp((0.066 * viento - 0.398) * viento
+                                                + (0.094 * caminata - 0.378) * caminata), 1)
+    correccion_aire = np.minimum(np.exp((0.047 * va - 0.472) * va + (0.117 * caminata - 0.342) * caminata), 1)
+    correccion_total = np.where(clo <= 0.6, ((0.6 - clo) * correccion_aire + clo * correccion_ropa) / 0.6, correccion_ropa)
+    aislamiento_dinamico = aislamiento_total * correccion_total
+    aislamiento_ropa = aislamiento_dinamico - correccion_aire * AISLAMIENTO_AIRE / fcl
+    permeabilidad_dinamica = np.minimum(permeabilidad * ((2.6 * correccion_total - 6.5) * correccion_total + 4.9), 0.9)
+    return 1 / np.maximum(aislamiento_ropa, 1e-4), aislamiento_dinamico / permeabilidad_dinamica / 16.7
+
+
+def _temperatura_ropa(ta, tr, tsk, z, fcl, conductancia, factor_radiacion, tcl):
+    """Temperatura de la ropa (°C) y coeficientes de convección y radiación (anexo E).
+
+    La norma parte de tr + 0.1 en cada minuto; aquí se parte de la temperatura
+    del minuto anterior (`tcl`), que llega al mismo punto fijo en menos pasos.
+    """
+    radiante = tr + 273
+    for _ in range(ITERACIONES_MAXIMAS):
+        hc = np.maximum(z, 2.38 * np.abs(tcl - ta) ** 0.25)
+        # (Tcl⁴ - Tr⁴) / (Tcl - Tr) en K, factorizado: sin división por cero cuando Tcl = Tr
+        ropa = tcl + 273
+        hr = factor_radiacion * (ropa * ropa + radiante * radiante) * (ropa + radiante)
+        tcl1 = (fcl * (hc * ta + hr * tr) + tsk * conductancia) / (fcl * (hc + hr) + conductancia)
+        pendientes = np.abs(tcl - tcl1) > TOLERANCIA
+        if not pendientes.any():
+            break
+        tcl = np.where(pendientes, (tcl + tcl1) / 2, tcl)
+    return tcl, hc, hr
+
+
+def _temperatura_central(almacenamiento, calor_especifico, tcr0, tsk0, tsk, ponderacion0):
+    """Temperatura central (°C) y ponderación piel-centro del minuto (anexo E)."""
+    tcr1 = tcr0
+    for _ in range(ITERACIONES_MAXIMAS):
+        ponderacion = np.clip(0.3 - 0.09 * (tcr1 - 36.8), 0.1, 0.3)
+        tcr = almacenamiento / calor_especifico + tsk0 * ponderacion0 / 2 - tsk * ponderacion / 2
+        tcr = (tcr + tcr0 * (1 - ponderacion0 / 2)) / (1 - ponderacion / 2)
+        pendientes = np.abs(tcr - tcr1) > TOLERANCIA
+        if not pendientes.any():
+            break
+        tcr1 = np.where(pendientes, (tcr1 + tcr) / 2, tcr1)
+    return tcr, ponderacion
+
+
+def simular(temp_aire, temp_radiante_media, presion_vapor, velocidad_aire, carga_metabolica, iclo, aclimatacion="Si",
+            postura="De pie", peso=70.0, altura=170.0, bebe=True, trabajo_externo=0.0, permeabilidad=PERMEABILIDAD,
+            series=True, trabajadores=None):
+    """Simulación PHS con la temperatura radiante media y la presión de vapor (kPa) ya calculadas.
+
+    Las series se combinan con broadcasting a (N, T). Con `series=False` solo
+    se guardan los valores finales (N,) en lugar de las series (N, T).
+    """
+    constantes = {"iclo": iclo, "aclimatacion": _categoria(aclimatacion), "postura": _categoria(postura),
+                  "peso": peso, "altura": altura, "bebe": np.asarray(bebe, dtype=bool)}
+    entradas = {"temp_aire": temp_aire, "temp_radiante_media": temp_radiante_media, "presion_vapor": presion_vapor,
+                "velocidad_aire": velocidad_aire, "carga_metabolica": carga_metabolica,
+                "trabajo_externo": trabajo_externo}
+    forma = np.broadcast_shapes((1, 1), *(np.shape(v) for v in [*entradas.values(), *constantes.values()]))
+    if len(forma) != 2:
+        raise ValueError(f"Las series deben tener forma (N, T), (T,) o (N, 1); se obtuvo {forma}")
+    n, minutos = forma
+    for nombre, valor in constantes.items():
+        if np.ndim(valor) == 2 and np.shape(valor)[1] != 1:
+            raise ValueError(f"{nombre} es un parámetro del trabajador: debe tener forma (N, 1)")
+    iclo, aclimatacion, postura, peso, altura, bebe = (np.broadcast_to(v, (n, 1))[:, 0] for v in constantes.values())
+    iclo, peso, altura = _numerico(iclo), _numerico(peso), _numerico(altura)
+    series_entrada = {nombre: _serie(valor) for nombre, valor in entradas.items()}
+
+    def en_minuto(nombre, t):
+        valor, variable = series_entrada[nombre]
+        return valor[t] if variable else valor
+
+    # Parámetros del trabajador
+    superficie = superficie_dubois(peso, altura)
+    calor_especifico = 57.83 * peso / superficie
+    perdida_max_50 = np.where(bebe, 0.075, 0.03) * peso * 1000  # g
+    perdida_max_95 = np.where(bebe, 0.05, 0.03) * peso * 1000
+    aclimatado = _codigos(aclimatacion, ("No", "Si"), "aclimatacion").astype(bool)
+    w_max = limites_aclimatacion(aclimatacion)["w_max"]
+    factor_radiacion = EMISIVIDAD_PIEL * BOLTZMAN * factor_postura(postura)
+    clo = iclo / CLO
+    fcl = 1 + 0.3 * clo
+    aislamiento_total = iclo + AISLAMIENTO_AIRE / fcl
+    interpolacion_piel = 2.5 * np.clip(clo - 0.2, 0, 0.4)
+    # El aislamiento dinámico depende del viento y de la caminata estimada con la tasa metabólica
+    ropa_variable = series_entrada["carga_metabolica"][1] or series_entrada["velocidad_aire"][1]
+    if not ropa_variable:
+        conductancia, resistencia_evaporativa = _ropa_dinamica(
+            en_minuto("carga_metabolica", 0) / SUPERFICIE_CORPORAL, en_minuto("velocidad_aire", 0), clo, fcl,
+            aislamiento_total, permeabilidad)
+
+    # Estado de todos los trabajadores
+    tre = np.full(n, TEMP_RECTAL_INICIAL)
+    tcr = np.full(n, TEMP_RECTAL_INICIAL)
+    tcreq = np.full(n, TEMP_RECTAL_INICIAL)
+    tsk = np.full(n, TEMP_PIEL_INICIAL)
+    ponderacion = np.full(n, 0.3)
+    swp = np.zeros(n)
+    tcl = None
+    sudoracion_total = np.zeros(n)  # W·min/m²
+    limite_rectal, limite_perdida_50, limite_perdida_95 = (np.full(n, np.inf) for _ in range(3))
+    temp_rectal = np.empty((minutos, n)) if series else None
+    perdida_agua = np.empty((minutos, n)) if series else None
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for t in range(minutos):
+            ta, tr, pa, va = (en_minuto(nombre, t) for nombre in ("temp_aire", "temp_radiante_media", "presion_vapor",
+                                                                  "velocidad_aire"))
+            m = en_minuto("carga_metabolica", t) / SUPERFICIE_CORPORAL
+            w = en_minuto("trabajo_externo", t) / SUPERFICIE_CORPORAL
+
+            sw_max = np.clip((m - 32) * superficie, 250, 400) * np.where(aclimatado, 1.25, 1)
+            if ropa_variable:
+                conductancia, resistencia_evaporativa = _ropa_dinamica(m, va, clo, fcl, aislamiento_total, permeabilidad)
+
+            # Temperatura central de equilibrio y calor almacenado por su aumento
+            tcreq0 = tcreq
+            tcreq = tcreq0 * CONSTANTE_CENTRAL + (0.0036 * m + 36.6) * (1 - CONSTANTE_CENTRAL)
+            almacenamiento_equilibrio = calor_especifico * (tcreq - tcreq0) * (1 - ponderacion)
+
+            # Temperatura de la piel: equilibrio vestido/desnudo interpolado según clo
+            piel_vestido = 12.165 + 0.02017 * ta + 0.04361 * tr + 0.19354 * pa - 0.25315 * va + 0.005346 * m + 0.51274 * tre
+            piel_desnudo = 7.191 + 0.064 * ta + 0.061 * tr + 0.198 * pa - 0.348 * va + 0.616 * tre
+            tsk0 = tsk
+            tsk = tsk0 * CONSTANTE_PIEL + (piel_desnudo + interpolacion_piel * (piel_vestido - piel_desnudo)) * (1 - CONSTANTE_PIEL)
+
+            # Intercambios por convección, radiación y respiración
+            z = np.where(va > 1, 8.7 * va ** 0.6, 3.5 + 5.2 * va)
+            tcl, hc, hr = _temperatura_ropa(ta, tr, tsk, z, fcl, conductancia, factor_radiacion,
+                                            tr + 0.1 if tcl is None else tcl)
+            c_res = 0.001516 * m * (28.56 + 0.115 * ta + 0.641 * pa - ta)
+            e_res = 0.00127 * m * (59.34 + 0.53 * ta - 11.63 * pa)
+            conveccion = fcl * hc * (tcl - ta)
+            radiacion = fcl * hr * (tcl - tr)
+
+            # Evaporación máxima y requerida, sudoración requerida y estimada
+            e_max = (presion_saturacion(tsk) - pa) / resistencia_evaporativa
+            e_req = m - almacenamiento_equilibrio - w - c_res - e_res - conveccion - radiacion
+            w_req = e_req / e_max
+            eficiencia = np.where(w_req > 1, (2 - w_req) ** 2 / 2, 1 - w_req ** 2 / 2)
+            swreq = np.minimum(e_req / eficiencia, sw_max)
+            swreq = np.where((e_max <= 0) | (w_req >= 1.7), sw_max, swreq)
+            swreq = np.where(e_req <= 0, 0, swreq)
+            e_req = np.maximum(e_req, 0)
+            e_max = np.maximum(e_max, 0)
+            swp = np.maximum(swp * CONSTANTE_SUDORACION + swreq * (1 - CONSTANTE_SUDORACION), 0)
+            k = e_max / swp
+            w_p = np.minimum(np.where(k >= 0.5, np.sqrt(k * k + 2) - k, 1), w_max)
+            e_p = np.where(swp > 0, w_p * e_max, 0)
+
+            # Temperaturas central y rectal
+            tcr, ponderacion = _temperatura_central(e_req - e_p + almacenamiento_equilibrio, calor_especifico,
+                                                    tcr, tsk0, tsk, ponderacion)
+            tre = tre + (2 * tcr - 1.962 * tre - 1.31) / 9
+
+            # Pérdida de agua acumulada (g) y minutos en que se alcanzan los límites
+            sudoracion_total += swp + e_res
+            perdida = sudoracion_total * 2.67 * superficie / 1.8 / 60
+            limite_rectal[np.isinf(limite_rectal) & (tre >= TEMP_RECTAL_LIMITE)] = t + 1
+            limite_perdida_50[np.isinf(limite_perdida_50) & (perdida >= perdida_max_50)] = t + 1
+            limite_perdida_95[np.isinf(limite_perdida_95) & (perdida >= perdida_max_95)] = t + 1
+            if series:
+                temp_rectal[t] = tre
+                perdida_agua[t] = perdida
+
+    if series:
+        temp_rectal, perdida_agua = temp_rectal.T, perdida_agua.T
+    else:
+        temp_rectal, perdida_agua = tre, perdida
+    return SimulacionPHS(range(n) if trabajadores is None else trabajadores, temp_rectal, perdida_agua,
+                         limite_rectal, limite_perdida_50, limite_perdida_95)
+
+
+def simular_globo(temp_aire, temp_globo, temp_bulbo, velocidad_aire, carga_metabolica, iclo, **opciones):
+    """`simular` con las mediciones del repositorio: temperatura de globo y de bulbo húmedo."""
+    temp_aire, temp_globo = _numerico(temp_aire), _numerico(temp_globo)
+    temp_bulbo, velocidad_aire = _numerico(temp_bulbo), _numerico(velocidad_aire)
+    with np.errstate(invalid="ignore"):
+        temp_radiante_media = temperatura_radiante_media(temp_globo, temp_aire, velocidad_aire)
+    return simular(temp_aire, temp_radiante_media, presion_parcial_ambiente(temp_aire, temp_bulbo), velocidad_aire,
+                   carga_metabolica, iclo, **opciones)
+
+
+def simular_turno(condiciones, trabajadores, carga_metabolica=None, series=True):
+    """Simulación de un turno: `condiciones` por minuto y una fila por trabajador.
+
+    `condiciones` es un DataFrame (o dict de columnas) con las variables de
+    VARIABLES_CONDICIONES, una fila por minuto. `trabajadores` tiene nombre,
+    iclo, carga_metabolica (W) y aclimatacion, y opcionalmente postura, peso,
+    altura y bebe. La tasa metabólica variable se da con `carga_metabolica`
+    (forma (N, T) o (T,)) o con una columna carga_metabolica en `condiciones`.
+    """
+    condiciones = pd.DataFrame(condiciones)
+    trabajadores = pd.DataFrame(trabajadores)
+    faltantes = [v for v in VARIABLES_CONDICIONES if v not in condiciones]
+    faltantes += [c for c, defecto in COLUMNAS_TRABAJADOR.items() if defecto is None and c not in trabajadores]
+    if faltantes:
+        raise ValueError(f"Faltan columnas: {', '.join(faltantes)}")
+    columnas = {c: (trabajadores[c] if c in trabajadores else pd.Series(defecto, index=trabajadores.index)).to_numpy()[:, None]
+                for c, defecto in COLUMNAS_TRABAJADOR.items()}
+    if carga_metabolica is not None:
+        columnas["carga_metabolica"] = carga_metabolica
+    elif "carga_metabolica" in condiciones:
+        columnas["carga_metabolica"] = condiciones["carga_metabolica"].to_numpy(dtype=np.float64)
+    nombres = trabajadores["nombre"] if "nombre" in trabajadores else trabajadores.index
+    return simular_globo(*(condiciones[v].to_numpy(dtype=np.float64) for v in VARIABLES_CONDICIONES),
+                         series=series, trabajadores=nombres, **columnas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulación PHS (ISO 7933) minuto a minuto de varios trabajadores")
+    parser.add_argument("condiciones", help="CSV con una fila por minuto: temp_aire, temp_globo, temp_bulbo, velocidad_aire")
+    parser.add_argument("trabajadores", help="CSV con nombre, iclo, carga_metabolica, aclimatacion")
+    parser.add_argument("--mostrar", help="trabajador cuya serie se muestra cada 30 min")
+    args = parser.parse_args()
+
+    trabajadores = pd.read_csv(args.trabajadores)
+    inicio = time.perf_counter()
+    simulacion = simular_turno(pd.read_csv(args.condiciones), trabajadores)
+    segundos = time.perf_counter() - inicio
+    print(f"{len(trabajadores):,} trabajadores x {simulacion.temp_rectal.shape[1]} minutos en {segundos:.2f} s")
+    with pd.option_context("display.width", 200):
+        print(simulacion.resumen())
+        if args.mostrar is not None:
+            fila = simulacion.trabajadores.index(args.mostrar)
+            minutos = np.arange(29, simulacion.temp_rectal.shape[1], 30)
+            print(pd.DataFrame({"minuto": minutos + 1, "temp_rectal": simulacion.temp_rectal[fila, minutos],
+                                "perdida_agua_g": simulacion.perdida_agua[fila, minutos]}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""Planificador de ciclos de trabajo/descanso con los límites de SWreq e ISC
+
+Dado un pronóstico horario (temp_aire, temp_globo, temp_bulbo, velocidad_aire) y
+la definición del turno (hora de inicio dentro del pronóstico, duración e
+intervalo, por defecto 12 h en intervalos de 5 min), calcula para cada cuadrilla
+en qué intervalos trabajar y en cuáles descansar para maximizar el tiempo de
+trabajo sin superar los umbrales de alarma:
+
+- Almacenamiento de calor: en cada intervalo se acumula (Ereq - Ep) del método
+  SWreq, donde Ep es la evaporación posible con w_max y sw_max, hasta Q_max;
+  cuando Ereq < Ep (descanso a la sombra) el calor almacenado se recupera. El ISC
+  se acumula igual con (Ereq - Emax) del ISC hasta 2440, el numerador de su
+  tiempo de exposición permitido. El estado es la fracción usada del más
+  restrictivo: sumar en cada intervalo el mayor de los dos incrementos
+  normalizados acota por arriba a ambos acumulados.
+- Deshidratación: la sudoración SWreq de cada intervalo se suma hasta D_max
+  (no se recupera dentro del turno).
+
+La búsqueda es programación dinámica hacia atrás sobre los intervalos, con el
+almacenamiento discretizado en `niveles` fracciones (redondeando siempre hacia
+arriba, de modo que el plan nunca supera el límite real) y la actividad anterior
+en el estado para penalizar los cambios de actividad. Todas las cuadrillas se
+resuelven a la vez con operaciones de NumPy por intervalo. El límite de
+deshidratación, que depende de todo el turno, se impone con relajación
+lagrangiana: a las cuadrillas que lo superan se les descuenta la sudoración
+extra de cada intervalo de trabajo y el multiplicador se ajusta por bisección.
+
+Uso:
+    python -m src.planificador pronostico.csv cuadrillas.csv [--inicio 6] [--duracion 720] [--paso 5]
+
+pronostico.csv tiene una fila por hora con las cuatro variables; cuadrillas.csv
+tiene nombre, iclo, carga_metabolica y aclimatacion (postura y conveccion son
+opcionales).
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.vectorizado import (
+    balance_sudoracion,
+    factor_postura,
+    indice_de_sudoracion_vec,
+    indice_sobrecarga_calorica_vec,
+    limites_aclimatacion,
+    presion_parcial_ambiente,
+    temperatura_radiante_media,
+)
+
+VARIABLES_PRONOSTICO = ("temp_aire", "temp_globo", "temp_bulbo", "velocidad_aire")
+# Columnas de la tabla de cuadrillas y valores por defecto de las opcionales
+COLUMNAS_CUADRILLA = {"iclo": None, "carga_metabolica": None, "aclimatacion": None, "postura": "De pie",
+                      "conveccion": "Natural"}
+DESCANSO, TRABAJO = 0, 1
+ACTIVIDADES = ("Descanso", "Trabajo")
+
+CARGA_DESCANSO = 115.0  # W, clase "Reposo" de data/Metabolismo.csv
+LIMITE_ISC = 2440.0  # numerador del tiempo de exposición permitido del ISC
+NIVELES = 200
+PENALIZACION_CAMBIO = 0.05  # en intervalos de trabajo: evita alternar cada 5 min
+ITERACIONES_LAGRANGE = 8
+
+
+def condiciones_turno(pronostico, inicio_h=0.0, duracion_min=720, paso_min=5):
+    """Variables del pronóstico horario interpoladas al centro de cada intervalo del turno.
+
+    La fila i del pronóstico corresponde a la hora i; `inicio_h` es la hora de
+    inicio del turno en esa escala.
+    """
+    horas = inicio_h + (np.arange(int(duracion_min // paso_min)) + 0.5) * paso_min / 60
+    largo = len(np.asarray(pronostico[VARIABLES_PRONOSTICO[0]]))
+    if inicio_h < 0 or horas[-1] > largo - 1:
+        raise ValueError(f"El turno ({inicio_h} h + {duracion_min} min) no está cubierto por el pronóstico de {largo} horas")
+    return {v: np.interp(horas, np.arange(largo), np.asarray(pronostico[v], dtype=np.float64))
+            for v in VARIABLES_PRONOSTICO}
+
+
+def _evaporacion_posible(e_max, limites):
+    # Evaporación con w = w_max, o con la humedad que da sw_max si la sudoración lo supera
+    w_max, sw_max = limites["w_max"], limites["sw_max"]
+    w = np.where(w_max * e_max / (1 - w_max**2 / 2) > sw_max, np.sqrt((e_max / sw_max)**2 + 2) - (e_max / sw_max), w_max)
+    return w * e_max
+
+
+def incrementos(condiciones, iclo, carga_metabolica, aclimatacion, postura="De pie", conveccion="Natural", paso_min=5):
+    """Fracción de los límites que se usa en cada intervalo: (almacenamiento, deshidratación).
+
+    `condiciones` son arreglos por intervalo (forma (T,)) y los parámetros de la
+    cuadrilla, arreglos de forma (C, 1); el resultado tiene forma (C, T). El
+    almacenamiento es el mayor de los incrementos de SWreq (sobre Q_max de
+    alarma) y de ISC (sobre 2440) y es negativo cuando hay recuperación; vale inf
+    si la evaporación máxima de SWreq es negativa. La deshidratación no es
+    negativa: un intervalo sin pérdida de sudor no repone agua.
+    """
+    ta, tg, tw, va = (condiciones[v] for v in VARIABLES_PRONOSTICO)
+    iclo = np.asarray(iclo, dtype=np.float64)
+    carga_metabolica = np.asarray(carga_metabolica, dtype=np.float64)
+    limites = limites_aclimatacion(aclimatacion)
+    postura_trabajo = factor_postura(postura)
+    natural = np.asarray(conveccion) == "Natural"
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        e_max, e_req = balance_sudoracion(ta, presion_parcial_ambiente(ta, tw), temperatura_radiante_media(tg, ta, va),
+                                          iclo, carga_metabolica / 1.7, va, postura_trabajo, natural)
+        swreq = (e_req - _evaporacion_posible(e_max, limites)) * paso_min / (60 * limites["Q_max_alarma"])
+        swreq = np.where(e_max < 0, np.inf, swreq)
+        isc = indice_sobrecarga_calorica_vec(carga_metabolica, va, tg, ta, tw, iclo, 170, 70)
+        isc = (isc["evaporacion_req"] - isc["evaporacion_max"]) * paso_min / LIMITE_ISC
+        # DLE de deshidratación = 60·D_max/sw_p: la fracción por minuto es su inverso. Con sw_p <= 0
+        # (reposo en sombra fresca) el DLE sale negativo: no suma deshidratación ni la resta
+        dle_d = indice_de_sudoracion_vec(ta, tg, tw, iclo, carga_metabolica, va, postura, aclimatacion, conveccion)["dle_alarma_d"]
+        deshidratacion = np.maximum(paso_min / dle_d, 0)
+    return np.maximum(swreq, isc), deshidratacion
+
+
+def _programar(almacenamiento, recompensa, niveles, penalizacion):
+    """DP hacia atrás para todas las cuadrillas: actividad por intervalo (C, T) y factibilidad (C,).
+
+    `almacenamiento` es (2, C, T) con los incrementos de descanso y trabajo;
+    `recompensa`, (C, T) con el valor de trabajar cada intervalo (descansar vale 0).
+    """
+    _, cuadrillas, intervalos = almacenamiento.shape
+    # Pasos de nivel redondeados hacia arriba (inf o enormes quedan fuera de la rejilla)
+    pasos = np.ceil(np.nan_to_num(almacenamiento * niveles, nan=np.inf, posinf=niveles + 1)
+                    .clip(-niveles, niveles + 1)).astype(np.int32)
+    n = niveles + 1
+    filas = np.arange(cuadrillas)
+    # Cada fila de `extendido` es [valor del nivel 0 (n veces), valor, -inf (n + 1 veces)]: el valor
+    # después de un paso s desde el nivel q está en la posición n + q + s, así que la ventana de
+    # largo n que empieza en n + s da el valor siguiente de todos los niveles (el nivel no baja de 0
+    # y pasar de `niveles` es no factible)
+    extendido = np.full((2, cuadrillas, 3 * n + 1), -np.inf, dtype=np.float32)
+    valor = extendido[:, :, n:2 * n]
+    valor[:] = 0
+    ventanas = sliding_window_view(extendido, n, axis=2)
+    decisiones = np.empty((intervalos, 2, cuadrillas, n), dtype=bool)
+    recompensa = recompensa.astype(np.float32)
+    trabajar_con_cambio = np.empty((cuadrillas, n), dtype=np.float32)
+    descansar_con_cambio = np.empty((cuadrillas, n), dtype=np.float32)
+    for t in range(intervalos - 1, -1, -1):
+        extendido[:, :, :n] = valor[:, :, :1]
+        descansar = ventanas[DESCANSO, filas, n + pasos[DESCANSO, :, t]]
+        trabajar = ventanas[TRABAJO, filas, n + pasos[TRABAJO, :, t]]
+        trabajar += recompensa[:, t, None]
+        # Decisión según la actividad del intervalo anterior (cambiar cuesta `penalizacion`)
+        np.subtract(trabajar, penalizacion, out=trabajar_con_cambio)
+        np.subtract(descansar, penalizacion, out=descansar_con_cambio)
+        np.greater(trabajar_con_cambio, descansar, out=decisiones[t, DESCANSO])
+        np.greater(trabajar, descansar_con_cambio, out=decisiones[t, TRABAJO])
+        np.maximum(descansar, trabajar_con_cambio, out=valor[DESCANSO])
+        np.maximum(trabajar, descansar_con_cambio, out=valor[TRABAJO])
+
+    # Reconstrucción hacia adelante desde almacenamiento 0; la primera actividad no se penaliza
+    factible = np.isfinite(valor[:, :, 0]).any(axis=0)
+    anterior = np.where(valor[TRABAJO, :, 0] > valor[DESCANSO, :, 0], TRABAJO, DESCANSO)
+    nivel = np.zeros(cuadrillas, dtype=np.int64)
+    trabajo = np.zeros((cuadrillas, intervalos), dtype=bool)
+    for t in range(intervalos):
+        actividad = decisiones[t, anterior, filas, nivel] & factible
+        trabajo[:, t] = actividad
+        # Las cuadrillas no factibles pueden salir de la rejilla descansando: se recortan
+        nivel = np.clip(nivel + pasos[actividad.astype(np.intp), filas, t], 0, niveles)
+        anterior = actividad.astype(np.intp)
+    return trabajo, factible
+
+
+def _recorrido(incremento, trabajo):
+    # Fracción acumulada exacta al final de cada intervalo, sin bajar de 0
+    acumulado = np.zeros(trabajo.shape)
+    actual = np.zeros(trabajo.shape[0])
+    paso = np.where(trabajo, incremento[TRABAJO], incremento[DESCANSO])
+    for t in range(trabajo.shape[1]):
+        actual = np.maximum(actual + paso[:, t], 0)
+        acumulado[:, t] = actual
+    return acumulado
+
+
+class PlanTurno:
+    """Plan de trabajo/descanso de varias cuadrillas en un turno."""
+
+    def __init__(self, cuadrillas, inicio_h, paso_min, trabajo, almacenamiento, deshidratacion, factible):
+        self.cuadrillas = list(cuadrillas)
+        self.inicio_h = inicio_h
+        self.paso_min = paso_min
+        self.trabajo = trabajo  # (C, T) bool
+        self.almacenamiento = almacenamiento  # (C, T) fracción de Q_max (o del ISC) al final de cada intervalo
+        self.deshidratacion = deshidratacion  # (C, T) fracción de D_max acumulada
+        self.factible = factible
+
+    def resumen(self):
+        """Una fila por cuadrilla: minutos de trabajo, picos de almacenamiento y deshidratación final."""
+        return pd.DataFrame({
+            "cuadrilla": self.cuadrillas,
+            "minutos_trabajo": self.trabajo.sum(axis=1) * self.paso_min,
+            "minutos_descanso": (~self.trabajo).sum(axis=1) * self.paso_min,
+            "almacenamiento_max": self.almacenamiento.max(axis=1, initial=0),
+            "deshidratacion_final": self.deshidratacion[:, -1] if self.deshidratacion.size else 0.0,
+            "factible": self.factible,
+        })
+
+    def bloques(self, cuadrilla):
+        """Bloques consecutivos de trabajo o descanso de una cuadrilla (por nombre o posición)."""
+        fila = self.cuadrillas.index(cuadrilla) if cuadrilla in self.cuadrillas else cuadrilla
+        actividad = self.trabajo[fila].astype(np.int8)
+        cortes = np.flatnonzero(np.diff(actividad)) + 1
+        inicios = np.concatenate([[0], cortes])
+        fines = np.concatenate([cortes, [len(actividad)]])
+        return pd.DataFrame({
+            "inicio_h": self.inicio_h + inicios * self.paso_min / 60,
+            "fin_h": self.inicio_h + fines * self.paso_min / 60,
+            "actividad": [ACTIVIDADES[a] for a in actividad[inicios]],
+            "almacenamiento_fin": self.almacenamiento[fila, fines - 1],
+        })
+
+
+def planificar(pronostico, cuadrillas, inicio_h=0.0, duracion_min=720, paso_min=5, carga_descanso=CARGA_DESCANSO,
+               descanso_sombra=True, niveles=NIVELES, penalizacion_cambio=PENALIZACION_CAMBIO):
+    """Plan de trabajo/descanso que maximiza el tiempo de trabajo de cada cuadrilla.
+
+    `cuadrillas` es un DataFrame (o dict de columnas) con nombre, iclo,
+    carga_metabolica (W) y aclimatacion, y opcionalmente postura y conveccion.
+    Durante el descanso la tasa metabólica es `carga_descanso` y, con
+    `descanso_sombra`, la temperatura de globo es la del aire. Una cuadrilla es
+    no factible si ni descansando todo el turno se mantiene bajo los límites; en
+    ese caso su plan es descanso completo.
+    """
+    cuadrillas = pd.DataFrame(cuadrillas)
+    faltantes = [columna for columna, defecto in COLUMNAS_CUADRILLA.items() if defecto is None and columna not in cuadrillas]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en la tabla de cuadrillas: {', '.join(faltantes)}")
+    tabla = pd.DataFrame({columna: cuadrillas[columna] if columna in cuadrillas else defecto
+                          for columna, defecto in COLUMNAS_CUADRILLA.items()}, index=cuadrillas.index)
+    # Las cuadrillas con la misma configuración tienen el mismo plan: se resuelve una vez por configuración
+    grupo = tabla.groupby(list(COLUMNAS_CUADRILLA), sort=False).ngroup().to_numpy()
+    configuraciones = tabla.drop_duplicates()
+    columnas = {columna: configuraciones[columna].to_numpy()[:, None] for columna in COLUMNAS_CUADRILLA}
+
+    condiciones = condiciones_turno(pronostico, inicio_h, duracion_min, paso_min)
+    sombra = {**condiciones, "temp_globo": condiciones["temp_aire"]} if descanso_sombra else condiciones
+    trabajo_q, trabajo_d = incrementos(condiciones, **columnas, paso_min=paso_min)
+    descanso_q, descanso_d = incrementos(sombra, **{**columnas, "carga_metabolica": carga_descanso}, paso_min=paso_min)
+    almacenamiento = np.stack([descanso_q, trabajo_q])
+    deshidratacion = np.stack([descanso_d, trabajo_d])
+
+    # Sin considerar la deshidratación; luego bisección del multiplicador para quienes superan D_max
+    with np.errstate(invalid="ignore"):
+        # inf - inf (Emax < 0 al trabajar y al descansar) da NaN: esas cuadrillas no son factibles
+        extra = trabajo_d - descanso_d
+    trabajo, factible = _programar(almacenamiento, np.ones_like(trabajo_q), niveles, penalizacion_cambio)
+    # Si ni eligiendo en cada intervalo la actividad que menos suda se cumple D_max, no hay plan posible
+    factible &= np.minimum(trabajo_d, descanso_d).sum(axis=1) <= 1
+    trabajo[~factible] = False
+    d_final = _recorrido(deshidratacion, trabajo)[:, -1]
+    pendientes = np.flatnonzero(factible & (d_final > 1))
+    if len(pendientes):
+        extra_positiva = np.sort(np.where(extra[pendientes] > 0, extra[pendientes], np.inf), axis=1)
+        # Con el extremo ningún intervalo de trabajo con sudoración extra conviene. El multiplicador
+        # buscado no supera 1/e_k, donde e_k es la sudoración extra del primer intervalo que ya no
+        # cabe en el presupuesto de D_max tomando los intervalos de menor sudoración extra
+        extremo = 1 / extra_positiva[:, 0].clip(1e-12)
+        presupuesto = 1 - descanso_d[pendientes].sum(axis=1)
+        k = (np.cumsum(extra_positiva, axis=1) <= presupuesto[:, None]).sum(axis=1).clip(max=extra_positiva.shape[1] - 1)
+        bajo = np.zeros(len(pendientes))
+        alto = np.minimum(extremo, 1 / extra_positiva[np.arange(len(pendientes)), k])
+        mejor = np.zeros((len(pendientes), trabajo.shape[1]), dtype=bool)
+        con_solucion = np.zeros(len(pendientes), dtype=bool)
+        for iteracion in range(ITERACIONES_LAGRANGE + 1):
+            # La primera iteración prueba el extremo: si ni así se cumple D_max, no es factible
+            multiplicador = extremo if iteracion == 0 else (bajo + alto) / 2
+            recompensa = 1 - multiplicador[:, None] * extra[pendientes]
+            plan, _ = _programar(almacenamiento[:, pendientes], recompensa, niveles, penalizacion_cambio)
+            cumple = _recorrido(deshidratacion[:, pendientes], plan)[:, -1] <= 1
+            mejor[cumple] = plan[cumple]
+            con_solucion |= cumple
+            if iteracion:
+                alto = np.where(cumple, multiplicador, alto)
+                bajo = np.where(cumple, bajo, multiplicador)
+        trabajo[pendientes] = mejor
+        factible[pendientes] = con_solucion
+
+    nombres = cuadrillas["nombre"] if "nombre" in cuadrillas else cuadrillas.index
+    return PlanTurno(nombres, inicio_h, paso_min, trabajo[grupo], _recorrido(almacenamiento, trabajo)[grupo],
+                     _recorrido(deshidratacion, trabajo)[grupo], factible[grupo])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan de trabajo/descanso por cuadrilla a partir de un pronóstico horario")
+    parser.add_argument("pronostico", help="CSV con una fila por hora: temp_aire, temp_globo, temp_bulbo, velocidad_aire")
+    parser.add_argument("cuadrillas", help="CSV con nombre, iclo, carga_metabolica, aclimatacion")
+    parser.add_argument("--inicio", type=float, default=0.0, help="hora de inicio del turno (fila del pronóstico)")
+    parser.add_argument("--duracion", type=float, default=720, help="duración del turno (min)")
+    parser.add_argument("--paso", type=float, default=5, help="intervalo de planificación (min)")
+    parser.add_argument("--carga-descanso", type=float, default=CARGA_DESCANSO)
+    parser.add_argument("--mostrar", help="cuadrilla cuyo horario se muestra por bloques")
+    args = parser.parse_args()
+
+    cuadrillas = pd.read_csv(args.cuadrillas)
+    inicio = time.perf_counter()
+    plan = planificar(pd.read_csv(args.pronostico), cuadrillas, args.inicio, args.duracion, args.paso, args.carga_descanso)
+    segundos = time.perf_counter() - inicio
+    print(f"{len(cuadrillas):,} cuadrillas x {plan.trabajo.shape[1]} intervalos en {segundos:.2f} s")
+    with pd.option_context("display.width", 200):
+        print(plan.resumen())
+        if args.mostrar is not None:
+            print(plan.bloques(args.mostrar))
+
+
+if __name__ == "__main__":
+    main()
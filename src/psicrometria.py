@@ -0,0 +1,98 @@
+"""Psicrometría vectorizada: bulbo húmedo a partir de la humedad relativa y viceversa
+
+El índice de calor usa la humedad relativa; TGBH, SWreq e ISC usan la
+temperatura de bulbo húmedo. Cuando un registro trae solo una de las dos, la
+otra se deriva con la misma relación psicrométrica de src.vectorizado (y
+src.funciones), así que derivar y volver da el valor original:
+
+    pa = ps(tbh) - 0.0667 · (ta - tbh)        (kPa)
+    HR = 100 · pa / ps(ta)
+
+La humedad relativa sale directo de esas fórmulas. El bulbo húmedo no tiene
+forma cerrada: se parte de la aproximación de Stull (2011), válida para HR
+5-99 % y -20 a 50 °C pero ajustada a tablas psicrométricas y no a la relación
+de arriba (difiere hasta 1.3 °C entre 15 y 50 °C), y se refina con Newton
+sobre todo el arreglo, actualizando solo los elementos que aún no convergen.
+La función a anular es creciente y convexa, así que fuera del rango de Stull se
+parte de la temperatura del aire (siempre a la derecha de la raíz) y Newton
+converge sin oscilar.
+"""
+
+import numpy as np
+
+from src.vectorizado import _numerico, presion_parcial_ambiente, presion_saturacion
+
+CONSTANTE_PSICROMETRICA = 0.0667  # kPa/°C, la de presion_parcial_ambiente
+TOLERANCIA = 1e-4  # °C
+ITERACIONES_MAXIMAS = 50
+
+# Rango de validez de la aproximación de Stull
+RANGO_STULL_HUMEDAD = (5.0, 99.0)
+RANGO_STULL_TEMPERATURA = (-20.0, 50.0)
+
+
+def humedad_relativa(temp_aire, temp_bulbo):
+    """Humedad relativa (%) a partir de la temperatura del aire y la de bulbo húmedo (°C)."""
+    return 100 * presion_parcial_ambiente(temp_aire, temp_bulbo) / presion_saturacion(temp_aire)
+
+
+def bulbo_humedo_stull(temp_aire, humedad_relativa):
+    """Aproximación de Stull (2011) del bulbo húmedo (°C); solo para HR 5-99 % y -20 a 50 °C."""
+    ta, hr = _numerico(temp_aire), _numerico(humedad_relativa)
+    return (ta * np.arctan(0.151977 * np.sqrt(hr + 8.313659)) + np.arctan(ta + hr) - np.arctan(hr - 1.676331)
+            + 0.00391838 * hr ** 1.5 * np.arctan(0.023101 * hr) - 4.686035)
+
+
+def temperatura_bulbo_humedo(temp_aire, humedad_relativa, exacta=True):
+    """Temperatura de bulbo húmedo (°C) a partir de la del aire (°C) y la humedad relativa (%).
+
+    Con `exacta=False` devuelve la aproximación de Stull donde es válida (y
+    resuelve el resto); con `exacta=True` el resultado cumple la relación
+    psicrométrica del repositorio con una tolerancia de TOLERANCIA °C.
+    """
+    ta, hr = np.broadcast_arrays(_numerico(temp_aire), _numerico(humedad_relativa))
+    forma = ta.shape
+    ta, hr = ta.ravel(), hr.ravel()
+    with np.errstate(invalid="ignore"):
+        en_rango = ((hr >= RANGO_STULL_HUMEDAD[0]) & (hr <= RANGO_STULL_HUMEDAD[1])
+                    & (ta >= RANGO_STULL_TEMPERATURA[0]) & (ta <= RANGO_STULL_TEMPERATURA[1]))
+        tbh = np.where(en_rango, bulbo_humedo_stull(ta, hr), ta)
+        # Newton sobre f(tbh) = ps(tbh) + k·tbh - (pa + k·ta): los elementos pendientes se compactan en cada paso
+        objetivo = hr / 100 * presion_saturacion(ta) + CONSTANTE_PSICROMETRICA * ta
+        resolver = np.isfinite(objetivo) & np.isfinite(tbh)
+        if not exacta:
+            resolver &= ~en_rango
+        pendientes = np.flatnonzero(resolver)
+        t, meta = tbh[pendientes], objetivo[pendientes]
+        for _ in range(ITERACIONES_MAXIMAS):
+            if not pendientes.size:
+                break
+            saturacion = presion_saturacion(t)
+            paso = (saturacion + CONSTANTE_PSICROMETRICA * t - meta) / (saturacion * 4030.18 / (t + 235) ** 2
+                                                                          + CONSTANTE_PSICROMETRICA)
+            t = t - paso
+            tbh[pendientes] = t
+            sigue = np.abs(paso) > TOLERANCIA
+            pendientes, t, meta = pendientes[sigue], t[sigue], meta[sigue]
+    tbh[~np.isfinite(ta) | ~np.isfinite(hr)] = np.nan
+    return tbh.reshape(forma)
+
+
+def completar_humedad(variables, exacta=True):
+    """Completa en `variables` (dict de arreglos) los NaN de temp_bulbo o humedad_relativa con la otra.
+
+    Solo se derivan las filas con temp_aire y la otra variable disponibles; el
+    resto queda como estaba. Modifica y devuelve `variables`.
+    """
+    ta = _numerico(variables["temp_aire"])
+    tbh = _numerico(variables["temp_bulbo"]).copy()
+    hr = _numerico(variables["humedad_relativa"]).copy()
+    sin_bulbo = np.isnan(tbh) & ~np.isnan(hr) & ~np.isnan(ta)
+    sin_humedad = np.isnan(hr) & ~np.isnan(tbh) & ~np.isnan(ta)
+    if sin_bulbo.any():
+        tbh[sin_bulbo] = temperatura_bulbo_humedo(ta[sin_bulbo], hr[sin_bulbo], exacta)
+    if sin_humedad.any():
+        with np.errstate(invalid="ignore"):
+            hr[sin_humedad] = humedad_relativa(ta[sin_humedad], tbh[sin_humedad])
+    variables["temp_bulbo"], variables["humedad_relativa"] = tbh, hr
+    return variables
@@ -0,0 +1,249 @@
+"""Tipos de resultado de los índices: tuplas con nombre, códigos enteros y lotes por columnas
+
+Los índices escalares de src.funciones devuelven tuplas con nombre inmutables y
+sin __dict__ (ResultadoCalor, ResultadoTGBH, ResultadoSudoracion, ResultadoISC):
+se desempaquetan como las tuplas de antes y cada campo también se lee por
+nombre. Los niveles, estados y clasificaciones son códigos IntEnum pequeños;
+el texto se resuelve con `.texto` (o con las tuplas de etiquetas) solo al
+mostrarlo. El SWreq lleva un estado explícito (EstadoSudoracion) en lugar de
+reconocer el caso Emax < 0 por los cuatro DLE en cero. Los resultados que no
+se pueden calcular (NaN o infinitos, por ejemplo globo más frío que el aire con
+convección natural) llevan el código SIN_DATO, como NivelCalor.SIN_DATO.
+
+Para lotes y flujos, LoteResultados guarda un tipo de resultado por columnas en
+arreglos de NumPy con los formatos de FORMATOS (los mismos de los arreglos
+estructurados de src.vectorizado): un millón de ResultadoSudoracion ocupa 33 MB
+en lugar de unos 190 MB como lista de tuplas con floats de Python.
+
+Solo usa la biblioteca estándar al importar (src.funciones lo importa); NumPy
+se importa al crear un lote.
+"""
+
+from collections import namedtuple
+from enum import IntEnum
+
+"""Etiquetas de los códigos (el índice de cada texto es su código)"""
+
+NIVELES_CALOR = ("Sin dato", "Nivel I", "Nivel II", "Nivel III", "Nivel IV")
+ESTADOS_TGBH = ("Discomfort", "Estrés Térmico")
+CLASIFICACIONES_ISC = (
+    "Confort térmico",
+    "Carga suave",
+    "Carga moderada (Zona de alarma)",
+    "Carga severa",
+    "Carga muy severa",
+    "Carga máxima permisible",
+    "Condiciones críticas por sobrecarga calórica",
+    "Sin dato",
+)
+ESTADOS_SUDORACION = ("Calculado", "No aplicable (Emax < 0)", "Sin dato")
+CATEGORIAS_FANGER = ("A", "B", "C", "Fuera de categoría")
+ESTADOS_FANGER = ("Calculado", "Fuera del rango de la ISO 7730", "Sin convergencia")
+
+
+class NivelCalor(IntEnum):
+    SIN_DATO = 0
+    NIVEL_I = 1
+    NIVEL_II = 2
+    NIVEL_III = 3
+    NIVEL_IV = 4
+
+    @property
+    def texto(self):
+        return NIVELES_CALOR[self]
+
+
+class EstadoTGBH(IntEnum):
+    DISCOMFORT = 0
+    ESTRES_TERMICO = 1
+
+    @property
+    def texto(self):
+        return ESTADOS_TGBH[self]
+
+
+class ClasificacionISC(IntEnum):
+    CONFORT = 0
+    SUAVE = 1
+    MODERADA = 2
+    SEVERA = 3
+    MUY_SEVERA = 4
+    MAXIMA_PERMISIBLE = 5
+    CRITICA = 6
+    # ISC no calculable (NaN o infinito): no es una clasificación
+    SIN_DATO = 7
+
+    @property
+    def texto(self):
+        return CLASIFICACIONES_ISC[self]
+
+
+class EstadoSudoracion(IntEnum):
+    CALCULADO = 0
+    # Emax < 0: el método no se aplica y los cuatro DLE valen 0
+    EMAX_NEGATIVO = 1
+    # Emax o Ereq no calculables (NaN o infinitos): los cuatro DLE valen NaN
+    SIN_DATO = 2
+
+    @property
+    def texto(self):
+        return ESTADOS_SUDORACION[self]
+
+
+class CategoriaFanger(IntEnum):
+    """Categoría del ambiente térmico según la ISO 7730 (anexo A)."""
+
+    A = 0
+    B = 1
+    C = 2
+    FUERA = 3
+
+    @property
+    def texto(self):
+        return CATEGORIAS_FANGER[self]
+
+
+class EstadoFanger(IntEnum):
+    CALCULADO = 0
+    # Alguna entrada está fuera del rango de aplicación de la ISO 7730 (el PMV se calcula igual)
+    FUERA_DE_RANGO = 1
+    # La temperatura de la ropa no convergió (o alguna entrada no es un número)
+    SIN_CONVERGENCIA = 2
+
+    @property
+    def texto(self):
+        return ESTADOS_FANGER[self]
+
+
+"""Resultados escalares
+
+FORMATOS da el tipo de NumPy de cada campo (en el orden de la tupla) y CODIGOS
+el IntEnum de los campos con códigos.
+"""
+
+class ResultadoCalor(namedtuple("ResultadoCalor", "ih nivel nivel_para_medidas")):
+    __slots__ = ()
+    FORMATOS = (("ih", "f8"), ("nivel", "i1"), ("nivel_para_medidas", "i1"))
+    CODIGOS = {"nivel": NivelCalor, "nivel_para_medidas": NivelCalor}
+
+
+class ResultadoTGBH(namedtuple("ResultadoTGBH", "wbgt wbgt_efectivo wbgt_ref estado")):
+    __slots__ = ()
+    FORMATOS = (("wbgt", "f8"), ("wbgt_efectivo", "f8"), ("wbgt_ref", "f8"), ("estado", "i1"))
+    CODIGOS = {"estado": EstadoTGBH}
+
+
+CAMPOS_DLE = ("dle_alarma_q", "dle_peligro_q", "dle_alarma_d", "dle_peligro_d")
+
+
+class ResultadoSudoracion(namedtuple("ResultadoSudoracion", CAMPOS_DLE + ("estado",))):
+    __slots__ = ()
+    FORMATOS = tuple((campo, "f8") for campo in CAMPOS_DLE) + (("estado", "i1"),)
+    CODIGOS = {"estado": EstadoSudoracion}
+
+    @property
+    def aplicable(self):
+        return self.estado == EstadoSudoracion.CALCULADO
+
+
+class ResultadoISC(namedtuple("ResultadoISC", "isc clasificacion tiempo_exp_per evaporacion_max evaporacion_req")):
+    __slots__ = ()
+    FORMATOS = (("isc", "f8"), ("clasificacion", "i1"), ("tiempo_exp_per", "f8"),
+                ("evaporacion_max", "f8"), ("evaporacion_req", "f8"))
+    CODIGOS = {"clasificacion": ClasificacionISC}
+
+
+class ResultadoFanger(namedtuple("ResultadoFanger", "pmv ppd temp_ropa categoria estado")):
+    __slots__ = ()
+    FORMATOS = (("pmv", "f8"), ("ppd", "f8"), ("temp_ropa", "f8"), ("categoria", "i1"), ("estado", "i1"))
+    CODIGOS = {"categoria": CategoriaFanger, "estado": EstadoFanger}
+
+
+def desde_valores(tipo, valores):
+    """Resultado `tipo` a partir de valores planos (los códigos enteros se convierten a su IntEnum)."""
+    return tipo._make(tipo.CODIGOS[campo](v) if campo in tipo.CODIGOS else v
+                      for campo, v in zip(tipo._fields, valores))
+
+
+"""Lote de resultados por columnas"""
+
+class LoteResultados:
+    """Resultados de un mismo tipo guardados por columnas, un arreglo de NumPy por campo.
+
+    `agregar` suma un resultado escalar y `extender` un arreglo estructurado de
+    src.vectorizado (o un dict de columnas); la capacidad se duplica al
+    llenarse. `lote[i]` e iterar devuelven resultados escalares de `tipo`, y
+    `columna(campo)` una vista de solo lectura de las filas ocupadas.
+    """
+
+    __slots__ = ("tipo", "_columnas", "_largo")
+
+    def __init__(self, tipo, capacidad=1024):
+        import numpy as np
+
+        self.tipo = tipo
+        self._columnas = {campo: np.empty(capacidad, dtype=formato) for campo, formato in tipo.FORMATOS}
+        self._largo = 0
+
+    def __len__(self):
+        return self._largo
+
+    @property
+    def capacidad(self):
+        return len(self._columnas[self.tipo._fields[0]])
+
+    @property
+    def nbytes(self):
+        return sum(columna.nbytes for columna in self._columnas.values())
+
+    def _reservar(self, largo):
+        if largo <= self.capacidad:
+            return
+        import numpy as np
+
+        capacidad = max(largo, 2 * self.capacidad, 16)
+        for campo, columna in self._columnas.items():
+            nueva = np.empty(capacidad, dtype=columna.dtype)
+            nueva[:self._largo] = columna[:self._largo]
+            self._columnas[campo] = nueva
+
+    def agregar(self, resultado):
+        self._reservar(self._largo + 1)
+        for campo, valor in zip(self.tipo._fields, resultado):
+            self._columnas[campo][self._largo] = valor
+        self._largo += 1
+
+    def extender(self, arreglo):
+        """Agrega las filas de un arreglo estructurado (o {campo: arreglo}) con los campos de `tipo`."""
+        import numpy as np
+
+        largo = len(np.ravel(arreglo[self.tipo._fields[0]]))
+        self._reservar(self._largo + largo)
+        for campo, columna in self._columnas.items():
+            columna[self._largo:self._largo + largo] = np.ravel(arreglo[campo])
+        self._largo += largo
+
+    def columna(self, campo):
+        vista = self._columnas[campo][:self._largo]
+        vista.flags.writeable = False
+        return vista
+
+    def __getitem__(self, indice):
+        if not -self._largo <= indice < self._largo:
+            raise IndexError(indice)
+        indice %= self._largo
+        return desde_valores(self.tipo, [self._columnas[campo][indice].item() for campo in self.tipo._fields])
+
+    def __iter__(self):
+        columnas = [self._columnas[campo][:self._largo].tolist() for campo in self.tipo._fields]
+        for valores in zip(*columnas):
+            yield desde_valores(self.tipo, valores)
+
+    def como_arreglo(self):
+        """Copia como arreglo estructurado (el formato de src.vectorizado)."""
+        import numpy as np
+
+        arreglo = np.empty(self._largo, dtype=list(self.tipo.FORMATOS))
+        for campo in self.tipo._fields:
+            arreglo[campo] = self._columnas[campo][:self._largo]
+        return arreglo
@@ -0,0 +1,311 @@
+"""Servicio HTTP (ASGI) para calcular los índices sin la interfaz de Streamlit
+
+Expone los cuatro índices como endpoints JSON (POST):
+
+    /indice-calor   temp_aire, humedad_relativa, exposicion_solar
+    /tgbh           radiacion_solar, temp_aire, temp_globo, temp_bulbo, cavs, carga_metabolica, aclimatacion
+    /sudoracion     temp_aire, temp_globo, temp_bulbo, iclo, carga_metabolica, velocidad_aire,
+                    postura, aclimatacion, conveccion
+    /isc            carga_metabolica, velocidad_aire, temp_globo, temp_aire, temp_bulbo, iclo
+                    (altura y peso opcionales, 170 y 70 por defecto)
+
+El cuerpo puede ser una lectura (un objeto con esos campos), que se evalúa con las
+funciones escalares memorizadas de src.cache, o un lote {"lecturas": [...]}, que
+se evalúa de una vez con las versiones vectorizadas. Los niveles, estados y
+clasificaciones se devuelven como texto (/sudoracion incluye su estado, que
+indica si Emax < 0 impide aplicar el método) y los tiempos sin límite
+(infinitos) como null. Las entradas fuera del dominio de las fórmulas se
+rechazan con 422 antes de evaluar, solas o en un lote: /isc sin movimiento de
+aire (velocidad_aire <= 0), /tgbh con carga_metabolica <= 0 y /sudoracion e /isc
+sin temperatura radiante media (globo más frío que el aire con velocidad_aire
+<= 0.15 m/s). GET /salud responde {"estado": "ok"}. Con INSTRUMENTACION=1, GET
+/metricas devuelve los histogramas de latencia de src.instrumentacion (formato de
+texto de Prometheus) del proceso que atiende la solicitud.
+
+Es una aplicación ASGI sin framework; la evaluación corre en el pool de hilos
+del bucle de eventos para no bloquear las demás conexiones mientras se calcula
+un lote. Para servirla con un proceso por núcleo y
+conexiones keep-alive (requirements-servicio.txt):
+    python -m src.servicio [--host 127.0.0.1] [--puerto 8000] [--procesos N]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+
+import numpy as np
+
+from src.cache import indice_de_calor_cache, indice_de_sudoracion_cache, indice_sobrecarga_calorica_cache, tgbh_cache
+from src.funciones import EFECTOS_CALOR, NIVELES_CALOR
+from src.instrumentacion import ACTIVA, como_prometheus, medir
+from src.vectorizado import (
+    CLASIFICACIONES_ISC,
+    ESTADOS_SUDORACION,
+    ESTADOS_TGBH,
+    indice_de_calor_vec,
+    indice_de_sudoracion_vec,
+    indice_sobrecarga_calorica_vec,
+    temperatura_radiante_media,
+    tgbh_vec,
+)
+
+MAXIMO_CUERPO = 16 * 1024 * 1024  # bytes
+MAXIMO_LECTURAS = 100_000
+SEGUNDOS_KEEP_ALIVE = 30
+
+CAMPOS_TEXTO = {"exposicion_solar", "radiacion_solar", "postura", "aclimatacion", "conveccion"}
+VALORES_OPCIONALES = {"altura": 170, "peso": 70}
+# Ruta -> campos que deben ser mayores que 0 (con Emax = 0 el ISC es una división por cero y
+# el TGBH de referencia es el logaritmo de la carga metabólica)
+CAMPOS_POSITIVOS = {"/isc": ("velocidad_aire",), "/tgbh": ("carga_metabolica",)}
+# Rutas que usan la temperatura radiante media, que no está definida con el globo más frío que el aire
+# en convección natural (ni con el globo muy frío en convección forzada)
+RUTAS_RADIANTE = {"/sudoracion", "/isc"}
+
+
+class ErrorSolicitud(Exception):
+    """Error del cliente: se responde con `estado` y el mensaje en JSON."""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.mensaje = mensaje
+
+
+def _numero(valor):
+    # JSON no admite inf ni NaN: los límites infinitos se devuelven como null
+    valor = float(valor)
+    return valor if math.isfinite(valor) else None
+
+
+def _columna(valores):
+    return [v if math.isfinite(v) else None for v in valores.tolist()]
+
+
+"""Índice de calor"""
+
+def _calor_lectura(l):
+    ih, nivel, nivel_para_medidas = indice_de_calor_cache(l["temp_aire"], l["humedad_relativa"], l["exposicion_solar"])
+    return {"ih": _numero(ih), "nivel": NIVELES_CALOR[nivel], "efecto": EFECTOS_CALOR[nivel],
+            "nivel_para_medidas": NIVELES_CALOR[nivel_para_medidas]}
+
+
+def _calor_lote(c):
+    r = indice_de_calor_vec(c["temp_aire"], c["humedad_relativa"], c["exposicion_solar"])
+    niveles = r["nivel"].tolist()
+    return {"ih": _columna(r["ih"]), "nivel": [NIVELES_CALOR[n] for n in niveles],
+            "efecto": [EFECTOS_CALOR[n] for n in niveles],
+            "nivel_para_medidas": [NIVELES_CALOR[n] for n in r["nivel_para_medidas"].tolist()]}
+
+
+"""TGBH"""
+
+def _tgbh_lectura(l):
+    wbgt, wbgt_efectivo, wbgt_ref, estado = tgbh_cache(l["radiacion_solar"], l["temp_aire"], l["temp_globo"],
+                                                       l["temp_bulbo"], l["cavs"], l["carga_metabolica"], l["aclimatacion"])
+    return {"wbgt": _numero(wbgt), "wbgt_efectivo": _numero(wbgt_efectivo), "wbgt_ref": _numero(wbgt_ref), "estado": estado.texto}
+
+
+def _tgbh_lote(c):
+    r = tgbh_vec(c["radiacion_solar"], c["temp_aire"], c["temp_globo"], c["temp_bulbo"], c["cavs"],
+                 c["carga_metabolica"], c["aclimatacion"])
+    return {"wbgt": _columna(r["wbgt"]), "wbgt_efectivo": _columna(r["wbgt_efectivo"]), "wbgt_ref": _columna(r["wbgt_ref"]),
+            "estado": [ESTADOS_TGBH[e] for e in r["estado"].tolist()]}
+
+
+"""Índice de sudoración requerida (SWreq)"""
+
+CAMPOS_SUDORACION = ("dle_alarma_q", "dle_peligro_q", "dle_alarma_d", "dle_peligro_d")
+
+
+def _sudoracion_lectura(l):
+    resultado = indice_de_sudoracion_cache(l["temp_aire"], l["temp_globo"], l["temp_bulbo"], l["iclo"], l["carga_metabolica"],
+                                           l["velocidad_aire"], l["postura"], l["aclimatacion"], l["conveccion"])
+    return {**{campo: _numero(t) for campo, t in zip(CAMPOS_SUDORACION, resultado)}, "estado": resultado.estado.texto}
+
+
+def _sudoracion_lote(c):
+    r = indice_de_sudoracion_vec(c["temp_aire"], c["temp_globo"], c["temp_bulbo"], c["iclo"], c["carga_metabolica"],
+                                 c["velocidad_aire"], c["postura"], c["aclimatacion"], c["conveccion"])
+    return {**{campo: _columna(r[campo]) for campo in CAMPOS_SUDORACION},
+            "estado": [ESTADOS_SUDORACION[e] for e in r["estado"].tolist()]}
+
+
+"""Índice de Sobrecarga Calórica (ISC)"""
+
+def _isc_lectura(l):
+    isc, clasificacion, tiempo_exp_per, evaporacion_max, evaporacion_req = indice_sobrecarga_calorica_cache(
+        l["carga_metabolica"], l["velocidad_aire"], l["temp_globo"], l["temp_aire"], l["temp_bulbo"], l["iclo"],
+        l["altura"], l["peso"])
+    return {"isc": _numero(isc), "clasificacion": clasificacion.texto, "tiempo_exp_per": _numero(tiempo_exp_per),
+            "evaporacion_max": _numero(evaporacion_max), "evaporacion_req": _numero(evaporacion_req)}
+
+
+def _isc_lote(c):
+    r = indice_sobrecarga_calorica_vec(c["carga_metabolica"], c["velocidad_aire"], c["temp_globo"], c["temp_aire"],
+                                       c["temp_bulbo"], c["iclo"], c["altura"], c["peso"])
+    return {"isc": _columna(r["isc"]), "clasificacion": [CLASIFICACIONES_ISC[k] for k in r["clasificacion"].tolist()],
+            "tiempo_exp_per": _columna(r["tiempo_exp_per"]), "evaporacion_max": _columna(r["evaporacion_max"]),
+            "evaporacion_req": _columna(r["evaporacion_req"])}
+
+
+# Ruta -> (campos de entrada, evaluación de una lectura, evaluación de un lote por columnas)
+ENDPOINTS = {
+    "/indice-calor": (("temp_aire", "humedad_relativa", "exposicion_solar"), _calor_lectura, _calor_lote),
+    "/tgbh": (("radiacion_solar", "temp_aire", "temp_globo", "temp_bulbo", "cavs", "carga_metabolica", "aclimatacion"),
+              _tgbh_lectura, _tgbh_lote),
+    "/sudoracion": (("temp_aire", "temp_globo", "temp_bulbo", "iclo", "carga_metabolica", "velocidad_aire", "postura",
+                     "aclimatacion", "conveccion"), _sudoracion_lectura, _sudoracion_lote),
+    "/isc": (("carga_metabolica", "velocidad_aire", "temp_globo", "temp_aire", "temp_bulbo", "iclo", "altura", "peso"),
+             _isc_lectura, _isc_lote),
+}
+
+
+def _validar_lectura(lectura, campos, positivos=()):
+    if not isinstance(lectura, dict):
+        raise ErrorSolicitud(422, "Cada lectura debe ser un objeto JSON")
+    faltantes = [c for c in campos if c not in lectura and c not in VALORES_OPCIONALES]
+    if faltantes:
+        raise ErrorSolicitud(422, f"Faltan campos: {', '.join(faltantes)}")
+    validada = {}
+    for campo in campos:
+        valor = lectura.get(campo, VALORES_OPCIONALES.get(campo))
+        if campo in CAMPOS_TEXTO:
+            if not isinstance(valor, str):
+                raise ErrorSolicitud(422, f"El campo {campo} debe ser texto")
+        elif isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            raise ErrorSolicitud(422, f"El campo {campo} debe ser numérico")
+        if campo in positivos and not valor > 0:
+            raise ErrorSolicitud(422, f"El campo {campo} debe ser mayor que 0")
+        validada[campo] = valor
+    return validada
+
+
+def _validar_radiante(columnas):
+    radiante = temperatura_radiante_media(columnas["temp_globo"], columnas["temp_aire"], columnas["velocidad_aire"])
+    if not np.isfinite(radiante).all():
+        raise ErrorSolicitud(422, "La temperatura radiante media no está definida para esos temp_globo, temp_aire y "
+                                  "velocidad_aire (con velocidad_aire <= 0.15 m/s, temp_globo no puede ser menor que temp_aire)")
+
+
+def evaluar(ruta, cuerpo):
+    """Evalúa el cuerpo JSON ya decodificado de una solicitud a `ruta`."""
+    campos, lectura_unica, lote = ENDPOINTS[ruta]
+    positivos = CAMPOS_POSITIVOS.get(ruta, ())
+    try:
+        if isinstance(cuerpo, dict) and "lecturas" in cuerpo:
+            lecturas = cuerpo["lecturas"]
+            if not isinstance(lecturas, list):
+                raise ErrorSolicitud(422, "lecturas debe ser una lista")
+            if len(lecturas) > MAXIMO_LECTURAS:
+                raise ErrorSolicitud(413, f"Máximo {MAXIMO_LECTURAS} lecturas por solicitud")
+            validadas = [_validar_lectura(l, campos, positivos) for l in lecturas]
+            columnas = {campo: np.asarray([l[campo] for l in validadas]) for campo in campos}
+            if ruta in RUTAS_RADIANTE:
+                _validar_radiante(columnas)
+            resultados = lote(columnas)
+            nombres = list(resultados)
+            return {"resultados": [dict(zip(nombres, fila)) for fila in zip(*resultados.values())]}
+        lectura = _validar_lectura(cuerpo, campos, positivos)
+        if ruta in RUTAS_RADIANTE:
+            _validar_radiante(lectura)
+        return lectura_unica(lectura)
+    except KeyError as error:
+        # Categoría no válida en una lectura (postura, aclimatación)
+        raise ErrorSolicitud(422, f"Valor no válido: {error}") from error
+    except ValueError as error:
+        # Categorías no válidas en un lote y valores fuera del dominio de las fórmulas
+        raise ErrorSolicitud(422, str(error)) from error
+    except (ZeroDivisionError, OverflowError, TypeError) as error:
+        raise ErrorSolicitud(422, f"Entradas fuera del dominio del índice: {error}") from error
+
+
+def _evaluar_medido(ruta, cuerpo):
+    with medir("servicio" + ruta.replace("/", ".")):
+        return evaluar(ruta, cuerpo)
+
+
+async def _leer_cuerpo(receive):
+    partes, tamano = [], 0
+    while True:
+        mensaje = await receive()
+        if mensaje["type"] == "http.disconnect":
+            return None
+        partes.append(mensaje.get("body", b""))
+        tamano += len(partes[-1])
+        if tamano > MAXIMO_CUERPO:
+            raise ErrorSolicitud(413, "Cuerpo de la solicitud demasiado grande")
+        if not mensaje.get("more_body", False):
+            return b"".join(partes)
+
+
+async def _responder(send, estado, contenido):
+    cuerpo = json.dumps(contenido, ensure_ascii=False, allow_nan=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": estado,
+        "headers": [(b"content-type", b"application/json; charset=utf-8"),
+                    (b"content-length", str(len(cuerpo)).encode())],
+    })
+    await send({"type": "http.response.body", "body": cuerpo})
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            mensaje = await receive()
+            if mensaje["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif mensaje["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    ruta, metodo = scope["path"].rstrip("/") or "/", scope["method"]
+    try:
+        if ruta == "/salud" and metodo == "GET":
+            await _responder(send, 200, {"estado": "ok"})
+            return
+        if ruta == "/metricas" and metodo == "GET" and ACTIVA:
+            cuerpo = como_prometheus().encode("utf-8")
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"text/plain; version=0.0.4; charset=utf-8"),
+                                    (b"content-length", str(len(cuerpo)).encode())]})
+            await send({"type": "http.response.body", "body": cuerpo})
+            return
+        if ruta not in ENDPOINTS:
+            raise ErrorSolicitud(404, f"Ruta no encontrada: {ruta}")
+        if metodo != "POST":
+            raise ErrorSolicitud(405, "Use POST con un cuerpo JSON")
+        crudo = await _leer_cuerpo(receive)
+        if crudo is None:
+            return
+        try:
+            cuerpo = json.loads(crudo)
+        except ValueError as error:
+            raise ErrorSolicitud(400, f"JSON no válido: {error}") from error
+        resultado = await asyncio.get_running_loop().run_in_executor(None, _evaluar_medido, ruta, cuerpo)
+        await _responder(send, 200, resultado)
+    except ErrorSolicitud as error:
+        await _responder(send, error.estado, {"error": error.mensaje})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP de los índices de estrés térmico")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1,
+                        help="procesos de uvicorn (por defecto, uno por núcleo)")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run("src.servicio:app", host=args.host, port=args.puerto, workers=args.procesos,
+                timeout_keep_alive=SEGUNDOS_KEEP_ALIVE, access_log=False, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
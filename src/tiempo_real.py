@@ -0,0 +1,153 @@
+"""TGBH en ventanas móviles para flujos de sensores en vivo
+
+La ISO 7243 (y `tgbh`) supone TGBH promediado en una hora. Con sensores a 1 Hz,
+recalcular los promedios desde cero en cada muestra es innecesario: cada ventana
+guarda sumas por cubetas de tiempo en un anillo, por sensor, y mantiene la suma
+total de la ventana. Cada muestra suma a su cubeta y, al pasar a una cubeta
+nueva, se resta la cubeta que sale de la ventana, así que la actualización es
+O(1) y la memoria por sensor es fija (cubetas x ventanas), sin importar la
+frecuencia de muestreo.
+
+Todos los sensores de un EvaluadorTGBHEnVivo se guardan en arreglos de NumPy y se
+actualizan juntos, lo que permite decenas de miles de flujos en un proceso. Con
+las ventanas y cubetas por defecto cada sensor ocupa 3 kB.
+
+La ventana efectiva es de (cubetas - 1) a cubetas cubetas completas más la
+cubeta en curso: con 60 cubetas, la ventana de 60 min promedia entre 59 y 60
+minutos. Las muestras más antiguas que la ventana se descartan y las que llegan
+fuera de orden dentro de la ventana se suman a su cubeta.
+"""
+
+import numpy as np
+
+from src.vectorizado import tgbh_vec
+
+VENTANAS_S = (60, 900, 3600)
+CUBETAS = 60
+# Índice de cada variable en los arreglos de sumas
+VARIABLES_TGBH = ("temp_aire", "temp_globo", "temp_bulbo")
+
+
+class VentanaMovil:
+    """Sumas móviles de las tres temperaturas de muchos sensores en una ventana de `segundos`."""
+
+    def __init__(self, sensores, segundos, cubetas=CUBETAS):
+        self.segundos = segundos
+        self.cubetas = cubetas
+        self.ancho = segundos / cubetas
+        # float32 basta para la suma de una cubeta; las sumas de la ventana van en float64
+        self.sumas = np.zeros((sensores, cubetas, len(VARIABLES_TGBH)), dtype=np.float32)
+        self.conteos = np.zeros((sensores, cubetas), dtype=np.int32)
+        self.total = np.zeros((sensores, len(VARIABLES_TGBH)))
+        self.total_conteo = np.zeros(sensores, dtype=np.int64)
+        # Número absoluto (tiempo / ancho) de la cubeta más reciente de cada sensor
+        self.ultima = np.full(sensores, np.iinfo(np.int64).min // 2, dtype=np.int64)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.sumas, self.conteos, self.total, self.total_conteo, self.ultima))
+
+    def _vaciar(self, sensores, cubetas_absolutas):
+        posiciones = cubetas_absolutas % self.cubetas
+        self.total[sensores] -= self.sumas[sensores, posiciones]
+        self.total_conteo[sensores] -= self.conteos[sensores, posiciones]
+        self.sumas[sensores, posiciones] = 0
+        self.conteos[sensores, posiciones] = 0
+
+    def agregar(self, sensores, tiempo_s, valores):
+        """Suma `valores` (k x 3) de los sensores `sensores` (sin repetir) en el tiempo `tiempo_s`."""
+        cubeta = np.floor_divide(tiempo_s, self.ancho).astype(np.int64)
+        cubeta = np.broadcast_to(cubeta, sensores.shape)
+        ultima = self.ultima[sensores]
+        # Al avanzar se vacían las cubetas que salen de la ventana; tras una pausa más
+        # larga que la ventana (o en la primera muestra) se vacía el anillo completo
+        salto = cubeta - ultima
+        completos = sensores[salto >= self.cubetas]
+        if len(completos):
+            self.sumas[completos] = 0
+            self.conteos[completos] = 0
+            self.total[completos] = 0
+            self.total_conteo[completos] = 0
+        salto = np.where(salto >= self.cubetas, 0, salto)
+        for paso in range(1, int(salto.max(initial=0)) + 1):
+            avanzan = salto >= paso
+            self._vaciar(sensores[avanzan], ultima[avanzan] + paso)
+        avanzan = cubeta > ultima
+        self.ultima[sensores[avanzan]] = cubeta[avanzan]
+        # Tras una vuelta completa se recalculan las sumas de la ventana para no acumular redondeo
+        vuelta = sensores[avanzan & (cubeta % self.cubetas == 0)]
+        if len(vuelta):
+            self.total[vuelta] = self.sumas[vuelta].sum(axis=1, dtype=np.float64)
+            self.total_conteo[vuelta] = self.conteos[vuelta].sum(axis=1)
+
+        # Muestras más antiguas que la ventana: se descartan
+        dentro = cubeta > self.ultima[sensores] - self.cubetas
+        sensores, posiciones, valores = sensores[dentro], cubeta[dentro] % self.cubetas, valores[dentro]
+        self.sumas[sensores, posiciones] += valores
+        self.conteos[sensores, posiciones] += 1
+        self.total[sensores] += valores
+        self.total_conteo[sensores] += 1
+
+    def promedios(self, sensores):
+        """Promedios (k x 3) de la ventana; NaN para sensores sin muestras en la ventana."""
+        conteo = self.total_conteo[sensores]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.total[sensores] / np.where(conteo > 0, conteo, np.nan)[:, None]
+
+
+class EvaluadorTGBHEnVivo:
+    """TGBH en ventanas móviles para `sensores` flujos, identificados por 0..sensores-1.
+
+    Las condiciones de la tarea (radiacion_solar, cavs, carga_metabolica,
+    aclimatacion) son escalares comunes a todos los sensores o arreglos con un
+    valor por sensor.
+    """
+
+    def __init__(self, sensores, radiacion_solar, cavs, carga_metabolica, aclimatacion, ventanas_s=VENTANAS_S,
+                 cubetas=CUBETAS):
+        self.sensores = sensores
+        self.ventanas = {segundos: VentanaMovil(sensores, segundos, cubetas) for segundos in ventanas_s}
+        self.tarea = {
+            "radiacion_solar": np.broadcast_to(np.asarray(radiacion_solar), (sensores,)),
+            "cavs": np.broadcast_to(np.asarray(cavs, dtype=np.float64), (sensores,)),
+            "carga_metabolica": np.broadcast_to(np.asarray(carga_metabolica, dtype=np.float64), (sensores,)),
+            "aclimatacion": np.broadcast_to(np.asarray(aclimatacion), (sensores,)),
+        }
+
+    @property
+    def nbytes(self):
+        return sum(ventana.nbytes for ventana in self.ventanas.values())
+
+    def agregar(self, sensores, tiempo_s, temp_aire, temp_globo, temp_bulbo):
+        """Agrega una muestra por sensor y devuelve el TGBH de cada ventana para esos sensores.
+
+        `sensores` es un índice o un arreglo de índices sin repetir; `tiempo_s` (segundos,
+        por ejemplo de time.time()) y las temperaturas son escalares o arreglos del mismo
+        largo. Devuelve {segundos de la ventana: arreglo DTYPE_TGBH}.
+        """
+        sensores = np.atleast_1d(np.asarray(sensores, dtype=np.intp))
+        valores = np.empty((len(sensores), len(VARIABLES_TGBH)))
+        valores[:, 0], valores[:, 1], valores[:, 2] = temp_aire, temp_globo, temp_bulbo
+        # Las muestras con alguna temperatura faltante no entran a los promedios
+        completas = np.isfinite(valores).all(axis=1)
+        tiempo_s = np.broadcast_to(np.asarray(tiempo_s, dtype=np.float64), sensores.shape)
+        for ventana in self.ventanas.values():
+            ventana.agregar(sensores[completas], tiempo_s[completas], valores[completas])
+        return self.evaluar(sensores)
+
+    def evaluar(self, sensores=None):
+        """TGBH (DTYPE_TGBH) de cada ventana con los promedios actuales de `sensores` (todos por defecto)."""
+        sensores = np.arange(self.sensores) if sensores is None else np.atleast_1d(np.asarray(sensores, dtype=np.intp))
+        tarea = {clave: valores[sensores] for clave, valores in self.tarea.items()}
+        resultados = {}
+        for segundos, ventana in self.ventanas.items():
+            promedios = ventana.promedios(sensores)
+            resultados[segundos] = tgbh_vec(tarea["radiacion_solar"], promedios[:, 0], promedios[:, 1], promedios[:, 2],
+                                            tarea["cavs"], tarea["carga_metabolica"], tarea["aclimatacion"])
+        return resultados
+
+    def promedios(self, segundos, sensores=None):
+        """Promedios de temp_aire, temp_globo y temp_bulbo (k x 3) en la ventana de `segundos`."""
+        sensores = np.arange(self.sensores) if sensores is None else np.atleast_1d(np.asarray(sensores, dtype=np.intp))
+        return self.ventanas[segundos].promedios(sensores)
+
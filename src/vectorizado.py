@@ -0,0 +1,282 @@
+"""Versiones vectorizadas (NumPy) de los índices de src/funciones.py
+
+Cada función acepta arreglos de NumPy, Series de pandas o escalares en todas sus
+entradas (numéricas y categóricas), aplica las ramas con máscaras y devuelve un
+arreglo estructurado con un registro por fila. Los resultados coinciden con las
+versiones escalares; los textos (niveles, estados, clasificaciones) se devuelven
+como códigos enteros que se traducen con las tuplas de etiquetas de este módulo.
+Cada arreglo tiene los campos y formatos del tipo de resultado escalar de
+src.resultados, así que src.resultados.LoteResultados lo acepta directamente.
+"""
+
+import numpy as np
+
+from src.funciones import ACLIMATACION, BOLTZMAN, EMISIVIDAD_PIEL, NIVELES_CALOR, POSTURAS
+# Etiquetas para traducir los códigos de los arreglos de resultados
+from src.resultados import (
+    CAMPOS_DLE,
+    CLASIFICACIONES_ISC,
+    ESTADOS_SUDORACION,
+    ESTADOS_TGBH,
+    EstadoSudoracion,
+    ResultadoCalor,
+    ResultadoISC,
+    ResultadoSudoracion,
+    ResultadoTGBH,
+)
+
+DTYPE_INDICE_CALOR = np.dtype(list(ResultadoCalor.FORMATOS))
+DTYPE_TGBH = np.dtype(list(ResultadoTGBH.FORMATOS))
+DTYPE_SUDORACION = np.dtype(list(ResultadoSudoracion.FORMATOS))
+DTYPE_ISC = np.dtype(list(ResultadoISC.FORMATOS))
+
+# Superficie corporal (m²) con la que SWreq e ISC pasan la tasa metabólica de W a W/m²
+SUPERFICIE_CORPORAL = 1.7
+
+
+def _numerico(valor):
+    return np.asarray(valor, dtype=np.float64)
+
+
+def _categoria(valor):
+    # Sin forzar dtype: los arreglos de texto (<U) se comparan en C sin crear objetos
+    return np.asarray(valor)
+
+
+def _codigos(valor, claves, nombre):
+    """Traduce una entrada categórica al índice de su clave dentro de `claves`."""
+    categorias = _categoria(valor)
+    codigos = np.full(categorias.shape, -1, dtype=np.int8)
+    for indice, clave in enumerate(claves):
+        codigos[categorias == clave] = indice
+    if (codigos < 0).any():
+        invalidos = sorted(set(np.atleast_1d(categorias[codigos < 0]).tolist()), key=str)
+        raise ValueError(f"Valor no válido para {nombre}: {invalidos}")
+    return codigos
+
+
+def _resultado(dtype, *entradas):
+    forma = np.broadcast_shapes(*(np.shape(e) for e in entradas))
+    return np.empty(forma, dtype=dtype)
+
+
+def temperatura_radiante_media(temp_globo, temp_aire, velocidad_aire):
+    """Temperatura radiante media (°C) a partir del globo, como en funciones.py."""
+    temp_globo, temp_aire, velocidad_aire = _numerico(temp_globo), _numerico(temp_aire), _numerico(velocidad_aire)
+    with np.errstate(invalid="ignore"):
+        forzada = _radiante_forzada(temp_globo, temp_aire, velocidad_aire)
+        natural = _radiante_natural(temp_globo, temp_aire)
+    return np.where(velocidad_aire > 0.15, forzada, natural)
+
+
+def _radiante_forzada(temp_globo, temp_aire, velocidad_aire):
+    # Convección forzada (velocidad del aire > 0.15 m/s)
+    return (((temp_globo + 273)**4) + (2.5 * (10**8)) * (velocidad_aire**0.6) * (temp_globo - temp_aire))**0.25 - 273
+
+
+def _radiante_natural(temp_globo, temp_aire):
+    # Convección natural; solo definida para globo >= aire
+    diferencia = temp_globo - temp_aire
+    return (((temp_globo + 273)**4) + (0.42 * (10**8)) * (diferencia**0.25) * diferencia)**0.25 - 273
+
+
+def presion_saturacion(temp):
+    """Presión de vapor de saturación (kPa) a la temperatura dada (°C)."""
+    return np.exp(16.653 - (4030.18 / (_numerico(temp) + 235)))
+
+
+def presion_parcial_ambiente(temp_aire, temp_bulbo):
+    """Presión parcial de vapor del ambiente (kPa) a partir del bulbo húmedo."""
+    temp_aire, temp_bulbo = _numerico(temp_aire), _numerico(temp_bulbo)
+    return presion_saturacion(temp_bulbo) - 0.0667 * (temp_aire - temp_bulbo)
+
+
+def superficie_dubois(peso, altura):
+    """Superficie corporal de Du Bois (m²) con el peso en kg y la altura en cm."""
+    return 0.202 * _numerico(peso) ** 0.425 * (_numerico(altura) / 100) ** 0.725
+
+
+"""Índice de calor vectorizado"""
+
+def indice_de_calor_vec(temp_aire, humedad_relativa, exposicion_solar):
+    temp_aire = _numerico(temp_aire) * 9/5 + 32  # Convertir a Fahrenheit
+    humedad_relativa = _numerico(humedad_relativa)
+    sol = _categoria(exposicion_solar) == "Si"
+    resultado = _resultado(DTYPE_INDICE_CALOR, temp_aire, humedad_relativa, sol)
+
+    indice_preliminar = 0.5*(temp_aire+61.0+((temp_aire-68)*1.2)+(humedad_relativa*0.094))
+    ih = -42.379 + 2.04901523*temp_aire + 10.14333127*humedad_relativa - .22475541*temp_aire*humedad_relativa - .00683783*temp_aire*temp_aire - .05481717*humedad_relativa*humedad_relativa + .00122874*temp_aire*temp_aire*humedad_relativa + .00085282*temp_aire*humedad_relativa*humedad_relativa - .00000199*temp_aire*temp_aire*humedad_relativa*humedad_relativa
+    # Ajuste 1 (HR < 13 % y 80 °F < T < 112 °F) y ajuste 2 (HR > 85 % y 80 °F < T < 87 °F)
+    ajuste_1 = (humedad_relativa < 13) & (80 < temp_aire) & (temp_aire < 112)
+    raiz = np.sqrt(np.clip((17-np.abs(temp_aire-95))/17, 0, None))
+    ih = np.where(ajuste_1, ih - ((13-humedad_relativa)/4)*raiz, ih)
+    ajuste_2 = (80 < temp_aire) & (temp_aire < 87) & (humedad_relativa > 85)
+    ih = np.where(ajuste_2, ih + ((humedad_relativa-85)/10) * ((87-temp_aire)/5), ih)
+    ih = np.where(indice_preliminar >= 80, ih, indice_preliminar)
+
+    nivel = np.select([ih < 91, ih < 103, ih < 125, ih >= 125], [1, 2, 3, 4], 0)
+    # Con exposición solar las medidas corresponden al siguiente nivel (máximo Nivel IV)
+    nivel_para_medidas = np.where(sol & (nivel > 0), np.minimum(nivel + 1, 4), nivel)
+
+    resultado["ih"] = ih
+    resultado["nivel"] = nivel
+    resultado["nivel_para_medidas"] = nivel_para_medidas
+    return resultado
+
+
+"""TGBH vectorizado"""
+
+def tgbh_vec(radiacion_solar, temp_aire, temp_globo, temp_bulbo, cavs, carga_metabolica, aclimatacion):
+    temp_aire, temp_globo, temp_bulbo = _numerico(temp_aire), _numerico(temp_globo), _numerico(temp_bulbo)
+    cavs, carga_metabolica = _numerico(cavs), _numerico(carga_metabolica)
+    sin_sol = _categoria(radiacion_solar) == "No"
+    aclimatado = _categoria(aclimatacion) == "Si"
+    resultado = _resultado(DTYPE_TGBH, sin_sol, temp_aire, temp_globo, temp_bulbo, cavs, carga_metabolica, aclimatado)
+
+    wbgt = np.where(sin_sol, (0.7*temp_bulbo)+(0.3*temp_globo), (0.7*temp_bulbo)+(0.2*temp_globo)+(0.1*temp_aire))
+    wbgt_efectivo = wbgt + cavs
+    logaritmo = np.log(carga_metabolica) / np.log(10)
+    wbgt_ref = np.where(aclimatado, 56.7-(11.5*logaritmo), 59.9-(14.1*logaritmo))
+
+    resultado["wbgt"] = wbgt
+    resultado["wbgt_efectivo"] = wbgt_efectivo
+    resultado["wbgt_ref"] = wbgt_ref
+    resultado["estado"] = wbgt_efectivo > wbgt_ref
+    return resultado
+
+
+"""Índice de sudoración requerida (SWreq) vectorizado"""
+
+def indice_de_sudoracion_vec(temp_aire, temp_globo, temp_bulbo, iclo, carga_metabolica, velocidad_aire, postura, aclimatacion, conveccion,
+                             superficie_corporal=SUPERFICIE_CORPORAL):
+    temp_aire, temp_globo, temp_bulbo = _numerico(temp_aire), _numerico(temp_globo), _numerico(temp_bulbo)
+    iclo, velocidad_aire = _numerico(iclo), _numerico(velocidad_aire)
+    postura_trabajo = factor_postura(postura)
+    natural = _categoria(conveccion) == "Natural"
+    limites = limites_aclimatacion(aclimatacion)
+    # Pasar la tasa metabólica a W/m2
+    carga_metabolica = _numerico(carga_metabolica) / _numerico(superficie_corporal)
+    resultado = _resultado(DTYPE_SUDORACION, temp_aire, temp_globo, temp_bulbo, iclo, carga_metabolica,
+                           velocidad_aire, postura_trabajo, natural, limites["w_max"])
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        temp_radiante_media = temperatura_radiante_media(temp_globo, temp_aire, velocidad_aire)
+        presion_ambiente = presion_parcial_ambiente(temp_aire, temp_bulbo)
+        e_max, e_req = balance_sudoracion(temp_aire, presion_ambiente, temp_radiante_media, iclo, carga_metabolica,
+                                          velocidad_aire, postura_trabajo, natural)
+        tiempos_limite_sudoracion(e_max, e_req, limites, resultado)
+    return resultado
+
+
+def factor_postura(postura):
+    """Ar/Adu (arreglo) según la postura de trabajo de cada fila."""
+    return np.array(list(POSTURAS.values()))[_codigos(postura, tuple(POSTURAS), "postura")]
+
+
+def limites_aclimatacion(aclimatacion):
+    """w_max, sw_max, Q_max y D_max (arreglos) según la aclimatación de cada fila."""
+    codigo_aclimatacion = _codigos(aclimatacion, tuple(ACLIMATACION), "aclimatacion")
+    return {clave: np.array([v[clave] for v in ACLIMATACION.values()], dtype=np.float64)[codigo_aclimatacion]
+            for clave in ACLIMATACION["Si"]}
+
+
+def balance_sudoracion(temp_aire, presion_ambiente, temp_radiante_media, iclo, carga_metabolica, velocidad_aire, postura_trabajo, natural):
+    """Evaporación máxima (Emax) y requerida (Ereq) en W/m² del método SWreq.
+
+    `presion_ambiente` es la presión parcial de vapor (kPa), `carga_metabolica`
+    ya en W/m², `postura_trabajo` es el Ar/Adu numérico y `natural` una máscara
+    booleana de convección natural.
+    """
+    temp_piel = 30 + (0.0930 * temp_aire) + (0.045 * temp_radiante_media) - (0.571 * velocidad_aire) + (0.2540 * presion_ambiente) + (0.00128 * carga_metabolica) - (3.570 * iclo)
+    presion_vapor_piel = presion_saturacion(temp_piel)
+
+    velocidad_aire_relativa = velocidad_aire + (0.0052 * (carga_metabolica - 58))
+    hc = np.where(natural | (velocidad_aire_relativa <= 1),
+                  3.5 + (5.2 * velocidad_aire_relativa),
+                  8.7*(np.abs(velocidad_aire_relativa)**0.6))
+    hr = (EMISIVIDAD_PIEL * BOLTZMAN * postura_trabajo * (((temp_piel + 273)**4) - ((temp_radiante_media + 273)**4))) / (temp_piel - temp_radiante_media)
+    he = 16.7 * hc
+    fclo = 1 + (1.970 * iclo)
+    f_mayus_clo = 1 / (((hc + hr) * iclo) + (1 / fclo))
+    feclo = 1 / (1 + (2.22 * hc * (iclo - ((fclo - 1) / ((hc + hr) * fclo)))))
+    resistencia_total_vestido = 1 / (he * feclo)
+
+    e_max = (presion_vapor_piel - presion_ambiente) / resistencia_total_vestido
+    c_res = 0.0014 * carga_metabolica * (35 - temp_aire)
+    e_res = 0.0173 * carga_metabolica * (5.624 - presion_ambiente)
+    r = hr * f_mayus_clo * (temp_piel - temp_radiante_media)
+    c = hc * f_mayus_clo * (temp_piel - temp_aire)
+    e_req = carga_metabolica - c_res - e_res - c - r
+    return e_max, e_req
+
+
+def tiempos_limite_sudoracion(e_max, e_req, limites, resultado):
+    """Aplica los topes de w_max y sw_max y escribe los cuatro DLE y el estado en `resultado`.
+
+    Sin sudoración (sw_p <= 0) los DLE de deshidratación valen inf, como sin
+    almacenamiento los de calor. Con Emax < 0 los DLE valen 0 (EMAX_NEGATIVO); si
+    Emax o Ereq no son finitos, NaN (SIN_DATO).
+    """
+    w_max, sw_max = limites["w_max"], limites["sw_max"]
+    w_p = np.minimum(e_req / e_max, w_max)
+    e_p = w_p * e_max
+    sw_p = e_p / (1 - (w_p**2) / 2)
+    # Si la sudoración supera sw_max se recalcula la humedad de la piel
+    excede = sw_p > sw_max
+    w_p = np.where(excede, np.sqrt((e_max / sw_max)**2 + 2) - (e_max / sw_max), w_p)
+    e_p = np.where(excede, w_p * e_max, e_p)
+    sw_p = np.where(excede, sw_max, sw_p)
+
+    # Sin almacenamiento de calor (e_p == e_req) el residuo es solo redondeo: límite infinito
+    almacenamiento = e_req - e_p
+    almacenamiento = np.where(almacenamiento <= 1e-9 * np.abs(e_req), 0, almacenamiento)
+    invalido = e_max < 0
+    sin_dato = ~np.isfinite(e_max) | (~invalido & ~np.isfinite(e_req))
+    sin_tiempo = np.where(sin_dato, np.nan, 0)
+    resultado["dle_alarma_q"] = np.where(invalido | sin_dato, sin_tiempo, 60 * limites["Q_max_alarma"] / almacenamiento)
+    resultado["dle_peligro_q"] = np.where(invalido | sin_dato, sin_tiempo, 60 * limites["Q_max_peligro"] / almacenamiento)
+    # Sin sudoración (sw_p <= 0, el cuerpo pierde calor) no hay límite de deshidratación
+    sw_p = np.where(sw_p <= 0, 0, sw_p)
+    resultado["dle_alarma_d"] = np.where(invalido | sin_dato, sin_tiempo, 60 * limites["D_max_alarma"] / sw_p)
+    resultado["dle_peligro_d"] = np.where(invalido | sin_dato, sin_tiempo, 60 * limites["D_max_peligro"] / sw_p)
+    resultado["estado"] = np.select([sin_dato, invalido], [EstadoSudoracion.SIN_DATO, EstadoSudoracion.EMAX_NEGATIVO],
+                                    EstadoSudoracion.CALCULADO)
+    return resultado
+
+
+"""Índice de Sobrecarga Calórica (ISC) vectorizado"""
+
+def indice_sobrecarga_calorica_vec(carga_metabolica, velocidad_aire, temp_globo, temp_aire, temp_bulbo, iclo, altura, peso,
+                                   superficie_corporal=SUPERFICIE_CORPORAL):
+    # Como en funciones.py, altura y peso no intervienen; la superficie corporal es la de la tasa metabólica
+    carga_metabolica = _numerico(carga_metabolica) / _numerico(superficie_corporal)
+    velocidad_aire, iclo = _numerico(velocidad_aire), _numerico(iclo)
+    temp_globo, temp_aire, temp_bulbo = _numerico(temp_globo), _numerico(temp_aire), _numerico(temp_bulbo)
+    resultado = _resultado(DTYPE_ISC, carga_metabolica, velocidad_aire, temp_globo, temp_aire, temp_bulbo, iclo)
+
+    # Valores de K según la vestimenta
+    con_ropa = iclo != 0
+    K_1 = np.where(con_ropa, 7, 11.7)
+    K_2 = np.where(con_ropa, 4.4, 7.3)
+    K_3 = np.where(con_ropa, 4.6, 7.6)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        temp_radiante_media = temperatura_radiante_media(temp_globo, temp_aire, velocidad_aire)
+        presion_ambiente = presion_parcial_ambiente(temp_aire, temp_bulbo)
+        calor_rad = K_2 * (temp_radiante_media - 35)
+        calor_conv = K_3 * (velocidad_aire ** 0.6) * (temp_aire - 35)
+        evaporacion_max = K_1 * (velocidad_aire ** 0.6) * (56 - presion_ambiente)
+        evaporacion_req = carga_metabolica + calor_rad + calor_conv
+        isc = (evaporacion_req / evaporacion_max) * 100
+        tiempo_exp_per = np.where(isc > 100, 2440 / (evaporacion_req - evaporacion_max), np.inf)
+    # ISC NaN o infinito (por ejemplo Emax = 0): sin clasificación ni tiempo de exposición
+    sin_dato = ~np.isfinite(isc)
+
+    resultado["isc"] = isc
+    resultado["clasificacion"] = np.select(
+        [sin_dato, isc <= 10, isc <= 30, isc <= 40, isc <= 80, isc < 100, isc == 100], [7, 0, 1, 2, 3, 4, 5], 6)
+    tiempo_exp_per = np.where(sin_dato, np.nan, tiempo_exp_per)
+    resultado["tiempo_exp_per"] = tiempo_exp_per
+    resultado["evaporacion_max"] = evaporacion_max
+    resultado["evaporacion_req"] = evaporacion_req
+    return resultado